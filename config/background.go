@@ -0,0 +1,274 @@
+package config
+
+import (
+	"context"
+	"database/sql"
+	"fmt"
+	"log"
+	"sync"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/migrations"
+)
+
+// Background migration statuses
+const (
+	BackfillPending   = "pending"
+	BackfillRunning   = "running"
+	BackfillCompleted = "completed"
+	BackfillFailed    = "failed"
+)
+
+// BackfillProgress reports the state of one background migration
+type BackfillProgress struct {
+	Name      string        `json:"name"`
+	Status    string        `json:"status"`
+	Cursor    int64         `json:"cursor"`
+	MaxID     int64         `json:"max_id"`
+	RowsDone  int64         `json:"rows_done"`
+	Percent   float64       `json:"percent"`
+	ETA       time.Duration `json:"eta_ns"`
+	ETAString string        `json:"eta"`
+	Error     string        `json:"error,omitempty"`
+}
+
+// BackgroundMigrator runs backfills in small, throttled, resumable batches on the
+// writer pool while the server is serving traffic
+type BackgroundMigrator struct {
+	db        *Database
+	backfills []migrations.Backfill
+	batchSize int
+	pause     time.Duration
+
+	mu       sync.Mutex
+	progress map[string]*backfillState
+}
+
+// backfillState is the in-memory progress of one backfill
+type backfillState struct {
+	BackfillProgress
+	startCursor int64
+	startedAt   time.Time
+}
+
+// NewBackgroundMigrator creates a migrator for the given backfills.
+// Each batch touches at most batchSize ids; after a batch the migrator sleeps for
+// at least pause, and at least as long as the batch held the writer.
+func NewBackgroundMigrator(db *Database, backfills []migrations.Backfill, batchSize int, pause time.Duration) *BackgroundMigrator {
+	progress := make(map[string]*backfillState, len(backfills))
+	for _, b := range backfills {
+		progress[b.Name] = &backfillState{BackfillProgress: BackfillProgress{Name: b.Name, Status: BackfillPending}}
+	}
+	return &BackgroundMigrator{
+		db:        db,
+		backfills: backfills,
+		batchSize: batchSize,
+		pause:     pause,
+		progress:  progress,
+	}
+}
+
+// Run runs every backfill to completion in order, returning early if ctx is cancelled
+func (m *BackgroundMigrator) Run(ctx context.Context) error {
+	for _, b := range m.backfills {
+		if err := m.runBackfill(ctx, b); err != nil {
+			m.update(b.Name, func(s *backfillState) {
+				s.Status = BackfillFailed
+				s.Error = err.Error()
+			})
+			return fmt.Errorf("background migration %s failed: %w", b.Name, err)
+		}
+	}
+	return nil
+}
+
+// Progress returns a snapshot of every backfill's progress
+func (m *BackgroundMigrator) Progress() []BackfillProgress {
+	m.mu.Lock()
+	defer m.mu.Unlock()
+
+	progress := make([]BackfillProgress, 0, len(m.backfills))
+	for _, b := range m.backfills {
+		progress = append(progress, m.progress[b.Name].BackfillProgress)
+	}
+	return progress
+}
+
+// runBackfill resumes a backfill from its persisted cursor and runs it to completion
+func (m *BackgroundMigrator) runBackfill(ctx context.Context, b migrations.Backfill) error {
+	cursor, rowsDone, status, err := m.loadState(b.Name)
+	if err != nil {
+		return err
+	}
+	if status == BackfillCompleted {
+		m.update(b.Name, func(s *backfillState) {
+			s.Status = BackfillCompleted
+			s.Cursor = cursor
+			s.RowsDone = rowsDone
+			s.Percent = 100
+		})
+		return nil
+	}
+
+	// The id range is fixed at start; rows inserted later are written by the
+	// application in the new shape and do not need backfilling
+	var maxID sql.NullInt64
+	if err := m.db.DB.QueryRowContext(ctx, "SELECT MAX(id) FROM "+b.Table).Scan(&maxID); err != nil {
+		return fmt.Errorf("failed to read id range: %w", err)
+	}
+
+	log.Printf("Background migration %s: resuming at id %d of %d", b.Name, cursor, maxID.Int64)
+	m.update(b.Name, func(s *backfillState) {
+		s.Status = BackfillRunning
+		s.Cursor = cursor
+		s.MaxID = maxID.Int64
+		s.RowsDone = rowsDone
+		s.startCursor = cursor
+		s.startedAt = time.Now()
+	})
+
+	lastLog := time.Now()
+	for b.Update != "" && cursor < maxID.Int64 {
+		upper := cursor + int64(m.batchSize)
+		if upper > maxID.Int64 {
+			upper = maxID.Int64
+		}
+
+		start := time.Now()
+		affected, err := m.runBatch(ctx, b, cursor, upper)
+		if err != nil {
+			return err
+		}
+		held := time.Since(start)
+
+		cursor = upper
+		rowsDone += affected
+		m.update(b.Name, func(s *backfillState) {
+			s.Cursor = cursor
+			s.RowsDone = rowsDone
+			s.estimate()
+		})
+
+		if time.Since(lastLog) > 10*time.Second {
+			p := m.snapshot(b.Name)
+			log.Printf("Background migration %s: %.1f%% (id %d of %d), ETA %s", b.Name, p.Percent, p.Cursor, p.MaxID, p.ETAString)
+			lastLog = time.Now()
+		}
+
+		// Throttle so foreground writes get the writer at least half of the time
+		sleep := m.pause
+		if held > sleep {
+			sleep = held
+		}
+		select {
+		case <-ctx.Done():
+			return nil
+		case <-time.After(sleep):
+		}
+	}
+
+	if b.Finalize != "" {
+		log.Printf("Background migration %s: finalizing", b.Name)
+		if _, err := m.db.DB.ExecContext(ctx, b.Finalize); err != nil {
+			return fmt.Errorf("failed to finalize: %w", err)
+		}
+	}
+
+	if _, err := m.db.DB.ExecContext(ctx,
+		"UPDATE background_migrations SET status = ?, updated_at = CURRENT_TIMESTAMP, completed_at = CURRENT_TIMESTAMP WHERE name = ?",
+		BackfillCompleted, b.Name,
+	); err != nil {
+		return fmt.Errorf("failed to record completion: %w", err)
+	}
+
+	m.update(b.Name, func(s *backfillState) {
+		s.Status = BackfillCompleted
+		s.Percent = 100
+		s.ETA = 0
+		s.ETAString = "0s"
+	})
+	log.Printf("Background migration %s: completed, %d rows updated", b.Name, rowsDone)
+	return nil
+}
+
+// runBatch updates the ids in (lower, upper] and advances the persisted cursor in one transaction
+func (m *BackgroundMigrator) runBatch(ctx context.Context, b migrations.Backfill, lower, upper int64) (int64, error) {
+	tx, err := m.db.DB.BeginTx(ctx, nil)
+	if err != nil {
+		return 0, fmt.Errorf("failed to begin transaction: %w", err)
+	}
+	defer tx.Rollback()
+
+	result, err := tx.ExecContext(ctx, b.Update, lower, upper)
+	if err != nil {
+		return 0, fmt.Errorf("failed to run batch (%d, %d]: %w", lower, upper, err)
+	}
+	affected, err := result.RowsAffected()
+	if err != nil {
+		return 0, fmt.Errorf("failed to get rows affected: %w", err)
+	}
+
+	if _, err := tx.ExecContext(ctx,
+		"UPDATE background_migrations SET cursor = ?, rows_done = rows_done + ?, updated_at = CURRENT_TIMESTAMP WHERE name = ?",
+		upper, affected, b.Name,
+	); err != nil {
+		return 0, fmt.Errorf("failed to record progress: %w", err)
+	}
+
+	if err := tx.Commit(); err != nil {
+		return 0, fmt.Errorf("failed to commit batch: %w", err)
+	}
+	return affected, nil
+}
+
+// loadState reads the persisted cursor for a backfill, registering it on first run
+func (m *BackgroundMigrator) loadState(name string) (int64, int64, string, error) {
+	if _, err := m.db.DB.Exec(
+		"INSERT OR IGNORE INTO background_migrations (name, status) VALUES (?, ?)",
+		name, BackfillRunning,
+	); err != nil {
+		return 0, 0, "", fmt.Errorf("failed to register background migration: %w", err)
+	}
+
+	var cursor, rowsDone int64
+	var status string
+	if err := m.db.DB.QueryRow(
+		"SELECT cursor, rows_done, status FROM background_migrations WHERE name = ?",
+		name,
+	).Scan(&cursor, &rowsDone, &status); err != nil {
+		return 0, 0, "", fmt.Errorf("failed to read background migration state: %w", err)
+	}
+	return cursor, rowsDone, status, nil
+}
+
+// update applies fn to a backfill's in-memory state under the lock
+func (m *BackgroundMigrator) update(name string, fn func(s *backfillState)) {
+	m.mu.Lock()
+	defer m.mu.Unlock()
+	fn(m.progress[name])
+}
+
+// snapshot returns a copy of a backfill's progress
+func (m *BackgroundMigrator) snapshot(name string) BackfillProgress {
+	m.mu.Lock()
+	defer m.mu.Unlock()
+	return m.progress[name].BackfillProgress
+}
+
+// estimate recomputes the completion percentage and ETA from the rate since this run started
+func (s *backfillState) estimate() {
+	if s.MaxID <= 0 {
+		s.Percent = 100
+		return
+	}
+	s.Percent = float64(s.Cursor) / float64(s.MaxID) * 100
+
+	covered := s.Cursor - s.startCursor
+	elapsed := time.Since(s.startedAt)
+	if covered <= 0 || elapsed <= 0 {
+		return
+	}
+	remaining := s.MaxID - s.Cursor
+	s.ETA = time.Duration(float64(elapsed) * float64(remaining) / float64(covered))
+	s.ETAString = s.ETA.Round(time.Second).String()
+}
@@ -0,0 +1,226 @@
+package config
+
+import (
+	"context"
+	"database/sql"
+	"database/sql/driver"
+	"fmt"
+	"io"
+	"net/url"
+	"sort"
+	"strconv"
+	"strings"
+	"sync"
+
+	"github.com/mattn/go-sqlite3"
+)
+
+// Pragma is a PRAGMA applied to every new connection in a pool
+type Pragma struct {
+	Name  string
+	Value string
+}
+
+// PoolSettings reports the PRAGMA values SQLite returned for the most recently
+// initialized connection in a pool, and how many connections were initialized
+type PoolSettings struct {
+	Pool        string
+	Connections int
+	Pragmas     map[string]string
+}
+
+// pragmas returns the declared PRAGMAs for the writer or reader pool
+func (cfg DatabaseConfig) pragmas(readOnly bool) []Pragma {
+	pragmas := []Pragma{
+		{Name: "foreign_keys", Value: "ON"},
+		{Name: "busy_timeout", Value: strconv.FormatInt(cfg.BusyTimeout.Milliseconds(), 10)},
+		{Name: "synchronous", Value: cfg.Synchronous},
+		// A negative cache_size is interpreted by SQLite as KiB rather than pages
+		{Name: "cache_size", Value: strconv.Itoa(-cfg.CacheSizeKB)},
+		{Name: "mmap_size", Value: strconv.FormatInt(cfg.MmapSize, 10)},
+		{Name: "temp_store", Value: cfg.TempStore},
+	}
+	if cfg.Mode == ModeWAL && !readOnly {
+		pragmas = append([]Pragma{{Name: "journal_mode", Value: "WAL"}}, pragmas...)
+	}
+	return pragmas
+}
+
+// connInit applies a declared set of PRAGMAs to every new connection in a pool
+// and records the values SQLite reports back
+type connInit struct {
+	pool    string
+	pragmas []Pragma
+
+	mu          sync.Mutex
+	connections int
+	live        map[string]string
+}
+
+// hook is installed as the driver's ConnectHook, so it runs once per new connection
+func (ci *connInit) hook(conn *sqlite3.SQLiteConn) error {
+	for _, p := range ci.pragmas {
+		if _, err := conn.Exec("PRAGMA "+p.Name+" = "+p.Value, nil); err != nil {
+			return fmt.Errorf("failed to set PRAGMA %s: %w", p.Name, err)
+		}
+	}
+
+	// Read the settings back so the live values can be reported
+	live := make(map[string]string, len(ci.pragmas))
+	for _, p := range ci.pragmas {
+		value, err := queryPragma(conn, p.Name)
+		if err != nil {
+			return err
+		}
+		live[p.Name] = value
+	}
+
+	ci.mu.Lock()
+	ci.connections++
+	ci.live = live
+	ci.mu.Unlock()
+
+	return nil
+}
+
+// settings returns a snapshot of the recorded settings
+func (ci *connInit) settings() PoolSettings {
+	ci.mu.Lock()
+	defer ci.mu.Unlock()
+
+	pragmas := make(map[string]string, len(ci.live))
+	for name, value := range ci.live {
+		pragmas[name] = value
+	}
+	return PoolSettings{Pool: ci.pool, Connections: ci.connections, Pragmas: pragmas}
+}
+
+// queryPragma reads the current value of a PRAGMA on a raw driver connection
+func queryPragma(conn *sqlite3.SQLiteConn, name string) (string, error) {
+	rows, err := conn.Query("PRAGMA "+name, nil)
+	if err != nil {
+		return "", fmt.Errorf("failed to read PRAGMA %s: %w", name, err)
+	}
+	defer rows.Close()
+
+	dest := make([]driver.Value, len(rows.Columns()))
+	if err := rows.Next(dest); err != nil {
+		if err == io.EOF {
+			return "", nil
+		}
+		return "", fmt.Errorf("failed to read PRAGMA %s: %w", name, err)
+	}
+	if len(dest) == 0 {
+		return "", nil
+	}
+	if b, ok := dest[0].([]byte); ok {
+		return string(b), nil
+	}
+	return fmt.Sprint(dest[0]), nil
+}
+
+// connector opens SQLite connections with a fixed DSN and runs the connection init hook
+type connector struct {
+	dsn    string
+	init   *connInit
+	driver *sqlite3.SQLiteDriver
+}
+
+// newConnector builds a connector for the writer or reader pool
+func newConnector(cfg DatabaseConfig, pool string, readOnly bool) *connector {
+	params := url.Values{}
+	if readOnly {
+		params.Set("mode", "ro")
+	} else if cfg.Mode == ModeWAL {
+		// Take the write lock at BEGIN so transactions never fail on lock upgrade
+		params.Set("_txlock", "immediate")
+	}
+
+	dsn := "file:" + cfg.Path
+	if len(params) > 0 {
+		dsn += "?" + params.Encode()
+	}
+
+	ci := &connInit{pool: pool, pragmas: cfg.pragmas(readOnly)}
+	return &connector{
+		dsn:    dsn,
+		init:   ci,
+		driver: &sqlite3.SQLiteDriver{ConnectHook: ci.hook},
+	}
+}
+
+// Connect opens a new connection
+func (c *connector) Connect(ctx context.Context) (driver.Conn, error) {
+	return c.driver.Open(c.dsn)
+}
+
+// Driver returns the underlying SQLite driver
+func (c *connector) Driver() driver.Driver {
+	return c.driver
+}
+
+// prepareStatements prepares the given queries on the pool and primes them on
+// up to conns connections, so no request pays the prepare cost on a fresh connection
+func prepareStatements(db *sql.DB, queries []string, conns int) (map[string]*sql.Stmt, error) {
+	stmts := make(map[string]*sql.Stmt, len(queries))
+	for _, query := range queries {
+		if _, ok := stmts[query]; ok {
+			continue
+		}
+		stmt, err := db.Prepare(query)
+		if err != nil {
+			closeStatements(stmts)
+			return nil, fmt.Errorf("failed to prepare statement %q: %w", query, err)
+		}
+		stmts[query] = stmt
+	}
+	if len(stmts) == 0 {
+		return stmts, nil
+	}
+
+	// Hold one transaction per connection at the same time so each lands on a
+	// distinct connection. Tx.Stmt prepares the statement on that connection and
+	// registers it with the parent statement, which keeps it after the rollback.
+	txs := make([]*sql.Tx, 0, conns)
+	defer func() {
+		for _, tx := range txs {
+			tx.Rollback()
+		}
+	}()
+	for i := 0; i < conns; i++ {
+		tx, err := db.Begin()
+		if err != nil {
+			closeStatements(stmts)
+			return nil, fmt.Errorf("failed to prime prepared statements: %w", err)
+		}
+		txs = append(txs, tx)
+		for _, stmt := range stmts {
+			tx.Stmt(stmt)
+		}
+	}
+
+	return stmts, nil
+}
+
+// closeStatements closes every prepared statement in the map
+func closeStatements(stmts map[string]*sql.Stmt) {
+	for _, stmt := range stmts {
+		stmt.Close()
+	}
+}
+
+// String formats the settings as "pool (N connections): name=value ..."
+func (s PoolSettings) String() string {
+	names := make([]string, 0, len(s.Pragmas))
+	for name := range s.Pragmas {
+		names = append(names, name)
+	}
+	sort.Strings(names)
+
+	var b strings.Builder
+	fmt.Fprintf(&b, "%s (%d connections):", s.Pool, s.Connections)
+	for _, name := range names {
+		fmt.Fprintf(&b, " %s=%s", name, s.Pragmas[name])
+	}
+	return b.String()
+}
@@ -1,95 +1,294 @@
 package config
 
 import (
+	"context"
 	"database/sql"
 	"fmt"
 	"io/fs"
-	"log"
 	"os"
-	"path/filepath"
-	"sort"
+	"runtime"
+	"strconv"
+	"strings"
+	"time"
 
-	_ "github.com/mattn/go-sqlite3"
+	"github.com/hayden-erickson/ai-evaluation/migrations"
 )
 
-// Database wraps the database connection
+// Storage modes supported by NewDatabaseWithConfig
+const (
+	// ModeSingle opens one shared pool with SQLite's default journal mode
+	ModeSingle = "single"
+	// ModeWAL opens a single-connection writer pool and a read-only reader pool in WAL mode
+	ModeWAL = "wal"
+)
+
+// DatabaseConfig holds the storage mode and SQLite tuning options
+type DatabaseConfig struct {
+	Path            string
+	Mode            string
+	ReadConnections int
+	Synchronous     string
+	CacheSizeKB     int
+	MmapSize        int64
+	TempStore       string
+	BusyTimeout     time.Duration
+
+	// ReadStatements and WriteStatements are prepared on every connection of the
+	// reader and writer pool respectively, and used whenever the same query text is run
+	ReadStatements  []string
+	WriteStatements []string
+
+	// Migrations holds the .sql migration files; it defaults to the files embedded in the binary
+	Migrations fs.FS
+}
+
+// DefaultDatabaseConfig returns the default configuration for a database file
+func DefaultDatabaseConfig(dbPath string) DatabaseConfig {
+	readConns := runtime.NumCPU()
+	if readConns < 4 {
+		readConns = 4
+	}
+	return DatabaseConfig{
+		Path:            dbPath,
+		Mode:            ModeWAL,
+		ReadConnections: readConns,
+		Synchronous:     "NORMAL",
+		CacheSizeKB:     20000,     // ~20 MB page cache per connection
+		MmapSize:        256 << 20, // 256 MB
+		TempStore:       "MEMORY",
+		Migrations:      migrations.FS,
+		BusyTimeout:     5 * time.Second,
+	}
+}
+
+// DatabaseConfigFromEnv returns the default configuration overridden by environment variables
+func DatabaseConfigFromEnv(dbPath string) DatabaseConfig {
+	cfg := DefaultDatabaseConfig(dbPath)
+
+	if mode := os.Getenv("DB_MODE"); mode != "" {
+		cfg.Mode = strings.ToLower(mode)
+	}
+	if v, err := strconv.Atoi(os.Getenv("DB_READ_CONNECTIONS")); err == nil && v > 0 {
+		cfg.ReadConnections = v
+	}
+	if sync := os.Getenv("DB_SYNCHRONOUS"); sync != "" {
+		cfg.Synchronous = strings.ToUpper(sync)
+	}
+	if v, err := strconv.Atoi(os.Getenv("DB_CACHE_SIZE_KB")); err == nil && v >= 0 {
+		cfg.CacheSizeKB = v
+	}
+	if v, err := strconv.ParseInt(os.Getenv("DB_MMAP_SIZE"), 10, 64); err == nil && v >= 0 {
+		cfg.MmapSize = v
+	}
+	if tempStore := os.Getenv("DB_TEMP_STORE"); tempStore != "" {
+		cfg.TempStore = strings.ToUpper(tempStore)
+	}
+	if v, err := strconv.Atoi(os.Getenv("DB_BUSY_TIMEOUT_MS")); err == nil && v >= 0 {
+		cfg.BusyTimeout = time.Duration(v) * time.Millisecond
+	}
+
+	return cfg
+}
+
+// Database wraps the database connection pools.
+// DB is the writer pool and ReadDB is the reader pool; in single mode both point to the same pool.
 type Database struct {
-	DB *sql.DB
+	DB     *sql.DB
+	ReadDB *sql.DB
+
+	writerInit *connInit
+	readerInit *connInit
+	readStmts  map[string]*sql.Stmt
+	writeStmts map[string]*sql.Stmt
 }
 
-// NewDatabase creates a new database connection and runs migrations
+// NewDatabase creates a new database connection with the default configuration and runs migrations
 func NewDatabase(dbPath string) (*Database, error) {
-	// Create database file if it doesn't exist
-	db, err := sql.Open("sqlite3", dbPath)
+	return NewDatabaseWithConfig(DefaultDatabaseConfig(dbPath))
+}
+
+// NewDatabaseWithConfig creates the database connection pools for the configured mode and runs migrations
+func NewDatabaseWithConfig(cfg DatabaseConfig) (*Database, error) {
+	var database *Database
+	var err error
+
+	switch cfg.Mode {
+	case ModeSingle:
+		database, err = openSingle(cfg)
+	case ModeWAL:
+		// An in-memory database cannot be shared between two pools
+		if cfg.Path == ":memory:" {
+			database, err = openSingle(cfg)
+		} else {
+			database, err = openWAL(cfg)
+		}
+	default:
+		return nil, fmt.Errorf("unknown database mode: %s", cfg.Mode)
+	}
 	if err != nil {
-		return nil, fmt.Errorf("failed to open database: %w", err)
+		return nil, err
 	}
 
-	// Enable foreign key constraints
-	if _, err := db.Exec("PRAGMA foreign_keys = ON"); err != nil {
-		db.Close()
-		return nil, fmt.Errorf("failed to enable foreign keys: %w", err)
+	// Run migrations
+	if err := database.runMigrations(cfg.Migrations); err != nil {
+		database.Close()
+		return nil, fmt.Errorf("failed to run migrations: %w", err)
 	}
 
-	database := &Database{DB: db}
+	// Prepare hot statements once the schema exists
+	if err := database.prepareStatements(cfg); err != nil {
+		database.Close()
+		return nil, err
+	}
 
-	// Run migrations
-	if err := database.runMigrations(); err != nil {
+	return database, nil
+}
+
+// openSingle opens one shared connection pool with SQLite's default journal mode
+func openSingle(cfg DatabaseConfig) (*Database, error) {
+	// Create database file if it doesn't exist
+	conn := newConnector(cfg, "shared", false)
+	db := sql.OpenDB(conn)
+
+	// Open the first connection so PRAGMA errors surface here
+	if err := db.Ping(); err != nil {
 		db.Close()
-		return nil, fmt.Errorf("failed to run migrations: %w", err)
+		return nil, fmt.Errorf("failed to open database: %w", err)
 	}
 
-	return database, nil
+	return &Database{DB: db, ReadDB: db, writerInit: conn.init}, nil
 }
 
-// runMigrations runs all SQL migration files in the migrations directory
-func (d *Database) runMigrations() error {
-	migrationsDir := "migrations"
+// openWAL opens a single-connection writer pool and a read-only reader pool in WAL mode
+func openWAL(cfg DatabaseConfig) (*Database, error) {
+	// The writer is opened first so the database file exists and is switched to WAL
+	// before any read-only connection is made
+	writerConn := newConnector(cfg, "writer", false)
+	writer := sql.OpenDB(writerConn)
+	writer.SetMaxOpenConns(1)
+	writer.SetMaxIdleConns(1)
+	writer.SetConnMaxLifetime(0)
 
-	// Check if migrations directory exists
-	if _, err := os.Stat(migrationsDir); os.IsNotExist(err) {
-		log.Println("No migrations directory found, skipping migrations")
-		return nil
+	var journalMode string
+	if err := writer.QueryRow("PRAGMA journal_mode").Scan(&journalMode); err != nil {
+		writer.Close()
+		return nil, fmt.Errorf("failed to open database: %w", err)
+	}
+	if !strings.EqualFold(journalMode, "wal") {
+		writer.Close()
+		return nil, fmt.Errorf("failed to enable WAL mode: journal_mode is %s", journalMode)
 	}
 
-	// Read all migration files
-	var migrationFiles []string
-	err := filepath.WalkDir(migrationsDir, func(path string, entry fs.DirEntry, err error) error {
-		if err != nil {
-			return err
-		}
-		// Only process .sql files
-		if !entry.IsDir() && filepath.Ext(path) == ".sql" {
-			migrationFiles = append(migrationFiles, path)
-		}
-		return nil
-	})
-	if err != nil {
-		return fmt.Errorf("failed to read migrations directory: %w", err)
+	readerConn := newConnector(cfg, "reader", true)
+	reader := sql.OpenDB(readerConn)
+	reader.SetMaxOpenConns(cfg.ReadConnections)
+	reader.SetMaxIdleConns(cfg.ReadConnections)
+	reader.SetConnMaxLifetime(0)
+
+	if err := reader.Ping(); err != nil {
+		reader.Close()
+		writer.Close()
+		return nil, fmt.Errorf("failed to open read pool: %w", err)
 	}
 
-	// Sort migration files to ensure they run in order
-	sort.Strings(migrationFiles)
+	return &Database{DB: writer, ReadDB: reader, writerInit: writerConn.init, readerInit: readerConn.init}, nil
+}
 
-	// Execute each migration
-	for _, file := range migrationFiles {
-		log.Printf("Running migration: %s", file)
-		content, err := os.ReadFile(file)
-		if err != nil {
-			return fmt.Errorf("failed to read migration file %s: %w", file, err)
-		}
+// prepareStatements prepares the configured hot statements on the writer and reader pools
+func (d *Database) prepareStatements(cfg DatabaseConfig) error {
+	readConns := 1
+	if d.ReadDB != d.DB {
+		readConns = cfg.ReadConnections
+	}
 
-		// Execute the migration
-		if _, err := d.DB.Exec(string(content)); err != nil {
-			return fmt.Errorf("failed to execute migration %s: %w", file, err)
-		}
+	writeStmts, err := prepareStatements(d.DB, cfg.WriteStatements, 1)
+	if err != nil {
+		return err
 	}
+	d.writeStmts = writeStmts
+
+	readStmts, err := prepareStatements(d.ReadDB, cfg.ReadStatements, readConns)
+	if err != nil {
+		return err
+	}
+	d.readStmts = readStmts
 
-	log.Println("All migrations completed successfully")
 	return nil
 }
 
-// Close closes the database connection
+// Settings returns the live PRAGMA values recorded for each connection pool
+func (d *Database) Settings() []PoolSettings {
+	settings := []PoolSettings{d.writerInit.settings()}
+	if d.readerInit != nil {
+		settings = append(settings, d.readerInit.settings())
+	}
+	return settings
+}
+
+// Exec runs a write statement on the writer pool
+func (d *Database) Exec(query string, args ...interface{}) (sql.Result, error) {
+	if stmt, ok := d.writeStmts[query]; ok {
+		return stmt.Exec(args...)
+	}
+	return d.DB.Exec(query, args...)
+}
+
+// ExecReturning runs a write statement with a RETURNING clause on the writer pool
+func (d *Database) ExecReturning(query string, args ...interface{}) *sql.Row {
+	if stmt, ok := d.writeStmts[query]; ok {
+		return stmt.QueryRow(args...)
+	}
+	return d.DB.QueryRow(query, args...)
+}
+
+// ExecReturningRows runs a write statement with a RETURNING clause on the writer
+// pool and returns all of its rows. The rows hold the writer until they are closed.
+func (d *Database) ExecReturningRows(query string, args ...interface{}) (*sql.Rows, error) {
+	if stmt, ok := d.writeStmts[query]; ok {
+		return stmt.Query(args...)
+	}
+	return d.DB.Query(query, args...)
+}
+
+// Query runs a read statement on the reader pool
+func (d *Database) Query(query string, args ...interface{}) (*sql.Rows, error) {
+	if stmt, ok := d.readStmts[query]; ok {
+		return stmt.Query(args...)
+	}
+	return d.ReadDB.Query(query, args...)
+}
+
+// QueryContext runs a read statement on the reader pool, stopping when ctx is cancelled
+func (d *Database) QueryContext(ctx context.Context, query string, args ...interface{}) (*sql.Rows, error) {
+	if stmt, ok := d.readStmts[query]; ok {
+		return stmt.QueryContext(ctx, args...)
+	}
+	return d.ReadDB.QueryContext(ctx, query, args...)
+}
+
+// BeginRead starts a read-only transaction on the reader pool. In WAL mode every
+// query in it sees the same snapshot of the database.
+func (d *Database) BeginRead(ctx context.Context) (*sql.Tx, error) {
+	return d.ReadDB.BeginTx(ctx, &sql.TxOptions{ReadOnly: true})
+}
+
+// QueryRow runs a single-row read statement on the reader pool
+func (d *Database) QueryRow(query string, args ...interface{}) *sql.Row {
+	if stmt, ok := d.readStmts[query]; ok {
+		return stmt.QueryRow(args...)
+	}
+	return d.ReadDB.QueryRow(query, args...)
+}
+
+// Close closes the prepared statements and the database connection pools
 func (d *Database) Close() error {
+	closeStatements(d.readStmts)
+	closeStatements(d.writeStmts)
+	if d.ReadDB != nil && d.ReadDB != d.DB {
+		if err := d.ReadDB.Close(); err != nil {
+			d.DB.Close()
+			return err
+		}
+	}
 	return d.DB.Close()
 }
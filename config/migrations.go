@@ -0,0 +1,212 @@
+package config
+
+import (
+	"crypto/sha256"
+	"encoding/hex"
+	"fmt"
+	"io/fs"
+	"log"
+	"path"
+	"sort"
+	"strings"
+)
+
+// legacyMigrations are the migrations the pre-ledger runner, which re-executed
+// every file on boot, could have applied, in order. Each has a query counting the
+// schema objects it creates and the count once they all exist. A database with
+// tables but no ledger is baselined at the last migration of the leading run whose
+// objects are all present; the migrations after it are applied as usual.
+var legacyMigrations = []struct {
+	version string
+	check   string
+	want    int
+}{
+	{"001_create_users_table", "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'users'", 1},
+	{"002_create_habits_table", "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'habits'", 1},
+	{"003_create_logs_table", "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'logs'", 1},
+	{"004_add_duration_to_habits_and_logs", "SELECT (SELECT COUNT(*) FROM pragma_table_info('habits') WHERE name = 'duration_seconds') + " +
+		"(SELECT COUNT(*) FROM pragma_table_info('logs') WHERE name = 'duration_seconds')", 2},
+}
+
+// migration is a single versioned .sql file
+type migration struct {
+	version  string
+	sql      string
+	checksum string
+}
+
+// loadMigrations reads the .sql files from fsys in version order
+func loadMigrations(fsys fs.FS) ([]migration, error) {
+	entries, err := fs.ReadDir(fsys, ".")
+	if err != nil {
+		return nil, fmt.Errorf("failed to read migrations: %w", err)
+	}
+
+	var migrations []migration
+	for _, entry := range entries {
+		// Only process .sql files
+		if entry.IsDir() || path.Ext(entry.Name()) != ".sql" {
+			continue
+		}
+		content, err := fs.ReadFile(fsys, entry.Name())
+		if err != nil {
+			return nil, fmt.Errorf("failed to read migration file %s: %w", entry.Name(), err)
+		}
+		sum := sha256.Sum256(content)
+		migrations = append(migrations, migration{
+			version:  strings.TrimSuffix(entry.Name(), ".sql"),
+			sql:      string(content),
+			checksum: hex.EncodeToString(sum[:]),
+		})
+	}
+
+	// Sort migrations to ensure they run in order
+	sort.Slice(migrations, func(i, j int) bool { return migrations[i].version < migrations[j].version })
+	return migrations, nil
+}
+
+// runMigrations applies pending migrations and records them in the schema_migrations ledger.
+// When the schema is current this costs a single ledger read.
+func (d *Database) runMigrations(fsys fs.FS) error {
+	if fsys == nil {
+		log.Println("No migrations configured, skipping migrations")
+		return nil
+	}
+
+	migrations, err := loadMigrations(fsys)
+	if err != nil {
+		return err
+	}
+
+	applied, err := d.readLedger()
+	if err != nil {
+		return err
+	}
+	if applied == nil {
+		// No ledger yet: create it, baselining databases built by the legacy runner
+		if applied, err = d.createLedger(migrations); err != nil {
+			return err
+		}
+	}
+
+	pending := 0
+	for _, m := range migrations {
+		checksum, ok := applied[m.version]
+		if ok {
+			if checksum != m.checksum {
+				return fmt.Errorf("migration %s has changed since it was applied (checksum %s, recorded %s)", m.version, m.checksum, checksum)
+			}
+			continue
+		}
+
+		log.Printf("Running migration: %s", m.version)
+		if err := d.applyMigration(m); err != nil {
+			return err
+		}
+		pending++
+	}
+
+	if pending == 0 {
+		log.Println("Database schema is up to date")
+	} else {
+		log.Printf("Applied %d migrations successfully", pending)
+	}
+	return nil
+}
+
+// readLedger returns the applied migration checksums by version, or nil if the ledger does not exist
+func (d *Database) readLedger() (map[string]string, error) {
+	rows, err := d.DB.Query("SELECT version, checksum FROM schema_migrations")
+	if err != nil {
+		if strings.Contains(err.Error(), "no such table") {
+			return nil, nil
+		}
+		return nil, fmt.Errorf("failed to read schema_migrations: %w", err)
+	}
+	defer rows.Close()
+
+	applied := map[string]string{}
+	for rows.Next() {
+		var version, checksum string
+		if err := rows.Scan(&version, &checksum); err != nil {
+			return nil, fmt.Errorf("failed to scan schema_migrations: %w", err)
+		}
+		applied[version] = checksum
+	}
+	if err := rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating schema_migrations: %w", err)
+	}
+
+	return applied, nil
+}
+
+// createLedger creates the schema_migrations table. If the database already has
+// (part of) the application schema from the legacy runner, the legacy migrations
+// whose schema is present are recorded as applied without being executed again.
+func (d *Database) createLedger(migrations []migration) (map[string]string, error) {
+	tx, err := d.DB.Begin()
+	if err != nil {
+		return nil, fmt.Errorf("failed to begin transaction: %w", err)
+	}
+	defer tx.Rollback()
+
+	if _, err := tx.Exec(`CREATE TABLE IF NOT EXISTS schema_migrations (
+		version TEXT PRIMARY KEY,
+		checksum TEXT NOT NULL,
+		applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+	)`); err != nil {
+		return nil, fmt.Errorf("failed to create schema_migrations: %w", err)
+	}
+
+	// Find the last legacy migration whose schema, and that of every one before it, is present
+	baseline := ""
+	for _, legacy := range legacyMigrations {
+		var found int
+		if err := tx.QueryRow(legacy.check).Scan(&found); err != nil {
+			return nil, fmt.Errorf("failed to inspect schema: %w", err)
+		}
+		if found < legacy.want {
+			break
+		}
+		baseline = legacy.version
+	}
+
+	applied := map[string]string{}
+	for _, m := range migrations {
+		if m.version > baseline {
+			break
+		}
+		if _, err := tx.Exec("INSERT INTO schema_migrations (version, checksum) VALUES (?, ?)", m.version, m.checksum); err != nil {
+			return nil, fmt.Errorf("failed to baseline migration %s: %w", m.version, err)
+		}
+		applied[m.version] = m.checksum
+		log.Printf("Baselined migration: %s", m.version)
+	}
+
+	if err := tx.Commit(); err != nil {
+		return nil, fmt.Errorf("failed to commit schema_migrations: %w", err)
+	}
+	return applied, nil
+}
+
+// applyMigration executes a migration and records it in the ledger in one transaction
+func (d *Database) applyMigration(m migration) error {
+	tx, err := d.DB.Begin()
+	if err != nil {
+		return fmt.Errorf("failed to begin transaction: %w", err)
+	}
+	defer tx.Rollback()
+
+	// Execute the migration
+	if _, err := tx.Exec(m.sql); err != nil {
+		return fmt.Errorf("failed to execute migration %s: %w", m.version, err)
+	}
+	if _, err := tx.Exec("INSERT INTO schema_migrations (version, checksum) VALUES (?, ?)", m.version, m.checksum); err != nil {
+		return fmt.Errorf("failed to record migration %s: %w", m.version, err)
+	}
+
+	if err := tx.Commit(); err != nil {
+		return fmt.Errorf("failed to commit migration %s: %w", m.version, err)
+	}
+	return nil
+}
@@ -0,0 +1,67 @@
+package config
+
+import (
+	"os"
+	"strconv"
+	"time"
+)
+
+// TwilioConfig holds the Twilio account, the sending limits and the HTTP client settings for SMS reminders
+type TwilioConfig struct {
+	// BaseURL is the API root; point it at a stand-in to send nothing for real
+	BaseURL    string
+	AccountSID string
+	AuthToken  string
+	FromNumber string
+
+	// RatePerSecond and Burst limit the messages handed to Twilio across all workers
+	RatePerSecond float64
+	Burst         int
+	// MaxConnections bounds the kept-alive connections to the API
+	MaxConnections int
+	Timeout        time.Duration
+
+	// BreakerThreshold consecutive failures stop sending for BreakerCooldown
+	BreakerThreshold int
+	BreakerCooldown  time.Duration
+}
+
+// DefaultTwilioConfig returns the default configuration without an account
+func DefaultTwilioConfig() TwilioConfig {
+	return TwilioConfig{
+		BaseURL:          "https://api.twilio.com",
+		RatePerSecond:    10,
+		Burst:            10,
+		MaxConnections:   16,
+		Timeout:          10 * time.Second,
+		BreakerThreshold: 5,
+		BreakerCooldown:  30 * time.Second,
+	}
+}
+
+// TwilioConfigFromEnv returns the default configuration overridden by environment
+// variables, and whether an account is configured
+func TwilioConfigFromEnv() (TwilioConfig, bool) {
+	cfg := DefaultTwilioConfig()
+
+	if baseURL := os.Getenv("TWILIO_BASE_URL"); baseURL != "" {
+		cfg.BaseURL = baseURL
+	}
+	cfg.AccountSID = os.Getenv("TWILIO_ACCOUNT_SID")
+	cfg.AuthToken = os.Getenv("TWILIO_AUTH_TOKEN")
+	cfg.FromNumber = os.Getenv("TWILIO_FROM_NUMBER")
+	if v, err := strconv.ParseFloat(os.Getenv("TWILIO_RATE_PER_SECOND"), 64); err == nil && v > 0 {
+		cfg.RatePerSecond = v
+	}
+	if v, err := strconv.Atoi(os.Getenv("TWILIO_BURST")); err == nil && v > 0 {
+		cfg.Burst = v
+	}
+	if v, err := strconv.Atoi(os.Getenv("TWILIO_MAX_CONNECTIONS")); err == nil && v > 0 {
+		cfg.MaxConnections = v
+	}
+	if v, err := strconv.Atoi(os.Getenv("TWILIO_TIMEOUT_MS")); err == nil && v > 0 {
+		cfg.Timeout = time.Duration(v) * time.Millisecond
+	}
+
+	return cfg, cfg.AccountSID != "" && cfg.AuthToken != "" && cfg.FromNumber != ""
+}
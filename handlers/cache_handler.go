@@ -0,0 +1,44 @@
+package handlers
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+
+	"github.com/hayden-erickson/ai-evaluation/middleware"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// CacheHandler reports the counters of the in-memory caches and token revocations
+type CacheHandler struct {
+	habitCache  *repository.HabitCache
+	tokenCache  *middleware.TokenCache
+	revocations *repository.TokenRevocations
+}
+
+// NewCacheHandler creates a new cache handler
+func NewCacheHandler(habitCache *repository.HabitCache, tokenCache *middleware.TokenCache, revocations *repository.TokenRevocations) *CacheHandler {
+	return &CacheHandler{
+		habitCache:  habitCache,
+		tokenCache:  tokenCache,
+		revocations: revocations,
+	}
+}
+
+// GetStats handles getting cache hits, misses, evictions and sizes (GET /health/cache)
+func (h *CacheHandler) GetStats(w http.ResponseWriter, r *http.Request) {
+	// Only allow GET requests
+	if r.Method != http.MethodGet {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Return the counters of every cache
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(struct {
+		Habits      repository.HabitCacheStats       `json:"habits"`
+		Tokens      middleware.TokenCacheStats       `json:"tokens"`
+		Revocations repository.TokenRevocationsStats `json:"revocations"`
+	}{h.habitCache.Stats(), h.tokenCache.Stats(), h.revocations.Stats()})
+}
@@ -0,0 +1,85 @@
+package handlers
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+	"strconv"
+	"strings"
+
+	"github.com/hayden-erickson/ai-evaluation/middleware"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/service"
+)
+
+// CalendarHandler handles calendar HTTP requests
+type CalendarHandler struct {
+	service service.CalendarService
+}
+
+// NewCalendarHandler creates a new calendar handler
+func NewCalendarHandler(service service.CalendarService) *CalendarHandler {
+	return &CalendarHandler{
+		service: service,
+	}
+}
+
+// GetCalendar handles getting a habit's daily log counts and durations
+// (GET /habits/{habit_id}/calendar?from=&to=)
+func (h *CalendarHandler) GetCalendar(w http.ResponseWriter, r *http.Request) {
+	// Only allow GET requests
+	if r.Method != http.MethodGet {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Get authenticated user ID from context
+	userID, ok := middleware.GetUserIDFromContext(r.Context())
+	if !ok {
+		log.Println("User ID not found in context")
+		http.Error(w, "Unauthorized", http.StatusUnauthorized)
+		return
+	}
+
+	// Extract habit ID from URL path
+	pathParts := strings.Split(strings.Trim(r.URL.Path, "/"), "/")
+	if len(pathParts) < 3 {
+		log.Println("Missing habit ID in path")
+		http.Error(w, "Habit ID required", http.StatusBadRequest)
+		return
+	}
+
+	habitID, err := strconv.ParseInt(pathParts[1], 10, 64)
+	if err != nil {
+		log.Printf("Invalid habit ID: %v", err)
+		http.Error(w, "Invalid habit ID", http.StatusBadRequest)
+		return
+	}
+
+	// Parse the date range
+	dates, err := models.CalendarRangeFromQuery(r.URL.Query())
+	if err != nil {
+		log.Printf("Invalid date range parameters: %v", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+
+	// Get the calendar
+	calendar, err := h.service.GetCalendar(habitID, userID, dates)
+	if err != nil {
+		log.Printf("Failed to get calendar: %v", err)
+		if strings.Contains(err.Error(), "validation") {
+			http.Error(w, err.Error(), http.StatusBadRequest)
+		} else if strings.Contains(err.Error(), "not found") {
+			http.Error(w, "Habit not found", http.StatusNotFound)
+		} else {
+			http.Error(w, "Internal server error", http.StatusInternalServerError)
+		}
+		return
+	}
+
+	// Return the calendar
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(calendar)
+}
@@ -0,0 +1,69 @@
+package handlers
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+	"strings"
+
+	"github.com/hayden-erickson/ai-evaluation/middleware"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/service"
+)
+
+// DashboardHandler handles dashboard HTTP requests
+type DashboardHandler struct {
+	service service.DashboardService
+}
+
+// NewDashboardHandler creates a new dashboard handler
+func NewDashboardHandler(service service.DashboardService) *DashboardHandler {
+	return &DashboardHandler{
+		service: service,
+	}
+}
+
+// GetDashboard handles getting the authenticated user's habits with their recent
+// logs and current streaks (GET /dashboard?days=)
+func (h *DashboardHandler) GetDashboard(w http.ResponseWriter, r *http.Request) {
+	// Only allow GET requests
+	if r.Method != http.MethodGet {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Get authenticated user ID from context
+	userID, ok := middleware.GetUserIDFromContext(r.Context())
+	if !ok {
+		log.Println("User ID not found in context")
+		http.Error(w, "Unauthorized", http.StatusUnauthorized)
+		return
+	}
+
+	// Parse the days parameter
+	days, err := models.DashboardDaysFromQuery(r.URL.Query())
+	if err != nil {
+		log.Printf("Invalid days parameter: %v", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+
+	// Get the dashboard
+	dashboard, err := h.service.GetDashboard(r.Context(), userID, days)
+	if err != nil {
+		log.Printf("Failed to get dashboard: %v", err)
+		if strings.Contains(err.Error(), "validation") {
+			http.Error(w, err.Error(), http.StatusBadRequest)
+		} else if strings.Contains(err.Error(), "not found") {
+			http.Error(w, "User not found", http.StatusNotFound)
+		} else {
+			http.Error(w, "Internal server error", http.StatusInternalServerError)
+		}
+		return
+	}
+
+	// Return the dashboard
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(dashboard)
+}
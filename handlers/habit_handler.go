@@ -116,7 +116,7 @@ func (h *HabitHandler) GetHabit(w http.ResponseWriter, r *http.Request) {
 	json.NewEncoder(w).Encode(habit)
 }
 
-// GetUserHabits handles getting all habits for the authenticated user (GET /habits)
+// GetUserHabits handles getting a page of habits for the authenticated user (GET /habits?fields=&limit=&before=&after=)
 func (h *HabitHandler) GetUserHabits(w http.ResponseWriter, r *http.Request) {
 	// Only allow GET requests
 	if r.Method != http.MethodGet {
@@ -133,17 +133,48 @@ func (h *HabitHandler) GetUserHabits(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	// Get all habits for the user
-	habits, err := h.service.GetUserHabits(userID)
+	// Parse the sparse fieldset and pagination parameters
+	fields, err := models.FieldSetFromQuery(r.URL.Query(), models.HabitFields)
+	if err != nil {
+		log.Printf("Invalid fields parameter: %v", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	page, err := models.PageRequestFromQuery(r.URL.Query())
+	if err != nil {
+		log.Printf("Invalid pagination parameters: %v", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+
+	// Stream one page of habits for the user straight from the database, after its cursor headers
+	stream := newJSONArrayStream(w)
+	setCursors := func(result *models.Page) error {
+		setPageHeaders(w, result)
+		return nil
+	}
+	err = h.service.StreamUserHabits(r.Context(), userID, fields, page, setCursors, func(habit *models.Habit) error {
+		if fields != nil {
+			return stream.Write(models.NewPartialHabit(habit, fields))
+		}
+		return stream.Write(habit)
+	})
 	if err != nil {
 		log.Printf("Failed to get habits: %v", err)
-		http.Error(w, "Internal server error", http.StatusInternalServerError)
+		if stream.Started() {
+			stream.Abort(r)
+		} else if strings.Contains(err.Error(), "validation") {
+			http.Error(w, err.Error(), http.StatusBadRequest)
+		} else {
+			http.Error(w, "Internal server error", http.StatusInternalServerError)
+		}
 		return
 	}
 
-	// Return the habits
-	w.Header().Set("Content-Type", "application/json")
-	json.NewEncoder(w).Encode(habits)
+	// Finish the array
+	if err := stream.Close(); err != nil {
+		log.Printf("Failed to write habits: %v", err)
+	}
 }
 
 // UpdateHabit handles updating a habit (PUT /habits/{id})
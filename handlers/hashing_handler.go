@@ -0,0 +1,35 @@
+package handlers
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// HashingHandler reports the load on password hashing
+type HashingHandler struct {
+	admission *utils.HashAdmission
+}
+
+// NewHashingHandler creates a new hashing handler
+func NewHashingHandler(admission *utils.HashAdmission) *HashingHandler {
+	return &HashingHandler{
+		admission: admission,
+	}
+}
+
+// GetStats handles getting password hashing admission counters (GET /health/hashing)
+func (h *HashingHandler) GetStats(w http.ResponseWriter, r *http.Request) {
+	// Only allow GET requests
+	if r.Method != http.MethodGet {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Return the running and queued hashes, counters and wait times
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(h.admission.Stats())
+}
@@ -133,7 +133,7 @@ func (h *LogHandler) GetLog(w http.ResponseWriter, r *http.Request) {
 	json.NewEncoder(w).Encode(logEntry)
 }
 
-// GetHabitLogs handles getting all logs for a habit (GET /habits/{habit_id}/logs)
+// GetHabitLogs handles getting a page of logs for a habit (GET /habits/{habit_id}/logs?from=&to=&fields=&limit=&before=&after=)
 func (h *LogHandler) GetHabitLogs(w http.ResponseWriter, r *http.Request) {
 	// Only allow GET requests
 	if r.Method != http.MethodGet {
@@ -165,11 +165,45 @@ func (h *LogHandler) GetHabitLogs(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	// Get all logs for the habit
-	logs, err := h.service.GetHabitLogs(habitID, userID)
+	// Parse the time range, sparse fieldset and pagination parameters
+	timeRange, err := models.TimeRangeFromQuery(r.URL.Query())
+	if err != nil {
+		log.Printf("Invalid time range parameters: %v", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	fields, err := models.FieldSetFromQuery(r.URL.Query(), models.LogFields)
+	if err != nil {
+		log.Printf("Invalid fields parameter: %v", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	page, err := models.PageRequestFromQuery(r.URL.Query())
+	if err != nil {
+		log.Printf("Invalid pagination parameters: %v", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+
+	// Stream one page of logs for the habit straight from the database, after its cursor headers
+	stream := newJSONArrayStream(w)
+	setCursors := func(result *models.Page) error {
+		setPageHeaders(w, result)
+		return nil
+	}
+	err = h.service.StreamHabitLogs(r.Context(), habitID, userID, timeRange, fields, page, setCursors, func(l *models.Log) error {
+		if fields != nil {
+			return stream.Write(models.NewPartialLog(l, fields))
+		}
+		return stream.Write(l)
+	})
 	if err != nil {
 		log.Printf("Failed to get logs: %v", err)
-		if strings.Contains(err.Error(), "not found") || strings.Contains(err.Error(), "unauthorized") {
+		if stream.Started() {
+			stream.Abort(r)
+		} else if strings.Contains(err.Error(), "validation") {
+			http.Error(w, err.Error(), http.StatusBadRequest)
+		} else if strings.Contains(err.Error(), "not found") || strings.Contains(err.Error(), "unauthorized") {
 			http.Error(w, "Habit not found", http.StatusNotFound)
 		} else {
 			http.Error(w, "Internal server error", http.StatusInternalServerError)
@@ -177,9 +211,57 @@ func (h *LogHandler) GetHabitLogs(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	// Return the logs
-	w.Header().Set("Content-Type", "application/json")
-	json.NewEncoder(w).Encode(logs)
+	// Finish the array
+	if err := stream.Close(); err != nil {
+		log.Printf("Failed to write logs: %v", err)
+	}
+}
+
+// GetLogFeed handles getting the authenticated user's logs across all habits,
+// grouped by habit (GET /logs?since=)
+func (h *LogHandler) GetLogFeed(w http.ResponseWriter, r *http.Request) {
+	// Only allow GET requests
+	if r.Method != http.MethodGet {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Get authenticated user ID from context
+	userID, ok := middleware.GetUserIDFromContext(r.Context())
+	if !ok {
+		log.Println("User ID not found in context")
+		http.Error(w, "Unauthorized", http.StatusUnauthorized)
+		return
+	}
+
+	// Parse the since parameter
+	since, err := models.SinceFromQuery(r.URL.Query())
+	if err != nil {
+		log.Printf("Invalid since parameter: %v", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+
+	// Stream the feed one habit at a time
+	stream := newJSONArrayStream(w)
+	err = h.service.StreamUserLogFeed(r.Context(), userID, since, func(group *models.HabitLogs) error {
+		return stream.Write(group)
+	})
+	if err != nil {
+		log.Printf("Failed to get log feed: %v", err)
+		if stream.Started() {
+			stream.Abort(r)
+		} else {
+			http.Error(w, "Internal server error", http.StatusInternalServerError)
+		}
+		return
+	}
+
+	// Finish the array
+	if err := stream.Close(); err != nil {
+		log.Printf("Failed to write log feed: %v", err)
+	}
 }
 
 // UpdateLog handles updating a log (PUT /logs/{id})
@@ -0,0 +1,35 @@
+package handlers
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+)
+
+// MigrationHandler reports the progress of background data migrations
+type MigrationHandler struct {
+	migrator *config.BackgroundMigrator
+}
+
+// NewMigrationHandler creates a new migration handler
+func NewMigrationHandler(migrator *config.BackgroundMigrator) *MigrationHandler {
+	return &MigrationHandler{
+		migrator: migrator,
+	}
+}
+
+// GetProgress handles getting background migration progress (GET /health/migrations)
+func (h *MigrationHandler) GetProgress(w http.ResponseWriter, r *http.Request) {
+	// Only allow GET requests
+	if r.Method != http.MethodGet {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Return the progress of every background migration
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(h.migrator.Progress())
+}
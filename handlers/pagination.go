@@ -0,0 +1,24 @@
+package handlers
+
+import (
+	"net/http"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// Response headers carrying the cursors for the neighbouring pages of a list
+const (
+	nextCursorHeader = "X-Next-Cursor"
+	prevCursorHeader = "X-Prev-Cursor"
+)
+
+// setPageHeaders sets the cursor headers for the pages around the one being
+// returned. They must be set before the body is written.
+func setPageHeaders(w http.ResponseWriter, page *models.Page) {
+	if page.NextCursor != "" {
+		w.Header().Set(nextCursorHeader, page.NextCursor)
+	}
+	if page.PrevCursor != "" {
+		w.Header().Set(prevCursorHeader, page.PrevCursor)
+	}
+}
@@ -0,0 +1,100 @@
+package handlers
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+	"strings"
+
+	"github.com/hayden-erickson/ai-evaluation/middleware"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/service"
+)
+
+// SessionHandler handles session-related HTTP requests
+type SessionHandler struct {
+	service service.SessionService
+}
+
+// NewSessionHandler creates a new session handler
+func NewSessionHandler(service service.SessionService) *SessionHandler {
+	return &SessionHandler{
+		service: service,
+	}
+}
+
+// Refresh handles exchanging a refresh token for new tokens (POST /users/token/refresh)
+func (h *SessionHandler) Refresh(w http.ResponseWriter, r *http.Request) {
+	// Only allow POST requests
+	if r.Method != http.MethodPost {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Parse the request body
+	var req models.RefreshTokenRequest
+	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+		log.Printf("Failed to decode request body: %v", err)
+		http.Error(w, "Invalid request body", http.StatusBadRequest)
+		return
+	}
+
+	// Refresh the session
+	resp, err := h.service.RefreshSession(&req)
+	if err != nil {
+		log.Printf("Failed to refresh session: %v", err)
+		if strings.Contains(err.Error(), "validation") {
+			http.Error(w, err.Error(), http.StatusBadRequest)
+		} else if strings.Contains(err.Error(), "invalid refresh token") {
+			http.Error(w, "Invalid refresh token", http.StatusUnauthorized)
+		} else {
+			http.Error(w, "Internal server error", http.StatusInternalServerError)
+		}
+		return
+	}
+
+	// Return the new tokens
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(resp)
+}
+
+// Logout handles ending a session (POST /users/logout)
+func (h *SessionHandler) Logout(w http.ResponseWriter, r *http.Request) {
+	// Only allow POST requests
+	if r.Method != http.MethodPost {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Get the claims of the token from context
+	claims, ok := middleware.GetClaimsFromContext(r.Context())
+	if !ok {
+		log.Println("Claims not found in context")
+		http.Error(w, "Unauthorized", http.StatusUnauthorized)
+		return
+	}
+
+	// Parse the request body
+	var req models.LogoutRequest
+	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+		log.Printf("Failed to decode request body: %v", err)
+		http.Error(w, "Invalid request body", http.StatusBadRequest)
+		return
+	}
+
+	// End the session
+	if err := h.service.EndSession(claims, &req); err != nil {
+		log.Printf("Failed to end session: %v", err)
+		if strings.Contains(err.Error(), "validation") {
+			http.Error(w, err.Error(), http.StatusBadRequest)
+		} else {
+			http.Error(w, "Internal server error", http.StatusInternalServerError)
+		}
+		return
+	}
+
+	// Return success
+	w.WriteHeader(http.StatusNoContent)
+}
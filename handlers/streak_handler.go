@@ -0,0 +1,73 @@
+package handlers
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+	"strconv"
+	"strings"
+
+	"github.com/hayden-erickson/ai-evaluation/middleware"
+	"github.com/hayden-erickson/ai-evaluation/service"
+)
+
+// StreakHandler handles streak HTTP requests
+type StreakHandler struct {
+	service service.StreakService
+}
+
+// NewStreakHandler creates a new streak handler
+func NewStreakHandler(service service.StreakService) *StreakHandler {
+	return &StreakHandler{
+		service: service,
+	}
+}
+
+// GetStreaks handles getting a habit's current and longest streak (GET /habits/{habit_id}/streak)
+func (h *StreakHandler) GetStreaks(w http.ResponseWriter, r *http.Request) {
+	// Only allow GET requests
+	if r.Method != http.MethodGet {
+		log.Printf("Method not allowed: %s", r.Method)
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// Get authenticated user ID from context
+	userID, ok := middleware.GetUserIDFromContext(r.Context())
+	if !ok {
+		log.Println("User ID not found in context")
+		http.Error(w, "Unauthorized", http.StatusUnauthorized)
+		return
+	}
+
+	// Extract habit ID from URL path
+	pathParts := strings.Split(strings.Trim(r.URL.Path, "/"), "/")
+	if len(pathParts) < 3 {
+		log.Println("Missing habit ID in path")
+		http.Error(w, "Habit ID required", http.StatusBadRequest)
+		return
+	}
+
+	habitID, err := strconv.ParseInt(pathParts[1], 10, 64)
+	if err != nil {
+		log.Printf("Invalid habit ID: %v", err)
+		http.Error(w, "Invalid habit ID", http.StatusBadRequest)
+		return
+	}
+
+	// Get the streaks
+	streaks, err := h.service.GetStreaks(habitID, userID)
+	if err != nil {
+		log.Printf("Failed to get streaks: %v", err)
+		if strings.Contains(err.Error(), "not found") {
+			http.Error(w, "Habit not found", http.StatusNotFound)
+		} else {
+			http.Error(w, "Internal server error", http.StatusInternalServerError)
+		}
+		return
+	}
+
+	// Return the streaks
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(streaks)
+}
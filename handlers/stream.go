@@ -0,0 +1,100 @@
+package handlers
+
+import (
+	"encoding/json"
+	"errors"
+	"io"
+	"net/http"
+	"time"
+)
+
+// streamFlushInterval is the longest a streamed element waits in the response buffer
+const streamFlushInterval = 100 * time.Millisecond
+
+// jsonArrayStream writes a JSON array to the response one element at a time, so
+// memory per request does not grow with the number of elements. A paginated
+// list sets its page cursor headers before the first element is written.
+type jsonArrayStream struct {
+	w         http.ResponseWriter
+	rc        *http.ResponseController
+	enc       *json.Encoder
+	started   bool
+	lastFlush time.Time
+}
+
+// newJSONArrayStream creates a stream that writes to w as elements arrive
+func newJSONArrayStream(w http.ResponseWriter) *jsonArrayStream {
+	return &jsonArrayStream{
+		w:   w,
+		rc:  http.NewResponseController(w),
+		enc: json.NewEncoder(w),
+	}
+}
+
+// Started reports whether the response headers have been sent. Nothing is sent
+// before the first element, so a failure before it can still be answered with
+// an error status.
+func (s *jsonArrayStream) Started() bool {
+	return s.started
+}
+
+// start sends the headers and the opening bracket
+func (s *jsonArrayStream) start() error {
+	s.started = true
+	s.w.Header().Set("Content-Type", "application/json")
+	_, err := io.WriteString(s.w, "[")
+	return err
+}
+
+// Write encodes one element. The first element is flushed straight away and
+// later ones at most streamFlushInterval apart.
+func (s *jsonArrayStream) Write(v interface{}) error {
+	first := !s.started
+	if first {
+		if err := s.start(); err != nil {
+			return err
+		}
+	} else if _, err := io.WriteString(s.w, ","); err != nil {
+		return err
+	}
+
+	if err := s.enc.Encode(v); err != nil {
+		return err
+	}
+	if first || time.Since(s.lastFlush) >= streamFlushInterval {
+		return s.flush()
+	}
+	return nil
+}
+
+// Close writes the closing bracket
+func (s *jsonArrayStream) Close() error {
+	if !s.started {
+		if err := s.start(); err != nil {
+			return err
+		}
+	}
+	if _, err := io.WriteString(s.w, "]\n"); err != nil {
+		return err
+	}
+	return s.flush()
+}
+
+// Abort ends a response that failed after it started. The connection is reset
+// so the client sees a truncated body instead of a shorter, valid array.
+func (s *jsonArrayStream) Abort(r *http.Request) {
+	if r.Context().Err() != nil {
+		// The client has gone away; there is nothing to tell it
+		return
+	}
+	panic(http.ErrAbortHandler)
+}
+
+// flush sends buffered output to the client, if the writer supports it
+func (s *jsonArrayStream) flush() error {
+	s.lastFlush = time.Now()
+	if err := s.rc.Flush(); err != nil && !errors.Is(err, http.ErrNotSupported) {
+		return err
+	}
+	return nil
+}
@@ -2,6 +2,7 @@ package handlers
 
 import (
 	"encoding/json"
+	"errors"
 	"log"
 	"net/http"
 	"strconv"
@@ -10,6 +11,7 @@ import (
 	"github.com/hayden-erickson/ai-evaluation/middleware"
 	"github.com/hayden-erickson/ai-evaluation/models"
 	"github.com/hayden-erickson/ai-evaluation/service"
+	"github.com/hayden-erickson/ai-evaluation/utils"
 )
 
 // UserHandler handles user-related HTTP requests
@@ -45,6 +47,9 @@ func (h *UserHandler) Register(w http.ResponseWriter, r *http.Request) {
 	user, err := h.service.Register(&req)
 	if err != nil {
 		log.Printf("Failed to register user: %v", err)
+		if writeHashingOverload(w, err) {
+			return
+		}
 		// Check if it's a validation error or duplicate user
 		if strings.Contains(err.Error(), "validation") || strings.Contains(err.Error(), "already exists") {
 			http.Error(w, err.Error(), http.StatusBadRequest)
@@ -81,7 +86,9 @@ func (h *UserHandler) Login(w http.ResponseWriter, r *http.Request) {
 	resp, err := h.service.Login(&req)
 	if err != nil {
 		log.Printf("Failed to login user: %v", err)
-		http.Error(w, "Invalid credentials", http.StatusUnauthorized)
+		if !writeHashingOverload(w, err) {
+			http.Error(w, "Invalid credentials", http.StatusUnauthorized)
+		}
 		return
 	}
 
@@ -197,6 +204,9 @@ func (h *UserHandler) UpdateUser(w http.ResponseWriter, r *http.Request) {
 	user, err := h.service.UpdateUser(id, &req)
 	if err != nil {
 		log.Printf("Failed to update user: %v", err)
+		if writeHashingOverload(w, err) {
+			return
+		}
 		if strings.Contains(err.Error(), "validation") {
 			http.Error(w, err.Error(), http.StatusBadRequest)
 		} else if strings.Contains(err.Error(), "not found") {
@@ -265,3 +275,20 @@ func (h *UserHandler) DeleteUser(w http.ResponseWriter, r *http.Request) {
 	// Return success
 	w.WriteHeader(http.StatusNoContent)
 }
+
+// writeHashingOverload answers a request whose password hash was not admitted,
+// with 429 if the hashing queue was full and 503 if the wait for a slot ran out,
+// and reports whether it did
+func writeHashingOverload(w http.ResponseWriter, err error) bool {
+	switch {
+	case errors.Is(err, utils.ErrHashQueueFull):
+		w.Header().Set("Retry-After", "1")
+		http.Error(w, "Too many requests", http.StatusTooManyRequests)
+	case errors.Is(err, utils.ErrHashWaitTimeout):
+		w.Header().Set("Retry-After", "5")
+		http.Error(w, "Service unavailable", http.StatusServiceUnavailable)
+	default:
+		return false
+	}
+	return true
+}
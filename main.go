@@ -1,13 +1,17 @@
 package main
 
 import (
+	"context"
 	"log"
 	"net/http"
 	"os"
+	"strconv"
+	"time"
 
 	"github.com/hayden-erickson/ai-evaluation/config"
 	"github.com/hayden-erickson/ai-evaluation/handlers"
 	"github.com/hayden-erickson/ai-evaluation/middleware"
+	"github.com/hayden-erickson/ai-evaluation/migrations"
 	"github.com/hayden-erickson/ai-evaluation/repository"
 	"github.com/hayden-erickson/ai-evaluation/service"
 	"github.com/hayden-erickson/ai-evaluation/utils"
@@ -31,32 +35,195 @@ func main() {
 		dbPath = "habits.db"
 	}
 
-	// Initialize database
-	database, err := config.NewDatabase(dbPath)
+	// Initialize database, preparing the repositories' hot statements on every pooled connection
+	dbConfig := config.DatabaseConfigFromEnv(dbPath)
+	dbConfig.ReadStatements = repository.ReadStatements()
+	dbConfig.WriteStatements = repository.WriteStatements()
+	database, err := config.NewDatabaseWithConfig(dbConfig)
 	if err != nil {
 		log.Fatalf("Failed to initialize database: %v", err)
 	}
 	defer database.Close()
 
 	log.Println("Database initialized successfully")
+	for _, settings := range database.Settings() {
+		log.Printf("Database pool %s", settings)
+	}
+
+	// Batch sizes and pauses of the background data migrations and the rollup backfill
+	backfillBatchSize, err := strconv.Atoi(os.Getenv("BACKFILL_BATCH_SIZE"))
+	if err != nil || backfillBatchSize <= 0 {
+		backfillBatchSize = 1000
+	}
+	backfillPauseMS, err := strconv.Atoi(os.Getenv("BACKFILL_PAUSE_MS"))
+	if err != nil || backfillPauseMS < 0 {
+		backfillPauseMS = 50
+	}
 
 	// Initialize JWT manager
 	jwtManager := utils.NewJWTManager(jwtSecret)
 
+	// Revoked users and tokens are held in memory, so requests are checked without a query
+	revocations, err := repository.LoadTokenRevocations(database)
+	if err != nil {
+		log.Fatalf("Failed to load token revocations: %v", err)
+	}
+
+	// Tokens that passed validation are remembered until they expire
+	tokenCacheSize, err := strconv.Atoi(os.Getenv("TOKEN_CACHE_SIZE"))
+	if err != nil || tokenCacheSize <= 0 {
+		tokenCacheSize = 100000
+	}
+	tokenCache := middleware.NewTokenCache(tokenCacheSize)
+
+	// Each active user's habits are cached in memory for ownership checks and habit lists
+	habitCacheMB, err := strconv.Atoi(os.Getenv("HABIT_CACHE_MB"))
+	if err != nil || habitCacheMB <= 0 {
+		habitCacheMB = 32
+	}
+	habitCache := repository.NewHabitCache(int64(habitCacheMB) << 20)
+
+	// Users' time zones are cached so a log write does not read the user
+	userZoneCacheSize, err := strconv.Atoi(os.Getenv("USER_ZONE_CACHE_SIZE"))
+	if err != nil || userZoneCacheSize <= 0 {
+		userZoneCacheSize = 100000
+	}
+
+	// Password hashes run only as many at once as fit in the memory budget; the rest queue briefly or are turned away
+	hashMemoryMB, err := strconv.Atoi(os.Getenv("PASSWORD_HASH_MEMORY_MB"))
+	if err != nil || hashMemoryMB <= 0 {
+		hashMemoryMB = 512
+	}
+	hashQueue, err := strconv.Atoi(os.Getenv("PASSWORD_HASH_QUEUE"))
+	if err != nil || hashQueue < 0 {
+		hashQueue = 64
+	}
+	hashMaxWait, err := time.ParseDuration(os.Getenv("PASSWORD_HASH_MAX_WAIT"))
+	if err != nil || hashMaxWait <= 0 {
+		hashMaxWait = 2 * time.Second
+	}
+	hashAdmission := utils.NewHashAdmission(int64(hashMemoryMB)<<20, utils.PasswordHashMemory, hashQueue, hashMaxWait)
+
+	// Access tokens are short-lived; clients renew them with a refresh token instead of the password
+	accessTokenTTL, err := time.ParseDuration(os.Getenv("ACCESS_TOKEN_TTL"))
+	if err != nil || accessTokenTTL <= 0 {
+		accessTokenTTL = 15 * time.Minute
+	}
+	refreshTokenTTL, err := time.ParseDuration(os.Getenv("REFRESH_TOKEN_TTL"))
+	if err != nil || refreshTokenTTL <= 0 {
+		refreshTokenTTL = 30 * 24 * time.Hour
+	}
+
 	// Initialize repositories
-	userRepo := repository.NewUserRepository(database.DB)
-	habitRepo := repository.NewHabitRepository(database.DB)
-	logRepo := repository.NewLogRepository(database.DB)
+	userRepo := repository.NewUserRepository(database)
+	userZones := repository.NewUserZoneCache(userRepo, userZoneCacheSize)
+	habitRepo := repository.NewCachedHabitRepository(repository.NewHabitRepository(database), habitCache)
+	logRepo := repository.NewLogRepository(database)
+	dashboardRepo := repository.NewDashboardRepository(database)
+	activityRepo := repository.NewActivityRepository(database)
+	rollupRepo := repository.NewRollupRepository(database)
+	reminderRepo := repository.NewReminderRepository(database)
+	refreshTokenRepo := repository.NewRefreshTokenRepository(database)
 
 	// Initialize services
-	userService := service.NewUserService(userRepo, jwtManager)
+	sessionService := service.NewSessionService(refreshTokenRepo, revocations, jwtManager, accessTokenTTL, refreshTokenTTL)
+	userService := service.NewUserService(userRepo, habitCache, userZones, hashAdmission, sessionService)
 	habitService := service.NewHabitService(habitRepo)
-	logService := service.NewLogService(logRepo, habitRepo)
+	streakService := service.NewStreakService(activityRepo, habitRepo, userZones)
+	logService := service.NewLogService(logRepo, habitRepo, userZones)
+	dashboardService := service.NewDashboardService(dashboardRepo, userZones)
+	calendarService := service.NewCalendarService(rollupRepo, habitRepo, userZones)
+
+	// Reminders go out through Twilio when an account is configured, and to standard output otherwise
+	reminderSender := service.NewLogReminderSender(os.Stdout)
+	if twilioConfig, ok := config.TwilioConfigFromEnv(); ok {
+		reminderSender = service.NewTwilioSender(twilioConfig)
+	}
+	reminderService := service.NewReminderService(reminderRepo, reminderSender)
+	notifyWorkers, err := strconv.Atoi(os.Getenv("NOTIFY_WORKERS"))
+	if err != nil || notifyWorkers <= 0 {
+		notifyWorkers = 4
+	}
+
+	// Subcommands run against the same database and exit instead of serving
+	if len(os.Args) > 1 {
+		switch os.Args[1] {
+		case "backfill-rollups":
+			// Date the logs written before daily rollups existed, which counts them in the rollups
+			dated, err := calendarService.BackfillLocalDates(context.Background(), backfillBatchSize)
+			if err != nil {
+				log.Fatalf("Rollup backfill failed after dating %d logs: %v", dated, err)
+			}
+			log.Printf("Rollup backfill dated %d logs", dated)
+		case "notify":
+			// Queue reminders for users who did not log yesterday in their time zone, then deliver them
+			notifyTimeout, err := time.ParseDuration(os.Getenv("NOTIFY_TIMEOUT"))
+			if err != nil || notifyTimeout <= 0 {
+				notifyTimeout = 15 * time.Minute
+			}
+
+			ctx, cancel := context.WithTimeout(context.Background(), notifyTimeout)
+			defer cancel()
+			enqueued, err := reminderService.EnqueueMissedLogReminders(ctx)
+			if err != nil {
+				log.Fatalf("Queueing reminders failed after %d: %v", enqueued, err)
+			}
+			run, err := reminderService.DeliverReminders(ctx, notifyWorkers)
+			log.Printf("Reminders: %d queued, %d sent, %d retried, %d deferred, %d failed, %d unconfirmed",
+				enqueued, run.Sent, run.Retried, run.Deferred, run.Failed, run.SentUnknown)
+			if err != nil {
+				// Undelivered reminders stay in the outbox for the next run
+				log.Fatalf("Delivering reminders stopped: %v", err)
+			}
+		default:
+			log.Fatalf("Unknown command %q, available: backfill-rollups, notify", os.Args[1])
+		}
+		return
+	}
+
+	// Start background data migrations; they run in throttled batches while the server serves traffic.
+	// Subcommands do not start them, so a batch job does not compete with them for the writer.
+	migrator := config.NewBackgroundMigrator(database, migrations.Background, backfillBatchSize, time.Duration(backfillPauseMS)*time.Millisecond)
+	migrationCtx, stopMigrations := context.WithCancel(context.Background())
+	defer stopMigrations()
+	go func() {
+		if err := migrator.Run(migrationCtx); err != nil {
+			log.Printf("Background migrations stopped: %v", err)
+		}
+	}()
+
+	// Optionally send reminders from the server, one wave per UTC offset just after its local midnight
+	if os.Getenv("NOTIFY_SCHEDULER") == "true" {
+		sendsPerMinute, err := strconv.Atoi(os.Getenv("NOTIFY_SENDS_PER_MINUTE"))
+		if err != nil || sendsPerMinute <= 0 {
+			sendsPerMinute = 600
+		}
+		waveDelay, err := time.ParseDuration(os.Getenv("NOTIFY_WAVE_DELAY"))
+		if err != nil || waveDelay < 0 {
+			waveDelay = 5 * time.Minute
+		}
+		scheduler := service.NewReminderScheduler(reminderRepo, reminderService, utils.SystemClock, sendsPerMinute, waveDelay, notifyWorkers)
+		schedulerCtx, stopScheduler := context.WithCancel(context.Background())
+		defer stopScheduler()
+		go func() {
+			if err := scheduler.Run(schedulerCtx); err != nil && err != context.Canceled {
+				log.Printf("Reminder scheduler stopped: %v", err)
+			}
+		}()
+		log.Printf("Started %s", scheduler)
+	}
 
 	// Initialize handlers
 	userHandler := handlers.NewUserHandler(userService)
+	sessionHandler := handlers.NewSessionHandler(sessionService)
 	habitHandler := handlers.NewHabitHandler(habitService)
 	logHandler := handlers.NewLogHandler(logService)
+	dashboardHandler := handlers.NewDashboardHandler(dashboardService)
+	streakHandler := handlers.NewStreakHandler(streakService)
+	calendarHandler := handlers.NewCalendarHandler(calendarService)
+	migrationHandler := handlers.NewMigrationHandler(migrator)
+	cacheHandler := handlers.NewCacheHandler(habitCache, tokenCache, revocations)
+	hashingHandler := handlers.NewHashingHandler(hashAdmission)
 
 	// Create a new ServeMux
 	mux := http.NewServeMux()
@@ -64,9 +231,13 @@ func main() {
 	// Public routes (no authentication required)
 	mux.HandleFunc("/users/register", userHandler.Register)
 	mux.HandleFunc("/users/login", userHandler.Login)
+	mux.HandleFunc("/users/token/refresh", sessionHandler.Refresh)
+
+	// Protected session routes
+	mux.Handle("/users/logout", middleware.AuthMiddleware(jwtManager, tokenCache, revocations)(http.HandlerFunc(sessionHandler.Logout)))
 
 	// Protected user routes
-	mux.Handle("/users/", middleware.AuthMiddleware(jwtManager)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+	mux.Handle("/users/", middleware.AuthMiddleware(jwtManager, tokenCache, revocations)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
 		// Route to the appropriate handler based on the method
 		switch r.Method {
 		case http.MethodGet:
@@ -81,7 +252,7 @@ func main() {
 	})))
 
 	// Protected habit routes
-	mux.Handle("/habits", middleware.AuthMiddleware(jwtManager)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+	mux.Handle("/habits", middleware.AuthMiddleware(jwtManager, tokenCache, revocations)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
 		// Handle /habits endpoint for listing user's habits or creating a new habit
 		switch r.Method {
 		case http.MethodGet:
@@ -93,7 +264,7 @@ func main() {
 		}
 	})))
 
-	mux.Handle("/habits/", middleware.AuthMiddleware(jwtManager)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+	mux.Handle("/habits/", middleware.AuthMiddleware(jwtManager, tokenCache, revocations)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
 		// Check if this is a logs endpoint
 		if len(r.URL.Path) > 7 && r.URL.Path[len(r.URL.Path)-5:] == "/logs" {
 			// This is a habit logs endpoint: /habits/{habit_id}/logs
@@ -105,6 +276,12 @@ func main() {
 			default:
 				http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
 			}
+		} else if len(r.URL.Path) > 9 && r.URL.Path[len(r.URL.Path)-7:] == "/streak" {
+			// This is a habit streak endpoint: /habits/{habit_id}/streak
+			streakHandler.GetStreaks(w, r)
+		} else if len(r.URL.Path) > 11 && r.URL.Path[len(r.URL.Path)-9:] == "/calendar" {
+			// This is a habit calendar endpoint: /habits/{habit_id}/calendar
+			calendarHandler.GetCalendar(w, r)
 		} else {
 			// This is a single habit endpoint: /habits/{id}
 			switch r.Method {
@@ -121,7 +298,17 @@ func main() {
 	})))
 
 	// Protected log routes
-	mux.Handle("/logs/", middleware.AuthMiddleware(jwtManager)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+	mux.Handle("/logs", middleware.AuthMiddleware(jwtManager, tokenCache, revocations)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		// Handle /logs endpoint for the user-wide log feed
+		switch r.Method {
+		case http.MethodGet:
+			logHandler.GetLogFeed(w, r)
+		default:
+			http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		}
+	})))
+
+	mux.Handle("/logs/", middleware.AuthMiddleware(jwtManager, tokenCache, revocations)(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
 		// Route to the appropriate handler based on the method
 		switch r.Method {
 		case http.MethodGet:
@@ -135,12 +322,24 @@ func main() {
 		}
 	})))
 
+	// Protected dashboard route
+	mux.Handle("/dashboard", middleware.AuthMiddleware(jwtManager, tokenCache, revocations)(http.HandlerFunc(dashboardHandler.GetDashboard)))
+
 	// Add health check endpoint
 	mux.HandleFunc("/health", func(w http.ResponseWriter, r *http.Request) {
 		w.WriteHeader(http.StatusOK)
 		w.Write([]byte("OK"))
 	})
 
+	// Background migration progress and ETA
+	mux.HandleFunc("/health/migrations", migrationHandler.GetProgress)
+
+	// Habit and token cache hit, miss and eviction counters
+	mux.HandleFunc("/health/cache", cacheHandler.GetStats)
+
+	// Password hashing concurrency, queue depth and wait times
+	mux.HandleFunc("/health/hashing", hashingHandler.GetStats)
+
 	// Apply middleware to the mux
 	handler := middleware.LoggingMiddleware(middleware.SecurityHeadersMiddleware(mux))
 
@@ -6,17 +6,26 @@ import (
 	"net/http"
 	"strings"
 
+	"github.com/hayden-erickson/ai-evaluation/repository"
 	"github.com/hayden-erickson/ai-evaluation/utils"
 )
 
 // contextKey is a custom type for context keys to avoid collisions
 type contextKey string
 
-// UserIDKey is the context key for the user ID
-const UserIDKey contextKey = "user_id"
+// Context keys set by AuthMiddleware
+const (
+	// UserIDKey is the context key for the user ID
+	UserIDKey contextKey = "user_id"
+	// ClaimsKey is the context key for the claims of the request's token
+	ClaimsKey contextKey = "claims"
+)
 
-// AuthMiddleware creates authentication middleware
-func AuthMiddleware(jwtManager *utils.JWTManager) func(http.Handler) http.Handler {
+// AuthMiddleware creates authentication middleware. Tokens are validated through
+// tokenCache when it is not nil, so a repeated token skips the signature check.
+// Revoked tokens are turned away when revocations is not nil; the check is in
+// memory, cached or not.
+func AuthMiddleware(jwtManager *utils.JWTManager, tokenCache *TokenCache, revocations *repository.TokenRevocations) func(http.Handler) http.Handler {
 	return func(next http.Handler) http.Handler {
 		return http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
 			// Get the Authorization header
@@ -38,15 +47,29 @@ func AuthMiddleware(jwtManager *utils.JWTManager) func(http.Handler) http.Handle
 			token := strings.TrimPrefix(authHeader, "Bearer ")
 
 			// Validate the token
-			claims, err := jwtManager.ValidateToken(token)
+			var claims *utils.JWTClaims
+			var err error
+			if tokenCache != nil {
+				claims, err = tokenCache.Validate(jwtManager, token)
+			} else {
+				claims, err = jwtManager.ValidateToken(token)
+			}
 			if err != nil {
 				log.Printf("Token validation failed: %v", err)
 				http.Error(w, "Unauthorized", http.StatusUnauthorized)
 				return
 			}
 
-			// Add the user ID to the request context
+			// Check the token has not been revoked, alone or with all of the user's tokens
+			if revocations != nil && revocations.Revoked(claims.UserID, claims.Epoch, claims.TokenID) {
+				log.Printf("Token of user %d has been revoked", claims.UserID)
+				http.Error(w, "Unauthorized", http.StatusUnauthorized)
+				return
+			}
+
+			// Add the user ID and claims to the request context
 			ctx := context.WithValue(r.Context(), UserIDKey, claims.UserID)
+			ctx = context.WithValue(ctx, ClaimsKey, claims)
 			next.ServeHTTP(w, r.WithContext(ctx))
 		})
 	}
@@ -57,3 +80,9 @@ func GetUserIDFromContext(ctx context.Context) (int64, bool) {
 	userID, ok := ctx.Value(UserIDKey).(int64)
 	return userID, ok
 }
+
+// GetClaimsFromContext extracts the claims of the request's token from the request context
+func GetClaimsFromContext(ctx context.Context) (*utils.JWTClaims, bool) {
+	claims, ok := ctx.Value(ClaimsKey).(*utils.JWTClaims)
+	return claims, ok
+}
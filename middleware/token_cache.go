@@ -0,0 +1,137 @@
+package middleware
+
+import (
+	"crypto/sha256"
+	"sync"
+	"sync/atomic"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// tokenCacheShards is the number of independently locked maps tokens are spread over
+const tokenCacheShards = 16
+
+// tokenCacheEvictDivisor sets the share of a full shard an eviction frees, a quarter
+const tokenCacheEvictDivisor = 4
+
+// TokenCache remembers tokens that passed validation until they expire, so a
+// client sending the same token again costs a digest and a map lookup instead of
+// decoding the token and checking its signature. Tokens are keyed by their
+// SHA-256 digest, so the cache never holds a usable token. Cached claims keep
+// the token ID and epoch, so a revoked token is still caught on a hit.
+type TokenCache struct {
+	shards     [tokenCacheShards]tokenCacheShard
+	shardLimit int
+	now        func() time.Time
+
+	hits      atomic.Int64
+	misses    atomic.Int64
+	evictions atomic.Int64
+}
+
+// tokenCacheShard is one lock's worth of verified tokens
+type tokenCacheShard struct {
+	mu     sync.RWMutex
+	tokens map[[sha256.Size]byte]verifiedToken
+}
+
+// verifiedToken is what the cache keeps of a valid token
+type verifiedToken struct {
+	userID    int64
+	expiresAt int64
+	tokenID   int64
+	epoch     int64
+}
+
+// TokenCacheStats reports the cache's counters and size
+type TokenCacheStats struct {
+	Hits      int64 `json:"hits"`
+	Misses    int64 `json:"misses"`
+	Evictions int64 `json:"evictions"`
+	Tokens    int   `json:"tokens"`
+	MaxTokens int   `json:"max_tokens"`
+}
+
+// NewTokenCache creates a cache that holds up to maxTokens verified tokens
+func NewTokenCache(maxTokens int) *TokenCache {
+	c := &TokenCache{shardLimit: (maxTokens + tokenCacheShards - 1) / tokenCacheShards, now: time.Now}
+	for i := range c.shards {
+		c.shards[i].tokens = make(map[[sha256.Size]byte]verifiedToken)
+	}
+	return c
+}
+
+// Validate returns the claims of a valid token, checking the signature only the
+// first time the token is seen. A cached token stops validating at its expiry,
+// exactly as JWTManager.ValidateToken does.
+func (c *TokenCache) Validate(jwtManager *utils.JWTManager, token string) (*utils.JWTClaims, error) {
+	digest := sha256.Sum256([]byte(token))
+	shard := &c.shards[digest[0]%tokenCacheShards]
+	now := c.now().Unix()
+
+	shard.mu.RLock()
+	verified, ok := shard.tokens[digest]
+	shard.mu.RUnlock()
+	if ok && now <= verified.expiresAt {
+		c.hits.Add(1)
+		return &utils.JWTClaims{UserID: verified.userID, ExpiresAt: verified.expiresAt, TokenID: verified.tokenID, Epoch: verified.epoch}, nil
+	}
+	c.misses.Add(1)
+
+	claims, err := jwtManager.ValidateToken(token)
+	if err != nil {
+		if ok {
+			// The cached token has expired
+			shard.mu.Lock()
+			delete(shard.tokens, digest)
+			shard.mu.Unlock()
+		}
+		return nil, err
+	}
+
+	shard.mu.Lock()
+	defer shard.mu.Unlock()
+	if len(shard.tokens) >= c.shardLimit {
+		shard.evict(now, c)
+	}
+	shard.tokens[digest] = verifiedToken{userID: claims.UserID, expiresAt: claims.ExpiresAt, tokenID: claims.TokenID, epoch: claims.Epoch}
+	return claims, nil
+}
+
+// Stats returns the counters and the current size of the cache
+func (c *TokenCache) Stats() TokenCacheStats {
+	stats := TokenCacheStats{
+		Hits:      c.hits.Load(),
+		Misses:    c.misses.Load(),
+		Evictions: c.evictions.Load(),
+		MaxTokens: c.shardLimit * tokenCacheShards,
+	}
+	for i := range c.shards {
+		shard := &c.shards[i]
+		shard.mu.RLock()
+		stats.Tokens += len(shard.tokens)
+		shard.mu.RUnlock()
+	}
+	return stats
+}
+
+// evict makes room in a full shard by dropping its expired tokens, then arbitrary
+// ones, until a quarter of the shard is free. Freeing a batch means the scan of the
+// shard runs once per quarter shard of inserts rather than on every insert into a
+// full shard, so an insert is O(1) amortized. The caller holds the shard's lock.
+func (s *tokenCacheShard) evict(now int64, c *TokenCache) {
+	target := c.shardLimit - max(c.shardLimit/tokenCacheEvictDivisor, 1)
+	for digest, verified := range s.tokens {
+		if now > verified.expiresAt {
+			delete(s.tokens, digest)
+		}
+	}
+	for digest := range s.tokens {
+		if len(s.tokens) <= target {
+			break
+		}
+		delete(s.tokens, digest)
+		c.evictions.Add(1)
+	}
+}
@@ -0,0 +1,6 @@
+-- Store creation times as integer Unix milliseconds, which decode without parsing.
+-- New rows set created_at_ms on insert; existing rows are filled in by the
+-- created_at_ms backfills, and reads fall back to created_at until then.
+ALTER TABLE users ADD COLUMN created_at_ms INTEGER;
+ALTER TABLE habits ADD COLUMN created_at_ms INTEGER;
+ALTER TABLE logs ADD COLUMN created_at_ms INTEGER;
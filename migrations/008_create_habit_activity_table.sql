@@ -0,0 +1,10 @@
+-- Keep one bitmap of logged days per habit for streaks. Bit i of the bitmap is set
+-- when the habit has a log on local day start_day + i, counted in days since
+-- 1970-01-01 in time_zone. Rows are derived from logs and can be rebuilt at any time.
+CREATE TABLE IF NOT EXISTS habit_activity (
+    habit_id INTEGER PRIMARY KEY,
+    time_zone TEXT NOT NULL,
+    start_day INTEGER NOT NULL,
+    bitmap BLOB NOT NULL,
+    FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+);
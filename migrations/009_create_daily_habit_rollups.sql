@@ -0,0 +1,48 @@
+-- Keep per-day log counts and total durations per habit for calendar views.
+-- local_date is the owner's local date when the log was written (YYYY-MM-DD). It is set
+-- by the log insert; older logs get it from the backfill-rollups command.
+ALTER TABLE logs ADD COLUMN local_date TEXT;
+
+CREATE TABLE IF NOT EXISTS daily_habit_rollups (
+    habit_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    log_count INTEGER NOT NULL,
+    total_duration_seconds INTEGER NOT NULL,
+    PRIMARY KEY (habit_id, day),
+    FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- The rollups are maintained by triggers, so they change in the same statement,
+-- and therefore the same transaction, as the log. Logs without a local_date are
+-- not counted until the backfill sets it, which fires the update trigger.
+CREATE TRIGGER IF NOT EXISTS logs_rollup_insert AFTER INSERT ON logs
+WHEN NEW.local_date IS NOT NULL
+BEGIN
+    INSERT INTO daily_habit_rollups (habit_id, day, log_count, total_duration_seconds)
+    VALUES (NEW.habit_id, NEW.local_date, 1, COALESCE(NEW.duration_seconds, 0))
+    ON CONFLICT (habit_id, day) DO UPDATE SET
+        log_count = log_count + 1,
+        total_duration_seconds = total_duration_seconds + excluded.total_duration_seconds;
+END;
+
+CREATE TRIGGER IF NOT EXISTS logs_rollup_update AFTER UPDATE OF duration_seconds, local_date ON logs
+BEGIN
+    UPDATE daily_habit_rollups
+    SET log_count = log_count - 1, total_duration_seconds = total_duration_seconds - COALESCE(OLD.duration_seconds, 0)
+    WHERE habit_id = OLD.habit_id AND day = OLD.local_date;
+    DELETE FROM daily_habit_rollups WHERE habit_id = OLD.habit_id AND day = OLD.local_date AND log_count <= 0;
+    INSERT INTO daily_habit_rollups (habit_id, day, log_count, total_duration_seconds)
+    SELECT NEW.habit_id, NEW.local_date, 1, COALESCE(NEW.duration_seconds, 0) WHERE NEW.local_date IS NOT NULL
+    ON CONFLICT (habit_id, day) DO UPDATE SET
+        log_count = log_count + 1,
+        total_duration_seconds = total_duration_seconds + excluded.total_duration_seconds;
+END;
+
+CREATE TRIGGER IF NOT EXISTS logs_rollup_delete AFTER DELETE ON logs
+WHEN OLD.local_date IS NOT NULL
+BEGIN
+    UPDATE daily_habit_rollups
+    SET log_count = log_count - 1, total_duration_seconds = total_duration_seconds - COALESCE(OLD.duration_seconds, 0)
+    WHERE habit_id = OLD.habit_id AND day = OLD.local_date;
+    DELETE FROM daily_habit_rollups WHERE habit_id = OLD.habit_id AND day = OLD.local_date AND log_count <= 0;
+END;
@@ -0,0 +1,3 @@
+-- Find the users of one time zone without scanning the table, for the reminder job,
+-- which looks at every user once per run in the days of their own time zone
+CREATE INDEX IF NOT EXISTS idx_users_time_zone ON users(time_zone);
@@ -0,0 +1,24 @@
+-- Reminders waiting to be delivered, and the record of each delivery. A user gets at
+-- most one reminder per local day, so re-running the reminder job enqueues nothing twice.
+-- A pending reminder is due at next_attempt_at_ms; claiming it pushes that out by a lease,
+-- so a reminder whose sender died is picked up again once the lease runs out.
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    name TEXT NOT NULL,
+    phone_number TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at_ms INTEGER NOT NULL,
+    provider_message_id TEXT,
+    last_error TEXT,
+    created_at_ms INTEGER NOT NULL,
+    sent_at_ms INTEGER,
+    UNIQUE (user_id, day),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Only pending reminders are ever claimed, in the order they fall due
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox(next_attempt_at_ms) WHERE status = 'pending';
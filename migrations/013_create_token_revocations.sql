@@ -0,0 +1,15 @@
+-- Token epochs of users whose tokens have been revoked. An access token carries the epoch it
+-- was issued in and stops working once the user's epoch has moved past it. There is no foreign
+-- key, so a deleted user's row stays and their tokens stay revoked.
+CREATE TABLE IF NOT EXISTS token_epochs (
+    user_id INTEGER PRIMARY KEY,
+    epoch INTEGER NOT NULL
+);
+
+-- Access tokens revoked one at a time, by token ID, kept until the token expires
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    token_id INTEGER PRIMARY KEY,
+    expires_at_ms INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at_ms ON revoked_tokens(expires_at_ms);
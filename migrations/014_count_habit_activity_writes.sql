@@ -0,0 +1,22 @@
+-- Count the log writes of every habit with an activity bitmap. The count is kept by
+-- triggers, so it changes in the same transaction as the log. A bitmap is current
+-- while applied_writes, the count it was last brought up to, equals log_writes; any
+-- other bitmap is rebuilt from the logs on its next read. Existing bitmaps are rebuilt once.
+ALTER TABLE habit_activity ADD COLUMN log_writes INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE habit_activity ADD COLUMN applied_writes INTEGER NOT NULL DEFAULT 0;
+UPDATE habit_activity SET applied_writes = -1;
+
+CREATE TRIGGER IF NOT EXISTS logs_activity_insert AFTER INSERT ON logs
+BEGIN
+    UPDATE habit_activity SET log_writes = log_writes + 1 WHERE habit_id = NEW.habit_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS logs_activity_update AFTER UPDATE OF habit_id, created_at ON logs
+BEGIN
+    UPDATE habit_activity SET log_writes = log_writes + 1 WHERE habit_id IN (OLD.habit_id, NEW.habit_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS logs_activity_delete AFTER DELETE ON logs
+BEGIN
+    UPDATE habit_activity SET log_writes = log_writes + 1 WHERE habit_id = OLD.habit_id;
+END;
@@ -0,0 +1,61 @@
+-- Store the activity bitmaps as one row per 64 local days of a habit, so triggers can
+-- set and clear a day's bit in the same statement, and therefore the same transaction,
+-- as the log write, like the daily rollups. A day is a log's local_date: the owner's
+-- local date when the log was written. Bit i of bits is day 64 * word + i, counted in
+-- days since 1970-01-01. Logs without a local_date are not counted until the
+-- backfill-rollups command sets it, which fires the update trigger. Existing logs are
+-- counted by the 015_habit_activity_words background migration. This replaces the
+-- bitmaps of migrations 008 and 014, which were maintained outside the log write.
+DROP TRIGGER IF EXISTS logs_activity_insert;
+DROP TRIGGER IF EXISTS logs_activity_update;
+DROP TRIGGER IF EXISTS logs_activity_delete;
+DROP TABLE IF EXISTS habit_activity;
+
+CREATE TABLE IF NOT EXISTS habit_activity_words (
+    habit_id INTEGER NOT NULL,
+    word INTEGER NOT NULL,
+    bits INTEGER NOT NULL,
+    PRIMARY KEY (habit_id, word),
+    FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS logs_activity_insert AFTER INSERT ON logs
+WHEN NEW.local_date IS NOT NULL
+BEGIN
+    INSERT INTO habit_activity_words (habit_id, word, bits)
+    SELECT NEW.habit_id, day >> 6, 1 << (day & 63)
+    FROM (SELECT CAST(julianday(NEW.local_date) - 2440587.5 AS INTEGER) AS day) WHERE true
+    ON CONFLICT (habit_id, word) DO UPDATE SET bits = bits | excluded.bits;
+END;
+
+-- A day is cleared once its habit has no log left on it. Logs on the same local date
+-- were created less than three days apart whatever the offsets, so the check is a
+-- range scan of idx_logs_habit_id_created_at.
+CREATE TRIGGER IF NOT EXISTS logs_activity_delete AFTER DELETE ON logs
+WHEN OLD.local_date IS NOT NULL AND NOT EXISTS (
+    SELECT 1 FROM logs
+    WHERE habit_id = OLD.habit_id AND local_date = OLD.local_date
+        AND created_at > datetime(OLD.created_at, '-3 days') AND created_at < datetime(OLD.created_at, '+3 days')
+)
+BEGIN
+    UPDATE habit_activity_words SET bits = bits & ~(1 << (CAST(julianday(OLD.local_date) - 2440587.5 AS INTEGER) & 63))
+    WHERE habit_id = OLD.habit_id AND word = CAST(julianday(OLD.local_date) - 2440587.5 AS INTEGER) >> 6;
+    DELETE FROM habit_activity_words WHERE habit_id = OLD.habit_id AND bits = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS logs_activity_update AFTER UPDATE OF habit_id, local_date ON logs
+BEGIN
+    UPDATE habit_activity_words SET bits = bits & ~(1 << (CAST(julianday(OLD.local_date) - 2440587.5 AS INTEGER) & 63))
+    WHERE OLD.local_date IS NOT NULL AND habit_id = OLD.habit_id
+        AND word = CAST(julianday(OLD.local_date) - 2440587.5 AS INTEGER) >> 6
+        AND NOT EXISTS (
+            SELECT 1 FROM logs
+            WHERE habit_id = OLD.habit_id AND local_date = OLD.local_date
+                AND created_at > datetime(OLD.created_at, '-3 days') AND created_at < datetime(OLD.created_at, '+3 days')
+        );
+    DELETE FROM habit_activity_words WHERE habit_id = OLD.habit_id AND bits = 0;
+    INSERT INTO habit_activity_words (habit_id, word, bits)
+    SELECT NEW.habit_id, day >> 6, 1 << (day & 63)
+    FROM (SELECT CAST(julianday(NEW.local_date) - 2440587.5 AS INTEGER) AS day) WHERE NEW.local_date IS NOT NULL
+    ON CONFLICT (habit_id, word) DO UPDATE SET bits = bits | excluded.bits;
+END;
@@ -0,0 +1,55 @@
+package migrations
+
+// Backfill is a data migration that runs in small batches after the server starts
+// listening, instead of inline in the schema migrations
+type Backfill struct {
+	// Name identifies the backfill in the background_migrations table; never rename one
+	Name string
+	// Table is walked in ascending order of its INTEGER PRIMARY KEY id column
+	Table string
+	// Update is run once per batch with two arguments: the exclusive lower and
+	// inclusive upper id bound of the batch. It may be empty for index-only migrations.
+	Update string
+	// Finalize is run once after the last batch, for example to build an index
+	Finalize string
+}
+
+// Background lists the backfills in the order they run. Append new entries to the end.
+var Background = []Backfill{
+	createdAtMillisBackfill("users"),
+	createdAtMillisBackfill("habits"),
+	createdAtMillisBackfill("logs"),
+	{
+		// Sets the activity bits (migration 015) of the logs written before the triggers
+		Name:  "015_habit_activity_words",
+		Table: "logs",
+		Update: "INSERT INTO habit_activity_words (habit_id, word, bits) " +
+			"SELECT habit_id, day >> 6, SUM(DISTINCT 1 << (day & 63)) " +
+			"FROM (SELECT habit_id, CAST(julianday(local_date) - 2440587.5 AS INTEGER) AS day " +
+			"FROM logs WHERE id > ? AND id <= ? AND local_date IS NOT NULL) " +
+			"GROUP BY habit_id, day >> 6 ON CONFLICT (habit_id, word) DO UPDATE SET bits = bits | excluded.bits",
+	},
+	paginationIndex("habits", "idx_habits_user_id_created_at", "user_id", "idx_habits_user_id"),
+	paginationIndex("logs", "idx_logs_habit_id_created_at", "habit_id", "idx_logs_habit_id"),
+}
+
+// paginationIndex builds the composite index for keyset pagination on (created_at, id),
+// newest first, so each list page is a bounded range scan of one owner's slice of it.
+// The single-column owner index it replaces is dropped only once it exists.
+func paginationIndex(table, index, owner, replaced string) Backfill {
+	return Backfill{
+		Name:  "006_" + index,
+		Table: table,
+		Finalize: "CREATE INDEX IF NOT EXISTS " + index + " ON " + table + "(" + owner + ", created_at, id); " +
+			"DROP INDEX IF EXISTS " + replaced,
+	}
+}
+
+// createdAtMillisBackfill fills created_at_ms (migration 007) from the created_at text of existing rows
+func createdAtMillisBackfill(table string) Backfill {
+	return Backfill{
+		Name:   "007_" + table + "_created_at_ms",
+		Table:  table,
+		Update: "UPDATE " + table + " SET created_at_ms = CAST(ROUND((julianday(created_at) - 2440587.5) * 86400000) AS INTEGER) WHERE id > ? AND id <= ? AND created_at_ms IS NULL",
+	}
+}
@@ -0,0 +1,9 @@
+// Package migrations embeds the SQL schema migrations into the binary.
+package migrations
+
+import "embed"
+
+// FS holds the .sql migration files, applied in file name order
+//
+//go:embed *.sql
+var FS embed.FS
@@ -0,0 +1,135 @@
+package models
+
+import "math/bits"
+
+// Streaks are a habit's current and longest streak, in logged days. A streak
+// survives one skipped day and ends at two consecutive days without a log.
+type Streaks struct {
+	HabitID int64 `json:"habit_id"`
+	Current int   `json:"current"`
+	Longest int   `json:"longest"`
+}
+
+// ActivityBitmap records the local days a habit was logged on, one bit per day.
+// Bit i of Words[k] is day StartDay + 64*k + i, where days are counted from
+// 1970-01-01 and a log's day is its local date when it was written. StartDay is
+// always a multiple of 64.
+type ActivityBitmap struct {
+	HabitID  int64
+	StartDay int64
+	Words    []uint64
+}
+
+// AddWord appends the 64 days starting at day 64*word. Words must be added in
+// ascending order; the words skipped between two added ones are left unlogged.
+func (a *ActivityBitmap) AddWord(word int64, bits uint64) {
+	if len(a.Words) == 0 {
+		a.StartDay = word * 64
+	}
+	for int64(len(a.Words)) < word-a.StartDay/64 {
+		a.Words = append(a.Words, 0)
+	}
+	a.Words = append(a.Words, bits)
+}
+
+// CurrentStreak counts the logged days of the streak still alive on today: the
+// days after the last pair of consecutive unlogged days that ends before today.
+// Days after today are counted too. It runs in word operations over the days since
+// that pair, never per day.
+func (a *ActivityBitmap) CurrentStreak(today int64) int {
+	if len(a.Words) == 0 {
+		return 0
+	}
+
+	// A break at position p means days p and p+1 are both unlogged. Only breaks
+	// whose second day is before today end the current streak.
+	limit := today - a.StartDay - 2
+	if limit >= int64(len(a.Words))*64 {
+		return 0
+	}
+
+	// Find the last break at or before limit, scanning words backwards
+	last := int64(-1)
+	if limit >= 0 {
+		for k := limit / 64; k >= 0; k-- {
+			b := a.breaks(k)
+			if k == limit/64 {
+				b &= lowMask(uint(limit&63) + 1)
+			}
+			if b != 0 {
+				last = k*64 + 63 - int64(bits.LeadingZeros64(b))
+				break
+			}
+		}
+	}
+
+	// Count the logged days after it
+	streak := 0
+	k := int64(0)
+	if last >= 0 {
+		k = last / 64
+		streak = bits.OnesCount64(a.Words[k] &^ lowMask(uint(last&63)+1))
+		k++
+	}
+	for ; k < int64(len(a.Words)); k++ {
+		streak += bits.OnesCount64(a.Words[k])
+	}
+	return streak
+}
+
+// LongestStreak returns the most logged days in any streak. Each word costs a
+// constant number of operations plus one per streak ending inside it.
+func (a *ActivityBitmap) LongestStreak() int {
+	longest, run := 0, 0
+	for k := range a.Words {
+		w := a.Words[k]
+		b := a.breaks(int64(k))
+		lo := uint(0)
+		for b != 0 {
+			// The streak running into this word ends at the break
+			j := uint(bits.TrailingZeros64(b))
+			run += bits.OnesCount64(w & lowMask(j) &^ lowMask(lo))
+			if run > longest {
+				longest = run
+			}
+			run = 0
+
+			// The next streak starts at the next logged day; breaks before it are
+			// inside the same gap
+			rest := w &^ lowMask(j+1)
+			if rest == 0 {
+				lo = 64
+				break
+			}
+			lo = uint(bits.TrailingZeros64(rest))
+			b &^= lowMask(lo)
+		}
+		if lo < 64 {
+			run += bits.OnesCount64(w &^ lowMask(lo))
+		}
+	}
+	if run > longest {
+		longest = run
+	}
+	return longest
+}
+
+// breaks returns the positions in word k where the day and the next day are both unlogged
+func (a *ActivityBitmap) breaks(k int64) uint64 {
+	unlogged := ^a.word(k)
+	next := unlogged>>1 | ^a.word(k+1)<<63
+	return unlogged & next
+}
+
+// word returns word k, or zero outside the bitmap
+func (a *ActivityBitmap) word(k int64) uint64 {
+	if k < 0 || k >= int64(len(a.Words)) {
+		return 0
+	}
+	return a.Words[k]
+}
+
+// lowMask returns a mask of the n lowest bits, for n from 0 to 64
+func lowMask(n uint) uint64 {
+	return uint64(1)<<n - 1
+}
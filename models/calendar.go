@@ -0,0 +1,86 @@
+package models
+
+import (
+	"errors"
+	"net/url"
+	"strconv"
+	"time"
+)
+
+// dateLayout is the format of local dates in the daily rollups and calendar parameters
+const dateLayout = "2006-01-02"
+
+// Calendar window limits, in days
+const (
+	DefaultCalendarDays = 365
+	MaxCalendarDays     = 3660
+)
+
+// Calendar is a habit's daily log counts and durations between two local dates
+type Calendar struct {
+	HabitID int64          `json:"habit_id"`
+	From    string         `json:"from"`
+	To      string         `json:"to"`
+	Days    []*CalendarDay `json:"days"`
+}
+
+// CalendarDay is one habit's daily rollup. Days without logs are omitted from a Calendar.
+type CalendarDay struct {
+	Date                 string `json:"date"`
+	LogCount             int    `json:"log_count"`
+	TotalDurationSeconds int64  `json:"total_duration_seconds"`
+}
+
+// CalendarRange is an inclusive range of local dates. An empty bound is filled in
+// by the service from the user's current date.
+type CalendarRange struct {
+	From string
+	To   string
+}
+
+// CalendarRangeFromQuery parses the from and to query parameters, each a YYYY-MM-DD date
+func CalendarRangeFromQuery(query url.Values) (*CalendarRange, error) {
+	r := &CalendarRange{From: query.Get("from"), To: query.Get("to")}
+	if r.From != "" {
+		if _, err := time.Parse(dateLayout, r.From); err != nil {
+			return nil, errors.New("from must be a YYYY-MM-DD date")
+		}
+	}
+	if r.To != "" {
+		if _, err := time.Parse(dateLayout, r.To); err != nil {
+			return nil, errors.New("to must be a YYYY-MM-DD date")
+		}
+	}
+	return r, nil
+}
+
+// Resolve fills in missing bounds around today: to defaults to today and from to
+// DefaultCalendarDays days before to
+func (r *CalendarRange) Resolve(today time.Time) {
+	if r.To == "" {
+		r.To = today.Format(dateLayout)
+	}
+	if r.From == "" {
+		to, _ := time.Parse(dateLayout, r.To)
+		r.From = to.AddDate(0, 0, 1-DefaultCalendarDays).Format(dateLayout)
+	}
+}
+
+// Validate validates a resolved CalendarRange
+func (r *CalendarRange) Validate() error {
+	from, err := time.Parse(dateLayout, r.From)
+	if err != nil {
+		return errors.New("from must be a YYYY-MM-DD date")
+	}
+	to, err := time.Parse(dateLayout, r.To)
+	if err != nil {
+		return errors.New("to must be a YYYY-MM-DD date")
+	}
+	if to.Before(from) {
+		return errors.New("from must not be after to")
+	}
+	if to.Sub(from) >= MaxCalendarDays*24*time.Hour {
+		return errors.New("a calendar spans at most " + strconv.Itoa(MaxCalendarDays) + " days")
+	}
+	return nil
+}
@@ -0,0 +1,41 @@
+package models
+
+import (
+	"errors"
+	"net/url"
+	"strconv"
+	"time"
+)
+
+// Dashboard window limits, in days
+const (
+	DefaultDashboardDays = 7
+	MaxDashboardDays     = 90
+)
+
+// Dashboard is the pre-shaped payload for the habit list screen
+type Dashboard struct {
+	Days   int               `json:"days"`
+	Since  time.Time         `json:"since"`
+	Habits []*DashboardHabit `json:"habits"`
+}
+
+// DashboardHabit is a habit with its current streak and its logs in the dashboard window
+type DashboardHabit struct {
+	*Habit
+	Streak     int    `json:"streak"`
+	RecentLogs []*Log `json:"recent_logs"`
+}
+
+// DashboardDaysFromQuery parses the days query parameter
+func DashboardDaysFromQuery(query url.Values) (int, error) {
+	raw := query.Get("days")
+	if raw == "" {
+		return DefaultDashboardDays, nil
+	}
+	days, err := strconv.Atoi(raw)
+	if err != nil || days < 1 || days > MaxDashboardDays {
+		return 0, errors.New("days must be between 1 and " + strconv.Itoa(MaxDashboardDays))
+	}
+	return days, nil
+}
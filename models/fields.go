@@ -0,0 +1,116 @@
+package models
+
+import (
+	"errors"
+	"net/url"
+	"strings"
+	"time"
+)
+
+// FieldSet is the list of JSON fields requested with the fields query parameter.
+// A nil FieldSet means every field.
+type FieldSet []string
+
+// Fields that can be requested for each list
+var (
+	HabitFields = FieldSet{"id", "user_id", "name", "description", "duration_seconds", "created_at"}
+	LogFields   = FieldSet{"id", "habit_id", "notes", "duration_seconds", "created_at"}
+)
+
+// FieldSetFromQuery parses the comma-separated fields query parameter against the
+// fields allowed for a list. It returns nil when the parameter is absent.
+func FieldSetFromQuery(query url.Values, allowed FieldSet) (FieldSet, error) {
+	raw := query.Get("fields")
+	if raw == "" {
+		return nil, nil
+	}
+
+	fields := FieldSet{}
+	for _, name := range strings.Split(raw, ",") {
+		name = strings.TrimSpace(name)
+		if !allowed.Has(name) {
+			return nil, errors.New("unknown field " + name + ", available: " + strings.Join(allowed, ","))
+		}
+		if !fields.Has(name) {
+			fields = append(fields, name)
+		}
+	}
+	return fields, nil
+}
+
+// Has reports whether name is in the set; every field is in a nil set
+func (f FieldSet) Has(name string) bool {
+	if f == nil {
+		return true
+	}
+	for _, field := range f {
+		if field == name {
+			return true
+		}
+	}
+	return false
+}
+
+// PartialHabit is a habit encoded with only the requested fields
+type PartialHabit struct {
+	ID              *int64     `json:"id,omitempty"`
+	UserID          *int64     `json:"user_id,omitempty"`
+	Name            *string    `json:"name,omitempty"`
+	Description     *string    `json:"description,omitempty"`
+	DurationSeconds *int       `json:"duration_seconds,omitempty"`
+	CreatedAt       *time.Time `json:"created_at,omitempty"`
+}
+
+// NewPartialHabit projects habit onto fields
+func NewPartialHabit(habit *Habit, fields FieldSet) *PartialHabit {
+	p := &PartialHabit{}
+	if fields.Has("id") {
+		p.ID = &habit.ID
+	}
+	if fields.Has("user_id") {
+		p.UserID = &habit.UserID
+	}
+	if fields.Has("name") {
+		p.Name = &habit.Name
+	}
+	if fields.Has("description") {
+		p.Description = &habit.Description
+	}
+	if fields.Has("duration_seconds") {
+		p.DurationSeconds = habit.DurationSeconds
+	}
+	if fields.Has("created_at") {
+		p.CreatedAt = &habit.CreatedAt
+	}
+	return p
+}
+
+// PartialLog is a log encoded with only the requested fields
+type PartialLog struct {
+	ID              *int64     `json:"id,omitempty"`
+	HabitID         *int64     `json:"habit_id,omitempty"`
+	Notes           *string    `json:"notes,omitempty"`
+	DurationSeconds *int       `json:"duration_seconds,omitempty"`
+	CreatedAt       *time.Time `json:"created_at,omitempty"`
+}
+
+// NewPartialLog projects log onto fields
+func NewPartialLog(log *Log, fields FieldSet) *PartialLog {
+	p := &PartialLog{}
+	if fields.Has("id") {
+		p.ID = &log.ID
+	}
+	if fields.Has("habit_id") {
+		p.HabitID = &log.HabitID
+	}
+	if fields.Has("notes") {
+		p.Notes = &log.Notes
+	}
+	if fields.Has("duration_seconds") {
+		p.DurationSeconds = log.DurationSeconds
+	}
+	if fields.Has("created_at") {
+		p.CreatedAt = &log.CreatedAt
+	}
+	return p
+}
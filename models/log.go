@@ -14,6 +14,12 @@ type Log struct {
 	CreatedAt       time.Time `json:"created_at"`
 }
 
+// HabitLogs groups a habit's logs in the user-wide log feed
+type HabitLogs struct {
+	HabitID int64  `json:"habit_id"`
+	Logs    []*Log `json:"logs"`
+}
+
 // CreateLogRequest represents the request to create a new log
 type CreateLogRequest struct {
 	Notes           string `json:"notes,omitempty"`
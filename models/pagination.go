@@ -0,0 +1,119 @@
+package models
+
+import (
+	"encoding/base64"
+	"errors"
+	"net/url"
+	"strconv"
+	"strings"
+	"time"
+)
+
+// Page size limits for list endpoints
+const (
+	DefaultPageLimit = 100
+	MaxPageLimit     = 1000
+)
+
+// Cursor identifies a position in a list ordered by (created_at, id), newest first
+type Cursor struct {
+	CreatedAt time.Time
+	ID        int64
+}
+
+// Encode returns the opaque string form of the cursor used in query parameters
+func (c Cursor) Encode() string {
+	raw := strconv.FormatInt(c.CreatedAt.Unix(), 10) + ":" + strconv.FormatInt(c.ID, 10)
+	return base64.RawURLEncoding.EncodeToString([]byte(raw))
+}
+
+// DecodeCursor parses a cursor produced by Cursor.Encode
+func DecodeCursor(s string) (*Cursor, error) {
+	raw, err := base64.RawURLEncoding.DecodeString(s)
+	if err != nil {
+		return nil, errors.New("invalid cursor")
+	}
+	createdAt, id, ok := strings.Cut(string(raw), ":")
+	if !ok {
+		return nil, errors.New("invalid cursor")
+	}
+	seconds, err := strconv.ParseInt(createdAt, 10, 64)
+	if err != nil {
+		return nil, errors.New("invalid cursor")
+	}
+	cursorID, err := strconv.ParseInt(id, 10, 64)
+	if err != nil {
+		return nil, errors.New("invalid cursor")
+	}
+	return &Cursor{CreatedAt: time.Unix(seconds, 0).UTC(), ID: cursorID}, nil
+}
+
+// PageRequest selects one page of a list ordered by (created_at, id), newest first.
+// After returns the rows older than the cursor, Before the rows newer than it. A
+// Limit of 0 with no cursor selects the whole list.
+type PageRequest struct {
+	Limit  int
+	Before *Cursor
+	After  *Cursor
+}
+
+// Page holds the cursors for the pages around the one returned; an empty
+// cursor means there is no page in that direction
+type Page struct {
+	NextCursor string
+	PrevCursor string
+}
+
+// PageRequestFromQuery parses the limit, before and after query parameters. A
+// list is only paged when one of them is given; otherwise the whole list is selected.
+func PageRequestFromQuery(query url.Values) (*PageRequest, error) {
+	if !query.Has("limit") && !query.Has("before") && !query.Has("after") {
+		return &PageRequest{}, nil
+	}
+	page := &PageRequest{Limit: DefaultPageLimit}
+
+	if limit := query.Get("limit"); limit != "" {
+		n, err := strconv.Atoi(limit)
+		if err != nil {
+			return nil, errors.New("limit must be an integer")
+		}
+		if n < 1 {
+			return nil, errors.New("limit must be between 1 and " + strconv.Itoa(MaxPageLimit))
+		}
+		page.Limit = n
+	}
+	if before := query.Get("before"); before != "" {
+		cursor, err := DecodeCursor(before)
+		if err != nil {
+			return nil, err
+		}
+		page.Before = cursor
+	}
+	if after := query.Get("after"); after != "" {
+		cursor, err := DecodeCursor(after)
+		if err != nil {
+			return nil, err
+		}
+		page.After = cursor
+	}
+
+	if err := page.Validate(); err != nil {
+		return nil, err
+	}
+	return page, nil
+}
+
+// Validate validates the PageRequest
+func (r *PageRequest) Validate() error {
+	if r.Limit == 0 && r.Before == nil && r.After == nil {
+		// The whole list
+		return nil
+	}
+	if r.Limit < 1 || r.Limit > MaxPageLimit {
+		return errors.New("limit must be between 1 and " + strconv.Itoa(MaxPageLimit))
+	}
+	if r.Before != nil && r.After != nil {
+		return errors.New("only one of before and after can be provided")
+	}
+	return nil
+}
@@ -0,0 +1,88 @@
+package models
+
+import (
+	"strconv"
+	"time"
+)
+
+// Reasons a user is reminded to log. A reminder looks at the user's last two
+// complete local days, day one and day two (yesterday).
+const (
+	// ReminderNoLogs is a user without a log on either day; their streak has ended
+	ReminderNoLogs = "no_logs"
+	// ReminderMissedYesterday is a user who logged on day one but not day two; their
+	// streak survives only if they log today
+	ReminderMissedYesterday = "missed_yesterday"
+)
+
+// Delivery states of a reminder in the outbox
+const (
+	ReminderPending = "pending"
+	ReminderSent    = "sent"
+	ReminderFailed  = "failed"
+	// ReminderSentUnknown is a reminder whose request reached the provider but whose
+	// answer was lost when the run stopped; it is not sent again
+	ReminderSentUnknown = "sent_unknown"
+)
+
+// Reminder is a user to notify about missed logs, as queued in the outbox. Day is
+// the local date of day two. Users who logged on day two are never reminded.
+type Reminder struct {
+	ID          int64
+	UserID      int64
+	Day         string
+	Reason      string
+	Name        string
+	PhoneNumber string
+	// Attempts counts the deliveries started, including the current one
+	Attempts   int
+	EnqueuedAt time.Time
+}
+
+// Message returns the text sent to the user
+func (r *Reminder) Message() string {
+	if r.Reason == ReminderMissedYesterday {
+		return "Hi " + r.Name + ", you didn't log a habit yesterday. Log one today to keep your streak going!"
+	}
+	return "Hi " + r.Name + ", you haven't logged a habit in two days. Log one today to start a new streak!"
+}
+
+// IdempotencyKey identifies the reminder to the provider. It is the same on every
+// attempt, so a provider that has already accepted it does not send it again.
+func (r *Reminder) IdempotencyKey() string {
+	return "reminder-" + r.Day + "-" + strconv.FormatInt(r.UserID, 10)
+}
+
+// ReminderDelivery is the outcome of one attempt to deliver a reminder. Status is
+// ReminderSent, ReminderFailed, ReminderSentUnknown, or ReminderPending for a reminder to retry at
+// NextAttemptAt. A Deferred retry was never handed to the provider and does not
+// count as an attempt.
+type ReminderDelivery struct {
+	ReminderID    int64
+	Status        string
+	MessageID     string
+	Error         string
+	NextAttemptAt time.Time
+	Deferred      bool
+	At            time.Time
+}
+
+// ReminderWindow is day one and day two in one time zone, as the instants day one
+// starts, day two starts and day two ends, and day two's local date
+type ReminderWindow struct {
+	TimeZone    string
+	Day         string
+	DayOneStart time.Time
+	DayTwoStart time.Time
+	DayTwoEnd   time.Time
+}
+
+// ReminderRun summarizes one pass of the reminder job
+type ReminderRun struct {
+	Sent     int64 `json:"sent"`
+	Retried  int64 `json:"retried"`
+	Deferred int64 `json:"deferred"`
+	Failed   int64 `json:"failed"`
+	// SentUnknown counts the reminders that may or may not have been sent
+	SentUnknown int64 `json:"sent_unknown"`
+}
@@ -0,0 +1,69 @@
+package models
+
+import (
+	"errors"
+	"net/url"
+	"time"
+)
+
+// TimeRange restricts a list to entries created in [From, To). A nil bound is open.
+type TimeRange struct {
+	From *time.Time
+	To   *time.Time
+}
+
+// TimeRangeFromQuery parses the from and to query parameters. Each accepts an
+// RFC 3339 timestamp or a YYYY-MM-DD date, which means midnight UTC.
+func TimeRangeFromQuery(query url.Values) (*TimeRange, error) {
+	r := &TimeRange{}
+
+	if from := query.Get("from"); from != "" {
+		t, err := parseTimeParam(from)
+		if err != nil {
+			return nil, errors.New("from must be an RFC 3339 timestamp or a YYYY-MM-DD date")
+		}
+		r.From = &t
+	}
+	if to := query.Get("to"); to != "" {
+		t, err := parseTimeParam(to)
+		if err != nil {
+			return nil, errors.New("to must be an RFC 3339 timestamp or a YYYY-MM-DD date")
+		}
+		r.To = &t
+	}
+
+	if err := r.Validate(); err != nil {
+		return nil, err
+	}
+	return r, nil
+}
+
+// SinceFromQuery parses the required since query parameter, an RFC 3339 timestamp or a YYYY-MM-DD date
+func SinceFromQuery(query url.Values) (time.Time, error) {
+	since := query.Get("since")
+	if since == "" {
+		return time.Time{}, errors.New("since is required")
+	}
+	t, err := parseTimeParam(since)
+	if err != nil {
+		return time.Time{}, errors.New("since must be an RFC 3339 timestamp or a YYYY-MM-DD date")
+	}
+	return t, nil
+}
+
+// parseTimeParam parses an RFC 3339 timestamp or a YYYY-MM-DD date
+func parseTimeParam(value string) (time.Time, error) {
+	t, err := time.Parse(time.RFC3339, value)
+	if err != nil {
+		return time.Parse("2006-01-02", value)
+	}
+	return t, nil
+}
+
+// Validate validates the TimeRange
+func (r *TimeRange) Validate() error {
+	if r.From != nil && r.To != nil && !r.From.Before(*r.To) {
+		return errors.New("from must be before to")
+	}
+	return nil
+}
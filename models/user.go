@@ -88,6 +88,42 @@ func (r *LoginRequest) Validate() error {
 
 // LoginResponse represents the response to a successful login
 type LoginResponse struct {
-	Token string `json:"token"`
-	User  User   `json:"user"`
+	Token        string `json:"token"`
+	RefreshToken string `json:"refresh_token"`
+	ExpiresIn    int64  `json:"expires_in"`
+	User         User   `json:"user"`
+}
+
+// RefreshTokenRequest represents the request to exchange a refresh token for new tokens
+type RefreshTokenRequest struct {
+	RefreshToken string `json:"refresh_token"`
+}
+
+// Validate validates the RefreshTokenRequest
+func (r *RefreshTokenRequest) Validate() error {
+	if r.RefreshToken == "" {
+		return errors.New("refresh_token is required")
+	}
+	return nil
+}
+
+// LogoutRequest represents the request to end the session of a refresh token
+type LogoutRequest struct {
+	RefreshToken string `json:"refresh_token"`
+}
+
+// Validate validates the LogoutRequest
+func (r *LogoutRequest) Validate() error {
+	if r.RefreshToken == "" {
+		return errors.New("refresh_token is required")
+	}
+	return nil
+}
+
+// TokenResponse holds a new access token, valid for ExpiresIn seconds, and the
+// refresh token to exchange for the next one
+type TokenResponse struct {
+	Token        string `json:"token"`
+	RefreshToken string `json:"refresh_token"`
+	ExpiresIn    int64  `json:"expires_in"`
 }
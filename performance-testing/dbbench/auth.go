@@ -0,0 +1,110 @@
+package main
+
+import (
+	"fmt"
+	"net/http"
+	"net/http/httptest"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/middleware"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// runAuth compares authenticating requests by validating the bearer token every
+// time against the verified-token cache, for opts.Rows distinct tokens each sent
+// many times
+func runAuth(opts Options) error {
+	jwtManager := utils.NewJWTManager("bench-secret")
+	tokens := make([]string, opts.Rows)
+	requests := make([]*http.Request, opts.Rows)
+	for i := range tokens {
+		token, err := jwtManager.GenerateToken(int64(i+1), 0, time.Hour)
+		if err != nil {
+			return err
+		}
+		tokens[i] = token
+		requests[i] = httptest.NewRequest(http.MethodGet, "/habits", nil)
+		requests[i].Header.Set("Authorization", "Bearer "+token)
+	}
+
+	// The cache must give the same user as validating, and must not accept an expired token
+	tokenCache := middleware.NewTokenCache(2 * opts.Rows)
+	for pass := 0; pass < 2; pass++ {
+		for i, token := range tokens {
+			claims, err := tokenCache.Validate(jwtManager, token)
+			if err != nil {
+				return err
+			}
+			if claims.UserID != int64(i+1) {
+				return fmt.Errorf("token %d: cache gives user %d", i, claims.UserID)
+			}
+		}
+	}
+	expired, err := jwtManager.GenerateToken(1, 0, -time.Second)
+	if err != nil {
+		return err
+	}
+	if _, err := tokenCache.Validate(jwtManager, expired); err == nil {
+		return fmt.Errorf("token cache accepted an expired token")
+	}
+
+	var userID int64
+	handler := http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		userID, _ = middleware.GetUserIDFromContext(r.Context())
+	})
+	uncached := middleware.AuthMiddleware(jwtManager, nil, nil)(handler)
+	cached := middleware.AuthMiddleware(jwtManager, tokenCache, nil)(handler)
+	recorder := httptest.NewRecorder()
+
+	results := []struct {
+		name   string
+		result testing.BenchmarkResult
+	}{
+		{"ValidateToken", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				jwtManager.ValidateToken(tokens[i%len(tokens)])
+			}
+		})},
+		{"TokenCache.Validate", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				tokenCache.Validate(jwtManager, tokens[i%len(tokens)])
+			}
+		})},
+		{"AuthMiddleware", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				uncached.ServeHTTP(recorder, requests[i%len(requests)])
+			}
+		})},
+		{"AuthMiddleware (cached)", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				cached.ServeHTTP(recorder, requests[i%len(requests)])
+			}
+		})},
+		{"TokenCache.Validate, parallel", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			b.RunParallel(func(pb *testing.PB) {
+				for i := 0; pb.Next(); i++ {
+					tokenCache.Validate(jwtManager, tokens[i%len(tokens)])
+				}
+			})
+		})},
+	}
+	if userID == 0 {
+		return fmt.Errorf("middleware did not authenticate the requests")
+	}
+
+	stats := tokenCache.Stats()
+	fmt.Printf("%d distinct tokens\n\n", len(tokens))
+	fmt.Printf("%-32s %14s %12s\n", "authenticate with", "ns/op", "allocs/op")
+	for _, r := range results {
+		fmt.Printf("%-32s %14d %12d\n", r.name, r.result.NsPerOp(), r.result.AllocsPerOp())
+	}
+	fmt.Printf("\ntoken cache: %d tokens, %.2f%% hits, %d evictions\n",
+		stats.Tokens, 100*float64(stats.Hits)/float64(stats.Hits+stats.Misses), stats.Evictions)
+	return nil
+}
@@ -0,0 +1,129 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/service"
+)
+
+// aggregateLogsQuery builds a calendar from the raw logs, as reading without the rollups requires
+const aggregateLogsQuery = "SELECT date(created_at), COUNT(*), COALESCE(SUM(duration_seconds), 0) FROM logs " +
+	"WHERE habit_id = ? AND created_at >= ? AND created_at < ? GROUP BY 1 ORDER BY 1"
+
+// runCalendar dates seeded logs with the rollup backfill, then compares reading a
+// year-long calendar from the daily rollups against aggregating the logs
+func runCalendar(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	habitID, err := seedLogs(database, opts.Rows)
+	if err != nil {
+		return err
+	}
+	if _, err := database.Exec("UPDATE logs SET duration_seconds = id % 600"); err != nil {
+		return fmt.Errorf("failed to set durations: %w", err)
+	}
+
+	userRepo := repository.NewUserRepository(database)
+	habitRepo := repository.NewHabitRepository(database)
+	calendarService := service.NewCalendarService(repository.NewRollupRepository(database), habitRepo, repository.NewUserZoneCache(userRepo, 1000))
+	habit, err := habitRepo.GetByID(habitID)
+	if err != nil {
+		return err
+	}
+
+	// Seeded logs have no local_date; dating them fills the rollups
+	start := time.Now()
+	dated, err := calendarService.BackfillLocalDates(context.Background(), 1000)
+	if err != nil {
+		return err
+	}
+	fmt.Printf("backfill dated %d logs in %s\n", dated, time.Since(start))
+
+	// The seeded user is in UTC, so both read the same year of dates
+	to := time.Now().UTC()
+	from := to.AddDate(0, 0, 1-models.DefaultCalendarDays)
+	dates := &models.CalendarRange{From: from.Format("2006-01-02"), To: to.Format("2006-01-02")}
+	calendar, err := calendarService.GetCalendar(habitID, habit.UserID, dates)
+	if err != nil {
+		return err
+	}
+	aggregated, logs, err := aggregateCalendar(database, habitID, from, to)
+	if err != nil {
+		return err
+	}
+	if fmt.Sprint(calendarDays(calendar.Days)) != fmt.Sprint(calendarDays(aggregated)) {
+		return fmt.Errorf("rollups differ from the aggregated logs")
+	}
+
+	var benchErr error
+	fail := func(b *testing.B, err error) {
+		benchErr = err
+		b.FailNow()
+	}
+	rollups := testing.Benchmark(func(b *testing.B) {
+		b.ReportAllocs()
+		for i := 0; i < b.N; i++ {
+			dates := &models.CalendarRange{From: calendar.From, To: calendar.To}
+			if _, err := calendarService.GetCalendar(habitID, habit.UserID, dates); err != nil {
+				fail(b, err)
+			}
+		}
+	})
+	aggregate := testing.Benchmark(func(b *testing.B) {
+		b.ReportAllocs()
+		for i := 0; i < b.N; i++ {
+			if _, _, err := aggregateCalendar(database, habitID, from, to); err != nil {
+				fail(b, err)
+			}
+		}
+	})
+	if benchErr != nil {
+		return benchErr
+	}
+
+	fmt.Printf("%d days with logs, %d logs in the year\n\n", len(calendar.Days), logs)
+	fmt.Printf("%-24s %14s %12s\n", "calendar from", "ns/op", "allocs/op")
+	fmt.Printf("%-24s %14d %12d\n", "daily rollups", rollups.NsPerOp(), rollups.AllocsPerOp())
+	fmt.Printf("%-24s %14d %12d\n", "aggregated logs", aggregate.NsPerOp(), aggregate.AllocsPerOp())
+	return nil
+}
+
+// aggregateCalendar groups a habit's logs between two UTC dates by day and returns the days and the number of logs read
+func aggregateCalendar(database *config.Database, habitID int64, from, to time.Time) ([]*models.CalendarDay, int, error) {
+	rows, err := database.Query(aggregateLogsQuery, habitID, from.Format("2006-01-02"), to.AddDate(0, 0, 1).Format("2006-01-02"))
+	if err != nil {
+		return nil, 0, fmt.Errorf("failed to aggregate logs: %w", err)
+	}
+	defer rows.Close()
+
+	var days []*models.CalendarDay
+	logs := 0
+	for rows.Next() {
+		day := &models.CalendarDay{}
+		if err := rows.Scan(&day.Date, &day.LogCount, &day.TotalDurationSeconds); err != nil {
+			return nil, 0, err
+		}
+		days = append(days, day)
+		logs += day.LogCount
+	}
+	return days, logs, rows.Err()
+}
+
+// calendarDays dereferences days for comparison
+func calendarDays(days []*models.CalendarDay) []models.CalendarDay {
+	values := make([]models.CalendarDay, len(days))
+	for i, day := range days {
+		values[i] = *day
+	}
+	return values
+}
@@ -0,0 +1,56 @@
+package main
+
+import (
+	"context"
+	"database/sql"
+	"sync/atomic"
+
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// countingDB wraps a repository.DB and counts the statements sent through it
+type countingDB struct {
+	repository.DB
+	queries int64
+}
+
+// Exec counts and runs a write statement
+func (c *countingDB) Exec(query string, args ...interface{}) (sql.Result, error) {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.Exec(query, args...)
+}
+
+// ExecReturning counts and runs a write statement with a RETURNING clause
+func (c *countingDB) ExecReturning(query string, args ...interface{}) *sql.Row {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.ExecReturning(query, args...)
+}
+
+// ExecReturningRows counts and runs a write statement returning many rows
+func (c *countingDB) ExecReturningRows(query string, args ...interface{}) (*sql.Rows, error) {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.ExecReturningRows(query, args...)
+}
+
+// Query counts and runs a read statement
+func (c *countingDB) Query(query string, args ...interface{}) (*sql.Rows, error) {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.Query(query, args...)
+}
+
+// QueryContext counts and runs a cancellable read statement
+func (c *countingDB) QueryContext(ctx context.Context, query string, args ...interface{}) (*sql.Rows, error) {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.QueryContext(ctx, query, args...)
+}
+
+// QueryRow counts and runs a single-row read statement
+func (c *countingDB) QueryRow(query string, args ...interface{}) *sql.Row {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.QueryRow(query, args...)
+}
+
+// reset returns the number of statements counted so far and zeroes the counter
+func (c *countingDB) reset() int64 {
+	return atomic.SwapInt64(&c.queries, 0)
+}
@@ -0,0 +1,124 @@
+package main
+
+import (
+	"database/sql"
+	"fmt"
+	"math"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/migrations"
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// Statements used to read every log of a habit with each created_at decoding
+const (
+	legacyDecodeLogsQuery = "SELECT id, habit_id, notes, duration_seconds, created_at FROM logs WHERE habit_id = ?"
+	millisDecodeLogsQuery = "SELECT id, habit_id, notes, duration_seconds, COALESCE(created_at_ms, CAST(ROUND((julianday(created_at) - 2440587.5) * 86400000) AS INTEGER)) FROM logs WHERE habit_id = ?"
+)
+
+// runDecode compares the per-row cost of decoding created_at from text, as the
+// repositories did before migration 007, against integer milliseconds, both
+// before the created_at_ms backfill (converted in SQLite) and after it
+func runDecode(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	habitID, err := seedLogs(database, opts.Rows)
+	if err != nil {
+		return err
+	}
+
+	var benchErr error
+	fail := func(b *testing.B, err error) {
+		benchErr = err
+		b.FailNow()
+	}
+	readAll := func(query string, scan func(*sql.Rows) error) testing.BenchmarkResult {
+		return testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				rows, err := database.Query(query, habitID)
+				if err != nil {
+					fail(b, err)
+				}
+				for rows.Next() {
+					if err := scan(rows); err != nil {
+						rows.Close()
+						fail(b, err)
+					}
+				}
+				if err := rows.Close(); err != nil {
+					fail(b, err)
+				}
+			}
+		})
+	}
+
+	var log models.Log
+	var duration sql.NullInt64
+	scanText := func(rows *sql.Rows) error {
+		var createdAt string
+		if err := rows.Scan(&log.ID, &log.HabitID, &log.Notes, &duration, &createdAt); err != nil {
+			return err
+		}
+		var err error
+		log.CreatedAt, err = legacyParseTimestamp(createdAt)
+		return err
+	}
+	scanMillis := func(rows *sql.Rows) error {
+		var createdAtMs int64
+		if err := rows.Scan(&log.ID, &log.HabitID, &log.Notes, &duration, &createdAtMs); err != nil {
+			return err
+		}
+		log.CreatedAt = time.UnixMilli(createdAtMs).UTC()
+		return nil
+	}
+
+	text := readAll(legacyDecodeLogsQuery, scanText)
+	converted := readAll(millisDecodeLogsQuery, scanMillis)
+
+	// Run the logs backfill over every row, as the background migrator would
+	for _, b := range migrations.Background {
+		if b.Table != "logs" || b.Update == "" {
+			continue
+		}
+		if _, err := database.Exec(b.Update, 0, math.MaxInt64); err != nil {
+			return fmt.Errorf("failed to backfill created_at_ms: %w", err)
+		}
+	}
+	backfilled := readAll(millisDecodeLogsQuery, scanMillis)
+	if benchErr != nil {
+		return benchErr
+	}
+
+	fmt.Printf("%d logs in one habit\n\n", opts.Rows)
+	fmt.Printf("%-32s %12s %12s %12s\n", "created_at decoding", "ns/row", "B/row", "allocs/row")
+	for _, r := range []struct {
+		name   string
+		result testing.BenchmarkResult
+	}{
+		{"text, time.Parse (legacy)", text},
+		{"millis, converted in SQLite", converted},
+		{"millis, backfilled", backfilled},
+	} {
+		rows := int64(opts.Rows)
+		fmt.Printf("%-32s %12d %12d %12.1f\n", r.name,
+			r.result.NsPerOp()/rows, r.result.AllocedBytesPerOp()/rows,
+			float64(r.result.AllocsPerOp())/float64(rows))
+	}
+	return nil
+}
+
+// legacyParseTimestamp is the created_at parsing the repositories used before migration 007
+func legacyParseTimestamp(value string) (time.Time, error) {
+	t, err := time.Parse("2006-01-02 15:04:05", value)
+	if err != nil {
+		t, err = time.Parse(time.RFC3339, value)
+	}
+	return t, err
+}
@@ -0,0 +1,88 @@
+package main
+
+import (
+	"fmt"
+	"regexp"
+	"strconv"
+	"strings"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// runExplain prints the query plan of every hot read statement and fails if any
+// of them scans a whole table or sorts through a temporary B-tree
+func runExplain(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	failed := 0
+	for _, query := range repository.ReadStatements() {
+		plan, err := explain(database, query)
+		if err != nil {
+			return err
+		}
+
+		status := "ok"
+		for _, detail := range plan {
+			if strings.HasPrefix(detail, "SCAN ") || strings.Contains(detail, "TEMP B-TREE") {
+				status = "FAIL"
+			}
+		}
+		if status != "ok" {
+			failed++
+		}
+
+		fmt.Printf("\n[%s] %s\n", status, query)
+		for _, detail := range plan {
+			fmt.Printf("  %s\n", detail)
+		}
+	}
+
+	if failed > 0 {
+		return fmt.Errorf("%d statements do not use an index for both filtering and ordering", failed)
+	}
+	return nil
+}
+
+// parameterPattern matches a ? or ?NNN statement parameter
+var parameterPattern = regexp.MustCompile(`\?(\d*)`)
+
+// parameterCount returns the number of parameters query takes: a bare ? takes
+// the next number after the largest so far, as in SQLite
+func parameterCount(query string) int {
+	count := 0
+	for _, match := range parameterPattern.FindAllStringSubmatch(query, -1) {
+		if match[1] == "" {
+			count++
+		} else if n, _ := strconv.Atoi(match[1]); n > count {
+			count = n
+		}
+	}
+	return count
+}
+
+// explain returns the detail column of EXPLAIN QUERY PLAN for query, with every
+// parameter bound to NULL
+func explain(database *config.Database, query string) ([]string, error) {
+	args := make([]interface{}, parameterCount(query))
+	rows, err := database.ReadDB.Query("EXPLAIN QUERY PLAN "+query, args...)
+	if err != nil {
+		return nil, fmt.Errorf("failed to explain %q: %w", query, err)
+	}
+	defer rows.Close()
+
+	var plan []string
+	for rows.Next() {
+		var id, parent, notUsed int
+		var detail string
+		if err := rows.Scan(&id, &parent, &notUsed, &detail); err != nil {
+			return nil, fmt.Errorf("failed to scan query plan: %w", err)
+		}
+		plan = append(plan, detail)
+	}
+	return plan, rows.Err()
+}
@@ -0,0 +1,81 @@
+package main
+
+import (
+	"context"
+	"encoding/json"
+	"fmt"
+	"testing"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// noteBytes is the size of the notes written to every log by the fields scenario
+const noteBytes = 2048
+
+// countingWriter discards what is written to it and counts the bytes
+type countingWriter struct {
+	n int64
+}
+
+// Write counts p
+func (c *countingWriter) Write(p []byte) (int, error) {
+	c.n += int64(len(p))
+	return len(p), nil
+}
+
+// runFields compares payload size and latency of a page of notes-heavy logs with
+// every field against a sparse fieldset of id and created_at
+func runFields(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	habitID, err := seedLogs(database, opts.Rows)
+	if err != nil {
+		return err
+	}
+	if _, err := database.Exec("UPDATE logs SET notes = replace(hex(zeroblob(?)), '0', 'x')", noteBytes/2); err != nil {
+		return fmt.Errorf("failed to write notes: %w", err)
+	}
+	logRepo := repository.NewLogRepository(database)
+	page := &models.PageRequest{Limit: models.MaxPageLimit}
+
+	var benchErr error
+	fmt.Printf("%d logs with %d-byte notes, %d per page\n\n", opts.Rows, noteBytes, page.Limit)
+	fmt.Printf("%-24s %14s %14s %12s\n", "fields", "bytes/page", "ns/op", "allocs/op")
+	for _, fields := range []models.FieldSet{nil, {"id", "created_at"}} {
+		var bytes int64
+		result := testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				out := &countingWriter{}
+				enc := json.NewEncoder(out)
+				err := logRepo.StreamByHabitID(context.Background(), habitID, nil, fields, page, func(*models.Page) error { return nil }, func(log *models.Log) error {
+					if fields != nil {
+						return enc.Encode(models.NewPartialLog(log, fields))
+					}
+					return enc.Encode(log)
+				})
+				if err != nil {
+					benchErr = err
+					b.FailNow()
+				}
+				bytes = out.n
+			}
+		})
+		if benchErr != nil {
+			return benchErr
+		}
+
+		name := "all"
+		if fields != nil {
+			name = fmt.Sprint([]string(fields))
+		}
+		fmt.Printf("%-24s %14d %14d %12d\n", name, bytes, result.NsPerOp(), result.AllocsPerOp())
+	}
+	return nil
+}
@@ -0,0 +1,224 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"math/rand"
+	"testing"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/service"
+)
+
+// Shape of the habit cache scenario
+const (
+	habitCacheHabitsPerUser = 8
+	habitCacheBudget        = 64 << 20
+)
+
+// runHabitCache seeds users with a handful of habits each and compares reading a
+// habit's logs and listing habits through the habit cache against the database:
+// statements per operation and ns/op. It checks that cached pages match the
+// keyset queries, then runs with a budget too small for every user to show evictions.
+func runHabitCache(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	habitIDs, err := seedHabitCacheUsers(database, opts.Rows)
+	if err != nil {
+		return err
+	}
+
+	counter := &countingDB{DB: database}
+	userRepo := repository.NewUserRepository(database)
+	logRepo := repository.NewLogRepository(counter)
+	plain := repository.NewHabitRepository(counter)
+	cache := repository.NewHabitCache(habitCacheBudget)
+	cached := repository.NewCachedHabitRepository(plain, cache)
+
+	// Cached pages must match the keyset queries in both directions
+	for userID := int64(1); userID <= 50 && userID <= int64(opts.Rows); userID++ {
+		if err := comparePages(plain, cached, userID); err != nil {
+			return err
+		}
+	}
+
+	var benchErr error
+	fail := func(b *testing.B, err error) {
+		benchErr = err
+		b.FailNow()
+	}
+	type result struct {
+		name    string
+		result  testing.BenchmarkResult
+		queries float64
+	}
+	var results []result
+	for _, repo := range []struct {
+		name  string
+		habit repository.HabitRepository
+	}{{"database", plain}, {"habit cache", cached}} {
+		logService := service.NewLogService(logRepo, repo.habit, repository.NewUserZoneCache(userRepo, 1000))
+		habitService := service.NewHabitService(repo.habit)
+		page := &models.PageRequest{Limit: 1}
+
+		for _, op := range []struct {
+			name string
+			run  func(userID int64) error
+		}{
+			{"GetHabitLogs", func(userID int64) error {
+				_, _, err := logService.GetHabitLogs(habitIDs[userID][0], userID, &models.TimeRange{}, page)
+				return err
+			}},
+			{"GET /habits", func(userID int64) error {
+				return habitService.StreamUserHabits(context.Background(), userID, nil, &models.PageRequest{},
+					func(*models.Page) error { return nil }, func(*models.Habit) error { return nil })
+			}},
+		} {
+			// Warm the cache, so the timed loop measures the steady state
+			for userID := range habitIDs {
+				if err := op.run(userID); err != nil {
+					return err
+				}
+			}
+
+			var queries float64
+			bench := testing.Benchmark(func(b *testing.B) {
+				b.ReportAllocs()
+				counter.reset()
+				for i := 0; i < b.N; i++ {
+					if err := op.run(int64(i%opts.Rows) + 1); err != nil {
+						fail(b, err)
+					}
+				}
+				queries = float64(counter.reset()) / float64(b.N)
+			})
+			if benchErr != nil {
+				return benchErr
+			}
+			results = append(results, result{op.name + " (" + repo.name + ")", bench, queries})
+		}
+	}
+	stats := cache.Stats()
+
+	// A budget for a tenth of the users, read with a skew towards recent users
+	small := repository.NewHabitCache(stats.Bytes / 10)
+	smallRepo := repository.NewCachedHabitRepository(plain, small)
+	random := rand.New(rand.NewSource(1))
+	for i := 0; i < 10*opts.Rows; i++ {
+		userID := int64(random.ExpFloat64()*float64(opts.Rows)/20)%int64(opts.Rows) + 1
+		if _, err := smallRepo.GetByIDForUser(habitIDs[userID][0], userID); err != nil {
+			return err
+		}
+	}
+	smallStats := small.Stats()
+
+	fmt.Printf("%d users, %d habits each\n\n", opts.Rows, habitCacheHabitsPerUser)
+	fmt.Printf("%-32s %14s %12s %10s\n", "operation", "ns/op", "allocs/op", "queries")
+	for _, r := range results {
+		fmt.Printf("%-32s %14d %12d %10.2f\n", r.name, r.result.NsPerOp(), r.result.AllocsPerOp(), r.queries)
+	}
+	fmt.Printf("\nfull budget: %d users in %.1f MiB, %d hits, %d misses, %d evictions\n",
+		stats.Users, float64(stats.Bytes)/(1<<20), stats.Hits, stats.Misses, stats.Evictions)
+	fmt.Printf("tenth of the budget, skewed reads: %d users cached, %.1f%% hits, %d evictions\n",
+		smallStats.Users, 100*float64(smallStats.Hits)/float64(smallStats.Hits+smallStats.Misses), smallStats.Evictions)
+	return nil
+}
+
+// seedHabitCacheUsers bulk-inserts users with habits created a few minutes
+// apart and returns each user's habit IDs
+func seedHabitCacheUsers(database *config.Database, rows int) (map[int64][]int64, error) {
+	_, err := database.DB.Exec(`
+		WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < ?)
+		INSERT INTO users (name, time_zone, phone_number, password_hash)
+		SELECT 'User ' || x, 'UTC', printf('+1555%07d', x), 'not-a-real-hash' FROM seq`, rows)
+	if err != nil {
+		return nil, fmt.Errorf("failed to seed users: %w", err)
+	}
+	_, err = database.DB.Exec(`
+		WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+		INSERT INTO habits (user_id, name, description, created_at)
+		SELECT users.id, 'Habit ' || n, 'A seeded habit', datetime('now', '-' || ((users.id * 7 + n * 3) % 20) || ' minutes')
+		FROM users CROSS JOIN seq`, habitCacheHabitsPerUser)
+	if err != nil {
+		return nil, fmt.Errorf("failed to seed habits: %w", err)
+	}
+
+	rowsRead, err := database.DB.Query("SELECT id, user_id FROM habits")
+	if err != nil {
+		return nil, fmt.Errorf("failed to read habits: %w", err)
+	}
+	defer rowsRead.Close()
+	habitIDs := make(map[int64][]int64, rows)
+	for rowsRead.Next() {
+		var id, userID int64
+		if err := rowsRead.Scan(&id, &userID); err != nil {
+			return nil, err
+		}
+		habitIDs[userID] = append(habitIDs[userID], id)
+	}
+	return habitIDs, rowsRead.Err()
+}
+
+// comparePages walks a user's habits three at a time forwards, then backwards
+// from the last page, through both repositories and fails on any difference
+func comparePages(plain, cached repository.HabitRepository, userID int64) error {
+	for _, backwards := range []bool{false, true} {
+		page := &models.PageRequest{Limit: 3}
+		if backwards {
+			// Start before the oldest habit and walk back towards the newest
+			all, err := plain.ListByUserID(userID)
+			if err != nil {
+				return err
+			}
+			oldest := all[len(all)-1]
+			page.Before = &models.Cursor{CreatedAt: oldest.CreatedAt, ID: oldest.ID}
+		}
+		for {
+			want, wantPage, err := plain.GetByUserID(userID, page)
+			if err != nil {
+				return err
+			}
+			got, gotPage, err := cached.GetByUserID(userID, page)
+			if err != nil {
+				return err
+			}
+			if fmt.Sprint(habitValues(want), *wantPage) != fmt.Sprint(habitValues(got), *gotPage) {
+				return fmt.Errorf("user %d: cached page differs from the keyset query", userID)
+			}
+
+			next := wantPage.NextCursor
+			if backwards {
+				next = wantPage.PrevCursor
+			}
+			if next == "" {
+				break
+			}
+			cursor, err := models.DecodeCursor(next)
+			if err != nil {
+				return err
+			}
+			page = &models.PageRequest{Limit: 3}
+			if backwards {
+				page.Before = cursor
+			} else {
+				page.After = cursor
+			}
+		}
+	}
+	return nil
+}
+
+// habitValues dereferences habits for comparison
+func habitValues(habits []*models.Habit) []models.Habit {
+	values := make([]models.Habit, len(habits))
+	for i, habit := range habits {
+		values[i] = *habit
+	}
+	return values
+}
@@ -0,0 +1,122 @@
+package main
+
+import (
+	"errors"
+	"fmt"
+	"runtime"
+	"sort"
+	"sync"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// Shape of the hashing scenario
+const (
+	hashingBurst     = 100
+	hashingBudget    = 512 << 20
+	hashingQueue     = 32
+	hashingMaxWait   = 2 * time.Second
+	hashingUnbounded = 16
+)
+
+// hashingResult is the outcome of one burst of password verifications
+type hashingResult struct {
+	admitted, rejected, timedOut int
+	latencies                    []time.Duration
+	peakHeap                     uint64
+}
+
+// runHashing sends a burst of concurrent logins' password verifications through
+// the hashing admission limit and reports what was admitted, turned away, and
+// the peak heap. For contrast it runs a smaller burst without a limit; the heap
+// grows with every concurrent hash.
+func runHashing(opts Options) error {
+	hash, err := utils.NewPasswordHasher(nil).Hash("correct horse battery staple")
+	if err != nil {
+		return err
+	}
+
+	admission := utils.NewHashAdmission(hashingBudget, utils.PasswordHashMemory, hashingQueue, hashingMaxWait)
+	limited, err := verifyBurst(utils.NewPasswordHasher(admission), hash, hashingBurst)
+	if err != nil {
+		return err
+	}
+	stats := admission.Stats()
+	unbounded, err := verifyBurst(utils.NewPasswordHasher(nil), hash, hashingUnbounded)
+	if err != nil {
+		return err
+	}
+
+	fmt.Printf("%-28s %8s %8s %8s %8s %10s %10s %12s\n", "burst", "logins", "ok", "429", "503", "p50", "p99", "peak heap")
+	for _, r := range []struct {
+		name   string
+		logins int
+		result *hashingResult
+	}{
+		{fmt.Sprintf("admission (%d at once)", stats.Concurrency), hashingBurst, limited},
+		{"no limit", hashingUnbounded, unbounded},
+	} {
+		fmt.Printf("%-28s %8d %8d %8d %8d %10s %10s %9.0f MiB\n", r.name, r.logins, r.result.admitted, r.result.rejected, r.result.timedOut,
+			percentile(r.result.latencies, 50).Round(time.Millisecond), percentile(r.result.latencies, 99).Round(time.Millisecond),
+			float64(r.result.peakHeap)/(1<<20))
+	}
+	fmt.Printf("\nqueue peaked at %d of %d, %d waited %.0f ms on average (max %.0f ms)\n",
+		stats.PeakQueued, stats.MaxQueue, stats.Waited, stats.AvgWaitMs, stats.MaxWaitMs)
+	fmt.Printf("%d logins without a limit would need about %d MiB for hashing alone\n",
+		hashingBurst, hashingBurst*utils.PasswordHashMemory>>20)
+	return nil
+}
+
+// verifyBurst verifies the password from n goroutines at once while sampling the heap
+func verifyBurst(hasher *utils.PasswordHasher, hash string, n int) (*hashingResult, error) {
+	runtime.GC()
+	result := &hashingResult{}
+	done := make(chan struct{})
+	sampled := make(chan struct{})
+	go func() {
+		defer close(sampled)
+		var stats runtime.MemStats
+		for {
+			runtime.ReadMemStats(&stats)
+			if stats.HeapInuse > result.peakHeap {
+				result.peakHeap = stats.HeapInuse
+			}
+			select {
+			case <-done:
+				return
+			case <-time.After(10 * time.Millisecond):
+			}
+		}
+	}()
+
+	var mu sync.Mutex
+	var wg sync.WaitGroup
+	var verifyErr error
+	for i := 0; i < n; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			began := time.Now()
+			valid, err := hasher.Verify("correct horse battery staple", hash)
+			mu.Lock()
+			defer mu.Unlock()
+			switch {
+			case errors.Is(err, utils.ErrHashQueueFull):
+				result.rejected++
+			case errors.Is(err, utils.ErrHashWaitTimeout):
+				result.timedOut++
+			case err != nil || !valid:
+				verifyErr = fmt.Errorf("verification failed: %v", err)
+			default:
+				result.admitted++
+				result.latencies = append(result.latencies, time.Since(began))
+			}
+		}()
+	}
+	wg.Wait()
+	sort.Slice(result.latencies, func(i, j int) bool { return result.latencies[i] < result.latencies[j] })
+	close(done)
+	<-sampled
+	return result, verifyErr
+}
@@ -0,0 +1,138 @@
+package main
+
+import (
+	"fmt"
+	"math/rand"
+	"sort"
+	"sync"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// latencyRecorder collects request latencies from concurrent workers
+type latencyRecorder struct {
+	mu      sync.Mutex
+	samples []time.Duration
+	errors  int64
+}
+
+// record stores the latency of a request that started at start
+func (l *latencyRecorder) record(start time.Time, err error) {
+	latency := time.Since(start)
+	l.mu.Lock()
+	defer l.mu.Unlock()
+	if err != nil {
+		l.errors++
+		return
+	}
+	l.samples = append(l.samples, latency)
+}
+
+// report prints the request count and latency percentiles
+func (l *latencyRecorder) report(label string) {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+
+	sort.Slice(l.samples, func(i, j int) bool { return l.samples[i] < l.samples[j] })
+	fmt.Printf("  %-10s %8d ok, %5d errors, p50 %-10s p99 %-10s max %s\n",
+		label, len(l.samples), l.errors,
+		percentile(l.samples, 50), percentile(l.samples, 99), percentile(l.samples, 100))
+}
+
+// percentile returns the p-th percentile of sorted samples
+func percentile(sorted []time.Duration, p float64) time.Duration {
+	if len(sorted) == 0 {
+		return 0
+	}
+	idx := int(float64(len(sorted)-1) * p / 100)
+	return sorted[idx].Round(time.Microsecond)
+}
+
+// foregroundLoad runs log reads and writes against the repositories until stop is closed
+type foregroundLoad struct {
+	reads  latencyRecorder
+	writes latencyRecorder
+	wg     sync.WaitGroup
+}
+
+// startForegroundLoad starts opts.Readers readers fetching random logs by id and one
+// writer creating logs at a steady rate, as the API would
+func startForegroundLoad(database *config.Database, opts Options, habitID int64, maxLogID int64, stop <-chan struct{}) *foregroundLoad {
+	load := &foregroundLoad{}
+	logRepo := repository.NewLogRepository(database)
+
+	load.wg.Add(1)
+	go func() {
+		defer load.wg.Done()
+		ticker := time.NewTicker(2 * time.Millisecond)
+		defer ticker.Stop()
+		for {
+			select {
+			case <-stop:
+				return
+			case <-ticker.C:
+			}
+			start := time.Now()
+			_, err := logRepo.Create(habitID, &models.CreateLogRequest{Notes: "foreground write"})
+			load.writes.record(start, err)
+		}
+	}()
+
+	for i := 0; i < opts.Readers; i++ {
+		load.wg.Add(1)
+		go func(seed int64) {
+			defer load.wg.Done()
+			rng := rand.New(rand.NewSource(seed))
+			for {
+				select {
+				case <-stop:
+					return
+				default:
+				}
+				start := time.Now()
+				_, err := logRepo.GetByID(rng.Int63n(maxLogID) + 1)
+				load.reads.record(start, err)
+			}
+		}(int64(i))
+	}
+
+	return load
+}
+
+// wait blocks until every worker has stopped
+func (l *foregroundLoad) wait() {
+	l.wg.Wait()
+}
+
+// seedLogs creates a user and habit and bulk-inserts rows logs for it with one statement
+func seedLogs(database *config.Database, rows int) (int64, error) {
+	userRepo := repository.NewUserRepository(database)
+	habitRepo := repository.NewHabitRepository(database)
+
+	user, err := userRepo.Create(&models.CreateUserRequest{
+		Name:        "Bench User",
+		TimeZone:    "UTC",
+		PhoneNumber: "+15550000001",
+	}, "not-a-real-hash")
+	if err != nil {
+		return 0, err
+	}
+	habit, err := habitRepo.Create(user.ID, &models.CreateHabitRequest{Name: "Bench Habit"})
+	if err != nil {
+		return 0, err
+	}
+
+	_, err = database.DB.Exec(`
+		WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < ?)
+		INSERT INTO logs (habit_id, notes, created_at)
+		SELECT ?, 'seeded log ' || x, datetime('now', '-' || (x % 3650) || ' days') FROM seq`,
+		rows, habit.ID,
+	)
+	if err != nil {
+		return 0, fmt.Errorf("failed to seed logs: %w", err)
+	}
+	return habit.ID, nil
+}
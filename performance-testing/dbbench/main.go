@@ -0,0 +1,122 @@
+// Command dbbench runs in-process storage benchmarks against a temporary SQLite database.
+//
+// Run it from the project root:
+//
+//	go run ./performance-testing/dbbench -scenario=rw-mix -duration=10s
+package main
+
+import (
+	"context"
+	"flag"
+	"fmt"
+	"log"
+	"os"
+	"path/filepath"
+	"sort"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/migrations"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// Options holds the command line options shared by all scenarios
+type Options struct {
+	Duration time.Duration
+	Readers  int
+	Rows     int
+	Dir      string
+}
+
+// scenarios maps a scenario name to its runner
+var scenarios = map[string]func(opts Options) error{
+	"rw-mix":           runReadWriteMix,
+	"startup":          runStartup,
+	"online-migration": runOnlineMigration,
+	"write-path":       runWritePath,
+	"pagination":       runPagination,
+	"explain":          runExplain,
+	"stream":           runStream,
+	"decode":           runDecode,
+	"fields":           runFields,
+	"streak":           runStreak,
+	"calendar":         runCalendar,
+	"timezone":         runTimeZone,
+	"notify":           runNotify,
+	"outbox":           runOutbox,
+	"waves":            runWaves,
+	"habit-cache":      runHabitCache,
+	"auth":             runAuth,
+	"jwt":              runJWT,
+	"hashing":          runHashing,
+	"refresh":          runRefresh,
+	"revocation":       runRevocation,
+}
+
+func main() {
+	scenario := flag.String("scenario", "rw-mix", "Scenario to run")
+	duration := flag.Duration("duration", 10*time.Second, "Duration of each timed phase")
+	readers := flag.Int("readers", 8, "Number of concurrent readers")
+	rows := flag.Int("rows", 10000, "Number of rows to seed")
+	dir := flag.String("dir", "", "Directory for temporary databases (default: system temp dir)")
+	flag.Parse()
+
+	run, ok := scenarios[*scenario]
+	if !ok {
+		names := make([]string, 0, len(scenarios))
+		for name := range scenarios {
+			names = append(names, name)
+		}
+		sort.Strings(names)
+		log.Fatalf("Unknown scenario %q, available: %v", *scenario, names)
+	}
+
+	opts := Options{
+		Duration: *duration,
+		Readers:  *readers,
+		Rows:     *rows,
+		Dir:      *dir,
+	}
+
+	fmt.Println("========================================")
+	fmt.Printf("Storage Benchmark: %s\n", *scenario)
+	fmt.Println("========================================")
+
+	if err := run(opts); err != nil {
+		log.Fatalf("Scenario %s failed: %v", *scenario, err)
+	}
+}
+
+// openTempDatabase creates a fresh database in a temporary directory using the given mode
+func openTempDatabase(opts Options, mode string) (*config.Database, func(), error) {
+	dir, err := os.MkdirTemp(opts.Dir, "dbbench-*")
+	if err != nil {
+		return nil, nil, fmt.Errorf("failed to create temp dir: %w", err)
+	}
+
+	cfg := config.DefaultDatabaseConfig(filepath.Join(dir, "bench.db"))
+	cfg.Mode = mode
+	cfg.ReadStatements = repository.ReadStatements()
+	cfg.WriteStatements = repository.WriteStatements()
+	if opts.Readers > cfg.ReadConnections {
+		cfg.ReadConnections = opts.Readers
+	}
+
+	database, err := config.NewDatabaseWithConfig(cfg)
+	if err != nil {
+		os.RemoveAll(dir)
+		return nil, nil, err
+	}
+	// Finish the background migrations, which build the list indexes, while the database is empty
+	if err := config.NewBackgroundMigrator(database, migrations.Background, 1000, 0).Run(context.Background()); err != nil {
+		database.Close()
+		os.RemoveAll(dir)
+		return nil, nil, err
+	}
+
+	cleanup := func() {
+		database.Close()
+		os.RemoveAll(dir)
+	}
+	return database, cleanup, nil
+}
@@ -0,0 +1,194 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"runtime"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/service"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// notifyNaiveUsers is how many users the repository loop is run over; its time is
+// extrapolated to every user
+const notifyNaiveUsers = 2000
+
+// countingSender counts reminders, keeps the reasons of the users the repository
+// loop also checks, and samples the heap every tenth of the expected reminders
+type countingSender struct {
+	sent     int64
+	expected int64
+
+	mu      sync.Mutex
+	reasons map[int64]string
+	heap    []uint64
+}
+
+// Send counts the reminder
+func (s *countingSender) Send(ctx context.Context, reminder *models.Reminder) (string, error) {
+	n := atomic.AddInt64(&s.sent, 1)
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if reminder.UserID <= notifyNaiveUsers {
+		s.reasons[reminder.UserID] = reminder.Reason
+	}
+	if step := s.expected / 10; step > 0 && n%step == 0 {
+		var stats runtime.MemStats
+		runtime.ReadMemStats(&stats)
+		s.heap = append(s.heap, stats.HeapInuse)
+	}
+	return "", nil
+}
+
+// runNotify seeds rows users across several time zones, each with a habit logged
+// on neither, one or both of their last two complete days, and runs the reminder job
+// over all of them in one pass: queueing with one statement per time zone, then
+// draining the outbox. The heap is sampled as reminders are sent to show memory
+// stays flat. A loop over users, habits and logs through the repositories
+// checks the candidates and gives the baseline.
+func runNotify(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	start := time.Now()
+	if err := seedReminderUsers(database, opts.Rows, append([]string{"UTC"}, benchTimeZones...)); err != nil {
+		return err
+	}
+	fmt.Printf("seeded %d users in %s\n", opts.Rows, time.Since(start))
+
+	// Users logged on neither day (id % 4 == 0), day one (1), day two (2) or both (3)
+	sender := &countingSender{expected: int64((opts.Rows + 3) / 4 * 2), reasons: make(map[int64]string)}
+	reminderService := service.NewReminderService(repository.NewReminderRepository(database), sender)
+	runtime.GC()
+	start = time.Now()
+	enqueued, err := reminderService.EnqueueMissedLogReminders(context.Background())
+	if err != nil {
+		return err
+	}
+	enqueue := time.Since(start)
+	run, err := reminderService.DeliverReminders(context.Background(), 4)
+	if err != nil {
+		return err
+	}
+	elapsed := time.Since(start)
+
+	// The repository loop over the first users must find the same reminders
+	userRepo := repository.NewUserRepository(database)
+	habitRepo := repository.NewHabitRepository(database)
+	logRepo := repository.NewLogRepository(database)
+	naiveUsers := opts.Rows
+	if naiveUsers > notifyNaiveUsers {
+		naiveUsers = notifyNaiveUsers
+	}
+	start = time.Now()
+	for id := int64(1); id <= int64(naiveUsers); id++ {
+		reason, err := naiveReminder(userRepo, habitRepo, logRepo, id)
+		if err != nil {
+			return err
+		}
+		if reason != sender.reasons[id] {
+			return fmt.Errorf("user %d: query gives reminder %q, repository loop %q", id, sender.reasons[id], reason)
+		}
+	}
+	naive := time.Since(start) / time.Duration(naiveUsers) * time.Duration(opts.Rows)
+
+	heap := make([]string, len(sender.heap))
+	for i, inUse := range sender.heap {
+		heap[i] = fmt.Sprintf("%.1f", float64(inUse)/(1<<20))
+	}
+	fmt.Printf("%d queued in %s, %d sent, %d failed\n", enqueued, enqueue.Round(time.Millisecond), run.Sent, run.Failed)
+	fmt.Printf("heap in use (MiB) at each tenth of the run: %s\n\n", strings.Join(heap, " "))
+	fmt.Printf("%-28s %14s %14s\n", "reminders from", "total", "users/s")
+	fmt.Printf("%-28s %14s %14.0f\n", "set-based outbox", elapsed.Round(time.Millisecond), float64(opts.Rows)/elapsed.Seconds())
+	fmt.Printf("%-28s %14s %14.0f\n", "repository loop (estimate)", naive.Round(time.Millisecond), float64(opts.Rows)/naive.Seconds())
+	return nil
+}
+
+// seedReminderUsers bulk-inserts users spread over the time zones, one habit
+// each, and logs at the start of the two local days before today by id % 4
+func seedReminderUsers(database *config.Database, rows int, timeZones []string) error {
+	values := make([]string, len(timeZones))
+	args := []interface{}{rows}
+	for i, timeZone := range timeZones {
+		values[i] = "(?, ?)"
+		args = append(args, i, timeZone)
+	}
+	_, err := database.DB.Exec(`
+		WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < ?),
+		zones(i, name) AS (VALUES `+strings.Join(values, ", ")+`)
+		INSERT INTO users (name, time_zone, phone_number, password_hash)
+		SELECT 'User ' || x, zones.name, printf('+1555%07d', x), 'not-a-real-hash'
+		FROM seq JOIN zones ON zones.i = x % `+fmt.Sprint(len(timeZones)), args...)
+	if err != nil {
+		return fmt.Errorf("failed to seed users: %w", err)
+	}
+	if _, err := database.DB.Exec("INSERT INTO habits (user_id, name) SELECT id, 'Habit' FROM users"); err != nil {
+		return fmt.Errorf("failed to seed habits: %w", err)
+	}
+
+	now := time.Now()
+	for _, timeZone := range timeZones {
+		today := utils.TimeZones.LocalDay(now, timeZone)
+		for _, seed := range []struct {
+			day int64
+			ids string
+		}{{today - 2, "1, 3"}, {today - 1, "2, 3"}} {
+			dayStart, _ := utils.TimeZones.DayBounds(seed.day, timeZone)
+			_, err := database.DB.Exec(`
+				INSERT INTO logs (habit_id, notes, created_at)
+				SELECT habits.id, 'seeded log', ? FROM users JOIN habits ON habits.user_id = users.id
+				WHERE users.time_zone = ? AND users.id % 4 IN (`+seed.ids+`)`,
+				dayStart.Add(time.Minute).UTC().Format("2006-01-02 15:04:05"), timeZone)
+			if err != nil {
+				return fmt.Errorf("failed to seed logs: %w", err)
+			}
+		}
+	}
+	return nil
+}
+
+// naiveReminder decides whether to remind one user by reading the user, every
+// habit and each habit's logs of day one and day two through the repositories
+func naiveReminder(userRepo repository.UserRepository, habitRepo repository.HabitRepository, logRepo repository.LogRepository, userID int64) (string, error) {
+	user, err := userRepo.GetByID(userID)
+	if err != nil {
+		return "", err
+	}
+	habits, _, err := habitRepo.GetByUserID(userID, &models.PageRequest{})
+	if err != nil || len(habits) == 0 {
+		return "", err
+	}
+
+	dayTwo := utils.TimeZones.LocalDay(time.Now(), user.TimeZone) - 1
+	dayOneStart, _ := utils.TimeZones.DayBounds(dayTwo-1, user.TimeZone)
+	dayTwoStart, dayTwoEnd := utils.TimeZones.DayBounds(dayTwo, user.TimeZone)
+	loggedDayOne := false
+	for _, habit := range habits {
+		logs, _, err := logRepo.GetByHabitID(habit.ID, &models.TimeRange{From: &dayTwoStart, To: &dayTwoEnd}, &models.PageRequest{Limit: 1})
+		if err != nil {
+			return "", err
+		}
+		if len(logs) > 0 {
+			return "", nil
+		}
+		logs, _, err = logRepo.GetByHabitID(habit.ID, &models.TimeRange{From: &dayOneStart, To: &dayTwoStart}, &models.PageRequest{Limit: 1})
+		if err != nil {
+			return "", err
+		}
+		loggedDayOne = loggedDayOne || len(logs) > 0
+	}
+	if loggedDayOne {
+		return models.ReminderMissedYesterday, nil
+	}
+	return models.ReminderNoLogs, nil
+}
@@ -0,0 +1,88 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/migrations"
+)
+
+// runOnlineMigration seeds opts.Rows logs and compares foreground request latency with
+// no migration, with a batched background backfill, and with an inline full-table UPDATE
+func runOnlineMigration(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	fmt.Printf("Seeding %d logs...\n", opts.Rows)
+	start := time.Now()
+	habitID, err := seedLogs(database, opts.Rows)
+	if err != nil {
+		return err
+	}
+	fmt.Printf("Seeded in %s\n", time.Since(start).Round(time.Millisecond))
+
+	if _, err := database.DB.Exec("ALTER TABLE logs ADD COLUMN bench_background INTEGER"); err != nil {
+		return err
+	}
+	if _, err := database.DB.Exec("ALTER TABLE logs ADD COLUMN bench_inline INTEGER"); err != nil {
+		return err
+	}
+
+	// Baseline: foreground load only
+	fmt.Printf("\nNo migration (%s):\n", opts.Duration)
+	stop := make(chan struct{})
+	load := startForegroundLoad(database, opts, habitID, int64(opts.Rows), stop)
+	time.Sleep(opts.Duration)
+	close(stop)
+	load.wait()
+	load.reads.report("reads")
+	load.writes.report("writes")
+
+	// Batched background backfill under the same load
+	backfill := migrations.Backfill{
+		Name:   "bench_background",
+		Table:  "logs",
+		Update: "UPDATE logs SET bench_background = length(notes) WHERE id > ? AND id <= ?",
+	}
+	migrator := config.NewBackgroundMigrator(database, []migrations.Backfill{backfill}, 1000, 5*time.Millisecond)
+
+	stop = make(chan struct{})
+	load = startForegroundLoad(database, opts, habitID, int64(opts.Rows), stop)
+	start = time.Now()
+	ctx, cancel := context.WithTimeout(context.Background(), opts.Duration)
+	err = migrator.Run(ctx)
+	cancel()
+	elapsed := time.Since(start)
+	close(stop)
+	load.wait()
+	if err != nil {
+		return err
+	}
+	progress := migrator.Progress()[0]
+	fmt.Printf("\nBatched background backfill (%s, %.1f%% done, %d rows, ETA %s):\n",
+		elapsed.Round(time.Millisecond), progress.Percent, progress.RowsDone, progress.ETAString)
+	load.reads.report("reads")
+	load.writes.report("writes")
+
+	// Inline backfill holding the writer for the whole table
+	stop = make(chan struct{})
+	load = startForegroundLoad(database, opts, habitID, int64(opts.Rows), stop)
+	start = time.Now()
+	_, err = database.DB.Exec("UPDATE logs SET bench_inline = length(notes)")
+	elapsed = time.Since(start)
+	close(stop)
+	load.wait()
+	if err != nil {
+		return err
+	}
+	fmt.Printf("\nInline full-table UPDATE (%s):\n", elapsed.Round(time.Millisecond))
+	load.reads.report("reads")
+	load.writes.report("writes")
+
+	return nil
+}
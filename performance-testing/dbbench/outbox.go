@@ -0,0 +1,124 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"net/http/httptest"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/performance-testing/twiliostandin"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/service"
+)
+
+// Stand-in behavior for the outbox scenario
+const (
+	outboxLatency     = 20 * time.Millisecond
+	outboxFailureRate = 0.05
+	outboxOutage      = 3 * time.Second
+	// outboxRejectPrefix makes the numbers of the first 99 users invalid
+	outboxRejectPrefix = "+155500000"
+)
+
+// runOutbox drains the reminder outbox through the Twilio sender into the local
+// stand-in. The first pass has a steady rate of random server errors, which are
+// retried with backoff; the second starts in a full outage, which opens the
+// circuit breaker until the stand-in recovers. Every reminder must end up sent
+// once, or failed for an invalid number.
+func runOutbox(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	if err := seedReminderUsers(database, opts.Rows, append([]string{"UTC"}, benchTimeZones...)); err != nil {
+		return err
+	}
+
+	standin := twiliostandin.NewServer(twiliostandin.Options{
+		Latency:      outboxLatency,
+		FailureRate:  outboxFailureRate,
+		RejectPrefix: outboxRejectPrefix,
+	})
+	server := httptest.NewServer(standin)
+	defer server.Close()
+
+	workers := opts.Readers * 4
+	cfg := config.DefaultTwilioConfig()
+	cfg.BaseURL = server.URL
+	cfg.AccountSID = "ACbench"
+	cfg.AuthToken = "bench-token"
+	cfg.FromNumber = "+15550009999"
+	cfg.RatePerSecond = 2000
+	cfg.Burst = workers
+	cfg.MaxConnections = workers
+	cfg.BreakerCooldown = time.Second
+	reminderService := service.NewReminderService(repository.NewReminderRepository(database), service.NewTwilioSender(cfg))
+
+	fmt.Printf("%d users, %d workers, stand-in latency %s\n\n", opts.Rows, workers, outboxLatency)
+	fmt.Printf("%-22s %8s %8s %8s %8s %8s %10s %12s %10s\n", "pass", "queued", "sent", "retried", "deferred", "failed", "requests", "duplicates", "msgs/s")
+
+	for _, pass := range []struct {
+		name   string
+		outage bool
+	}{
+		{fmt.Sprintf("%.0f%% server errors", outboxFailureRate*100), false},
+		{fmt.Sprintf("%s outage", outboxOutage), true},
+	} {
+		if _, err := database.Exec("DELETE FROM notification_outbox"); err != nil {
+			return fmt.Errorf("failed to clear outbox: %w", err)
+		}
+		before := standin.Stats()
+		if pass.outage {
+			standin.SetFailureRate(1)
+			time.AfterFunc(outboxOutage, func() { standin.SetFailureRate(outboxFailureRate) })
+		}
+
+		start := time.Now()
+		enqueued, err := reminderService.EnqueueMissedLogReminders(context.Background())
+		if err != nil {
+			return err
+		}
+		run, err := reminderService.DeliverReminders(context.Background(), workers)
+		if err != nil {
+			return err
+		}
+		elapsed := time.Since(start)
+
+		// Queueing again the same day must add nothing
+		again, err := reminderService.EnqueueMissedLogReminders(context.Background())
+		if err != nil {
+			return err
+		}
+		if again != 0 {
+			return fmt.Errorf("re-running the job queued %d reminders again", again)
+		}
+		if err := checkOutbox(database, run); err != nil {
+			return err
+		}
+
+		after := standin.Stats()
+		fmt.Printf("%-22s %8d %8d %8d %8d %8d %10d %12d %10.0f\n", pass.name, enqueued, run.Sent, run.Retried, run.Deferred,
+			run.Failed, after.Requests-before.Requests, after.Duplicates-before.Duplicates, float64(run.Sent)/elapsed.Seconds())
+	}
+	return nil
+}
+
+// checkOutbox verifies that every reminder was delivered or failed, and that the
+// outbox agrees with the run
+func checkOutbox(database *config.Database, run *models.ReminderRun) error {
+	var pending, sent, failed int64
+	err := database.QueryRow(`SELECT
+		COUNT(*) FILTER (WHERE status = ?), COUNT(*) FILTER (WHERE status = ?), COUNT(*) FILTER (WHERE status = ?)
+		FROM notification_outbox`, models.ReminderPending, models.ReminderSent, models.ReminderFailed).Scan(&pending, &sent, &failed)
+	if err != nil {
+		return fmt.Errorf("failed to count outbox: %w", err)
+	}
+	if pending != 0 || sent != run.Sent || failed != run.Failed {
+		return fmt.Errorf("outbox has %d pending, %d sent, %d failed; run sent %d and failed %d", pending, sent, failed, run.Sent, run.Failed)
+	}
+	return nil
+}
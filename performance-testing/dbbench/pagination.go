@@ -0,0 +1,120 @@
+package main
+
+import (
+	"fmt"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// Statements used to emulate offset pagination and to find a cursor at a given depth
+const (
+	offsetLogsPageQuery = "SELECT id, habit_id, notes, duration_seconds, created_at FROM logs WHERE habit_id = ? ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+	cursorAtOffsetQuery = "SELECT CAST(strftime('%s', created_at) AS INTEGER), id FROM logs WHERE habit_id = ? ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?"
+)
+
+// pageLimit is the page size used by the pagination scenario
+const pageLimit = 100
+
+// maxDeepPageSlowdown is how many times slower than the first page any keyset
+// page may be before the scenario fails; a cursor that stops bounding the index
+// scan makes the deepest pages orders of magnitude slower
+const maxDeepPageSlowdown = 10
+
+// runPagination compares the latency of reading one page of logs at increasing
+// depths with keyset cursors, in both directions and within a time range, and
+// with LIMIT/OFFSET. It fails if a keyset page gets much slower with depth.
+func runPagination(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	habitID, err := seedLogs(database, opts.Rows)
+	if err != nil {
+		return err
+	}
+	logRepo := repository.NewLogRepository(database)
+
+	var benchErr error
+	fail := func(b *testing.B, err error) {
+		benchErr = err
+		b.FailNow()
+	}
+
+	// A range covering every log, so the range predicates are present but select everything
+	from, to := time.Unix(0, 0), time.Now().Add(24*time.Hour)
+	everything := &models.TimeRange{From: &from, To: &to}
+	keysetPage := func(timeRange *models.TimeRange, page *models.PageRequest) testing.BenchmarkResult {
+		return testing.Benchmark(func(b *testing.B) {
+			for i := 0; i < b.N; i++ {
+				if _, _, err := logRepo.GetByHabitID(habitID, timeRange, page); err != nil {
+					fail(b, err)
+				}
+			}
+		})
+	}
+
+	fmt.Printf("%d logs, %d per page\n\n", opts.Rows, pageLimit)
+	fmt.Printf("%-8s %-8s %14s %14s %14s %14s\n", "depth", "offset", "keyset", "keyset, range", "before, range", "limit/offset")
+	var firstPage int64
+	slowest := ""
+	for _, percent := range []int{0, 10, 50, 90, 99} {
+		offset := opts.Rows * percent / 100
+
+		page := &models.PageRequest{Limit: pageLimit}
+		before := &models.PageRequest{Limit: pageLimit}
+		if offset > 0 {
+			var seconds, id int64
+			if err := database.QueryRow(cursorAtOffsetQuery, habitID, offset-1).Scan(&seconds, &id); err != nil {
+				return fmt.Errorf("failed to find cursor at offset %d: %w", offset, err)
+			}
+			page.After = &models.Cursor{CreatedAt: time.Unix(seconds, 0).UTC(), ID: id}
+			before.Before = page.After
+		}
+
+		keyset := keysetPage(nil, page)
+		ranged := keysetPage(everything, page)
+		backwards := keysetPage(everything, before)
+		limitOffset := testing.Benchmark(func(b *testing.B) {
+			for i := 0; i < b.N; i++ {
+				rows, err := database.Query(offsetLogsPageQuery, habitID, pageLimit, offset)
+				if err != nil {
+					fail(b, err)
+				}
+				for rows.Next() {
+				}
+				rows.Close()
+			}
+		})
+		if benchErr != nil {
+			return benchErr
+		}
+
+		fmt.Printf("%-8s %-8d %14s %14s %14s %14s\n", fmt.Sprintf("%d%%", percent), offset,
+			time.Duration(keyset.NsPerOp()), time.Duration(ranged.NsPerOp()), time.Duration(backwards.NsPerOp()),
+			time.Duration(limitOffset.NsPerOp()))
+
+		if offset == 0 {
+			firstPage = keyset.NsPerOp()
+			continue
+		}
+		for _, r := range []struct {
+			name   string
+			result testing.BenchmarkResult
+		}{{"keyset", keyset}, {"keyset, range", ranged}, {"before, range", backwards}} {
+			if r.result.NsPerOp() > maxDeepPageSlowdown*firstPage && slowest == "" {
+				slowest = fmt.Sprintf("%s page at offset %d takes %s, the first page %s",
+					r.name, offset, time.Duration(r.result.NsPerOp()), time.Duration(firstPage))
+			}
+		}
+	}
+	if slowest != "" {
+		return fmt.Errorf("keyset pages slow down with depth: %s", slowest)
+	}
+	return nil
+}
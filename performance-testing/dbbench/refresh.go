@@ -0,0 +1,133 @@
+package main
+
+import (
+	"fmt"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/service"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// refreshPassword is the password of every seeded user in the refresh scenario
+const refreshPassword = "correct horse battery staple"
+
+// runRefresh compares getting a new token by logging in again, which verifies
+// the password with Argon2id, against exchanging a refresh token: ns/op and
+// statements per operation. It checks that a used or unknown refresh token is refused.
+func runRefresh(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	hash, err := utils.NewPasswordHasher(nil).Hash(refreshPassword)
+	if err != nil {
+		return err
+	}
+	_, err = database.DB.Exec(`
+		WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < ?)
+		INSERT INTO users (name, time_zone, phone_number, password_hash)
+		SELECT 'User ' || x, 'UTC', printf('+1555%07d', x), ? FROM seq`, opts.Rows, hash)
+	if err != nil {
+		return fmt.Errorf("failed to seed users: %w", err)
+	}
+
+	revocations, err := repository.LoadTokenRevocations(database)
+	if err != nil {
+		return err
+	}
+	counter := &countingDB{DB: database}
+	jwtManager := utils.NewJWTManager("bench-secret")
+	sessions := service.NewSessionService(repository.NewRefreshTokenRepository(counter), revocations, jwtManager, 15*time.Minute, 30*24*time.Hour)
+	userService := service.NewUserService(repository.NewUserRepository(counter), nil, nil, nil, sessions)
+
+	// Each user has a session; the refresh loop walks them, keeping each one's latest token
+	refreshTokens := make([]string, opts.Rows)
+	for i := range refreshTokens {
+		tokens, err := sessions.StartSession(int64(i + 1))
+		if err != nil {
+			return err
+		}
+		refreshTokens[i] = tokens.RefreshToken
+	}
+
+	// Logging in starts a session too. A refresh token works once, and the access token it gives belongs to the session's user
+	if _, err := userService.Login(&models.LoginRequest{PhoneNumber: "+15550000001", Password: refreshPassword}); err != nil {
+		return err
+	}
+	first, err := sessions.RefreshSession(&models.RefreshTokenRequest{RefreshToken: refreshTokens[0]})
+	if err != nil {
+		return err
+	}
+	if _, err := sessions.RefreshSession(&models.RefreshTokenRequest{RefreshToken: refreshTokens[0]}); err == nil {
+		return fmt.Errorf("a used refresh token was accepted")
+	}
+	if _, err := sessions.RefreshSession(&models.RefreshTokenRequest{RefreshToken: "not-a-refresh-token"}); err == nil {
+		return fmt.Errorf("an unknown refresh token was accepted")
+	}
+	claims, err := jwtManager.ValidateToken(first.Token)
+	if err != nil {
+		return err
+	}
+	if claims.UserID != 1 {
+		return fmt.Errorf("refreshed token belongs to user %d, want 1", claims.UserID)
+	}
+	refreshTokens[0] = first.RefreshToken
+
+	var benchErr error
+	fail := func(b *testing.B, err error) {
+		benchErr = err
+		b.FailNow()
+	}
+	type result struct {
+		name    string
+		result  testing.BenchmarkResult
+		queries float64
+	}
+	var results []result
+	for _, op := range []struct {
+		name string
+		run  func(i int) error
+	}{
+		{"POST /users/login", func(i int) error {
+			_, err := userService.Login(&models.LoginRequest{PhoneNumber: fmt.Sprintf("+1555%07d", i+1), Password: refreshPassword})
+			return err
+		}},
+		{"POST /users/token/refresh", func(i int) error {
+			resp, err := sessions.RefreshSession(&models.RefreshTokenRequest{RefreshToken: refreshTokens[i]})
+			if err != nil {
+				return err
+			}
+			refreshTokens[i] = resp.RefreshToken
+			return nil
+		}},
+	} {
+		var queries float64
+		bench := testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			counter.reset()
+			for i := 0; i < b.N; i++ {
+				if err := op.run(i % opts.Rows); err != nil {
+					fail(b, err)
+				}
+			}
+			queries = float64(counter.reset()) / float64(b.N)
+		})
+		if benchErr != nil {
+			return benchErr
+		}
+		results = append(results, result{op.name, bench, queries})
+	}
+
+	fmt.Printf("%d users, one session each\n\n", opts.Rows)
+	fmt.Printf("%-32s %14s %12s %10s\n", "new token via", "ns/op", "allocs/op", "queries")
+	for _, r := range results {
+		fmt.Printf("%-32s %14d %12d %10.2f\n", r.name, r.result.NsPerOp(), r.result.AllocsPerOp(), r.queries)
+	}
+	return nil
+}
@@ -0,0 +1,154 @@
+package main
+
+import (
+	"fmt"
+	"net/http"
+	"net/http/httptest"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/middleware"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// Shape of the revocation scenario: every revokedUserEvery-th user has all
+// their tokens revoked, and every revokedTokenEvery-th other token is revoked alone
+const (
+	revokedUserEvery  = 10
+	revokedTokenEvery = 7
+)
+
+// runRevocation issues a token to each of opts.Rows users, authenticates them
+// all through the token cache, then revokes some users and single tokens. It
+// checks the middleware turns every revoked token away, cached or not, and
+// after the revocations are reloaded from the database, and compares
+// authenticating with and without the revocation check.
+func runRevocation(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	revocations, err := repository.LoadTokenRevocations(database)
+	if err != nil {
+		return err
+	}
+	jwtManager := utils.NewJWTManager("bench-secret")
+	tokenCache := middleware.NewTokenCache(2 * opts.Rows)
+	claims := make([]*utils.JWTClaims, opts.Rows)
+	requests := make([]*http.Request, opts.Rows)
+	for i := range requests {
+		token, err := jwtManager.GenerateToken(int64(i+1), revocations.Epoch(int64(i+1)), time.Hour)
+		if err != nil {
+			return err
+		}
+		if claims[i], err = tokenCache.Validate(jwtManager, token); err != nil {
+			return err
+		}
+		requests[i] = httptest.NewRequest(http.MethodGet, "/habits", nil)
+		requests[i].Header.Set("Authorization", "Bearer "+token)
+	}
+
+	// Revoke after the tokens are cached, so the cache has to defer to the revocations
+	revoked := make([]bool, opts.Rows)
+	for i, c := range claims {
+		switch {
+		case i%revokedUserEvery == 0:
+			err = revocations.RevokeUser(c.UserID)
+		case i%revokedTokenEvery == 0:
+			err = revocations.RevokeToken(c.TokenID, c.ExpiresAt)
+		default:
+			continue
+		}
+		if err != nil {
+			return err
+		}
+		revoked[i] = true
+	}
+	reloaded, err := repository.LoadTokenRevocations(database)
+	if err != nil {
+		return err
+	}
+
+	handler := http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {})
+	cached := middleware.AuthMiddleware(jwtManager, tokenCache, nil)(handler)
+	for _, check := range []struct {
+		name        string
+		revocations *repository.TokenRevocations
+		tokenCache  *middleware.TokenCache
+	}{
+		{"cached", revocations, tokenCache},
+		{"uncached", revocations, nil},
+		{"reloaded", reloaded, tokenCache},
+	} {
+		auth := middleware.AuthMiddleware(jwtManager, check.tokenCache, check.revocations)(handler)
+		for i, request := range requests {
+			recorder := httptest.NewRecorder()
+			auth.ServeHTTP(recorder, request)
+			if (recorder.Code == http.StatusUnauthorized) != revoked[i] {
+				return fmt.Errorf("%s: user %d got %d, revoked %v", check.name, i+1, recorder.Code, revoked[i])
+			}
+		}
+	}
+
+	// A new token in the revoked user's next epoch works again
+	token, err := jwtManager.GenerateToken(1, revocations.Epoch(1), time.Hour)
+	if err != nil {
+		return err
+	}
+	renewed, err := tokenCache.Validate(jwtManager, token)
+	if err != nil {
+		return err
+	}
+	if revocations.Revoked(renewed.UserID, renewed.Epoch, renewed.TokenID) {
+		return fmt.Errorf("token issued after revoking user 1 is revoked")
+	}
+
+	checked := middleware.AuthMiddleware(jwtManager, tokenCache, revocations)(handler)
+	recorder := httptest.NewRecorder()
+	results := []struct {
+		name   string
+		result testing.BenchmarkResult
+	}{
+		{"AuthMiddleware (cached)", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				cached.ServeHTTP(recorder, requests[i%len(requests)])
+			}
+		})},
+		{"AuthMiddleware (cached, revocations)", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				checked.ServeHTTP(recorder, requests[i%len(requests)])
+			}
+		})},
+		{"TokenRevocations.Revoked", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				c := claims[i%len(claims)]
+				revocations.Revoked(c.UserID, c.Epoch, c.TokenID)
+			}
+		})},
+		{"TokenRevocations.Revoked, parallel", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			b.RunParallel(func(pb *testing.PB) {
+				for i := 0; pb.Next(); i++ {
+					c := claims[i%len(claims)]
+					revocations.Revoked(c.UserID, c.Epoch, c.TokenID)
+				}
+			})
+		})},
+	}
+
+	stats := revocations.Stats()
+	fmt.Printf("%d tokens, %d users revoked, %d single tokens revoked\n\n", opts.Rows, stats.Users, stats.RevokedTokens)
+	fmt.Printf("%-40s %14s %12s\n", "authenticate with", "ns/op", "allocs/op")
+	for _, r := range results {
+		fmt.Printf("%-40s %14d %12d\n", r.name, r.result.NsPerOp(), r.result.AllocsPerOp())
+	}
+	fmt.Printf("\n%d rejections\n", stats.Rejected)
+	return nil
+}
@@ -0,0 +1,141 @@
+package main
+
+import (
+	"fmt"
+	"math/rand"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// rwMixResult holds the counters collected during one read/write mix run
+type rwMixResult struct {
+	reads       int64
+	writes      int64
+	readErrors  int64
+	writeErrors int64
+	lockedErrs  int64
+	elapsed     time.Duration
+}
+
+// runReadWriteMix compares read throughput during sustained log writes in single and WAL mode
+func runReadWriteMix(opts Options) error {
+	for _, mode := range []string{config.ModeSingle, config.ModeWAL} {
+		result, err := readWriteMix(opts, mode)
+		if err != nil {
+			return fmt.Errorf("%s mode: %w", mode, err)
+		}
+
+		seconds := result.elapsed.Seconds()
+		fmt.Printf("\nMode: %s (%d readers, %s)\n", mode, opts.Readers, result.elapsed.Round(time.Millisecond))
+		fmt.Printf("  Reads:  %d (%.0f/s), errors: %d\n", result.reads, float64(result.reads)/seconds, result.readErrors)
+		fmt.Printf("  Writes: %d (%.0f/s), errors: %d\n", result.writes, float64(result.writes)/seconds, result.writeErrors)
+		fmt.Printf("  'database is locked' errors: %d\n", result.lockedErrs)
+	}
+	return nil
+}
+
+// readWriteMix seeds a habit with logs, then runs one log writer and opts.Readers readers concurrently
+func readWriteMix(opts Options, mode string) (*rwMixResult, error) {
+	database, cleanup, err := openTempDatabase(opts, mode)
+	if err != nil {
+		return nil, err
+	}
+	defer cleanup()
+
+	userRepo := repository.NewUserRepository(database)
+	habitRepo := repository.NewHabitRepository(database)
+	logRepo := repository.NewLogRepository(database)
+
+	user, err := userRepo.Create(&models.CreateUserRequest{
+		Name:        "Bench User",
+		TimeZone:    "UTC",
+		PhoneNumber: "+15550000000",
+	}, "not-a-real-hash")
+	if err != nil {
+		return nil, err
+	}
+	habit, err := habitRepo.Create(user.ID, &models.CreateHabitRequest{Name: "Bench Habit"})
+	if err != nil {
+		return nil, err
+	}
+
+	// Seed logs in a single transaction so setup time does not dominate
+	tx, err := database.DB.Begin()
+	if err != nil {
+		return nil, err
+	}
+	for i := 0; i < opts.Rows; i++ {
+		if _, err := tx.Exec("INSERT INTO logs (habit_id, notes) VALUES (?, ?)", habit.ID, fmt.Sprintf("seed %d", i)); err != nil {
+			tx.Rollback()
+			return nil, err
+		}
+	}
+	if err := tx.Commit(); err != nil {
+		return nil, err
+	}
+
+	result := &rwMixResult{}
+	stop := make(chan struct{})
+	var wg sync.WaitGroup
+
+	countError := func(err error, counter *int64) {
+		atomic.AddInt64(counter, 1)
+		if strings.Contains(err.Error(), "database is locked") {
+			atomic.AddInt64(&result.lockedErrs, 1)
+		}
+	}
+
+	// Sustained writer
+	wg.Add(1)
+	go func() {
+		defer wg.Done()
+		for {
+			select {
+			case <-stop:
+				return
+			default:
+			}
+			if _, err := logRepo.Create(habit.ID, &models.CreateLogRequest{Notes: "bench write"}); err != nil {
+				countError(err, &result.writeErrors)
+				continue
+			}
+			atomic.AddInt64(&result.writes, 1)
+		}
+	}()
+
+	// Concurrent readers
+	for i := 0; i < opts.Readers; i++ {
+		wg.Add(1)
+		go func(seed int64) {
+			defer wg.Done()
+			rng := rand.New(rand.NewSource(seed))
+			for {
+				select {
+				case <-stop:
+					return
+				default:
+				}
+				id := rng.Int63n(int64(opts.Rows)) + 1
+				if _, err := logRepo.GetByID(id); err != nil {
+					countError(err, &result.readErrors)
+					continue
+				}
+				atomic.AddInt64(&result.reads, 1)
+			}
+		}(int64(i))
+	}
+
+	start := time.Now()
+	time.Sleep(opts.Duration)
+	close(stop)
+	wg.Wait()
+	result.elapsed = time.Since(start)
+
+	return result, nil
+}
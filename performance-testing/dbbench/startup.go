@@ -0,0 +1,147 @@
+package main
+
+import (
+	"fmt"
+	"io/fs"
+	"os"
+	"path"
+	"path/filepath"
+	"sort"
+	"testing/fstest"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/migrations"
+)
+
+// startupReopens is the number of times the database is reopened per measurement
+const startupReopens = 20
+
+// runStartup measures cold start against a database with a large schema history,
+// comparing re-executing every migration on boot with the schema_migrations ledger
+func runStartup(opts Options) error {
+	history, err := syntheticHistory(opts.Rows / 20)
+	if err != nil {
+		return err
+	}
+
+	dir, err := os.MkdirTemp(opts.Dir, "dbbench-*")
+	if err != nil {
+		return fmt.Errorf("failed to create temp dir: %w", err)
+	}
+	defer os.RemoveAll(dir)
+
+	cfg := config.DefaultDatabaseConfig(filepath.Join(dir, "bench.db"))
+	cfg.Migrations = history
+
+	// The first open applies the whole history and creates the ledger
+	start := time.Now()
+	database, err := config.NewDatabaseWithConfig(cfg)
+	if err != nil {
+		return err
+	}
+	database.Close()
+	fmt.Printf("Migrations in history: %d\n", countSQLFiles(history))
+	fmt.Printf("First boot (apply all): %s\n", time.Since(start).Round(time.Microsecond))
+
+	// Legacy behavior: open the database and re-execute every migration file
+	replayed := historyWithoutAlters(history)
+	start = time.Now()
+	for i := 0; i < startupReopens; i++ {
+		cfg.Migrations = nil
+		database, err := config.NewDatabaseWithConfig(cfg)
+		if err != nil {
+			return err
+		}
+		if err := execAll(database, replayed); err != nil {
+			database.Close()
+			return err
+		}
+		database.Close()
+	}
+	legacy := time.Since(start) / startupReopens
+
+	// Ledger fast path: one ledger read when the schema is current
+	cfg.Migrations = history
+	start = time.Now()
+	for i := 0; i < startupReopens; i++ {
+		database, err := config.NewDatabaseWithConfig(cfg)
+		if err != nil {
+			return err
+		}
+		database.Close()
+	}
+	ledger := time.Since(start) / startupReopens
+
+	fmt.Printf("\nWarm boot, re-executing every migration: %s\n", legacy.Round(time.Microsecond))
+	fmt.Printf("Warm boot, schema_migrations fast path: %s\n", ledger.Round(time.Microsecond))
+	return nil
+}
+
+// syntheticHistory returns the embedded migrations followed by n generated ones
+func syntheticHistory(n int) (fstest.MapFS, error) {
+	history := fstest.MapFS{}
+	entries, err := fs.ReadDir(migrations.FS, ".")
+	if err != nil {
+		return nil, err
+	}
+	for _, entry := range entries {
+		content, err := fs.ReadFile(migrations.FS, entry.Name())
+		if err != nil {
+			return nil, err
+		}
+		history[entry.Name()] = &fstest.MapFile{Data: content}
+	}
+
+	for i := 0; i < n; i++ {
+		name := fmt.Sprintf("9%05d_bench_history.sql", i)
+		history[name] = &fstest.MapFile{Data: []byte(fmt.Sprintf(
+			"CREATE TABLE IF NOT EXISTS bench_history_%d (id INTEGER PRIMARY KEY, value TEXT);\n"+
+				"CREATE INDEX IF NOT EXISTS idx_bench_history_%d_value ON bench_history_%d(value);\n",
+			i, i, i,
+		))}
+	}
+	return history, nil
+}
+
+// historyWithoutAlters drops the non-idempotent ALTER TABLE migrations, which the
+// legacy runner could not replay against an existing database
+func historyWithoutAlters(history fstest.MapFS) fstest.MapFS {
+	replayed := fstest.MapFS{}
+	for name, file := range history {
+		if name == "004_add_duration_to_habits_and_logs.sql" {
+			continue
+		}
+		replayed[name] = file
+	}
+	return replayed
+}
+
+// execAll executes every .sql file in name order, as the legacy runner did
+func execAll(database *config.Database, history fstest.MapFS) error {
+	names := make([]string, 0, len(history))
+	for name := range history {
+		if path.Ext(name) == ".sql" {
+			names = append(names, name)
+		}
+	}
+	sort.Strings(names)
+
+	for _, name := range names {
+		if _, err := database.DB.Exec(string(history[name].Data)); err != nil {
+			return fmt.Errorf("failed to execute migration %s: %w", name, err)
+		}
+	}
+	return nil
+}
+
+// countSQLFiles returns the number of .sql files in the history
+func countSQLFiles(history fstest.MapFS) int {
+	count := 0
+	for name := range history {
+		if path.Ext(name) == ".sql" {
+			count++
+		}
+	}
+	return count
+}
@@ -0,0 +1,249 @@
+package main
+
+import (
+	"fmt"
+	"sort"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/service"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// Shape of the history seeded by the streak scenario
+const (
+	streakYears    = 12
+	streakHabits   = 10
+	streakTimeZone = "America/New_York"
+)
+
+// runStreak seeds habits with more than ten years of near-daily logs and compares
+// answering current and longest streak from the activity bitmaps against scanning
+// every log. It also checks that the bitmaps the log triggers keep match a rebuild.
+func runStreak(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	userRepo := repository.NewUserRepository(database)
+	habitRepo := repository.NewHabitRepository(database)
+	activityRepo := repository.NewActivityRepository(database)
+	zones := repository.NewUserZoneCache(userRepo, 1000)
+	streakService := service.NewStreakService(activityRepo, habitRepo, zones)
+	logService := service.NewLogService(repository.NewLogRepository(database), habitRepo, zones)
+
+	user, err := userRepo.Create(&models.CreateUserRequest{Name: "Bench User", TimeZone: streakTimeZone, PhoneNumber: "+15550000001"}, "not-a-real-hash")
+	if err != nil {
+		return err
+	}
+
+	// One log a day, skipping every 11th day (a streak survives that) and two days
+	// in a row every 400 days (it does not), offset per habit. Each log is dated
+	// in the user's zone as the log service dates it, so the triggers fill the bitmaps.
+	loc, err := utils.TimeZones.Location(streakTimeZone)
+	if err != nil {
+		return err
+	}
+	_, offset := time.Now().In(loc).Zone()
+	localModifier := fmt.Sprintf("%d seconds", offset)
+	days := streakYears * 365
+	habitIDs := make([]int64, streakHabits)
+	for i := range habitIDs {
+		habit, err := habitRepo.Create(user.ID, &models.CreateHabitRequest{Name: fmt.Sprintf("Habit %d", i)})
+		if err != nil {
+			return err
+		}
+		habitIDs[i] = habit.ID
+		_, err = database.DB.Exec(`
+			WITH RECURSIVE seq(x) AS (SELECT 0 UNION ALL SELECT x + 1 FROM seq WHERE x < ?)
+			INSERT INTO logs (habit_id, notes, created_at, local_date)
+			SELECT ?, 'seeded log', datetime('now', '-' || x || ' days'), date('now', '-' || x || ' days', ?) FROM seq
+			WHERE (x + ?) % 11 != 0 AND (x + ?) % 400 NOT IN (0, 1)`,
+			days-1, habit.ID, localModifier, i, i*37,
+		)
+		if err != nil {
+			return fmt.Errorf("failed to seed logs: %w", err)
+		}
+	}
+
+	// The bitmaps the triggers kept while seeding must match rebuilding them from the logs
+	maintained := make([]*models.ActivityBitmap, len(habitIDs))
+	for i, habitID := range habitIDs {
+		if maintained[i], err = activityRepo.Get(habitID); err != nil {
+			return err
+		}
+	}
+	start := time.Now()
+	bitmaps := make([]*models.ActivityBitmap, len(habitIDs))
+	for i, habitID := range habitIDs {
+		if bitmaps[i], err = streakService.Rebuild(habitID, user.ID); err != nil {
+			return err
+		}
+	}
+	rebuild := time.Since(start) / time.Duration(len(habitIDs))
+	for i, habitID := range habitIDs {
+		if !sameBitmap(maintained[i], bitmaps[i]) {
+			return fmt.Errorf("habit %d: bitmap kept by the triggers differs from a rebuild", habitID)
+		}
+	}
+
+	// Both approaches must agree before they are timed
+	today := utils.TimeZones.LocalDay(time.Now(), streakTimeZone)
+	for i, habitID := range habitIDs {
+		current, longest, err := scanStreaks(database, habitID, today)
+		if err != nil {
+			return err
+		}
+		if bitmaps[i].CurrentStreak(today) != current || bitmaps[i].LongestStreak() != longest {
+			return fmt.Errorf("habit %d: bitmap streaks %d/%d, log scan %d/%d", habitID,
+				bitmaps[i].CurrentStreak(today), bitmaps[i].LongestStreak(), current, longest)
+		}
+	}
+
+	// Writing and deleting a log through the log service must leave the same
+	// bitmap as rebuilding it
+	created, err := logService.CreateLog(habitIDs[0], user.ID, &models.CreateLogRequest{Notes: "today"})
+	if err != nil {
+		return err
+	}
+	if err := logService.DeleteLog(created.ID, user.ID); err != nil {
+		return err
+	}
+	incremental, err := activityRepo.Get(habitIDs[0])
+	if err != nil {
+		return err
+	}
+	rebuilt, err := streakService.Rebuild(habitIDs[0], user.ID)
+	if err != nil {
+		return err
+	}
+	if !sameBitmap(incremental, rebuilt) {
+		return fmt.Errorf("bitmap kept by the triggers differs from a rebuild")
+	}
+
+	var benchErr error
+	fail := func(b *testing.B, err error) {
+		benchErr = err
+		b.FailNow()
+	}
+	results := []struct {
+		name   string
+		result testing.BenchmarkResult
+	}{
+		{"bitmap (in memory)", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				bitmap := bitmaps[i%len(bitmaps)]
+				bitmap.CurrentStreak(today)
+				bitmap.LongestStreak()
+			}
+		})},
+		{"GetStreaks (bitmap)", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				if _, err := streakService.GetStreaks(habitIDs[i%len(habitIDs)], user.ID); err != nil {
+					fail(b, err)
+				}
+			}
+		})},
+		{"log scan", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				if _, _, err := scanStreaks(database, habitIDs[i%len(habitIDs)], today); err != nil {
+					fail(b, err)
+				}
+			}
+		})},
+		{"CreateLog + DeleteLog", testing.Benchmark(func(b *testing.B) {
+			for i := 0; i < b.N; i++ {
+				created, err := logService.CreateLog(habitIDs[i%len(habitIDs)], user.ID, &models.CreateLogRequest{Notes: "bench"})
+				if err != nil {
+					fail(b, err)
+				}
+				if err := logService.DeleteLog(created.ID, user.ID); err != nil {
+					fail(b, err)
+				}
+			}
+		})},
+	}
+	if benchErr != nil {
+		return benchErr
+	}
+
+	fmt.Printf("%d habits, %d years of logs each, %d-word bitmaps\n", len(habitIDs), streakYears, len(bitmaps[0].Words))
+	fmt.Printf("rebuild from logs: %s per habit\n\n", rebuild)
+	fmt.Printf("%-24s %14s %12s\n", "streaks from", "ns/op", "allocs/op")
+	for _, r := range results {
+		fmt.Printf("%-24s %14d %12d\n", r.name, r.result.NsPerOp(), r.result.AllocsPerOp())
+	}
+	return nil
+}
+
+// sameBitmap reports whether two bitmaps hold the same days
+func sameBitmap(a, b *models.ActivityBitmap) bool {
+	return fmt.Sprint(a.StartDay, a.Words) == fmt.Sprint(b.StartDay, b.Words)
+}
+
+// scanStreaks computes current and longest streak the way a client without the
+// bitmaps has to: read every log's local date and walk the distinct days
+func scanStreaks(database *config.Database, habitID int64, today int64) (int, int, error) {
+	rows, err := database.Query("SELECT local_date FROM logs WHERE habit_id = ? AND local_date IS NOT NULL", habitID)
+	if err != nil {
+		return 0, 0, err
+	}
+	defer rows.Close()
+
+	seen := make(map[int64]bool)
+	for rows.Next() {
+		var localDate string
+		if err := rows.Scan(&localDate); err != nil {
+			return 0, 0, err
+		}
+		date, err := time.Parse("2006-01-02", localDate)
+		if err != nil {
+			return 0, 0, err
+		}
+		seen[date.Unix()/86400] = true
+	}
+	if err := rows.Err(); err != nil {
+		return 0, 0, err
+	}
+
+	days := make([]int64, 0, len(seen))
+	for day := range seen {
+		days = append(days, day)
+	}
+	sort.Slice(days, func(i, j int) bool { return days[i] < days[j] })
+
+	// Longest: oldest first, a gap of more than two days starts a new streak
+	longest, run := 0, 0
+	for i, day := range days {
+		if i > 0 && day-days[i-1] > 2 {
+			run = 0
+		}
+		run++
+		if run > longest {
+			longest = run
+		}
+	}
+
+	// Current: newest first from today
+	current, previous := 0, today
+	for i := len(days) - 1; i >= 0; i-- {
+		if days[i] > today {
+			current++
+			continue
+		}
+		if previous-days[i] > 2 {
+			break
+		}
+		current++
+		previous = days[i]
+	}
+	return current, longest, nil
+}
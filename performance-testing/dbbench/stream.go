@@ -0,0 +1,77 @@
+package main
+
+import (
+	"context"
+	"encoding/json"
+	"fmt"
+	"io"
+	"testing"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// runStream compares the memory cost of encoding a full page of logs from a
+// materialized slice against streaming it row by row from sql.Rows
+func runStream(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	habitID, err := seedLogs(database, opts.Rows)
+	if err != nil {
+		return err
+	}
+	logRepo := repository.NewLogRepository(database)
+
+	var benchErr error
+	fail := func(b *testing.B, err error) {
+		benchErr = err
+		b.FailNow()
+	}
+
+	fmt.Printf("%d logs\n\n", opts.Rows)
+	fmt.Printf("%-8s %-12s %14s %14s %12s\n", "limit", "path", "ns/op", "B/op", "allocs/op")
+	for _, limit := range []int{10, 100, models.MaxPageLimit} {
+		page := &models.PageRequest{Limit: limit}
+
+		buffered := testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				logs, _, err := logRepo.GetByHabitID(habitID, nil, page)
+				if err != nil {
+					fail(b, err)
+				}
+				if err := json.NewEncoder(io.Discard).Encode(logs); err != nil {
+					fail(b, err)
+				}
+			}
+		})
+		streamed := testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				enc := json.NewEncoder(io.Discard)
+				err := logRepo.StreamByHabitID(context.Background(), habitID, nil, nil, page, func(*models.Page) error { return nil }, func(log *models.Log) error {
+					return enc.Encode(log)
+				})
+				if err != nil {
+					fail(b, err)
+				}
+			}
+		})
+		if benchErr != nil {
+			return benchErr
+		}
+
+		for _, r := range []struct {
+			name   string
+			result testing.BenchmarkResult
+		}{{"buffered", buffered}, {"streamed", streamed}} {
+			fmt.Printf("%-8d %-12s %14d %14d %12d\n", limit, r.name, r.result.NsPerOp(), r.result.AllocedBytesPerOp(), r.result.AllocsPerOp())
+		}
+	}
+	return nil
+}
@@ -0,0 +1,91 @@
+package main
+
+import (
+	"fmt"
+	"math/rand"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// benchTimeZones are the zones log times are bucketed in by the timezone scenario
+var benchTimeZones = []string{"America/New_York", "Europe/London", "Asia/Kolkata", "Australia/Sydney", "America/Sao_Paulo"}
+
+// runTimeZone compares mapping a log's created_at to the user's local day by
+// loading the zone every time, with a cached *time.Location, and with the
+// precomputed day-boundary table of utils.TimeZones
+func runTimeZone(opts Options) error {
+	// Log times from the last year, each with a user's zone
+	r := rand.New(rand.NewSource(1))
+	now := time.Now()
+	times := make([]time.Time, opts.Rows)
+	zones := make([]string, opts.Rows)
+	locations := make([]*time.Location, opts.Rows)
+	for i := range times {
+		times[i] = now.Add(-time.Duration(r.Int63n(int64(365 * 24 * time.Hour))))
+		zones[i] = benchTimeZones[r.Intn(len(benchTimeZones))]
+		loc, err := time.LoadLocation(zones[i])
+		if err != nil {
+			return err
+		}
+		locations[i] = loc
+	}
+
+	// The table must agree with the time package everywhere, including across DST changes
+	for i := range times {
+		if got, want := utils.TimeZones.LocalDay(times[i], zones[i]), timePackageLocalDay(times[i], locations[i]); got != want {
+			return fmt.Errorf("%s in %s: table gives day %d, time package %d", times[i], zones[i], got, want)
+		}
+	}
+
+	var benchErr error
+	results := []struct {
+		name   string
+		result testing.BenchmarkResult
+	}{
+		{"time.LoadLocation + In", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				j := i % len(times)
+				loc, err := time.LoadLocation(zones[j])
+				if err != nil {
+					benchErr = err
+					b.FailNow()
+				}
+				timePackageLocalDay(times[j], loc)
+			}
+		})},
+		{"cached Location + In", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				j := i % len(times)
+				timePackageLocalDay(times[j], locations[j])
+			}
+		})},
+		{"day table", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				j := i % len(times)
+				utils.TimeZones.LocalDay(times[j], zones[j])
+			}
+		})},
+	}
+	if benchErr != nil {
+		return benchErr
+	}
+
+	fmt.Printf("%d log times across %d zones\n\n", len(times), len(benchTimeZones))
+	fmt.Printf("%-24s %14s %12s\n", "local day via", "ns/op", "allocs/op")
+	for _, r := range results {
+		fmt.Printf("%-24s %14d %12d\n", r.name, r.result.NsPerOp(), r.result.AllocsPerOp())
+	}
+	return nil
+}
+
+// timePackageLocalDay is the baseline the day table is checked and timed against:
+// the local day of t in loc, from the time package alone
+func timePackageLocalDay(t time.Time, loc *time.Location) int64 {
+	year, month, day := t.In(loc).Date()
+	return time.Date(year, month, day, 0, 0, 0, 0, time.UTC).Unix() / 86400
+}
@@ -0,0 +1,120 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"strings"
+	"sync"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/service"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// waveTimeZones cover UTC offsets around the world, including half- and
+// quarter-hour ones
+var waveTimeZones = []string{
+	"Pacific/Honolulu", "America/Los_Angeles", "America/Denver", "America/Chicago", "America/New_York",
+	"America/St_Johns", "America/Sao_Paulo", "UTC", "Europe/London", "Europe/Berlin", "Africa/Cairo",
+	"Asia/Dubai", "Asia/Kolkata", "Asia/Kathmandu", "Asia/Shanghai", "Asia/Tokyo", "Australia/Adelaide",
+	"Australia/Sydney", "Pacific/Auckland",
+}
+
+// Shape of the waves simulation
+const (
+	waveSimulated = 48 * time.Hour
+	waveDelay     = 5 * time.Minute
+)
+
+// simulatedSender counts sends per simulated minute
+type simulatedSender struct {
+	clock *utils.SimulatedClock
+	start time.Time
+
+	mu        sync.Mutex
+	perMinute map[int64]int
+	sent      int
+}
+
+// Send counts the reminder at the current simulated time
+func (s *simulatedSender) Send(ctx context.Context, reminder *models.Reminder) (string, error) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.perMinute[int64(s.clock.Now().Sub(s.start)/time.Minute)]++
+	s.sent++
+	return "", nil
+}
+
+// runWaves runs the reminder scheduler for two simulated days against users
+// spread over many UTC offsets, and shows that sends arrive in one wave per
+// offset, capped per minute, instead of all at one cron time
+func runWaves(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	if err := seedReminderUsers(database, opts.Rows, waveTimeZones); err != nil {
+		return err
+	}
+
+	// Cap sends so a day's reminders would take six hours if they all fell due at once
+	sendsPerMinute := opts.Rows / 360
+	if sendsPerMinute < 60 {
+		sendsPerMinute = 60
+	}
+
+	start := time.Now().UTC().Truncate(time.Minute)
+	clock := utils.NewSimulatedClock(start)
+	sender := &simulatedSender{clock: clock, start: start, perMinute: make(map[int64]int)}
+	reminderRepo := repository.NewReminderRepository(database)
+	scheduler := service.NewReminderScheduler(reminderRepo, service.NewReminderService(reminderRepo, sender),
+		clock, sendsPerMinute, waveDelay, opts.Readers)
+
+	// The scheduler is the only goroutine waiting on the clock, so whenever it
+	// waits, the clock jumps to its timer
+	ctx, cancel := context.WithCancel(context.Background())
+	done := make(chan error, 1)
+	go func() {
+		done <- scheduler.Run(ctx)
+	}()
+	began := time.Now()
+	for clock.Now().Before(start.Add(waveSimulated)) {
+		clock.BlockUntil(1)
+		clock.AdvanceToNext()
+	}
+	cancel()
+	<-done
+	elapsed := time.Since(began)
+
+	var queued int64
+	if err := database.QueryRow("SELECT COUNT(*) FROM notification_outbox").Scan(&queued); err != nil {
+		return fmt.Errorf("failed to count outbox: %w", err)
+	}
+
+	// Busiest minute and sends per hour over the second day, when every offset has a wave
+	busiest := 0
+	hours := make([]string, 24)
+	for hour := 0; hour < 24; hour++ {
+		sends := 0
+		for minute := int64(24+hour) * 60; minute < int64(25+hour)*60; minute++ {
+			sends += sender.perMinute[minute]
+		}
+		hours[hour] = fmt.Sprint(sends)
+	}
+	for _, sends := range sender.perMinute {
+		if sends > busiest {
+			busiest = sends
+		}
+	}
+
+	fmt.Printf("\n%d users in %d time zones, simulated %s in %s\n", opts.Rows, len(waveTimeZones), waveSimulated, elapsed.Round(time.Millisecond))
+	fmt.Printf("%d reminders queued, %d sent, cap %d a minute, busiest minute %d\n", queued, sender.sent, sendsPerMinute, busiest)
+	fmt.Printf("sends per hour of day two, from %s: %s\n", start.Add(24*time.Hour).Format("15:04 MST"), strings.Join(hours, " "))
+	fmt.Printf("a single cron run would have queued every user's reminder at one instant\n")
+	return nil
+}
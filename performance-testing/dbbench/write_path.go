@@ -0,0 +1,100 @@
+package main
+
+import (
+	"fmt"
+	"testing"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// Statements used to emulate the previous write path: an Exec followed by a separate read
+const (
+	legacyInsertLogQuery = "INSERT INTO logs (habit_id, notes, duration_seconds) VALUES (?, ?, ?)"
+	legacyUpdateLogQuery = "UPDATE logs SET notes = ? WHERE id = ?"
+	legacySelectLogQuery = "SELECT id, habit_id, notes, duration_seconds, created_at FROM logs WHERE id = ?"
+)
+
+// runWritePath compares per-write latency of INSERT/UPDATE ... RETURNING against
+// an Exec followed by a read of the written row
+func runWritePath(opts Options) error {
+	database, cleanup, err := openTempDatabase(opts, config.ModeWAL)
+	if err != nil {
+		return err
+	}
+	defer cleanup()
+
+	habitID, err := seedLogs(database, 1)
+	if err != nil {
+		return err
+	}
+	logRepo := repository.NewLogRepository(database)
+	notes := "updated notes"
+
+	var benchErr error
+	fail := func(b *testing.B, err error) {
+		benchErr = err
+		b.FailNow()
+	}
+
+	results := []struct {
+		name   string
+		result testing.BenchmarkResult
+	}{
+		{"create, exec + select", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				result, err := database.Exec(legacyInsertLogQuery, habitID, "bench", nil)
+				if err != nil {
+					fail(b, err)
+				}
+				id, _ := result.LastInsertId()
+				var log models.Log
+				var createdAt string
+				var duration interface{}
+				if err := database.QueryRow(legacySelectLogQuery, id).Scan(&log.ID, &log.HabitID, &log.Notes, &duration, &createdAt); err != nil {
+					fail(b, err)
+				}
+			}
+		})},
+		{"create, RETURNING", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				if _, err := logRepo.Create(habitID, &models.CreateLogRequest{Notes: "bench"}); err != nil {
+					fail(b, err)
+				}
+			}
+		})},
+		{"update, exec + select", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				if _, err := database.Exec(legacyUpdateLogQuery, notes, 1); err != nil {
+					fail(b, err)
+				}
+				var log models.Log
+				var createdAt string
+				var duration interface{}
+				if err := database.QueryRow(legacySelectLogQuery, 1).Scan(&log.ID, &log.HabitID, &log.Notes, &duration, &createdAt); err != nil {
+					fail(b, err)
+				}
+			}
+		})},
+		{"update, RETURNING", testing.Benchmark(func(b *testing.B) {
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				if _, err := logRepo.Update(1, &models.UpdateLogRequest{Notes: &notes}); err != nil {
+					fail(b, err)
+				}
+			}
+		})},
+	}
+	if benchErr != nil {
+		return benchErr
+	}
+
+	for _, r := range results {
+		fmt.Printf("%-24s %s %s\n", r.name, r.result.String(), r.result.MemString())
+	}
+	return nil
+}
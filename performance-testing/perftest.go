@@ -38,6 +38,8 @@ type TestStats struct {
 	CreateLogLatencies   []time.Duration
 	GetHabitsLatencies   []time.Duration
 	GetLogsLatencies     []time.Duration
+	DashboardLatencies   []time.Duration
+	FanOutLatencies      []time.Duration
 }
 
 // User credentials for testing
@@ -140,8 +142,13 @@ func main() {
 	performReadOperations(config, stats, users)
 	fmt.Printf("✓ Performed read operations\n")
 
-	// Phase 6: Load Testing
-	fmt.Println("\nPhase 6: Load Testing")
+	// Phase 6: Page Load (GET /dashboard vs. GET /habits plus GET /habits/{id}/logs per habit)
+	fmt.Println("\nPhase 6: Page Load")
+	comparePageLoads(config, stats, users)
+	fmt.Printf("✓ Compared dashboard and fan-out page loads\n")
+
+	// Phase 7: Load Testing
+	fmt.Println("\nPhase 7: Load Testing")
 	performLoadTest(config, stats, users)
 
 	// Print results
@@ -483,6 +490,97 @@ func getLogs(baseURL string, user *TestUser, habit TestHabit) error {
 	return nil
 }
 
+// comparePageLoads measures the latency of loading the habit list screen for every
+// user, once with the single dashboard request and once by fanning out a habits
+// request and a logs request per habit. Each user's two loads run back to back so
+// both see the same data.
+func comparePageLoads(config TestConfig, stats *TestStats, users []*TestUser) {
+	var wg sync.WaitGroup
+	sem := make(chan struct{}, config.ConcurrentWorkers)
+
+	for _, user := range users {
+		wg.Add(1)
+		go func(u *TestUser) {
+			defer wg.Done()
+			sem <- struct{}{}
+			defer func() { <-sem }()
+
+			start := time.Now()
+			if err := getDashboard(config.BaseURL, u); err != nil {
+				log.Printf("Failed to get dashboard: %v", err)
+				recordRequest(stats, start, false, &stats.DashboardLatencies)
+			} else {
+				recordRequest(stats, start, true, &stats.DashboardLatencies)
+			}
+
+			start = time.Now()
+			if err := getFanOut(config.BaseURL, u); err != nil {
+				log.Printf("Failed to fan out: %v", err)
+				recordRequest(stats, start, false, &stats.FanOutLatencies)
+			} else {
+				recordRequest(stats, start, true, &stats.FanOutLatencies)
+			}
+		}(user)
+	}
+
+	wg.Wait()
+}
+
+// getDashboard loads the habit list screen with a single request
+func getDashboard(baseURL string, user *TestUser) error {
+	return getAndDrain(baseURL+"/dashboard?days=7", user)
+}
+
+// getFanOut loads the habit list screen the way a client without the dashboard
+// endpoint does: the habits, then every habit's logs concurrently
+func getFanOut(baseURL string, user *TestUser) error {
+	if err := getAndDrain(baseURL+"/habits", user); err != nil {
+		return err
+	}
+
+	var wg sync.WaitGroup
+	errs := make(chan error, len(user.Habits))
+	for _, habit := range user.Habits {
+		wg.Add(1)
+		go func(h TestHabit) {
+			defer wg.Done()
+			errs <- getAndDrain(fmt.Sprintf("%s/habits/%d/logs", baseURL, h.ID), user)
+		}(habit)
+	}
+	wg.Wait()
+	close(errs)
+
+	for err := range errs {
+		if err != nil {
+			return err
+		}
+	}
+	return nil
+}
+
+// getAndDrain sends an authenticated GET and reads the whole body, so streamed
+// responses are timed to their last byte
+func getAndDrain(url string, user *TestUser) error {
+	req, _ := http.NewRequest("GET", url, nil)
+	req.Header.Set("Authorization", "Bearer "+user.Token)
+
+	resp, err := http.DefaultClient.Do(req)
+	if err != nil {
+		return err
+	}
+	defer resp.Body.Close()
+
+	body, err := io.ReadAll(resp.Body)
+	if err != nil {
+		return err
+	}
+	if resp.StatusCode != http.StatusOK {
+		return fmt.Errorf("unexpected status code: %d, body: %s", resp.StatusCode, string(body))
+	}
+
+	return nil
+}
+
 // performLoadTest performs sustained load testing
 func performLoadTest(config TestConfig, stats *TestStats, users []*TestUser) {
 	if len(users) == 0 {
@@ -597,6 +695,8 @@ func printResults(stats *TestStats) {
 	printOperationStats("Create Log", stats.CreateLogLatencies)
 	printOperationStats("Get Habits", stats.GetHabitsLatencies)
 	printOperationStats("Get Logs", stats.GetLogsLatencies)
+	printOperationStats("Page Load: Dashboard", stats.DashboardLatencies)
+	printOperationStats("Page Load: Fan-out", stats.FanOutLatencies)
 }
 
 // printOperationStats prints statistics for a specific operation
@@ -0,0 +1,43 @@
+// Command cmd serves the Twilio stand-in, so the notify command can be pointed at
+// it with TWILIO_BASE_URL.
+//
+// Run it from the project root:
+//
+//	go run ./performance-testing/twiliostandin/cmd -addr=:8089 -latency=50ms -rate=100 -failure-rate=0.05
+package main
+
+import (
+	"flag"
+	"log"
+	"net/http"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/performance-testing/twiliostandin"
+)
+
+func main() {
+	addr := flag.String("addr", ":8089", "Address to listen on")
+	latency := flag.Duration("latency", 50*time.Millisecond, "Latency of each accepted request")
+	rate := flag.Int("rate", 100, "Messages accepted per second before answering 429 (0 is unlimited)")
+	failureRate := flag.Float64("failure-rate", 0, "Fraction of requests answered with 500")
+	rejectPrefix := flag.String("reject-prefix", "", "Reject numbers starting with this prefix as invalid")
+	flag.Parse()
+
+	server := twiliostandin.NewServer(twiliostandin.Options{
+		Latency:       *latency,
+		RatePerSecond: *rate,
+		FailureRate:   *failureRate,
+		RejectPrefix:  *rejectPrefix,
+	})
+
+	go func() {
+		for range time.Tick(5 * time.Second) {
+			stats := server.Stats()
+			log.Printf("requests=%d accepted=%d duplicates=%d rate_limited=%d failed=%d rejected=%d",
+				stats.Requests, stats.Accepted, stats.Duplicates, stats.RateLimited, stats.Failed, stats.Rejected)
+		}
+	}()
+
+	log.Printf("Twilio stand-in listening on %s", *addr)
+	log.Fatal(http.ListenAndServe(*addr, server))
+}
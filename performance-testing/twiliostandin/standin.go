@@ -0,0 +1,173 @@
+// Package twiliostandin is a local stand-in for the Twilio Messages API, for
+// load-testing reminder delivery offline. It sends nothing: it accepts messages
+// after a configurable latency, and can throttle, fail and reject them.
+package twiliostandin
+
+import (
+	"encoding/json"
+	"fmt"
+	"math/rand"
+	"net/http"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
+)
+
+// Options controls how the stand-in responds
+type Options struct {
+	// Latency is how long each accepted request takes
+	Latency time.Duration
+	// RatePerSecond is the account's sending limit; requests over it get 429. Zero is unlimited.
+	RatePerSecond int
+	// FailureRate is the fraction of requests that get a 500
+	FailureRate float64
+	// RejectPrefix rejects messages to numbers starting with it with a 400, as Twilio does invalid numbers
+	RejectPrefix string
+}
+
+// Stats counts the requests the stand-in has answered
+type Stats struct {
+	Requests    int64 `json:"requests"`
+	Accepted    int64 `json:"accepted"`
+	Duplicates  int64 `json:"duplicates"`
+	RateLimited int64 `json:"rate_limited"`
+	Failed      int64 `json:"failed"`
+	Rejected    int64 `json:"rejected"`
+}
+
+// Server is the stand-in's HTTP handler
+type Server struct {
+	latency      time.Duration
+	ratePerSec   int64
+	failureRate  atomic.Value // float64
+	rejectPrefix string
+
+	requests, accepted, duplicates, rateLimited, failed, rejected int64
+
+	mu          sync.Mutex
+	window      int64
+	windowCount int64
+	// sent maps each idempotency key to the SID of the message accepted for it
+	sent map[string]string
+}
+
+// NewServer creates a stand-in
+func NewServer(opts Options) *Server {
+	s := &Server{
+		latency:      opts.Latency,
+		ratePerSec:   int64(opts.RatePerSecond),
+		rejectPrefix: opts.RejectPrefix,
+		sent:         make(map[string]string),
+	}
+	s.failureRate.Store(opts.FailureRate)
+	return s
+}
+
+// SetFailureRate changes the fraction of requests that fail, to simulate an outage and recovery
+func (s *Server) SetFailureRate(rate float64) {
+	s.failureRate.Store(rate)
+}
+
+// Stats returns the counts so far
+func (s *Server) Stats() Stats {
+	return Stats{
+		Requests:    atomic.LoadInt64(&s.requests),
+		Accepted:    atomic.LoadInt64(&s.accepted),
+		Duplicates:  atomic.LoadInt64(&s.duplicates),
+		RateLimited: atomic.LoadInt64(&s.rateLimited),
+		Failed:      atomic.LoadInt64(&s.failed),
+		Rejected:    atomic.LoadInt64(&s.rejected),
+	}
+}
+
+// ServeHTTP answers POST /2010-04-01/Accounts/{sid}/Messages.json like Twilio, and GET /stats with the counts
+func (s *Server) ServeHTTP(w http.ResponseWriter, r *http.Request) {
+	if r.Method == http.MethodGet && r.URL.Path == "/stats" {
+		writeJSON(w, http.StatusOK, s.Stats())
+		return
+	}
+	if r.Method != http.MethodPost || !strings.HasPrefix(r.URL.Path, "/2010-04-01/Accounts/") || !strings.HasSuffix(r.URL.Path, "/Messages.json") {
+		writeError(w, http.StatusNotFound, 20404, "The requested resource was not found")
+		return
+	}
+	if _, _, ok := r.BasicAuth(); !ok {
+		writeError(w, http.StatusUnauthorized, 20003, "Authenticate")
+		return
+	}
+	atomic.AddInt64(&s.requests, 1)
+
+	if !s.admit() {
+		atomic.AddInt64(&s.rateLimited, 1)
+		writeError(w, http.StatusTooManyRequests, 20429, "Too Many Requests")
+		return
+	}
+	if s.latency > 0 {
+		time.Sleep(s.latency)
+	}
+	if rate := s.failureRate.Load().(float64); rate > 0 && rand.Float64() < rate {
+		atomic.AddInt64(&s.failed, 1)
+		writeError(w, http.StatusInternalServerError, 20500, "Internal Server Error")
+		return
+	}
+
+	to := r.PostFormValue("To")
+	if to == "" || r.PostFormValue("Body") == "" {
+		atomic.AddInt64(&s.rejected, 1)
+		writeError(w, http.StatusBadRequest, 21604, "A 'To' phone number and a 'Body' are required")
+		return
+	}
+	if s.rejectPrefix != "" && strings.HasPrefix(to, s.rejectPrefix) {
+		atomic.AddInt64(&s.rejected, 1)
+		writeError(w, http.StatusBadRequest, 21211, fmt.Sprintf("The 'To' number %s is not a valid phone number.", to))
+		return
+	}
+
+	sid, duplicate := s.accept(r.Header.Get("I-Twilio-Idempotency-Token"))
+	if duplicate {
+		atomic.AddInt64(&s.duplicates, 1)
+	} else {
+		atomic.AddInt64(&s.accepted, 1)
+	}
+	writeJSON(w, http.StatusCreated, map[string]string{"sid": sid, "status": "queued", "to": to})
+}
+
+// admit counts the request against the current one-second window
+func (s *Server) admit() bool {
+	if s.ratePerSec <= 0 {
+		return true
+	}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if window := time.Now().Unix(); window != s.window {
+		s.window, s.windowCount = window, 0
+	}
+	s.windowCount++
+	return s.windowCount <= s.ratePerSec
+}
+
+// accept returns a new SID, or the SID already accepted for the idempotency key
+func (s *Server) accept(key string) (string, bool) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if sid, ok := s.sent[key]; ok && key != "" {
+		return sid, true
+	}
+	sid := fmt.Sprintf("SM%032x", len(s.sent)+1)
+	if key != "" {
+		s.sent[key] = sid
+	}
+	return sid, false
+}
+
+// writeJSON writes a JSON response
+func writeJSON(w http.ResponseWriter, status int, body interface{}) {
+	w.Header().Set("Content-Type", "application/json")
+	w.WriteHeader(status)
+	json.NewEncoder(w).Encode(body)
+}
+
+// writeError writes an error in Twilio's format
+func writeError(w http.ResponseWriter, status int, code int, message string) {
+	writeJSON(w, status, map[string]interface{}{"status": status, "code": code, "message": message})
+}
@@ -0,0 +1,80 @@
+package repository
+
+import (
+	"fmt"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// ActivityRepository defines the interface for the per-habit activity bitmaps. The
+// bitmaps are kept current by triggers on logs, so nothing but a rebuild writes them.
+type ActivityRepository interface {
+	// Get returns the habit's bitmap, which is empty if the habit has no dated logs
+	Get(habitID int64) (*models.ActivityBitmap, error)
+	// Rebuild recomputes the habit's bitmap from its logs
+	Rebuild(habitID int64) error
+}
+
+// localDayNumber is a log's local_date as a day number counted from 1970-01-01,
+// the way the activity triggers count it
+const localDayNumber = "CAST(julianday(local_date) - 2440587.5 AS INTEGER)"
+
+// Activity statements
+const (
+	selectActivityQuery = "SELECT word, bits FROM habit_activity_words WHERE habit_id = ? ORDER BY word"
+
+	deleteActivityQuery = "DELETE FROM habit_activity_words WHERE habit_id = ?"
+	// Summing the distinct bit values of a word's days sets each day's bit once
+	insertActivityFromLogsQuery = "INSERT INTO habit_activity_words (habit_id, word, bits) " +
+		"SELECT habit_id, day >> 6, SUM(DISTINCT 1 << (day & 63)) " +
+		"FROM (SELECT habit_id, " + localDayNumber + " AS day FROM logs WHERE habit_id = ? AND local_date IS NOT NULL) " +
+		"GROUP BY habit_id, day >> 6 ON CONFLICT (habit_id, word) DO UPDATE SET bits = bits | excluded.bits"
+)
+
+// activityRepository implements ActivityRepository
+type activityRepository struct {
+	db DB
+}
+
+// NewActivityRepository creates a new activity repository
+func NewActivityRepository(db DB) ActivityRepository {
+	return &activityRepository{db: db}
+}
+
+// Get reads a habit's bitmap, one row per 64 days
+func (r *activityRepository) Get(habitID int64) (*models.ActivityBitmap, error) {
+	rows, err := r.db.Query(selectActivityQuery, habitID)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get activity: %w", err)
+	}
+	defer rows.Close()
+
+	activity := &models.ActivityBitmap{HabitID: habitID}
+	for rows.Next() {
+		var word, bits int64
+		if err := rows.Scan(&word, &bits); err != nil {
+			return nil, fmt.Errorf("failed to scan activity: %w", err)
+		}
+		// SQLite integers are signed, so day 63 of a word comes back as the sign bit
+		activity.AddWord(word, uint64(bits))
+	}
+
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating activity: %w", err)
+	}
+
+	return activity, nil
+}
+
+// Rebuild replaces a habit's bitmap with one computed from its logs. A log
+// written between the two statements is kept by its trigger, since the insert
+// only adds bits to the words a trigger may have recreated.
+func (r *activityRepository) Rebuild(habitID int64) error {
+	if _, err := r.db.Exec(deleteActivityQuery, habitID); err != nil {
+		return fmt.Errorf("failed to delete activity: %w", err)
+	}
+	if _, err := r.db.Exec(insertActivityFromLogsQuery, habitID); err != nil {
+		return fmt.Errorf("failed to rebuild activity: %w", err)
+	}
+	return nil
+}
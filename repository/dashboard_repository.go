@@ -0,0 +1,121 @@
+package repository
+
+import (
+	"context"
+	"fmt"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// DashboardRepository defines the interface for reading a user's dashboard
+type DashboardRepository interface {
+	Load(ctx context.Context, userID int64, since time.Time) (*DashboardSnapshot, error)
+}
+
+// DashboardSnapshot is everything a dashboard is built from, read from one snapshot
+type DashboardSnapshot struct {
+	// Habits are the user's habits, newest first
+	Habits []*models.Habit
+	// Logs are the user's logs created since the start of the window, grouped by
+	// habit in the order of Habits and newest first within a habit
+	Logs []*models.Log
+	// Activity holds the activity bitmap of every habit, for the streaks
+	Activity map[int64]*models.ActivityBitmap
+}
+
+// Dashboard statements. They run inside a read transaction, so they are not prepared
+// per connection like ReadStatements.
+const (
+	selectAllHabitsByUserIDQuery = "SELECT " + habitColumns + " FROM habits WHERE user_id = ? ORDER BY created_at DESC, id DESC"
+
+	// selectActivityByUserIDQuery reads the activity bitmaps of all of the user's
+	// habits, one row per 64 days with a log, so it never reads the logs themselves
+	selectActivityByUserIDQuery = "SELECT habit_activity_words.habit_id, word, bits " +
+		"FROM habits JOIN habit_activity_words ON habit_activity_words.habit_id = habits.id " +
+		"WHERE habits.user_id = ? ORDER BY habit_activity_words.habit_id, word"
+)
+
+// dashboardRepository implements DashboardRepository
+type dashboardRepository struct {
+	db DB
+}
+
+// NewDashboardRepository creates a new dashboard repository
+func NewDashboardRepository(db DB) DashboardRepository {
+	return &dashboardRepository{db: db}
+}
+
+// Load reads the user's habits, their logs created since since and their activity
+// bitmaps in three queries. The queries share one read transaction, so a log
+// written meanwhile cannot appear in one result and not another.
+func (r *dashboardRepository) Load(ctx context.Context, userID int64, since time.Time) (*DashboardSnapshot, error) {
+	tx, err := r.db.BeginRead(ctx)
+	if err != nil {
+		return nil, fmt.Errorf("failed to begin read: %w", err)
+	}
+	// The transaction only reads, so it is always rolled back
+	defer tx.Rollback()
+
+	snapshot := &DashboardSnapshot{Activity: make(map[int64]*models.ActivityBitmap)}
+
+	// Read the habits
+	rows, err := tx.QueryContext(ctx, selectAllHabitsByUserIDQuery, userID)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get habits: %w", err)
+	}
+	for rows.Next() {
+		habit, err := scanHabit(rows)
+		if err != nil {
+			rows.Close()
+			return nil, fmt.Errorf("failed to scan habit: %w", err)
+		}
+		snapshot.Habits = append(snapshot.Habits, habit)
+	}
+	rows.Close()
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating habits: %w", err)
+	}
+
+	// Read the logs in the window, already grouped by habit
+	rows, err = tx.QueryContext(ctx, selectLogsByUserIDSinceQuery, userID, since.UTC().Format(timestampLayout))
+	if err != nil {
+		return nil, fmt.Errorf("failed to get logs: %w", err)
+	}
+	for rows.Next() {
+		log, err := scanLog(rows)
+		if err != nil {
+			rows.Close()
+			return nil, fmt.Errorf("failed to scan log: %w", err)
+		}
+		snapshot.Logs = append(snapshot.Logs, log)
+	}
+	rows.Close()
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating logs: %w", err)
+	}
+
+	// Read the activity bitmaps for the streaks
+	rows, err = tx.QueryContext(ctx, selectActivityByUserIDQuery, userID)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get activity: %w", err)
+	}
+	defer rows.Close()
+	for rows.Next() {
+		var habitID, word, bits int64
+		if err := rows.Scan(&habitID, &word, &bits); err != nil {
+			return nil, fmt.Errorf("failed to scan activity: %w", err)
+		}
+		activity, ok := snapshot.Activity[habitID]
+		if !ok {
+			activity = &models.ActivityBitmap{HabitID: habitID}
+			snapshot.Activity[habitID] = activity
+		}
+		activity.AddWord(word, uint64(bits))
+	}
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating activity: %w", err)
+	}
+
+	return snapshot, nil
+}
@@ -0,0 +1,99 @@
+package repository
+
+import (
+	"context"
+	"database/sql"
+	"strconv"
+	"strings"
+	"time"
+)
+
+// DB is the set of database operations used by the repositories.
+// It is satisfied by *config.Database, which routes Query/QueryRow calls to the
+// reader pool and Exec/ExecReturning calls to the writer pool.
+type DB interface {
+	Exec(query string, args ...interface{}) (sql.Result, error)
+	// ExecReturning runs a write statement with a RETURNING clause and returns its single row
+	ExecReturning(query string, args ...interface{}) *sql.Row
+	// ExecReturningRows runs a write statement with a RETURNING clause that may return many rows
+	ExecReturningRows(query string, args ...interface{}) (*sql.Rows, error)
+	Query(query string, args ...interface{}) (*sql.Rows, error)
+	// QueryContext runs a read statement that stops when ctx is cancelled, for streaming reads
+	QueryContext(ctx context.Context, query string, args ...interface{}) (*sql.Rows, error)
+	QueryRow(query string, args ...interface{}) *sql.Row
+	// BeginRead starts a read-only transaction whose queries all see one snapshot
+	BeginRead(ctx context.Context) (*sql.Tx, error)
+}
+
+// rowScanner is implemented by *sql.Row and *sql.Rows, so the same decoding
+// is shared by single-row reads, list reads and RETURNING writes
+type rowScanner interface {
+	Scan(dest ...interface{}) error
+}
+
+// timestampLayout is the format SQLite's CURRENT_TIMESTAMP stores created_at in.
+// created_at remains the sort key of the list indexes, so cursors and ranges compare against it.
+const timestampLayout = "2006-01-02 15:04:05"
+
+// createdAtMillis selects a row's creation time as Unix milliseconds. Rows the
+// created_at_ms backfill has not reached yet are converted from the created_at
+// text by SQLite, so every row decodes as an integer without parsing in Go.
+const createdAtMillis = "COALESCE(created_at_ms, CAST(ROUND((julianday(created_at) - 2440587.5) * 86400000) AS INTEGER))"
+
+// tableCreatedAtMillis is createdAtMillis reading table's columns, for joins in
+// which more than one table has a created_at
+func tableCreatedAtMillis(table string) string {
+	return strings.ReplaceAll(createdAtMillis, "created_at", table+".created_at")
+}
+
+// nowMillis is the statement time as Unix milliseconds, for setting created_at_ms on insert.
+// SQLite evaluates 'now' once per statement, so it matches the created_at default.
+const nowMillis = "CAST(ROUND((julianday('now') - 2440587.5) * 86400000) AS INTEGER)"
+
+// offsetModifier formats a UTC offset as a SQLite date modifier such as "-14400 seconds",
+// for shifting a UTC time to local time in date() and datetime()
+func offsetModifier(utcOffset time.Duration) string {
+	return strconv.FormatInt(int64(utcOffset/time.Second), 10) + " seconds"
+}
+
+// ReadStatements returns the fixed read queries on the repositories' hot paths,
+// for preparing on every connection of the reader pool
+func ReadStatements() []string {
+	return []string{
+		selectUserByIDQuery,
+		selectUserByPhoneNumberQuery,
+		selectHabitByIDQuery,
+		selectHabitsByUserIDQuery,
+		listHabitsByUserIDQuery,
+		selectHabitsByUserIDAfterQuery,
+		selectHabitsByUserIDBeforeQuery,
+		selectHabitByIDForUserQuery,
+		selectLogByIDQuery,
+		selectLogsByHabitIDQuery,
+		selectLogsByHabitIDAfterQuery,
+		selectLogsByHabitIDBeforeQuery,
+		selectLogByIDForUserQuery,
+		selectLogsByUserIDSinceQuery,
+		selectActivityQuery,
+		selectRollupsByHabitIDQuery,
+	}
+}
+
+// WriteStatements returns the fixed write queries on the repositories' hot paths,
+// for preparing on the writer connection
+func WriteStatements() []string {
+	return []string{
+		insertUserQuery,
+		deleteUserQuery,
+		insertHabitQuery,
+		deleteHabitQuery,
+		deleteHabitForUserQuery,
+		insertLogQuery,
+		insertLogForUserQuery,
+		deleteLogQuery,
+		deleteLogForUserQuery,
+		claimRemindersQuery,
+		insertRefreshTokenQuery,
+		rotateRefreshTokenQuery,
+	}
+}
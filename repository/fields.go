@@ -0,0 +1,40 @@
+package repository
+
+import (
+	"strings"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// selectedFields returns the fields to select for a sparse fieldset. id and
+// created_at are always selected because the page cursors are built from them.
+func selectedFields(fields models.FieldSet) []string {
+	selected := []string{"id", "created_at"}
+	for _, field := range fields {
+		if field != "id" && field != "created_at" {
+			selected = append(selected, field)
+		}
+	}
+	return selected
+}
+
+// projectColumns returns the column list for the selected fields
+func projectColumns(selected []string, columns map[string]string) string {
+	projected := make([]string, len(selected))
+	for i, field := range selected {
+		projected[i] = columns[field]
+	}
+	return strings.Join(projected, ", ")
+}
+
+// projectPageQueries returns q selecting projected instead of the full column list
+func projectPageQueries(q pageQueries, columns, projected string) pageQueries {
+	project := func(query string) string {
+		return strings.Replace(query, "SELECT "+columns+" ", "SELECT "+projected+" ", 1)
+	}
+	return pageQueries{
+		first:  project(q.first),
+		after:  project(q.after),
+		before: project(q.before),
+	}
+}
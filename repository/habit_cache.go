@@ -0,0 +1,398 @@
+package repository
+
+import (
+	"container/list"
+	"context"
+	"fmt"
+	"sync"
+	"sync/atomic"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// Habit cache sizing
+const (
+	// habitCacheShards is the number of independently locked LRU lists users are spread over
+	habitCacheShards = 16
+	// habitCacheEntryBytes and habitCacheHabitBytes estimate the memory held by a
+	// cached habit set and each habit in it, apart from the habits' strings
+	habitCacheEntryBytes = 96
+	habitCacheHabitBytes = 112
+)
+
+// HabitCache holds each recently active user's full set of habits in memory.
+// Users are spread over shards, each with its own lock, LRU list and share of the
+// memory budget. A set that would take more than a shard's budget is not cached;
+// the cache remembers that instead, and the user's reads go to the database.
+type HabitCache struct {
+	shards     [habitCacheShards]habitCacheShard
+	shardBytes int64
+
+	hits      atomic.Int64
+	misses    atomic.Int64
+	evictions atomic.Int64
+}
+
+// habitCacheShard is one lock's worth of cached users, least recently used at the back
+type habitCacheShard struct {
+	mu      sync.Mutex
+	entries map[int64]*list.Element
+	lru     *list.List
+	bytes   int64
+	// generation counts invalidations, so a set loaded while a write ran is not stored
+	generation uint64
+}
+
+// habitCacheEntry is one user's habits, newest first
+type habitCacheEntry struct {
+	userID int64
+	habits []*models.Habit
+	bytes  int64
+	// tooLarge marks a user whose habits take more than a shard's budget; habits is nil
+	tooLarge bool
+}
+
+// HabitCacheStats reports the cache's counters and size
+type HabitCacheStats struct {
+	Hits      int64 `json:"hits"`
+	Misses    int64 `json:"misses"`
+	Evictions int64 `json:"evictions"`
+	Users     int   `json:"users"`
+	Bytes     int64 `json:"bytes"`
+	MaxBytes  int64 `json:"max_bytes"`
+}
+
+// NewHabitCache creates a cache that holds about maxBytes of habits
+func NewHabitCache(maxBytes int64) *HabitCache {
+	c := &HabitCache{shardBytes: maxBytes / habitCacheShards}
+	for i := range c.shards {
+		c.shards[i].entries = make(map[int64]*list.Element)
+		c.shards[i].lru = list.New()
+	}
+	return c
+}
+
+// Invalidate drops the user's cached habits; the next read loads them again
+func (c *HabitCache) Invalidate(userID int64) {
+	shard := c.shard(userID)
+	shard.mu.Lock()
+	defer shard.mu.Unlock()
+
+	shard.generation++
+	if element, ok := shard.entries[userID]; ok {
+		shard.remove(element)
+	}
+}
+
+// Stats returns the counters and the current size of the cache
+func (c *HabitCache) Stats() HabitCacheStats {
+	stats := HabitCacheStats{
+		Hits:      c.hits.Load(),
+		Misses:    c.misses.Load(),
+		Evictions: c.evictions.Load(),
+		MaxBytes:  c.shardBytes * habitCacheShards,
+	}
+	for i := range c.shards {
+		shard := &c.shards[i]
+		shard.mu.Lock()
+		stats.Users += len(shard.entries)
+		stats.Bytes += shard.bytes
+		shard.mu.Unlock()
+	}
+	return stats
+}
+
+// userHabits returns the user's habits, newest first, calling load on a miss.
+// load reads at most limit habits, enough to fill a shard, and reports whether
+// that was all of them. ok is false when the user's habits are too large to
+// cache, and the caller reads them from the database. The returned slice is
+// shared and must not be modified.
+func (c *HabitCache) userHabits(userID int64, load func(limit int) ([]*models.Habit, bool, error)) ([]*models.Habit, bool, error) {
+	shard := c.shard(userID)
+	shard.mu.Lock()
+	if element, ok := shard.entries[userID]; ok {
+		shard.lru.MoveToFront(element)
+		entry := element.Value.(*habitCacheEntry)
+		shard.mu.Unlock()
+		if entry.tooLarge {
+			c.misses.Add(1)
+			return nil, false, nil
+		}
+		c.hits.Add(1)
+		return entry.habits, true, nil
+	}
+	generation := shard.generation
+	shard.mu.Unlock()
+	c.misses.Add(1)
+
+	// Load without the lock, so one slow user does not hold up the shard
+	limit := int((c.shardBytes - habitCacheEntryBytes) / habitCacheHabitBytes)
+	if limit < 1 {
+		limit = 1
+	}
+	habits, complete, err := load(limit)
+	if err != nil {
+		return nil, false, err
+	}
+
+	entry := &habitCacheEntry{userID: userID, habits: habits, bytes: habitCacheEntryBytes}
+	for _, habit := range habits {
+		entry.bytes += habitCacheHabitBytes + int64(len(habit.Name)+len(habit.Description))
+	}
+	if !complete || entry.bytes > c.shardBytes {
+		entry.habits, entry.bytes, entry.tooLarge = nil, habitCacheEntryBytes, true
+	}
+
+	shard.mu.Lock()
+	defer shard.mu.Unlock()
+	if shard.generation != generation {
+		// A write may have landed after the load read its rows
+		return habits, complete, nil
+	}
+	if element, ok := shard.entries[userID]; ok {
+		shard.remove(element)
+	}
+	shard.entries[userID] = shard.lru.PushFront(entry)
+	shard.bytes += entry.bytes
+	for shard.bytes > c.shardBytes {
+		shard.remove(shard.lru.Back())
+		c.evictions.Add(1)
+	}
+	return habits, complete, nil
+}
+
+// shard returns the shard a user is cached in
+func (c *HabitCache) shard(userID int64) *habitCacheShard {
+	return &c.shards[uint64(userID)%habitCacheShards]
+}
+
+// remove drops an entry from the shard; the caller holds the shard's lock
+func (s *habitCacheShard) remove(element *list.Element) {
+	entry := s.lru.Remove(element).(*habitCacheEntry)
+	delete(s.entries, entry.userID)
+	s.bytes -= entry.bytes
+}
+
+// cachedHabitRepository serves a user's habit reads from a HabitCache and drops
+// the user's cached habits whenever one of them is written
+type cachedHabitRepository struct {
+	repo  HabitRepository
+	cache *HabitCache
+}
+
+// NewCachedHabitRepository wraps repo with a read-through cache of each user's habits.
+// Every habit write must go through the returned repository to keep the cache current.
+func NewCachedHabitRepository(repo HabitRepository, cache *HabitCache) HabitRepository {
+	return &cachedHabitRepository{repo: repo, cache: cache}
+}
+
+// Create creates a habit and invalidates its owner's cached habits
+func (r *cachedHabitRepository) Create(userID int64, habit *models.CreateHabitRequest) (*models.Habit, error) {
+	created, err := r.repo.Create(userID, habit)
+	if err != nil {
+		return nil, err
+	}
+	r.cache.Invalidate(userID)
+	return created, nil
+}
+
+// GetByID reads a habit without an owner from the database
+func (r *cachedHabitRepository) GetByID(id int64) (*models.Habit, error) {
+	return r.repo.GetByID(id)
+}
+
+// GetByIDForUser finds a habit in the user's cached habits
+func (r *cachedHabitRepository) GetByIDForUser(id int64, userID int64) (*models.Habit, error) {
+	habits, ok, err := r.userHabits(userID)
+	if err != nil {
+		return nil, err
+	}
+	if !ok {
+		return r.repo.GetByIDForUser(id, userID)
+	}
+	for _, habit := range habits {
+		if habit.ID == id {
+			found := &models.Habit{}
+			copyHabit(found, habit)
+			return found, nil
+		}
+	}
+	return nil, fmt.Errorf("habit not found")
+}
+
+// ListByUserID returns a copy of the user's cached habits, newest first
+func (r *cachedHabitRepository) ListByUserID(userID int64) ([]*models.Habit, error) {
+	habits, ok, err := r.userHabits(userID)
+	if err != nil {
+		return nil, err
+	}
+	if !ok {
+		return r.repo.ListByUserID(userID)
+	}
+	return copyHabits(habits), nil
+}
+
+// GetByUserID pages through the user's cached habits
+func (r *cachedHabitRepository) GetByUserID(userID int64, page *models.PageRequest) ([]*models.Habit, *models.Page, error) {
+	habits, ok, err := r.userHabits(userID)
+	if err != nil {
+		return nil, nil, err
+	}
+	if !ok {
+		return r.repo.GetByUserID(userID, page)
+	}
+	items, result := pageHabits(habits, page)
+	return copyHabits(items), result, nil
+}
+
+// StreamByUserID passes the cursors of one page of the user's cached habits to
+// start, then the page to emit. Every field is set; callers project the requested ones.
+func (r *cachedHabitRepository) StreamByUserID(ctx context.Context, userID int64, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Habit) error) error {
+	habits, ok, err := r.userHabits(userID)
+	if err != nil {
+		return err
+	}
+	if !ok {
+		return r.repo.StreamByUserID(ctx, userID, fields, page, start, emit)
+	}
+	items, result := pageHabits(habits, page)
+	if err := start(result); err != nil {
+		return err
+	}
+	for _, habit := range copyHabits(items) {
+		if err := ctx.Err(); err != nil {
+			return err
+		}
+		if err := emit(habit); err != nil {
+			return err
+		}
+	}
+	return nil
+}
+
+// Update updates a habit and invalidates its owner's cached habits
+func (r *cachedHabitRepository) Update(id int64, req *models.UpdateHabitRequest) (*models.Habit, error) {
+	updated, err := r.repo.Update(id, req)
+	if err != nil {
+		return nil, err
+	}
+	r.cache.Invalidate(updated.UserID)
+	return updated, nil
+}
+
+// UpdateForUser updates a habit owned by the user and invalidates the user's cached habits
+func (r *cachedHabitRepository) UpdateForUser(id int64, userID int64, req *models.UpdateHabitRequest) (*models.Habit, error) {
+	updated, err := r.repo.UpdateForUser(id, userID, req)
+	if err != nil {
+		return nil, err
+	}
+	r.cache.Invalidate(userID)
+	return updated, nil
+}
+
+// Delete deletes a habit and invalidates its owner's cached habits
+func (r *cachedHabitRepository) Delete(id int64) error {
+	habit, err := r.repo.GetByID(id)
+	if err != nil {
+		return err
+	}
+	if err := r.repo.Delete(id); err != nil {
+		return err
+	}
+	r.cache.Invalidate(habit.UserID)
+	return nil
+}
+
+// DeleteForUser deletes a habit owned by the user and invalidates the user's cached habits
+func (r *cachedHabitRepository) DeleteForUser(id int64, userID int64) error {
+	if err := r.repo.DeleteForUser(id, userID); err != nil {
+		return err
+	}
+	r.cache.Invalidate(userID)
+	return nil
+}
+
+// userHabits returns the user's shared cached habits, loading them on a miss with
+// one bounded page. ok is false when they are too large to cache.
+func (r *cachedHabitRepository) userHabits(userID int64) ([]*models.Habit, bool, error) {
+	return r.cache.userHabits(userID, func(limit int) ([]*models.Habit, bool, error) {
+		habits, page, err := r.repo.GetByUserID(userID, &models.PageRequest{Limit: limit})
+		if err != nil {
+			return nil, false, err
+		}
+		return habits, page.NextCursor == "", nil
+	})
+}
+
+// pageHabits selects one page from habits ordered newest first, with the same
+// cursors the keyset queries return
+func pageHabits(habits []*models.Habit, page *models.PageRequest) ([]*models.Habit, *models.Page) {
+	result := &models.Page{}
+	if page.Limit == 0 {
+		return habits, result
+	}
+	if page.Before != nil {
+		// The page is the oldest habits newer than the cursor
+		end := 0
+		for end < len(habits) && cursorBefore(*page.Before, habitCursor(habits[end])) {
+			end++
+		}
+		start := end - page.Limit
+		if start > 0 {
+			result.PrevCursor = habitCursor(habits[start]).Encode()
+		} else {
+			start = 0
+		}
+		if end > start {
+			result.NextCursor = habitCursor(habits[end-1]).Encode()
+		}
+		return habits[start:end], result
+	}
+
+	start := 0
+	if page.After != nil {
+		for start < len(habits) && !cursorBefore(habitCursor(habits[start]), *page.After) {
+			start++
+		}
+	}
+	end := start + page.Limit
+	if end < len(habits) {
+		result.NextCursor = habitCursor(habits[end-1]).Encode()
+	} else {
+		end = len(habits)
+	}
+	if page.After != nil && end > start {
+		result.PrevCursor = habitCursor(habits[start]).Encode()
+	}
+	return habits[start:end], result
+}
+
+// cursorBefore reports whether a sorts before b in (created_at, id) order. Like
+// the stored created_at, cursors compare to the second.
+func cursorBefore(a, b models.Cursor) bool {
+	if a.CreatedAt.Unix() != b.CreatedAt.Unix() {
+		return a.CreatedAt.Unix() < b.CreatedAt.Unix()
+	}
+	return a.ID < b.ID
+}
+
+// copyHabits copies cached habits so callers can change them
+func copyHabits(habits []*models.Habit) []*models.Habit {
+	copies := make([]models.Habit, len(habits))
+	result := make([]*models.Habit, len(habits))
+	for i, habit := range habits {
+		copyHabit(&copies[i], habit)
+		result[i] = &copies[i]
+	}
+	return result
+}
+
+// copyHabit copies a cached habit into dst, including the values its pointer
+// fields point to, so nothing a caller changes reaches the cache
+func copyHabit(dst, src *models.Habit) {
+	*dst = *src
+	if src.DurationSeconds != nil {
+		duration := *src.DurationSeconds
+		dst.DurationSeconds = &duration
+	}
+}
@@ -1,6 +1,7 @@
 package repository
 
 import (
+	"context"
 	"database/sql"
 	"fmt"
 	"time"
@@ -12,54 +13,108 @@ import (
 type HabitRepository interface {
 	Create(userID int64, habit *models.CreateHabitRequest) (*models.Habit, error)
 	GetByID(id int64) (*models.Habit, error)
-	GetByUserID(userID int64) ([]*models.Habit, error)
+	GetByUserID(userID int64, page *models.PageRequest) ([]*models.Habit, *models.Page, error)
+	// ListByUserID reads every habit of a user, newest first
+	ListByUserID(userID int64) ([]*models.Habit, error)
+	StreamByUserID(ctx context.Context, userID int64, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Habit) error) error
 	Update(id int64, req *models.UpdateHabitRequest) (*models.Habit, error)
 	Delete(id int64) error
+
+	// User-scoped variants enforce ownership in the statement itself, so a habit
+	// owned by another user is reported as not found
+	GetByIDForUser(id int64, userID int64) (*models.Habit, error)
+	UpdateForUser(id int64, userID int64, req *models.UpdateHabitRequest) (*models.Habit, error)
+	DeleteForUser(id int64, userID int64) error
+}
+
+// habitColumns is the column list decoded by scanHabit
+const habitColumns = "id, user_id, name, description, duration_seconds, " + createdAtMillis
+
+// Hot-path statements; see ReadStatements and WriteStatements
+const (
+	insertHabitQuery          = "INSERT INTO habits (user_id, name, description, duration_seconds, created_at_ms) VALUES (?, ?, ?, ?, " + nowMillis + ") RETURNING " + habitColumns
+	selectHabitByIDQuery      = "SELECT " + habitColumns + " FROM habits WHERE id = ?"
+	selectHabitsByUserIDQuery = "SELECT " + habitColumns + " FROM habits WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?"
+	listHabitsByUserIDQuery   = "SELECT " + habitColumns + " FROM habits WHERE user_id = ? ORDER BY created_at DESC, id DESC"
+	deleteHabitQuery          = "DELETE FROM habits WHERE id = ?"
+
+	selectHabitByIDForUserQuery = "SELECT " + habitColumns + " FROM habits WHERE id = ? AND user_id = ?"
+	deleteHabitForUserQuery     = "DELETE FROM habits WHERE id = ? AND user_id = ?"
+
+	selectHabitsByUserIDAfterQuery  = "SELECT " + habitColumns + " FROM habits WHERE user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?"
+	selectHabitsByUserIDBeforeQuery = "SELECT " + habitColumns + " FROM habits WHERE user_id = ? AND (created_at, id) > (?, ?) ORDER BY created_at ASC, id ASC LIMIT ?"
+)
+
+// habitPageQueries are the keyset statements for GetByUserID
+var habitPageQueries = pageQueries{
+	first:  selectHabitsByUserIDQuery,
+	after:  selectHabitsByUserIDAfterQuery,
+	before: selectHabitsByUserIDBeforeQuery,
+}
+
+// habitPageKeyQueries read only the keys of a page of habits, for its cursors
+var habitPageKeyQueries = projectPageQueries(habitPageQueries, habitColumns, pageKeyColumns)
+
+// habitFieldColumns maps each field in models.HabitFields to its column
+var habitFieldColumns = map[string]string{
+	"id":               "id",
+	"user_id":          "user_id",
+	"name":             "name",
+	"description":      "description",
+	"duration_seconds": "duration_seconds",
+	"created_at":       createdAtMillis,
 }
 
 // habitRepository implements HabitRepository
 type habitRepository struct {
-	db *sql.DB
+	db DB
 }
 
 // NewHabitRepository creates a new habit repository
-func NewHabitRepository(db *sql.DB) HabitRepository {
+func NewHabitRepository(db DB) HabitRepository {
 	return &habitRepository{db: db}
 }
 
-// Create creates a new habit in the database
+// scanHabit decodes a row selected or returned with habitColumns
+func scanHabit(row rowScanner) (*models.Habit, error) {
+	habit := &models.Habit{}
+	var createdAtMs int64
+	var durationSeconds sql.NullInt64
+
+	if err := row.Scan(&habit.ID, &habit.UserID, &habit.Name, &habit.Description, &durationSeconds, &createdAtMs); err != nil {
+		return nil, err
+	}
+
+	// Set duration_seconds if not null
+	if durationSeconds.Valid {
+		duration := int(durationSeconds.Int64)
+		habit.DurationSeconds = &duration
+	}
+
+	// Decode created_at from Unix milliseconds
+	habit.CreatedAt = time.UnixMilli(createdAtMs).UTC()
+
+	return habit, nil
+}
+
+// Create creates a new habit in the database and returns the stored row
 func (r *habitRepository) Create(userID int64, habit *models.CreateHabitRequest) (*models.Habit, error) {
-	// Insert the habit
-	result, err := r.db.Exec(
-		"INSERT INTO habits (user_id, name, description, duration_seconds) VALUES (?, ?, ?, ?)",
+	// Insert the habit and read it back in the same statement
+	created, err := scanHabit(r.db.ExecReturning(
+		insertHabitQuery,
 		userID, habit.Name, habit.Description, habit.DurationSeconds,
-	)
+	))
 	if err != nil {
 		return nil, fmt.Errorf("failed to create habit: %w", err)
 	}
 
-	// Get the inserted ID
-	id, err := result.LastInsertId()
-	if err != nil {
-		return nil, fmt.Errorf("failed to get inserted habit ID: %w", err)
-	}
-
-	// Retrieve and return the created habit
-	return r.GetByID(id)
+	return created, nil
 }
 
 // GetByID retrieves a habit by ID
 func (r *habitRepository) GetByID(id int64) (*models.Habit, error) {
-	habit := &models.Habit{}
-	var createdAt string
-	var durationSeconds sql.NullInt64
-
 	// Query the habit
-	err := r.db.QueryRow(
-		"SELECT id, user_id, name, description, duration_seconds, created_at FROM habits WHERE id = ?",
-		id,
-	).Scan(&habit.ID, &habit.UserID, &habit.Name, &habit.Description, &durationSeconds, &createdAt)
-
+	habit, err := scanHabit(r.db.QueryRow(selectHabitByIDQuery, id))
 	if err == sql.ErrNoRows {
 		return nil, fmt.Errorf("habit not found")
 	}
@@ -67,32 +122,35 @@ func (r *habitRepository) GetByID(id int64) (*models.Habit, error) {
 		return nil, fmt.Errorf("failed to get habit: %w", err)
 	}
 
-	// Set duration_seconds if not null
-	if durationSeconds.Valid {
-		duration := int(durationSeconds.Int64)
-		habit.DurationSeconds = &duration
-	}
+	return habit, nil
+}
 
-	// Parse created_at timestamp
-	habit.CreatedAt, err = time.Parse("2006-01-02 15:04:05", createdAt)
+// GetByIDForUser retrieves a habit by ID if it belongs to the user
+func (r *habitRepository) GetByIDForUser(id int64, userID int64) (*models.Habit, error) {
+	habit, err := scanHabit(r.db.QueryRow(selectHabitByIDForUserQuery, id, userID))
+	if err == sql.ErrNoRows {
+		return nil, fmt.Errorf("habit not found")
+	}
 	if err != nil {
-		// Try alternative format
-		habit.CreatedAt, err = time.Parse(time.RFC3339, createdAt)
-		if err != nil {
-			return nil, fmt.Errorf("failed to parse created_at: %w", err)
-		}
+		return nil, fmt.Errorf("failed to get habit: %w", err)
 	}
 
 	return habit, nil
 }
 
-// GetByUserID retrieves all habits for a user
-func (r *habitRepository) GetByUserID(userID int64) ([]*models.Habit, error) {
-	// Query all habits for the user
-	rows, err := r.db.Query(
-		"SELECT id, user_id, name, description, duration_seconds, created_at FROM habits WHERE user_id = ? ORDER BY created_at DESC",
-		userID,
-	)
+// GetByUserID retrieves one page of habits for a user, newest first
+func (r *habitRepository) GetByUserID(userID int64, page *models.PageRequest) ([]*models.Habit, *models.Page, error) {
+	habits, result, err := queryPage(r.db, habitPageQueries, []interface{}{userID}, page, scanHabit, habitCursor)
+	if err != nil {
+		return nil, nil, fmt.Errorf("failed to get habits: %w", err)
+	}
+
+	return habits, result, nil
+}
+
+// ListByUserID retrieves all of a user's habits, newest first
+func (r *habitRepository) ListByUserID(userID int64) ([]*models.Habit, error) {
+	rows, err := r.db.Query(listHabitsByUserIDQuery, userID)
 	if err != nil {
 		return nil, fmt.Errorf("failed to get habits: %w", err)
 	}
@@ -100,13 +158,65 @@ func (r *habitRepository) GetByUserID(userID int64) ([]*models.Habit, error) {
 
 	habits := []*models.Habit{}
 	for rows.Next() {
+		habit, err := scanHabit(rows)
+		if err != nil {
+			return nil, fmt.Errorf("failed to scan habit: %w", err)
+		}
+		habits = append(habits, habit)
+	}
+
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating habits: %w", err)
+	}
+
+	return habits, nil
+}
+
+// StreamByUserID passes the cursors of one page of habits for a user to start, then
+// the page's habits to emit as they are read, newest first. Only the columns for
+// fields are selected; a nil FieldSet selects all.
+func (r *habitRepository) StreamByUserID(ctx context.Context, userID int64, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Habit) error) error {
+	queries, scan := habitPageQueries, scanHabit
+	if fields != nil {
+		selected := selectedFields(fields)
+		queries = projectPageQueries(habitPageQueries, habitColumns, projectColumns(selected, habitFieldColumns))
+		scan = scanHabitFields(selected)
+	}
+
+	err := streamPage(ctx, r.db, queries, habitPageKeyQueries, []interface{}{userID}, page, scan, habitCursor, start, emit)
+	if err != nil {
+		return fmt.Errorf("failed to stream habits: %w", err)
+	}
+
+	return nil
+}
+
+// scanHabitFields returns a decoder for rows selected with the columns for selected
+func scanHabitFields(selected []string) func(rowScanner) (*models.Habit, error) {
+	return func(row rowScanner) (*models.Habit, error) {
 		habit := &models.Habit{}
-		var createdAt string
+		var createdAtMs int64
 		var durationSeconds sql.NullInt64
 
-		err := rows.Scan(&habit.ID, &habit.UserID, &habit.Name, &habit.Description, &durationSeconds, &createdAt)
-		if err != nil {
-			return nil, fmt.Errorf("failed to scan habit: %w", err)
+		dest := make([]interface{}, len(selected))
+		for i, field := range selected {
+			switch field {
+			case "id":
+				dest[i] = &habit.ID
+			case "user_id":
+				dest[i] = &habit.UserID
+			case "name":
+				dest[i] = &habit.Name
+			case "description":
+				dest[i] = &habit.Description
+			case "duration_seconds":
+				dest[i] = &durationSeconds
+			case "created_at":
+				dest[i] = &createdAtMs
+			}
+		}
+		if err := row.Scan(dest...); err != nil {
+			return nil, err
 		}
 
 		// Set duration_seconds if not null
@@ -115,28 +225,45 @@ func (r *habitRepository) GetByUserID(userID int64) ([]*models.Habit, error) {
 			habit.DurationSeconds = &duration
 		}
 
-		// Parse created_at timestamp
-		habit.CreatedAt, err = time.Parse("2006-01-02 15:04:05", createdAt)
-		if err != nil {
-			// Try alternative format
-			habit.CreatedAt, err = time.Parse(time.RFC3339, createdAt)
-			if err != nil {
-				return nil, fmt.Errorf("failed to parse created_at: %w", err)
-			}
-		}
+		// Decode created_at from Unix milliseconds
+		habit.CreatedAt = time.UnixMilli(createdAtMs).UTC()
 
-		habits = append(habits, habit)
+		return habit, nil
+	}
+}
+
+// habitCursor returns the pagination cursor positioned at habit
+func habitCursor(habit *models.Habit) models.Cursor {
+	return models.Cursor{CreatedAt: habit.CreatedAt, ID: habit.ID}
+}
+
+// Update updates a habit in the database and returns the stored row
+func (r *habitRepository) Update(id int64, req *models.UpdateHabitRequest) (*models.Habit, error) {
+	query, args := buildHabitUpdate(req)
+
+	// No fields to update
+	if query == "" {
+		return r.GetByID(id)
 	}
 
-	if err = rows.Err(); err != nil {
-		return nil, fmt.Errorf("error iterating habits: %w", err)
+	return r.update(query+" WHERE id = ? RETURNING "+habitColumns, append(args, id)...)
+}
+
+// UpdateForUser updates a habit owned by the user and returns the stored row
+func (r *habitRepository) UpdateForUser(id int64, userID int64, req *models.UpdateHabitRequest) (*models.Habit, error) {
+	query, args := buildHabitUpdate(req)
+
+	// No fields to update
+	if query == "" {
+		return r.GetByIDForUser(id, userID)
 	}
 
-	return habits, nil
+	return r.update(query+" WHERE id = ? AND user_id = ? RETURNING "+habitColumns, append(args, id, userID)...)
 }
 
-// Update updates a habit in the database
-func (r *habitRepository) Update(id int64, req *models.UpdateHabitRequest) (*models.Habit, error) {
+// buildHabitUpdate builds the SET part of an update for the provided fields, or
+// returns an empty query if there is nothing to update
+func buildHabitUpdate(req *models.UpdateHabitRequest) (string, []interface{}) {
 	// Build dynamic update query
 	query := "UPDATE habits SET "
 	args := []interface{}{}
@@ -155,9 +282,8 @@ func (r *habitRepository) Update(id int64, req *models.UpdateHabitRequest) (*mod
 		args = append(args, *req.DurationSeconds)
 	}
 
-	// No fields to update
 	if len(updates) == 0 {
-		return r.GetByID(id)
+		return "", nil
 	}
 
 	// Build the complete query
@@ -167,23 +293,36 @@ func (r *habitRepository) Update(id int64, req *models.UpdateHabitRequest) (*mod
 		}
 		query += update
 	}
-	query += " WHERE id = ?"
-	args = append(args, id)
+	return query, args
+}
 
-	// Execute the update
-	_, err := r.db.Exec(query, args...)
+// update executes an UPDATE ... RETURNING and decodes the stored row
+func (r *habitRepository) update(query string, args ...interface{}) (*models.Habit, error) {
+	habit, err := scanHabit(r.db.ExecReturning(query, args...))
+	if err == sql.ErrNoRows {
+		return nil, fmt.Errorf("habit not found")
+	}
 	if err != nil {
 		return nil, fmt.Errorf("failed to update habit: %w", err)
 	}
 
-	// Retrieve and return the updated habit
-	return r.GetByID(id)
+	return habit, nil
 }
 
 // Delete deletes a habit from the database
 func (r *habitRepository) Delete(id int64) error {
+	return r.delete(deleteHabitQuery, id)
+}
+
+// DeleteForUser deletes a habit if it belongs to the user
+func (r *habitRepository) DeleteForUser(id int64, userID int64) error {
+	return r.delete(deleteHabitForUserQuery, id, userID)
+}
+
+// delete executes a DELETE and reports a missing row as not found
+func (r *habitRepository) delete(query string, args ...interface{}) error {
 	// Delete the habit
-	result, err := r.db.Exec("DELETE FROM habits WHERE id = ?", id)
+	result, err := r.db.Exec(query, args...)
 	if err != nil {
 		return fmt.Errorf("failed to delete habit: %w", err)
 	}
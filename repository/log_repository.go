@@ -1,7 +1,9 @@
 package repository
 
 import (
+	"context"
 	"database/sql"
+	"errors"
 	"fmt"
 	"time"
 
@@ -12,54 +14,179 @@ import (
 type LogRepository interface {
 	Create(habitID int64, log *models.CreateLogRequest) (*models.Log, error)
 	GetByID(id int64) (*models.Log, error)
-	GetByHabitID(habitID int64) ([]*models.Log, error)
+	GetByHabitID(habitID int64, timeRange *models.TimeRange, page *models.PageRequest) ([]*models.Log, *models.Page, error)
+	StreamByHabitID(ctx context.Context, habitID int64, timeRange *models.TimeRange, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Log) error) error
+	StreamByUserID(ctx context.Context, userID int64, since time.Time, emit func(*models.Log) error) error
 	Update(id int64, req *models.UpdateLogRequest) (*models.Log, error)
 	Delete(id int64) error
+
+	// User-scoped variants enforce habit ownership, and the habit's duration
+	// requirement, in the statement itself. A log or habit owned by another
+	// user is reported as not found. utcOffset is the user's current offset from
+	// UTC, which dates the log for the daily rollups.
+	CreateForUser(habitID int64, userID int64, log *models.CreateLogRequest, utcOffset time.Duration) (*models.Log, error)
+	GetByIDForUser(id int64, userID int64) (*models.Log, error)
+	UpdateForUser(id int64, userID int64, req *models.UpdateLogRequest) (*models.Log, error)
+	DeleteForUser(id int64, userID int64) (*models.Log, error)
+}
+
+// ErrDurationRequired is returned when a log for a habit with a duration would have no duration
+var ErrDurationRequired = errors.New("duration_seconds is required for this habit")
+
+// logColumns is the column list decoded by scanLog
+const logColumns = "id, habit_id, notes, duration_seconds, " + createdAtMillis
+
+// Hot-path statements; see ReadStatements and WriteStatements
+const (
+	insertLogQuery           = "INSERT INTO logs (habit_id, notes, duration_seconds, created_at_ms) VALUES (?, ?, ?, " + nowMillis + ") RETURNING " + logColumns
+	selectLogByIDQuery       = "SELECT " + logColumns + " FROM logs WHERE id = ?"
+	selectLogsByHabitIDQuery = "SELECT " + logColumns + " FROM logs WHERE habit_id = ? AND created_at >= ? AND created_at < ? ORDER BY created_at DESC, id DESC LIMIT ?"
+	deleteLogQuery           = "DELETE FROM logs WHERE id = ?"
+
+	// logOwnedByUser restricts a logs statement to logs whose habit belongs to the user
+	logOwnedByUser = "EXISTS (SELECT 1 FROM habits WHERE habits.id = logs.habit_id AND habits.user_id = ?)"
+	// logKeepsRequiredDuration rejects an update that leaves a log without a duration its habit requires
+	logKeepsRequiredDuration = "(duration_seconds IS NOT NULL OR NOT EXISTS (SELECT 1 FROM habits WHERE habits.id = logs.habit_id AND habits.duration_seconds IS NOT NULL))"
+
+	insertLogForUserQuery     = "INSERT INTO logs (habit_id, notes, duration_seconds, created_at_ms, local_date) SELECT id, ?, ?, " + nowMillis + ", date('now', ?) FROM habits WHERE id = ? AND user_id = ? AND (duration_seconds IS NULL OR ? IS NOT NULL) RETURNING " + logColumns
+	selectLogByIDForUserQuery = "SELECT " + logColumns + " FROM logs WHERE id = ? AND " + logOwnedByUser
+	deleteLogForUserQuery     = "DELETE FROM logs WHERE id = ? AND " + logOwnedByUser + " RETURNING " + logColumns
+	selectHabitForLogQuery    = "SELECT duration_seconds IS NOT NULL FROM habits WHERE id = ? AND user_id = ?"
+
+	// The cursor pages fold the range end they walk towards from into the cursor, so the
+	// index scan starts at the cursor however deep it is: after starts below the earlier of
+	// the cursor and to (with id 0 when to comes first, as to is exclusive), and before
+	// starts above the later of the cursor and from (with id 0 when from comes last, as
+	// from is inclusive). Parameters are ?1 habit, ?2 from, ?3 to, ?4 and ?5 the cursor's
+	// created_at and id, ?6 the limit.
+	selectLogsByHabitIDAfterQuery = "SELECT " + logColumns + " FROM logs WHERE habit_id = ?1 AND created_at >= ?2 " +
+		"AND (created_at, id) < (min(?4, ?3), CASE WHEN ?4 < ?3 THEN ?5 ELSE 0 END) ORDER BY created_at DESC, id DESC LIMIT ?6"
+	selectLogsByHabitIDBeforeQuery = "SELECT " + logColumns + " FROM logs WHERE habit_id = ?1 AND created_at < ?3 " +
+		"AND (created_at, id) > (max(?4, ?2), CASE WHEN ?4 >= ?2 THEN ?5 ELSE 0 END) ORDER BY created_at ASC, id ASC LIMIT ?6"
+)
+
+// selectLogsByUserIDSinceQuery reads a user's logs across all habits in one join.
+// Habits are walked newest first on (user_id, created_at, id) and each habit's
+// logs newest first on (habit_id, created_at, id), so the rows arrive grouped by
+// habit without a sort.
+var selectLogsByUserIDSinceQuery = "SELECT logs.id, logs.habit_id, logs.notes, logs.duration_seconds, " +
+	tableCreatedAtMillis("logs") + " " +
+	"FROM habits JOIN logs ON logs.habit_id = habits.id " +
+	"WHERE habits.user_id = ? AND logs.created_at >= ? " +
+	"ORDER BY habits.created_at DESC, habits.id DESC, logs.created_at DESC, logs.id DESC"
+
+// logPageQueries are the keyset statements for GetByHabitID
+var logPageQueries = pageQueries{
+	first:  selectLogsByHabitIDQuery,
+	after:  selectLogsByHabitIDAfterQuery,
+	before: selectLogsByHabitIDBeforeQuery,
+}
+
+// logPageKeyQueries read only the keys of a page of logs, for its cursors
+var logPageKeyQueries = projectPageQueries(logPageQueries, logColumns, pageKeyColumns)
+
+// logFieldColumns maps each field in models.LogFields to its column
+var logFieldColumns = map[string]string{
+	"id":               "id",
+	"habit_id":         "habit_id",
+	"notes":            "notes",
+	"duration_seconds": "duration_seconds",
+	"created_at":       createdAtMillis,
 }
 
 // logRepository implements LogRepository
 type logRepository struct {
-	db *sql.DB
+	db DB
 }
 
 // NewLogRepository creates a new log repository
-func NewLogRepository(db *sql.DB) LogRepository {
+func NewLogRepository(db DB) LogRepository {
 	return &logRepository{db: db}
 }
 
-// Create creates a new log in the database
+// scanLog decodes a row selected or returned with logColumns
+func scanLog(row rowScanner) (*models.Log, error) {
+	log := &models.Log{}
+	var createdAtMs int64
+	var durationSeconds sql.NullInt64
+
+	if err := row.Scan(&log.ID, &log.HabitID, &log.Notes, &durationSeconds, &createdAtMs); err != nil {
+		return nil, err
+	}
+
+	// Set duration_seconds if not null
+	if durationSeconds.Valid {
+		duration := int(durationSeconds.Int64)
+		log.DurationSeconds = &duration
+	}
+
+	// Decode created_at from Unix milliseconds
+	log.CreatedAt = time.UnixMilli(createdAtMs).UTC()
+
+	return log, nil
+}
+
+// Create creates a new log in the database and returns the stored row. It does not
+// know the owner's time zone, so the log is left without a local_date and is counted
+// in the daily rollups once the backfill dates it.
 func (r *logRepository) Create(habitID int64, log *models.CreateLogRequest) (*models.Log, error) {
-	// Insert the log
-	result, err := r.db.Exec(
-		"INSERT INTO logs (habit_id, notes, duration_seconds) VALUES (?, ?, ?)",
+	// Insert the log and read it back in the same statement
+	created, err := scanLog(r.db.ExecReturning(
+		insertLogQuery,
 		habitID, log.Notes, log.DurationSeconds,
-	)
+	))
 	if err != nil {
 		return nil, fmt.Errorf("failed to create log: %w", err)
 	}
 
-	// Get the inserted ID
-	id, err := result.LastInsertId()
+	return created, nil
+}
+
+// GetByID retrieves a log by ID
+func (r *logRepository) GetByID(id int64) (*models.Log, error) {
+	// Query the log
+	log, err := scanLog(r.db.QueryRow(selectLogByIDQuery, id))
+	if err == sql.ErrNoRows {
+		return nil, fmt.Errorf("log not found")
+	}
 	if err != nil {
-		return nil, fmt.Errorf("failed to get inserted log ID: %w", err)
+		return nil, fmt.Errorf("failed to get log: %w", err)
 	}
 
-	// Retrieve and return the created log
-	return r.GetByID(id)
+	return log, nil
 }
 
-// GetByID retrieves a log by ID
-func (r *logRepository) GetByID(id int64) (*models.Log, error) {
-	log := &models.Log{}
-	var createdAt string
-	var durationSeconds sql.NullInt64
+// CreateForUser creates a new log for a habit owned by the user and returns the stored row.
+// The log's local_date fires the trigger that counts it in the habit's daily rollup
+// within the same statement.
+func (r *logRepository) CreateForUser(habitID int64, userID int64, log *models.CreateLogRequest, utcOffset time.Duration) (*models.Log, error) {
+	// Insert the log only if the habit belongs to the user and its duration requirement is met
+	created, err := scanLog(r.db.ExecReturning(
+		insertLogForUserQuery,
+		log.Notes, log.DurationSeconds, offsetModifier(utcOffset), habitID, userID, log.DurationSeconds,
+	))
+	if err == sql.ErrNoRows {
+		// Nothing was inserted; find out why. This only runs on the failure path.
+		var requiresDuration bool
+		err := r.db.QueryRow(selectHabitForLogQuery, habitID, userID).Scan(&requiresDuration)
+		if err == sql.ErrNoRows {
+			return nil, fmt.Errorf("habit not found")
+		}
+		if err != nil {
+			return nil, fmt.Errorf("failed to get habit: %w", err)
+		}
+		return nil, ErrDurationRequired
+	}
+	if err != nil {
+		return nil, fmt.Errorf("failed to create log: %w", err)
+	}
 
-	// Query the log
-	err := r.db.QueryRow(
-		"SELECT id, habit_id, notes, duration_seconds, created_at FROM logs WHERE id = ?",
-		id,
-	).Scan(&log.ID, &log.HabitID, &log.Notes, &durationSeconds, &createdAt)
+	return created, nil
+}
 
+// GetByIDForUser retrieves a log by ID if its habit belongs to the user
+func (r *logRepository) GetByIDForUser(id int64, userID int64) (*models.Log, error) {
+	log, err := scanLog(r.db.QueryRow(selectLogByIDForUserQuery, id, userID))
 	if err == sql.ErrNoRows {
 		return nil, fmt.Errorf("log not found")
 	}
@@ -67,46 +194,91 @@ func (r *logRepository) GetByID(id int64) (*models.Log, error) {
 		return nil, fmt.Errorf("failed to get log: %w", err)
 	}
 
-	// Set duration_seconds if not null
-	if durationSeconds.Valid {
-		duration := int(durationSeconds.Int64)
-		log.DurationSeconds = &duration
+	return log, nil
+}
+
+// GetByHabitID retrieves one page of logs for a habit created within timeRange, newest first
+func (r *logRepository) GetByHabitID(habitID int64, timeRange *models.TimeRange, page *models.PageRequest) ([]*models.Log, *models.Page, error) {
+	from, to := rangeBounds(timeRange)
+	logs, result, err := queryPage(r.db, logPageQueries, []interface{}{habitID, from, to}, page, scanLog, logCursor)
+	if err != nil {
+		return nil, nil, fmt.Errorf("failed to get logs: %w", err)
+	}
+
+	return logs, result, nil
+}
+
+// StreamByHabitID passes the cursors of one page of logs for a habit created within
+// timeRange to start, then the page's logs to emit as they are read, newest first.
+// Only the columns for fields are selected; a nil FieldSet selects all.
+func (r *logRepository) StreamByHabitID(ctx context.Context, habitID int64, timeRange *models.TimeRange, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Log) error) error {
+	queries, scan := logPageQueries, scanLog
+	if fields != nil {
+		selected := selectedFields(fields)
+		queries = projectPageQueries(logPageQueries, logColumns, projectColumns(selected, logFieldColumns))
+		scan = scanLogFields(selected)
 	}
 
-	// Parse created_at timestamp
-	log.CreatedAt, err = time.Parse("2006-01-02 15:04:05", createdAt)
+	from, to := rangeBounds(timeRange)
+	err := streamPage(ctx, r.db, queries, logPageKeyQueries, []interface{}{habitID, from, to}, page, scan, logCursor, start, emit)
 	if err != nil {
-		// Try alternative format
-		log.CreatedAt, err = time.Parse(time.RFC3339, createdAt)
-		if err != nil {
-			return nil, fmt.Errorf("failed to parse created_at: %w", err)
-		}
+		return fmt.Errorf("failed to stream logs: %w", err)
 	}
 
-	return log, nil
+	return nil
 }
 
-// GetByHabitID retrieves all logs for a habit
-func (r *logRepository) GetByHabitID(habitID int64) ([]*models.Log, error) {
-	// Query all logs for the habit
-	rows, err := r.db.Query(
-		"SELECT id, habit_id, notes, duration_seconds, created_at FROM logs WHERE habit_id = ? ORDER BY created_at DESC",
-		habitID,
-	)
+// StreamByUserID passes every log created since since on the user's habits to
+// emit as they are read, grouped by habit with the newest habit first and each
+// habit's logs newest first
+func (r *logRepository) StreamByUserID(ctx context.Context, userID int64, since time.Time, emit func(*models.Log) error) error {
+	rows, err := r.db.QueryContext(ctx, selectLogsByUserIDSinceQuery, userID, since.UTC().Format(timestampLayout))
 	if err != nil {
-		return nil, fmt.Errorf("failed to get logs: %w", err)
+		return fmt.Errorf("failed to get logs: %w", err)
 	}
 	defer rows.Close()
 
-	logs := []*models.Log{}
 	for rows.Next() {
+		log, err := scanLog(rows)
+		if err != nil {
+			return fmt.Errorf("failed to scan log: %w", err)
+		}
+		if err := emit(log); err != nil {
+			return err
+		}
+	}
+
+	if err = rows.Err(); err != nil {
+		return fmt.Errorf("error iterating logs: %w", err)
+	}
+
+	return nil
+}
+
+// scanLogFields returns a decoder for rows selected with the columns for selected
+func scanLogFields(selected []string) func(rowScanner) (*models.Log, error) {
+	return func(row rowScanner) (*models.Log, error) {
 		log := &models.Log{}
-		var createdAt string
+		var createdAtMs int64
 		var durationSeconds sql.NullInt64
 
-		err := rows.Scan(&log.ID, &log.HabitID, &log.Notes, &durationSeconds, &createdAt)
-		if err != nil {
-			return nil, fmt.Errorf("failed to scan log: %w", err)
+		dest := make([]interface{}, len(selected))
+		for i, field := range selected {
+			switch field {
+			case "id":
+				dest[i] = &log.ID
+			case "habit_id":
+				dest[i] = &log.HabitID
+			case "notes":
+				dest[i] = &log.Notes
+			case "duration_seconds":
+				dest[i] = &durationSeconds
+			case "created_at":
+				dest[i] = &createdAtMs
+			}
+		}
+		if err := row.Scan(dest...); err != nil {
+			return nil, err
 		}
 
 		// Set duration_seconds if not null
@@ -115,28 +287,74 @@ func (r *logRepository) GetByHabitID(habitID int64) ([]*models.Log, error) {
 			log.DurationSeconds = &duration
 		}
 
-		// Parse created_at timestamp
-		log.CreatedAt, err = time.Parse("2006-01-02 15:04:05", createdAt)
-		if err != nil {
-			// Try alternative format
-			log.CreatedAt, err = time.Parse(time.RFC3339, createdAt)
-			if err != nil {
-				return nil, fmt.Errorf("failed to parse created_at: %w", err)
-			}
-		}
+		// Decode created_at from Unix milliseconds
+		log.CreatedAt = time.UnixMilli(createdAtMs).UTC()
 
-		logs = append(logs, log)
+		return log, nil
 	}
+}
 
-	if err = rows.Err(); err != nil {
-		return nil, fmt.Errorf("error iterating logs: %w", err)
+// logCursor returns the pagination cursor positioned at log
+func logCursor(log *models.Log) models.Cursor {
+	return models.Cursor{CreatedAt: log.CreatedAt, ID: log.ID}
+}
+
+// Update updates a log in the database and returns the stored row
+func (r *logRepository) Update(id int64, req *models.UpdateLogRequest) (*models.Log, error) {
+	query, args := buildLogUpdate(req)
+
+	// No fields to update
+	if query == "" {
+		return r.GetByID(id)
+	}
+
+	log, err := scanLog(r.db.ExecReturning(query+" WHERE id = ? RETURNING "+logColumns, append(args, id)...))
+	if err == sql.ErrNoRows {
+		return nil, fmt.Errorf("log not found")
+	}
+	if err != nil {
+		return nil, fmt.Errorf("failed to update log: %w", err)
 	}
 
-	return logs, nil
+	return log, nil
 }
 
-// Update updates a log in the database
-func (r *logRepository) Update(id int64, req *models.UpdateLogRequest) (*models.Log, error) {
+// UpdateForUser updates a log whose habit belongs to the user and returns the stored row
+func (r *logRepository) UpdateForUser(id int64, userID int64, req *models.UpdateLogRequest) (*models.Log, error) {
+	query, args := buildLogUpdate(req)
+
+	// No fields to update
+	if query == "" {
+		return r.GetByIDForUser(id, userID)
+	}
+
+	query += " WHERE id = ? AND " + logOwnedByUser
+	args = append(args, id, userID)
+	// A provided duration is never null, so the habit's requirement only needs
+	// checking when the existing duration is kept
+	if req.DurationSeconds == nil {
+		query += " AND " + logKeepsRequiredDuration
+	}
+	query += " RETURNING " + logColumns
+
+	log, err := scanLog(r.db.ExecReturning(query, args...))
+	if err == sql.ErrNoRows {
+		// Nothing was updated; find out why. This only runs on the failure path.
+		if _, err := r.GetByIDForUser(id, userID); err != nil {
+			return nil, err
+		}
+		return nil, ErrDurationRequired
+	}
+	if err != nil {
+		return nil, fmt.Errorf("failed to update log: %w", err)
+	}
+
+	return log, nil
+}
+
+// buildLogUpdate builds the SET part of an update for the provided fields, or
+// returns an empty query if there is nothing to update
+func buildLogUpdate(req *models.UpdateLogRequest) (string, []interface{}) {
 	// Build dynamic update query
 	query := "UPDATE logs SET "
 	args := []interface{}{}
@@ -151,9 +369,8 @@ func (r *logRepository) Update(id int64, req *models.UpdateLogRequest) (*models.
 		args = append(args, *req.DurationSeconds)
 	}
 
-	// No fields to update
 	if len(updates) == 0 {
-		return r.GetByID(id)
+		return "", nil
 	}
 
 	// Build the complete query
@@ -163,23 +380,31 @@ func (r *logRepository) Update(id int64, req *models.UpdateLogRequest) (*models.
 		}
 		query += update
 	}
-	query += " WHERE id = ?"
-	args = append(args, id)
+	return query, args
+}
+
+// Delete deletes a log from the database
+func (r *logRepository) Delete(id int64) error {
+	return r.delete(deleteLogQuery, id)
+}
 
-	// Execute the update
-	_, err := r.db.Exec(query, args...)
+// DeleteForUser deletes a log if its habit belongs to the user and returns the deleted row
+func (r *logRepository) DeleteForUser(id int64, userID int64) (*models.Log, error) {
+	deleted, err := scanLog(r.db.ExecReturning(deleteLogForUserQuery, id, userID))
+	if err == sql.ErrNoRows {
+		return nil, fmt.Errorf("log not found")
+	}
 	if err != nil {
-		return nil, fmt.Errorf("failed to update log: %w", err)
+		return nil, fmt.Errorf("failed to delete log: %w", err)
 	}
 
-	// Retrieve and return the updated log
-	return r.GetByID(id)
+	return deleted, nil
 }
 
-// Delete deletes a log from the database
-func (r *logRepository) Delete(id int64) error {
+// delete executes a DELETE and reports a missing row as not found
+func (r *logRepository) delete(query string, args ...interface{}) error {
 	// Delete the log
-	result, err := r.db.Exec("DELETE FROM logs WHERE id = ?", id)
+	result, err := r.db.Exec(query, args...)
 	if err != nil {
 		return fmt.Errorf("failed to delete log: %w", err)
 	}
@@ -0,0 +1,94 @@
+package repository
+
+import (
+	"context"
+	"path/filepath"
+	"strings"
+	"testing"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/migrations"
+)
+
+// openTestDatabase creates a migrated WAL database in a temporary directory, with
+// the background migrations, which build the list indexes, finished
+func openTestDatabase(t *testing.T) *config.Database {
+	t.Helper()
+
+	cfg := config.DefaultDatabaseConfig(filepath.Join(t.TempDir(), "test.db"))
+	cfg.Mode = config.ModeWAL
+	cfg.ReadStatements = ReadStatements()
+	cfg.WriteStatements = WriteStatements()
+
+	database, err := config.NewDatabaseWithConfig(cfg)
+	if err != nil {
+		t.Fatalf("failed to open database: %v", err)
+	}
+	t.Cleanup(func() { database.Close() })
+
+	if err := config.NewBackgroundMigrator(database, migrations.Background, 1000, 0).Run(context.Background()); err != nil {
+		t.Fatalf("failed to run background migrations: %v", err)
+	}
+	return database
+}
+
+// queryPlan returns the detail column of EXPLAIN QUERY PLAN for query
+func queryPlan(t *testing.T, database *config.Database, query string, args ...interface{}) []string {
+	t.Helper()
+
+	rows, err := database.ReadDB.Query("EXPLAIN QUERY PLAN "+query, args...)
+	if err != nil {
+		t.Fatalf("failed to explain %q: %v", query, err)
+	}
+	defer rows.Close()
+
+	var plan []string
+	for rows.Next() {
+		var id, parent, notUsed int
+		var detail string
+		if err := rows.Scan(&id, &parent, &notUsed, &detail); err != nil {
+			t.Fatalf("failed to scan query plan: %v", err)
+		}
+		plan = append(plan, detail)
+	}
+	if err := rows.Err(); err != nil {
+		t.Fatalf("failed to read query plan: %v", err)
+	}
+	return plan
+}
+
+// TestLogTimeRangeQueryPlans checks that every page of a habit's logs in a time
+// range, including the cursor probes and a projected fieldset, is a range scan of
+// idx_logs_habit_id_created_at that needs no sort
+func TestLogTimeRangeQueryPlans(t *testing.T) {
+	database := openTestDatabase(t)
+
+	from, to := "2024-01-01 00:00:00", "2024-02-01 00:00:00"
+	cursor := "2024-01-15 12:00:00"
+	projected := projectPageQueries(logPageQueries, logColumns, projectColumns([]string{"id", "notes"}, logFieldColumns))
+
+	for name, queries := range map[string]pageQueries{
+		"columns":   logPageQueries,
+		"keys":      logPageKeyQueries,
+		"projected": projected,
+	} {
+		for _, tc := range []struct {
+			page  string
+			query string
+			args  []interface{}
+		}{
+			{"first", queries.first, []interface{}{1, from, to, 101}},
+			{"after", queries.after, []interface{}{1, from, to, cursor, 42, 101}},
+			{"before", queries.before, []interface{}{1, from, to, cursor, 42, 101}},
+		} {
+			plan := queryPlan(t, database, tc.query, tc.args...)
+			detail := strings.Join(plan, "; ")
+			if !strings.Contains(detail, "idx_logs_habit_id_created_at") {
+				t.Errorf("%s %s page does not use idx_logs_habit_id_created_at: %s", name, tc.page, detail)
+			}
+			if strings.Contains(detail, "USE TEMP B-TREE") {
+				t.Errorf("%s %s page sorts through a temporary B-tree: %s", name, tc.page, detail)
+			}
+		}
+	}
+}
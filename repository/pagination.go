@@ -0,0 +1,189 @@
+package repository
+
+import (
+	"context"
+	"database/sql"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// Bounds that match every stored created_at, used for the open ends of a time range
+// so the range statements stay fixed and can be prepared
+const (
+	minTimestamp = "0000-01-01 00:00:00"
+	maxTimestamp = "9999-12-31 23:59:59"
+)
+
+// rangeBounds returns the created_at bounds for r as stored by SQLite
+func rangeBounds(r *models.TimeRange) (string, string) {
+	from, to := minTimestamp, maxTimestamp
+	if r != nil && r.From != nil {
+		from = r.From.UTC().Format(timestampLayout)
+	}
+	if r != nil && r.To != nil {
+		to = r.To.UTC().Format(timestampLayout)
+	}
+	return from, to
+}
+
+// pageQueries are the keyset statements for one paginated list, ordered by
+// (created_at, id) newest first. Each takes the list's filter arguments (the
+// owner id, and any created_at bounds) first and the limit last; after and
+// before also take the cursor's created_at and id. With a composite index on
+// (owner, created_at, id) each is a bounded range scan no matter how deep the
+// cursor is, provided the cursor bounds the scan: a list with created_at bounds
+// must not also bound the cursor's end of the scan with them, or SQLite uses the
+// bound and only filters on the cursor.
+type pageQueries struct {
+	first  string // newest rows
+	after  string // rows older than the cursor, newest first
+	before string // rows newer than the cursor, oldest first
+}
+
+// pageKeyColumns are the columns a page's cursors are made of. The list indexes
+// cover them, so the keys of a page are read from the index alone.
+const pageKeyColumns = "id, created_at"
+
+// pageReader runs a page's statement; it is satisfied by DB and *sql.Tx
+type pageReader interface {
+	QueryContext(ctx context.Context, query string, args ...interface{}) (*sql.Rows, error)
+}
+
+// queryPage runs the keyset query for page and returns at most page.Limit rows,
+// newest first, with the cursors for the neighbouring pages
+func queryPage[T any](db DB, q pageQueries, filter []interface{}, page *models.PageRequest, scan func(rowScanner) (T, error), key func(T) models.Cursor) ([]T, *models.Page, error) {
+	// Internal callers may ask for more than an API page; grow past that as rows arrive
+	items := make([]T, 0, min(page.Limit, models.MaxPageLimit))
+	result, err := readPage(context.Background(), db, q, filter, page, scan, key, func(item T) error {
+		items = append(items, item)
+		return nil
+	})
+	if err != nil {
+		return nil, nil, err
+	}
+	return items, result, nil
+}
+
+// streamPage passes the cursors for the pages around page to start and then at most
+// page.Limit rows, newest first, to emit as they are read, so a response can send
+// the cursors ahead of rows it has not read yet. The cursors come from a probe of
+// the page's keys, keys being q selecting only pageKeyColumns; the probe and the
+// rows are read in one read transaction, so they see the same rows. The whole
+// list has no neighbouring pages, so it is not probed.
+func streamPage[T any](ctx context.Context, db DB, q, keys pageQueries, filter []interface{}, page *models.PageRequest, scan func(rowScanner) (T, error), key func(T) models.Cursor, start func(*models.Page) error, emit func(T) error) error {
+	tx, err := db.BeginRead(ctx)
+	if err != nil {
+		return err
+	}
+	// The transaction only reads, so it is always rolled back
+	defer tx.Rollback()
+
+	result := &models.Page{}
+	if page.Limit > 0 {
+		result, err = readPage(ctx, tx, keys, filter, page, scanPageKey, func(c models.Cursor) models.Cursor { return c }, func(models.Cursor) error { return nil })
+		if err != nil {
+			return err
+		}
+	}
+	if err := start(result); err != nil {
+		return err
+	}
+
+	_, err = readPage(ctx, tx, q, filter, page, scan, key, emit)
+	return err
+}
+
+// scanPageKey decodes a row selected with pageKeyColumns as the cursor at that row
+func scanPageKey(row rowScanner) (models.Cursor, error) {
+	var cursor models.Cursor
+	var createdAt time.Time
+	if err := row.Scan(&cursor.ID, &createdAt); err != nil {
+		return models.Cursor{}, err
+	}
+	cursor.CreatedAt = createdAt.UTC()
+	return cursor, nil
+}
+
+// readPage runs the keyset query for page and passes at most page.Limit rows, or
+// every row of the whole list, newest first, to emit as they are read, then
+// returns the cursors for the neighbouring pages. It stops at the first error from emit or when ctx is
+// cancelled. Pages read with a before cursor arrive oldest first from the index,
+// so they are held until the last row is read; that is at most page.Limit rows.
+func readPage[T any](ctx context.Context, db pageReader, q pageQueries, filter []interface{}, page *models.PageRequest, scan func(rowScanner) (T, error), key func(T) models.Cursor, emit func(T) error) (*models.Page, error) {
+	query := q.first
+	args := append([]interface{}{}, filter...)
+	if page.After != nil {
+		query = q.after
+		args = append(args, page.After.CreatedAt.UTC().Format(timestampLayout), page.After.ID)
+	} else if page.Before != nil {
+		query = q.before
+		args = append(args, page.Before.CreatedAt.UTC().Format(timestampLayout), page.Before.ID)
+	}
+	// Fetch one extra row to learn whether another page follows; SQLite reads
+	// every row for a negative limit
+	if page.Limit == 0 {
+		args = append(args, -1)
+	} else {
+		args = append(args, page.Limit+1)
+	}
+
+	rows, err := db.QueryContext(ctx, query, args...)
+	if err != nil {
+		return nil, err
+	}
+	defer rows.Close()
+
+	var first, last T
+	var held []T
+	count, hasMore := 0, false
+	for rows.Next() {
+		if page.Limit > 0 && count == page.Limit {
+			hasMore = true
+			break
+		}
+		item, err := scan(rows)
+		if err != nil {
+			return nil, err
+		}
+		if count == 0 {
+			first = item
+		}
+		last = item
+		count++
+
+		if page.Before != nil {
+			held = append(held, item)
+		} else if err := emit(item); err != nil {
+			return nil, err
+		}
+	}
+	if err := rows.Err(); err != nil {
+		return nil, err
+	}
+
+	result := &models.Page{}
+	if page.Before != nil {
+		// The before query walks forward in time; emit the page newest first
+		for i := len(held) - 1; i >= 0; i-- {
+			if err := emit(held[i]); err != nil {
+				return nil, err
+			}
+		}
+		if hasMore {
+			result.PrevCursor = key(last).Encode()
+		}
+		if count > 0 {
+			result.NextCursor = key(first).Encode()
+		}
+		return result, nil
+	}
+
+	if hasMore {
+		result.NextCursor = key(last).Encode()
+	}
+	if page.After != nil && count > 0 {
+		result.PrevCursor = key(first).Encode()
+	}
+	return result, nil
+}
@@ -0,0 +1,85 @@
+package repository
+
+import (
+	"database/sql"
+	"fmt"
+	"time"
+)
+
+// RefreshTokenRepository defines the interface for login sessions, each known by
+// the SHA-256 of its current refresh token
+type RefreshTokenRepository interface {
+	Create(userID int64, tokenHash []byte, expiresAt time.Time) error
+	// Rotate replaces an unexpired session's token hash with the next one and
+	// returns the session's user
+	Rotate(tokenHash, nextHash []byte, now, expiresAt time.Time) (int64, error)
+	Delete(userID int64, tokenHash []byte) error
+	DeleteByUserID(userID int64) error
+	DeleteExpired(userID int64, now time.Time) error
+}
+
+// Hot-path statements; see WriteStatements
+const (
+	insertRefreshTokenQuery = "INSERT INTO refresh_tokens (user_id, token_hash, expires_at_ms, created_at_ms) VALUES (?, ?, ?, " + nowMillis + ")"
+	rotateRefreshTokenQuery = "UPDATE refresh_tokens SET token_hash = ?, expires_at_ms = ?, refreshed_at_ms = ? " +
+		"WHERE token_hash = ? AND expires_at_ms > ? RETURNING user_id"
+	deleteRefreshTokenQuery         = "DELETE FROM refresh_tokens WHERE token_hash = ? AND user_id = ?"
+	deleteRefreshTokensByUserQuery  = "DELETE FROM refresh_tokens WHERE user_id = ?"
+	deleteExpiredRefreshTokensQuery = "DELETE FROM refresh_tokens WHERE user_id = ? AND expires_at_ms <= ?"
+)
+
+// refreshTokenRepository implements RefreshTokenRepository
+type refreshTokenRepository struct {
+	db DB
+}
+
+// NewRefreshTokenRepository creates a new refresh token repository
+func NewRefreshTokenRepository(db DB) RefreshTokenRepository {
+	return &refreshTokenRepository{db: db}
+}
+
+// Create starts a session for the user
+func (r *refreshTokenRepository) Create(userID int64, tokenHash []byte, expiresAt time.Time) error {
+	if _, err := r.db.Exec(insertRefreshTokenQuery, userID, tokenHash, expiresAt.UnixMilli()); err != nil {
+		return fmt.Errorf("failed to create refresh token: %w", err)
+	}
+	return nil
+}
+
+// Rotate looks the session up by its token hash and moves it to the next token
+// in one statement, so a refresh token can be exchanged only once
+func (r *refreshTokenRepository) Rotate(tokenHash, nextHash []byte, now, expiresAt time.Time) (int64, error) {
+	var userID int64
+	err := r.db.ExecReturning(rotateRefreshTokenQuery, nextHash, expiresAt.UnixMilli(), now.UnixMilli(), tokenHash, now.UnixMilli()).Scan(&userID)
+	if err == sql.ErrNoRows {
+		return 0, fmt.Errorf("refresh token not found")
+	}
+	if err != nil {
+		return 0, fmt.Errorf("failed to rotate refresh token: %w", err)
+	}
+	return userID, nil
+}
+
+// Delete ends the user's session with the given token hash
+func (r *refreshTokenRepository) Delete(userID int64, tokenHash []byte) error {
+	if _, err := r.db.Exec(deleteRefreshTokenQuery, tokenHash, userID); err != nil {
+		return fmt.Errorf("failed to delete refresh token: %w", err)
+	}
+	return nil
+}
+
+// DeleteByUserID ends all of the user's sessions
+func (r *refreshTokenRepository) DeleteByUserID(userID int64) error {
+	if _, err := r.db.Exec(deleteRefreshTokensByUserQuery, userID); err != nil {
+		return fmt.Errorf("failed to delete refresh tokens: %w", err)
+	}
+	return nil
+}
+
+// DeleteExpired removes the user's expired sessions
+func (r *refreshTokenRepository) DeleteExpired(userID int64, now time.Time) error {
+	if _, err := r.db.Exec(deleteExpiredRefreshTokensQuery, userID, now.UnixMilli()); err != nil {
+		return fmt.Errorf("failed to delete expired refresh tokens: %w", err)
+	}
+	return nil
+}
@@ -0,0 +1,196 @@
+package repository
+
+import (
+	"database/sql"
+	"fmt"
+	"strings"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// ReminderRepository defines the interface for the reminder outbox
+type ReminderRepository interface {
+	// ListTimeZones returns every time zone a user is in
+	ListTimeZones() ([]string, error)
+	// Enqueue queues a reminder for every user in the window's time zone who has a
+	// habit but no log on day two, unless one is already queued for them for that
+	// day, and returns the number queued
+	Enqueue(window *models.ReminderWindow, now time.Time) (int64, error)
+	// Claim takes up to limit pending reminders due at now, leasing each until now
+	// plus lease and counting the attempt
+	Claim(now time.Time, lease time.Duration, limit int) ([]*models.Reminder, error)
+	// NextDue returns when the next pending reminder falls due, or nil if none is pending
+	NextDue() (*time.Time, error)
+	// Record stores the outcomes of a batch of delivery attempts
+	Record(deliveries []*models.ReminderDelivery) error
+}
+
+// Reminder statements
+const (
+	selectUserTimeZonesDistinctQuery = "SELECT DISTINCT time_zone FROM users"
+
+	// enqueueRemindersQuery selects the candidates of one time zone and queues them
+	// in the same statement, so the outbox always matches one snapshot of the logs.
+	// Users are read from idx_users_time_zone, and the logs of day one and day two
+	// are each found with one probe per habit of idx_logs_habit_id_created_at.
+	enqueueRemindersQuery = "INSERT INTO notification_outbox (user_id, day, reason, name, phone_number, next_attempt_at_ms, created_at_ms) " +
+		"SELECT users.id, ?, " +
+		"CASE WHEN EXISTS (SELECT 1 FROM habits JOIN logs ON logs.habit_id = habits.id WHERE habits.user_id = users.id " +
+		"AND logs.created_at >= ? AND logs.created_at < ?) THEN '" + models.ReminderMissedYesterday + "' ELSE '" + models.ReminderNoLogs + "' END, " +
+		"users.name, users.phone_number, ?, ? " +
+		"FROM users WHERE users.time_zone = ? " +
+		"AND EXISTS (SELECT 1 FROM habits WHERE habits.user_id = users.id) " +
+		"AND NOT EXISTS (SELECT 1 FROM habits JOIN logs ON logs.habit_id = habits.id WHERE habits.user_id = users.id " +
+		"AND logs.created_at >= ? AND logs.created_at < ?) " +
+		"ON CONFLICT (user_id, day) DO NOTHING"
+
+	claimRemindersQuery = "UPDATE notification_outbox SET attempts = attempts + 1, next_attempt_at_ms = ? " +
+		"WHERE id IN (SELECT id FROM notification_outbox WHERE status = 'pending' AND next_attempt_at_ms <= ? ORDER BY next_attempt_at_ms LIMIT ?) " +
+		"RETURNING id, user_id, day, reason, name, phone_number, attempts, created_at_ms"
+	selectNextDueReminderQuery = "SELECT MIN(next_attempt_at_ms) FROM notification_outbox WHERE status = 'pending'"
+
+	// The record statements are completed with one VALUES row per delivery
+	markRemindersSentQuery = "UPDATE notification_outbox SET status = 'sent', provider_message_id = delivered.column2, " +
+		"sent_at_ms = delivered.column3, last_error = NULL FROM (VALUES %s) AS delivered WHERE notification_outbox.id = delivered.column1"
+	rescheduleRemindersQuery = "UPDATE notification_outbox SET next_attempt_at_ms = retry.column2, attempts = attempts - retry.column3, " +
+		"last_error = retry.column4 FROM (VALUES %s) AS retry WHERE notification_outbox.id = retry.column1"
+	markRemindersFailedQuery = "UPDATE notification_outbox SET status = 'failed', last_error = failed.column2 " +
+		"FROM (VALUES %s) AS failed WHERE notification_outbox.id = failed.column1"
+	markRemindersSentUnknownQuery = "UPDATE notification_outbox SET status = 'sent_unknown', last_error = unknown.column2 " +
+		"FROM (VALUES %s) AS unknown WHERE notification_outbox.id = unknown.column1"
+)
+
+// reminderRepository implements ReminderRepository
+type reminderRepository struct {
+	db DB
+}
+
+// NewReminderRepository creates a new reminder repository
+func NewReminderRepository(db DB) ReminderRepository {
+	return &reminderRepository{db: db}
+}
+
+// ListTimeZones reads the distinct time zones from idx_users_time_zone
+func (r *reminderRepository) ListTimeZones() ([]string, error) {
+	rows, err := r.db.Query(selectUserTimeZonesDistinctQuery)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get time zones: %w", err)
+	}
+	defer rows.Close()
+
+	var timeZones []string
+	for rows.Next() {
+		var timeZone string
+		if err := rows.Scan(&timeZone); err != nil {
+			return nil, fmt.Errorf("failed to scan time zone: %w", err)
+		}
+		timeZones = append(timeZones, timeZone)
+	}
+
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating time zones: %w", err)
+	}
+
+	return timeZones, nil
+}
+
+// Enqueue selects and queues one time zone's candidates with a single INSERT ... SELECT
+func (r *reminderRepository) Enqueue(window *models.ReminderWindow, now time.Time) (int64, error) {
+	result, err := r.db.Exec(enqueueRemindersQuery, window.Day,
+		window.DayOneStart.UTC().Format(timestampLayout), window.DayTwoStart.UTC().Format(timestampLayout),
+		now.UnixMilli(), now.UnixMilli(), window.TimeZone,
+		window.DayTwoStart.UTC().Format(timestampLayout), window.DayTwoEnd.UTC().Format(timestampLayout))
+	if err != nil {
+		return 0, fmt.Errorf("failed to enqueue reminders: %w", err)
+	}
+
+	rowsAffected, err := result.RowsAffected()
+	if err != nil {
+		return 0, fmt.Errorf("failed to get rows affected: %w", err)
+	}
+	return rowsAffected, nil
+}
+
+// Claim leases the due reminders that have waited longest with one UPDATE ... RETURNING
+func (r *reminderRepository) Claim(now time.Time, lease time.Duration, limit int) ([]*models.Reminder, error) {
+	rows, err := r.db.ExecReturningRows(claimRemindersQuery, now.Add(lease).UnixMilli(), now.UnixMilli(), limit)
+	if err != nil {
+		return nil, fmt.Errorf("failed to claim reminders: %w", err)
+	}
+	defer rows.Close()
+
+	var reminders []*models.Reminder
+	for rows.Next() {
+		reminder := &models.Reminder{}
+		var enqueuedAtMs int64
+		if err := rows.Scan(&reminder.ID, &reminder.UserID, &reminder.Day, &reminder.Reason,
+			&reminder.Name, &reminder.PhoneNumber, &reminder.Attempts, &enqueuedAtMs); err != nil {
+			return nil, fmt.Errorf("failed to scan reminder: %w", err)
+		}
+		reminder.EnqueuedAt = time.UnixMilli(enqueuedAtMs).UTC()
+		reminders = append(reminders, reminder)
+	}
+
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating reminders: %w", err)
+	}
+
+	return reminders, nil
+}
+
+// NextDue reads the earliest due time from idx_notification_outbox_due
+func (r *reminderRepository) NextDue() (*time.Time, error) {
+	var nextMs sql.NullInt64
+	if err := r.db.QueryRow(selectNextDueReminderQuery).Scan(&nextMs); err != nil {
+		return nil, fmt.Errorf("failed to get next reminder: %w", err)
+	}
+	if !nextMs.Valid {
+		return nil, nil
+	}
+
+	next := time.UnixMilli(nextMs.Int64).UTC()
+	return &next, nil
+}
+
+// Record writes a batch of outcomes with at most one statement per status
+func (r *reminderRepository) Record(deliveries []*models.ReminderDelivery) error {
+	var sent, retried, failed, unknown []interface{}
+	for _, delivery := range deliveries {
+		switch delivery.Status {
+		case models.ReminderSent:
+			sent = append(sent, delivery.ReminderID, delivery.MessageID, delivery.At.UnixMilli())
+		case models.ReminderPending:
+			deferred := 0
+			if delivery.Deferred {
+				deferred = 1
+			}
+			retried = append(retried, delivery.ReminderID, delivery.NextAttemptAt.UnixMilli(), deferred, delivery.Error)
+		case models.ReminderSentUnknown:
+			unknown = append(unknown, delivery.ReminderID, delivery.Error)
+		default:
+			failed = append(failed, delivery.ReminderID, delivery.Error)
+		}
+	}
+
+	for _, batch := range []struct {
+		query   string
+		columns int
+		args    []interface{}
+	}{
+		{markRemindersSentQuery, 3, sent},
+		{rescheduleRemindersQuery, 4, retried},
+		{markRemindersFailedQuery, 2, failed},
+		{markRemindersSentUnknownQuery, 2, unknown},
+	} {
+		if len(batch.args) == 0 {
+			continue
+		}
+		row := "(" + strings.TrimSuffix(strings.Repeat("?, ", batch.columns), ", ") + ")"
+		values := strings.TrimSuffix(strings.Repeat(row+", ", len(batch.args)/batch.columns), ", ")
+		if _, err := r.db.Exec(fmt.Sprintf(batch.query, values), batch.args...); err != nil {
+			return fmt.Errorf("failed to record reminder deliveries: %w", err)
+		}
+	}
+	return nil
+}
@@ -0,0 +1,122 @@
+package repository
+
+import (
+	"database/sql"
+	"fmt"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+)
+
+// RollupRepository defines the interface for the daily habit rollups
+type RollupRepository interface {
+	GetByHabitID(habitID int64, from, to string) ([]*models.CalendarDay, error)
+
+	// Backfill support: logs written before local_date existed are dated one
+	// user and one constant-offset span of their time zone at a time
+	ListUserTimeZones(afterID int64, limit int) ([]*models.User, error)
+	OldestUndatedLog(userID int64) (*time.Time, error)
+	DateLogs(userID int64, from, to time.Time, utcOffset time.Duration) (int64, error)
+}
+
+// Rollup statements
+const (
+	selectRollupsByHabitIDQuery = "SELECT day, log_count, total_duration_seconds FROM daily_habit_rollups WHERE habit_id = ? AND day >= ? AND day <= ? ORDER BY day"
+
+	selectUserTimeZonesQuery = "SELECT id, time_zone FROM users WHERE id > ? ORDER BY id LIMIT ?"
+	selectOldestUndatedQuery = "SELECT CAST(strftime('%s', MIN(logs.created_at)) AS INTEGER) FROM habits JOIN logs ON logs.habit_id = habits.id WHERE habits.user_id = ? AND logs.local_date IS NULL"
+	// dateLogsQuery sets local_date on a user's undated logs in [from, to), which
+	// fires the update trigger that counts each one in its daily rollup
+	dateLogsQuery = "UPDATE logs SET local_date = date(created_at, ?) " +
+		"WHERE local_date IS NULL AND created_at >= ? AND created_at < ? " +
+		"AND habit_id IN (SELECT id FROM habits WHERE user_id = ?)"
+)
+
+// rollupRepository implements RollupRepository
+type rollupRepository struct {
+	db DB
+}
+
+// NewRollupRepository creates a new rollup repository
+func NewRollupRepository(db DB) RollupRepository {
+	return &rollupRepository{db: db}
+}
+
+// GetByHabitID reads a habit's rollups between two inclusive local dates, one row per day with logs
+func (r *rollupRepository) GetByHabitID(habitID int64, from, to string) ([]*models.CalendarDay, error) {
+	rows, err := r.db.Query(selectRollupsByHabitIDQuery, habitID, from, to)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get rollups: %w", err)
+	}
+	defer rows.Close()
+
+	days := []*models.CalendarDay{}
+	for rows.Next() {
+		day := &models.CalendarDay{}
+		if err := rows.Scan(&day.Date, &day.LogCount, &day.TotalDurationSeconds); err != nil {
+			return nil, fmt.Errorf("failed to scan rollup: %w", err)
+		}
+		days = append(days, day)
+	}
+
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating rollups: %w", err)
+	}
+
+	return days, nil
+}
+
+// ListUserTimeZones reads the ID and time zone of up to limit users after afterID
+func (r *rollupRepository) ListUserTimeZones(afterID int64, limit int) ([]*models.User, error) {
+	rows, err := r.db.Query(selectUserTimeZonesQuery, afterID, limit)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get users: %w", err)
+	}
+	defer rows.Close()
+
+	var users []*models.User
+	for rows.Next() {
+		user := &models.User{}
+		if err := rows.Scan(&user.ID, &user.TimeZone); err != nil {
+			return nil, fmt.Errorf("failed to scan user: %w", err)
+		}
+		users = append(users, user)
+	}
+
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("error iterating users: %w", err)
+	}
+
+	return users, nil
+}
+
+// OldestUndatedLog returns the creation time of the user's oldest log without a
+// local_date, or nil if every log is dated
+func (r *rollupRepository) OldestUndatedLog(userID int64) (*time.Time, error) {
+	var oldest sql.NullInt64
+	if err := r.db.QueryRow(selectOldestUndatedQuery, userID).Scan(&oldest); err != nil {
+		return nil, fmt.Errorf("failed to get oldest log: %w", err)
+	}
+	if !oldest.Valid {
+		return nil, nil
+	}
+
+	t := time.Unix(oldest.Int64, 0).UTC()
+	return &t, nil
+}
+
+// DateLogs dates the user's undated logs created in [from, to) with utcOffset,
+// which must be the offset of the user's time zone throughout the range
+func (r *rollupRepository) DateLogs(userID int64, from, to time.Time, utcOffset time.Duration) (int64, error) {
+	result, err := r.db.Exec(dateLogsQuery, offsetModifier(utcOffset),
+		from.UTC().Format(timestampLayout), to.UTC().Format(timestampLayout), userID)
+	if err != nil {
+		return 0, fmt.Errorf("failed to date logs: %w", err)
+	}
+
+	rowsAffected, err := result.RowsAffected()
+	if err != nil {
+		return 0, fmt.Errorf("failed to get rows affected: %w", err)
+	}
+	return rowsAffected, nil
+}
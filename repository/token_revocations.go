@@ -0,0 +1,192 @@
+package repository
+
+import (
+	"fmt"
+	"sync"
+	"sync/atomic"
+	"time"
+)
+
+// revokedTokensMinPrune is the fewest revoked tokens held before expired ones are dropped
+const revokedTokensMinPrune = 4096
+
+// Token revocation statements
+const (
+	upsertTokenEpochQuery = "INSERT INTO token_epochs (user_id, epoch) VALUES (?, 1) " +
+		"ON CONFLICT (user_id) DO UPDATE SET epoch = epoch + 1 RETURNING epoch"
+	selectTokenEpochsQuery          = "SELECT user_id, epoch FROM token_epochs"
+	insertRevokedTokenQuery         = "INSERT OR IGNORE INTO revoked_tokens (token_id, expires_at_ms) VALUES (?, ?)"
+	selectRevokedTokensQuery        = "SELECT token_id, expires_at_ms FROM revoked_tokens WHERE expires_at_ms > ?"
+	deleteExpiredRevokedTokensQuery = "DELETE FROM revoked_tokens WHERE expires_at_ms <= ?"
+)
+
+// TokenRevocations decides in memory whether an access token has been revoked,
+// so authenticating a request never queries the database. All of a user's
+// tokens are revoked by moving the user's token epoch past the one their tokens
+// carry; only users revoked at least once have an entry. Single tokens are
+// revoked by ID until they expire, in a map of the revoked IDs. Both are written
+// to SQLite and loaded at startup.
+type TokenRevocations struct {
+	db  DB
+	now func() time.Time
+
+	mu     sync.RWMutex
+	epochs map[int64]int64
+	// denied maps each revoked token ID to its expiry in Unix seconds
+	denied map[int64]int64
+	// pruneAt is the size of denied at which its expired tokens are dropped
+	pruneAt int
+
+	rejected atomic.Int64
+}
+
+// TokenRevocationsStats reports the revocation counters and size
+type TokenRevocationsStats struct {
+	Users         int   `json:"users"`
+	RevokedTokens int   `json:"revoked_tokens"`
+	Rejected      int64 `json:"rejected"`
+}
+
+// LoadTokenRevocations reads the token epochs and the unexpired revoked tokens
+// into memory, deleting expired ones
+func LoadTokenRevocations(db DB) (*TokenRevocations, error) {
+	r := &TokenRevocations{
+		db:     db,
+		now:    time.Now,
+		epochs: make(map[int64]int64),
+		denied: make(map[int64]int64),
+	}
+	now := r.now()
+
+	rows, err := db.Query(selectTokenEpochsQuery)
+	if err != nil {
+		return nil, fmt.Errorf("failed to load token epochs: %w", err)
+	}
+	for rows.Next() {
+		var userID, epoch int64
+		if err := rows.Scan(&userID, &epoch); err != nil {
+			rows.Close()
+			return nil, fmt.Errorf("failed to scan token epoch: %w", err)
+		}
+		r.epochs[userID] = epoch
+	}
+	rows.Close()
+	if err := rows.Err(); err != nil {
+		return nil, fmt.Errorf("failed to load token epochs: %w", err)
+	}
+
+	if _, err := db.Exec(deleteExpiredRevokedTokensQuery, now.UnixMilli()); err != nil {
+		return nil, fmt.Errorf("failed to delete expired revoked tokens: %w", err)
+	}
+	rows, err = db.Query(selectRevokedTokensQuery, now.UnixMilli())
+	if err != nil {
+		return nil, fmt.Errorf("failed to load revoked tokens: %w", err)
+	}
+	for rows.Next() {
+		var tokenID, expiresAtMs int64
+		if err := rows.Scan(&tokenID, &expiresAtMs); err != nil {
+			rows.Close()
+			return nil, fmt.Errorf("failed to scan revoked token: %w", err)
+		}
+		r.denied[tokenID] = expiresAtMs / 1000
+	}
+	rows.Close()
+	if err := rows.Err(); err != nil {
+		return nil, fmt.Errorf("failed to load revoked tokens: %w", err)
+	}
+
+	r.prune(now.Unix())
+	return r, nil
+}
+
+// Epoch returns the user's current token epoch, for issuing tokens
+func (r *TokenRevocations) Epoch(userID int64) int64 {
+	r.mu.RLock()
+	defer r.mu.RUnlock()
+	return r.epochs[userID]
+}
+
+// Revoked reports whether a token with these claims has been revoked. It reads
+// only memory and is safe to call on every request.
+func (r *TokenRevocations) Revoked(userID, epoch, tokenID int64) bool {
+	r.mu.RLock()
+	revoked := epoch < r.epochs[userID]
+	if !revoked && tokenID != 0 {
+		_, revoked = r.denied[tokenID]
+	}
+	r.mu.RUnlock()
+
+	if revoked {
+		r.rejected.Add(1)
+	}
+	return revoked
+}
+
+// RevokeUser revokes every token issued to the user so far by moving the user's
+// token epoch on. Tokens issued afterwards carry the new epoch.
+func (r *TokenRevocations) RevokeUser(userID int64) error {
+	var epoch int64
+	if err := r.db.ExecReturning(upsertTokenEpochQuery, userID).Scan(&epoch); err != nil {
+		return fmt.Errorf("failed to revoke user tokens: %w", err)
+	}
+
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	if epoch > r.epochs[userID] {
+		r.epochs[userID] = epoch
+	}
+	return nil
+}
+
+// RevokeToken revokes a single token until it expires at expiresAt, in Unix seconds
+func (r *TokenRevocations) RevokeToken(tokenID, expiresAt int64) error {
+	if tokenID == 0 {
+		return fmt.Errorf("token has no ID to revoke")
+	}
+	if _, err := r.db.Exec(insertRevokedTokenQuery, tokenID, expiresAt*1000); err != nil {
+		return fmt.Errorf("failed to revoke token: %w", err)
+	}
+
+	now := r.now()
+	r.mu.Lock()
+	r.denied[tokenID] = expiresAt
+	// Expired tokens are dropped once the set has doubled since they last were
+	full := len(r.denied) > r.pruneAt
+	if full {
+		r.prune(now.Unix())
+	}
+	r.mu.Unlock()
+
+	if full {
+		if _, err := r.db.Exec(deleteExpiredRevokedTokensQuery, now.UnixMilli()); err != nil {
+			return fmt.Errorf("failed to delete expired revoked tokens: %w", err)
+		}
+	}
+	return nil
+}
+
+// Stats returns the revocation counters and the number of revoked users and tokens
+func (r *TokenRevocations) Stats() TokenRevocationsStats {
+	r.mu.RLock()
+	defer r.mu.RUnlock()
+	return TokenRevocationsStats{
+		Users:         len(r.epochs),
+		RevokedTokens: len(r.denied),
+		Rejected:      r.rejected.Load(),
+	}
+}
+
+// prune drops tokens expired at now and sets the next prune for when the rest has
+// doubled; the caller holds the lock or has not shared r yet
+func (r *TokenRevocations) prune(now int64) {
+	for tokenID, expiresAt := range r.denied {
+		if expiresAt <= now {
+			delete(r.denied, tokenID)
+		}
+	}
+
+	r.pruneAt = 2 * len(r.denied)
+	if r.pruneAt < revokedTokensMinPrune {
+		r.pruneAt = revokedTokensMinPrune
+	}
+}
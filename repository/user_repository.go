@@ -17,48 +17,60 @@ type UserRepository interface {
 	Delete(id int64) error
 }
 
+// userColumns is the column list decoded by scanUser
+const userColumns = "id, profile_image_url, name, time_zone, phone_number, password_hash, " + createdAtMillis
+
+// Hot-path statements; see ReadStatements and WriteStatements
+const (
+	insertUserQuery              = "INSERT INTO users (profile_image_url, name, time_zone, phone_number, password_hash, created_at_ms) VALUES (?, ?, ?, ?, ?, " + nowMillis + ") RETURNING " + userColumns
+	selectUserByIDQuery          = "SELECT " + userColumns + " FROM users WHERE id = ?"
+	selectUserByPhoneNumberQuery = "SELECT " + userColumns + " FROM users WHERE phone_number = ?"
+	deleteUserQuery              = "DELETE FROM users WHERE id = ?"
+)
+
 // userRepository implements UserRepository
 type userRepository struct {
-	db *sql.DB
+	db DB
 }
 
 // NewUserRepository creates a new user repository
-func NewUserRepository(db *sql.DB) UserRepository {
+func NewUserRepository(db DB) UserRepository {
 	return &userRepository{db: db}
 }
 
-// Create creates a new user in the database
+// scanUser decodes a row selected or returned with userColumns
+func scanUser(row rowScanner) (*models.User, error) {
+	user := &models.User{}
+	var createdAtMs int64
+
+	if err := row.Scan(&user.ID, &user.ProfileImageURL, &user.Name, &user.TimeZone, &user.PhoneNumber, &user.PasswordHash, &createdAtMs); err != nil {
+		return nil, err
+	}
+
+	// Decode created_at from Unix milliseconds
+	user.CreatedAt = time.UnixMilli(createdAtMs).UTC()
+
+	return user, nil
+}
+
+// Create creates a new user in the database and returns the stored row
 func (r *userRepository) Create(user *models.CreateUserRequest, passwordHash string) (*models.User, error) {
-	// Insert the user
-	result, err := r.db.Exec(
-		"INSERT INTO users (profile_image_url, name, time_zone, phone_number, password_hash) VALUES (?, ?, ?, ?, ?)",
+	// Insert the user and read it back in the same statement
+	created, err := scanUser(r.db.ExecReturning(
+		insertUserQuery,
 		user.ProfileImageURL, user.Name, user.TimeZone, user.PhoneNumber, passwordHash,
-	)
+	))
 	if err != nil {
 		return nil, fmt.Errorf("failed to create user: %w", err)
 	}
 
-	// Get the inserted ID
-	id, err := result.LastInsertId()
-	if err != nil {
-		return nil, fmt.Errorf("failed to get inserted user ID: %w", err)
-	}
-
-	// Retrieve and return the created user
-	return r.GetByID(id)
+	return created, nil
 }
 
 // GetByID retrieves a user by ID
 func (r *userRepository) GetByID(id int64) (*models.User, error) {
-	user := &models.User{}
-	var createdAt string
-
 	// Query the user
-	err := r.db.QueryRow(
-		"SELECT id, profile_image_url, name, time_zone, phone_number, password_hash, created_at FROM users WHERE id = ?",
-		id,
-	).Scan(&user.ID, &user.ProfileImageURL, &user.Name, &user.TimeZone, &user.PhoneNumber, &user.PasswordHash, &createdAt)
-
+	user, err := scanUser(r.db.QueryRow(selectUserByIDQuery, id))
 	if err == sql.ErrNoRows {
 		return nil, fmt.Errorf("user not found")
 	}
@@ -66,30 +78,13 @@ func (r *userRepository) GetByID(id int64) (*models.User, error) {
 		return nil, fmt.Errorf("failed to get user: %w", err)
 	}
 
-	// Parse created_at timestamp
-	user.CreatedAt, err = time.Parse("2006-01-02 15:04:05", createdAt)
-	if err != nil {
-		// Try alternative format
-		user.CreatedAt, err = time.Parse(time.RFC3339, createdAt)
-		if err != nil {
-			return nil, fmt.Errorf("failed to parse created_at: %w", err)
-		}
-	}
-
 	return user, nil
 }
 
 // GetByPhoneNumber retrieves a user by phone number
 func (r *userRepository) GetByPhoneNumber(phoneNumber string) (*models.User, error) {
-	user := &models.User{}
-	var createdAt string
-
 	// Query the user
-	err := r.db.QueryRow(
-		"SELECT id, profile_image_url, name, time_zone, phone_number, password_hash, created_at FROM users WHERE phone_number = ?",
-		phoneNumber,
-	).Scan(&user.ID, &user.ProfileImageURL, &user.Name, &user.TimeZone, &user.PhoneNumber, &user.PasswordHash, &createdAt)
-
+	user, err := scanUser(r.db.QueryRow(selectUserByPhoneNumberQuery, phoneNumber))
 	if err == sql.ErrNoRows {
 		return nil, fmt.Errorf("user not found")
 	}
@@ -97,20 +92,10 @@ func (r *userRepository) GetByPhoneNumber(phoneNumber string) (*models.User, err
 		return nil, fmt.Errorf("failed to get user: %w", err)
 	}
 
-	// Parse created_at timestamp
-	user.CreatedAt, err = time.Parse("2006-01-02 15:04:05", createdAt)
-	if err != nil {
-		// Try alternative format
-		user.CreatedAt, err = time.Parse(time.RFC3339, createdAt)
-		if err != nil {
-			return nil, fmt.Errorf("failed to parse created_at: %w", err)
-		}
-	}
-
 	return user, nil
 }
 
-// Update updates a user in the database
+// Update updates a user in the database and returns the stored row
 func (r *userRepository) Update(id int64, req *models.UpdateUserRequest, passwordHash *string) (*models.User, error) {
 	// Build dynamic update query
 	query := "UPDATE users SET "
@@ -150,23 +135,25 @@ func (r *userRepository) Update(id int64, req *models.UpdateUserRequest, passwor
 		}
 		query += update
 	}
-	query += " WHERE id = ?"
+	query += " WHERE id = ? RETURNING " + userColumns
 	args = append(args, id)
 
-	// Execute the update
-	_, err := r.db.Exec(query, args...)
+	// Execute the update and read the row back in the same statement
+	user, err := scanUser(r.db.ExecReturning(query, args...))
+	if err == sql.ErrNoRows {
+		return nil, fmt.Errorf("user not found")
+	}
 	if err != nil {
 		return nil, fmt.Errorf("failed to update user: %w", err)
 	}
 
-	// Retrieve and return the updated user
-	return r.GetByID(id)
+	return user, nil
 }
 
 // Delete deletes a user from the database
 func (r *userRepository) Delete(id int64) error {
 	// Delete the user
-	result, err := r.db.Exec("DELETE FROM users WHERE id = ?", id)
+	result, err := r.db.Exec(deleteUserQuery, id)
 	if err != nil {
 		return fmt.Errorf("failed to delete user: %w", err)
 	}
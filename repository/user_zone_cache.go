@@ -0,0 +1,61 @@
+package repository
+
+import "sync"
+
+// UserZoneCache remembers each user's time zone name, so a write dated in the
+// user's time zone, like a log, does not read the user. The user service
+// invalidates a user's entry when it updates or deletes them. Once the cache
+// holds maxUsers zones it is emptied and refills from the users read next.
+type UserZoneCache struct {
+	users    UserRepository
+	maxUsers int
+
+	mu    sync.RWMutex
+	zones map[int64]string
+	// generation counts invalidations, so a zone read while a write ran is not stored
+	generation uint64
+}
+
+// NewUserZoneCache creates a cache of up to maxUsers zones read through users
+func NewUserZoneCache(users UserRepository, maxUsers int) *UserZoneCache {
+	return &UserZoneCache{
+		users:    users,
+		maxUsers: maxUsers,
+		zones:    make(map[int64]string),
+	}
+}
+
+// TimeZone returns the user's time zone name, reading the user on a miss
+func (c *UserZoneCache) TimeZone(userID int64) (string, error) {
+	c.mu.RLock()
+	zone, ok := c.zones[userID]
+	generation := c.generation
+	c.mu.RUnlock()
+	if ok {
+		return zone, nil
+	}
+
+	user, err := c.users.GetByID(userID)
+	if err != nil {
+		return "", err
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if c.generation == generation {
+		if len(c.zones) >= c.maxUsers {
+			c.zones = make(map[int64]string)
+		}
+		c.zones[userID] = user.TimeZone
+	}
+	return user.TimeZone, nil
+}
+
+// Invalidate drops the user's zone; the next read loads it again
+func (c *UserZoneCache) Invalidate(userID int64) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	c.generation++
+	delete(c.zones, userID)
+}
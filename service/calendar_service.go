@@ -0,0 +1,119 @@
+package service
+
+import (
+	"context"
+	"fmt"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// CalendarService defines the interface for calendar business logic
+type CalendarService interface {
+	GetCalendar(habitID int64, userID int64, dates *models.CalendarRange) (*models.Calendar, error)
+	// BackfillLocalDates dates every log written before daily rollups existed,
+	// which counts it in its habit's rollups, and returns the number of logs dated
+	BackfillLocalDates(ctx context.Context, batchSize int) (int64, error)
+}
+
+// calendarService implements CalendarService
+type calendarService struct {
+	rollupRepo repository.RollupRepository
+	habitRepo  repository.HabitRepository
+	zones      *repository.UserZoneCache
+	now        func() time.Time
+}
+
+// NewCalendarService creates a new calendar service
+func NewCalendarService(rollupRepo repository.RollupRepository, habitRepo repository.HabitRepository, zones *repository.UserZoneCache) CalendarService {
+	return &calendarService{
+		rollupRepo: rollupRepo,
+		habitRepo:  habitRepo,
+		zones:      zones,
+		now:        time.Now,
+	}
+}
+
+// GetCalendar retrieves a habit's daily rollups between two local dates. It reads
+// one row per day with logs and never the logs themselves.
+func (s *calendarService) GetCalendar(habitID int64, userID int64, dates *models.CalendarRange) (*models.Calendar, error) {
+	// Missing bounds default to the year up to the user's today
+	zone, err := s.zones.TimeZone(userID)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get user: %w", err)
+	}
+	dates.Resolve(s.now().In(loadLocation(zone)))
+	if err := dates.Validate(); err != nil {
+		return nil, fmt.Errorf("validation failed: %w", err)
+	}
+
+	// Verify that the habit exists and belongs to the user
+	if _, err := s.habitRepo.GetByIDForUser(habitID, userID); err != nil {
+		return nil, fmt.Errorf("habit not found")
+	}
+
+	days, err := s.rollupRepo.GetByHabitID(habitID, dates.From, dates.To)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get calendar: %w", err)
+	}
+
+	return &models.Calendar{HabitID: habitID, From: dates.From, To: dates.To, Days: days}, nil
+}
+
+// BackfillLocalDates walks users in batches. Each user's undated logs are dated in
+// one UPDATE per span of their time zone with a constant UTC offset, from their
+// oldest undated log to now, so daylight saving time is applied exactly.
+func (s *calendarService) BackfillLocalDates(ctx context.Context, batchSize int) (int64, error) {
+	var dated int64
+	var afterID int64
+	for {
+		users, err := s.rollupRepo.ListUserTimeZones(afterID, batchSize)
+		if err != nil {
+			return dated, err
+		}
+		if len(users) == 0 {
+			return dated, nil
+		}
+
+		for _, user := range users {
+			if err := ctx.Err(); err != nil {
+				return dated, err
+			}
+			n, err := s.backfillUser(user.ID, loadLocation(user.TimeZone))
+			if err != nil {
+				return dated, fmt.Errorf("failed to backfill user %d: %w", user.ID, err)
+			}
+			dated += n
+		}
+		afterID = users[len(users)-1].ID
+	}
+}
+
+// backfillUser dates one user's undated logs
+func (s *calendarService) backfillUser(userID int64, loc *time.Location) (int64, error) {
+	oldest, err := s.rollupRepo.OldestUndatedLog(userID)
+	if err != nil || oldest == nil {
+		return 0, err
+	}
+
+	var dated int64
+	end := s.now().Add(24 * time.Hour)
+	for from := *oldest; from.Before(end); {
+		local := from.In(loc)
+		_, offset := local.Zone()
+		_, to := local.ZoneBounds()
+		if to.IsZero() || to.After(end) {
+			// The zone has no further transitions
+			to = end
+		}
+
+		n, err := s.rollupRepo.DateLogs(userID, from, to, time.Duration(offset)*time.Second)
+		if err != nil {
+			return dated, err
+		}
+		dated += n
+		from = to
+	}
+	return dated, nil
+}
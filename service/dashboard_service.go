@@ -0,0 +1,86 @@
+package service
+
+import (
+	"context"
+	"fmt"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// DashboardService defines the interface for dashboard business logic
+type DashboardService interface {
+	GetDashboard(ctx context.Context, userID int64, days int) (*models.Dashboard, error)
+}
+
+// dashboardService implements DashboardService
+type dashboardService struct {
+	dashboardRepo repository.DashboardRepository
+	zones         *repository.UserZoneCache
+	now           func() time.Time
+}
+
+// NewDashboardService creates a new dashboard service
+func NewDashboardService(dashboardRepo repository.DashboardRepository, zones *repository.UserZoneCache) DashboardService {
+	return &dashboardService{
+		dashboardRepo: dashboardRepo,
+		zones:         zones,
+		now:           time.Now,
+	}
+}
+
+// GetDashboard assembles the user's habits with their logs from the last days local
+// days and their current streaks
+func (s *dashboardService) GetDashboard(ctx context.Context, userID int64, days int) (*models.Dashboard, error) {
+	// Validate the window
+	if days < 1 || days > models.MaxDashboardDays {
+		return nil, fmt.Errorf("validation failed: days must be between 1 and %d", models.MaxDashboardDays)
+	}
+
+	// Days are counted in the user's time zone
+	zone, err := s.zones.TimeZone(userID)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get user: %w", err)
+	}
+	now := s.now().In(loadLocation(zone))
+	today := utils.TimeZones.LocalDay(now, zone)
+	since := time.Date(now.Year(), now.Month(), now.Day()-(days-1), 0, 0, 0, 0, now.Location())
+
+	// Read everything from one snapshot
+	snapshot, err := s.dashboardRepo.Load(ctx, userID, since)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get dashboard: %w", err)
+	}
+
+	// Logs arrive grouped by habit, so each habit's logs are one contiguous run
+	logsByHabit := make(map[int64][]*models.Log, len(snapshot.Habits))
+	for _, log := range snapshot.Logs {
+		logsByHabit[log.HabitID] = append(logsByHabit[log.HabitID], log)
+	}
+
+	dashboard := &models.Dashboard{
+		Days:   days,
+		Since:  since.UTC(),
+		Habits: make([]*models.DashboardHabit, 0, len(snapshot.Habits)),
+	}
+	for _, habit := range snapshot.Habits {
+		recent := logsByHabit[habit.ID]
+		if recent == nil {
+			recent = []*models.Log{}
+		}
+		// Streaks come from the same bitmaps as GET /habits/{id}/streak
+		streak := 0
+		if activity, ok := snapshot.Activity[habit.ID]; ok {
+			streak = activity.CurrentStreak(today)
+		}
+		dashboard.Habits = append(dashboard.Habits, &models.DashboardHabit{
+			Habit:      habit,
+			Streak:     streak,
+			RecentLogs: recent,
+		})
+	}
+
+	return dashboard, nil
+}
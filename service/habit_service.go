@@ -1,6 +1,7 @@
 package service
 
 import (
+	"context"
 	"fmt"
 
 	"github.com/hayden-erickson/ai-evaluation/models"
@@ -11,7 +12,8 @@ import (
 type HabitService interface {
 	CreateHabit(userID int64, req *models.CreateHabitRequest) (*models.Habit, error)
 	GetHabit(id int64, userID int64) (*models.Habit, error)
-	GetUserHabits(userID int64) ([]*models.Habit, error)
+	GetUserHabits(userID int64, page *models.PageRequest) ([]*models.Habit, *models.Page, error)
+	StreamUserHabits(ctx context.Context, userID int64, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Habit) error) error
 	UpdateHabit(id int64, userID int64, req *models.UpdateHabitRequest) (*models.Habit, error)
 	DeleteHabit(id int64, userID int64) error
 }
@@ -46,27 +48,43 @@ func (s *habitService) CreateHabit(userID int64, req *models.CreateHabitRequest)
 
 // GetHabit retrieves a habit by ID
 func (s *habitService) GetHabit(id int64, userID int64) (*models.Habit, error) {
-	habit, err := s.repo.GetByID(id)
+	// Ownership is enforced by the query; another user's habit is not found
+	habit, err := s.repo.GetByIDForUser(id, userID)
 	if err != nil {
 		return nil, fmt.Errorf("failed to get habit: %w", err)
 	}
 
-	// Check if the habit belongs to the user
-	if habit.UserID != userID {
-		return nil, fmt.Errorf("unauthorized access to habit")
-	}
-
 	return habit, nil
 }
 
-// GetUserHabits retrieves all habits for a user
-func (s *habitService) GetUserHabits(userID int64) ([]*models.Habit, error) {
-	habits, err := s.repo.GetByUserID(userID)
+// GetUserHabits retrieves one page of habits for a user
+func (s *habitService) GetUserHabits(userID int64, page *models.PageRequest) ([]*models.Habit, *models.Page, error) {
+	// Validate the page request
+	if err := page.Validate(); err != nil {
+		return nil, nil, fmt.Errorf("validation failed: %w", err)
+	}
+
+	habits, result, err := s.repo.GetByUserID(userID, page)
 	if err != nil {
-		return nil, fmt.Errorf("failed to get habits: %w", err)
+		return nil, nil, fmt.Errorf("failed to get habits: %w", err)
 	}
 
-	return habits, nil
+	return habits, result, nil
+}
+
+// StreamUserHabits passes the cursors of one page of habits for a user to start, then
+// the page's habits, with only the requested fields, to emit as they are read
+func (s *habitService) StreamUserHabits(ctx context.Context, userID int64, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Habit) error) error {
+	// Validate the page request
+	if err := page.Validate(); err != nil {
+		return fmt.Errorf("validation failed: %w", err)
+	}
+
+	if err := s.repo.StreamByUserID(ctx, userID, fields, page, start, emit); err != nil {
+		return fmt.Errorf("failed to get habits: %w", err)
+	}
+
+	return nil
 }
 
 // UpdateHabit updates a habit
@@ -76,19 +94,8 @@ func (s *habitService) UpdateHabit(id int64, userID int64, req *models.UpdateHab
 		return nil, fmt.Errorf("validation failed: %w", err)
 	}
 
-	// Get the habit to check ownership
-	habit, err := s.repo.GetByID(id)
-	if err != nil {
-		return nil, fmt.Errorf("failed to get habit: %w", err)
-	}
-
-	// Check if the habit belongs to the user
-	if habit.UserID != userID {
-		return nil, fmt.Errorf("unauthorized access to habit")
-	}
-
-	// Update the habit
-	updatedHabit, err := s.repo.Update(id, req)
+	// Update the habit if it belongs to the user
+	updatedHabit, err := s.repo.UpdateForUser(id, userID, req)
 	if err != nil {
 		return nil, fmt.Errorf("failed to update habit: %w", err)
 	}
@@ -98,19 +105,8 @@ func (s *habitService) UpdateHabit(id int64, userID int64, req *models.UpdateHab
 
 // DeleteHabit deletes a habit
 func (s *habitService) DeleteHabit(id int64, userID int64) error {
-	// Get the habit to check ownership
-	habit, err := s.repo.GetByID(id)
-	if err != nil {
-		return fmt.Errorf("failed to get habit: %w", err)
-	}
-
-	// Check if the habit belongs to the user
-	if habit.UserID != userID {
-		return fmt.Errorf("unauthorized access to habit")
-	}
-
-	// Delete the habit
-	if err := s.repo.Delete(id); err != nil {
+	// Delete the habit if it belongs to the user
+	if err := s.repo.DeleteForUser(id, userID); err != nil {
 		return fmt.Errorf("failed to delete habit: %w", err)
 	}
 
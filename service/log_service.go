@@ -1,7 +1,10 @@
 package service
 
 import (
+	"context"
+	"errors"
 	"fmt"
+	"time"
 
 	"github.com/hayden-erickson/ai-evaluation/models"
 	"github.com/hayden-erickson/ai-evaluation/repository"
@@ -11,7 +14,9 @@ import (
 type LogService interface {
 	CreateLog(habitID int64, userID int64, req *models.CreateLogRequest) (*models.Log, error)
 	GetLog(id int64, userID int64) (*models.Log, error)
-	GetHabitLogs(habitID int64, userID int64) ([]*models.Log, error)
+	GetHabitLogs(habitID int64, userID int64, timeRange *models.TimeRange, page *models.PageRequest) ([]*models.Log, *models.Page, error)
+	StreamHabitLogs(ctx context.Context, habitID int64, userID int64, timeRange *models.TimeRange, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Log) error) error
+	StreamUserLogFeed(ctx context.Context, userID int64, since time.Time, emit func(*models.HabitLogs) error) error
 	UpdateLog(id int64, userID int64, req *models.UpdateLogRequest) (*models.Log, error)
 	DeleteLog(id int64, userID int64) error
 }
@@ -20,13 +25,16 @@ type LogService interface {
 type logService struct {
 	logRepo   repository.LogRepository
 	habitRepo repository.HabitRepository
+	zones     *repository.UserZoneCache
 }
 
-// NewLogService creates a new log service
-func NewLogService(logRepo repository.LogRepository, habitRepo repository.HabitRepository) LogService {
+// NewLogService creates a new log service. Logs are dated in the time zone
+// zones has for their owner.
+func NewLogService(logRepo repository.LogRepository, habitRepo repository.HabitRepository, zones *repository.UserZoneCache) LogService {
 	return &logService{
 		logRepo:   logRepo,
 		habitRepo: habitRepo,
+		zones:     zones,
 	}
 }
 
@@ -37,22 +45,20 @@ func (s *logService) CreateLog(habitID int64, userID int64, req *models.CreateLo
 		return nil, fmt.Errorf("validation failed: %w", err)
 	}
 
-	// Verify that the habit exists and belongs to the user
-	habit, err := s.habitRepo.GetByID(habitID)
+	// The log is dated in the user's time zone for the daily rollups and streaks
+	zone, err := s.zones.TimeZone(userID)
 	if err != nil {
-		return nil, fmt.Errorf("habit not found")
-	}
-	if habit.UserID != userID {
-		return nil, fmt.Errorf("unauthorized access to habit")
+		return nil, fmt.Errorf("failed to get user: %w", err)
 	}
+	_, offset := time.Now().In(loadLocation(zone)).Zone()
 
-	// Validate duration requirement: if habit has duration, log must have duration
-	if habit.DurationSeconds != nil && req.DurationSeconds == nil {
-		return nil, fmt.Errorf("validation failed: duration_seconds is required for this habit")
+	// Create the log; the insert checks that the habit belongs to the user and,
+	// if the habit has a duration, that the log has one too. Its triggers count
+	// it in the habit's rollups and activity bitmap.
+	log, err := s.logRepo.CreateForUser(habitID, userID, req, time.Duration(offset)*time.Second)
+	if errors.Is(err, repository.ErrDurationRequired) {
+		return nil, fmt.Errorf("validation failed: %w", err)
 	}
-
-	// Create the log
-	log, err := s.logRepo.Create(habitID, req)
 	if err != nil {
 		return nil, fmt.Errorf("failed to create log: %w", err)
 	}
@@ -62,41 +68,94 @@ func (s *logService) CreateLog(habitID int64, userID int64, req *models.CreateLo
 
 // GetLog retrieves a log by ID
 func (s *logService) GetLog(id int64, userID int64) (*models.Log, error) {
-	log, err := s.logRepo.GetByID(id)
+	// Ownership is enforced by the query; a log on another user's habit is not found
+	log, err := s.logRepo.GetByIDForUser(id, userID)
 	if err != nil {
 		return nil, fmt.Errorf("failed to get log: %w", err)
 	}
 
-	// Verify that the log's habit belongs to the user
-	habit, err := s.habitRepo.GetByID(log.HabitID)
-	if err != nil {
-		return nil, fmt.Errorf("failed to get habit: %w", err)
+	return log, nil
+}
+
+// GetHabitLogs retrieves one page of logs for a habit created within timeRange
+func (s *logService) GetHabitLogs(habitID int64, userID int64, timeRange *models.TimeRange, page *models.PageRequest) ([]*models.Log, *models.Page, error) {
+	// Validate the time range and page request
+	if err := timeRange.Validate(); err != nil {
+		return nil, nil, fmt.Errorf("validation failed: %w", err)
 	}
-	if habit.UserID != userID {
-		return nil, fmt.Errorf("unauthorized access to log")
+	if err := page.Validate(); err != nil {
+		return nil, nil, fmt.Errorf("validation failed: %w", err)
 	}
 
-	return log, nil
+	// Verify that the habit exists and belongs to the user
+	if _, err := s.habitRepo.GetByIDForUser(habitID, userID); err != nil {
+		return nil, nil, fmt.Errorf("habit not found")
+	}
+
+	// Get the page of logs for the habit
+	logs, result, err := s.logRepo.GetByHabitID(habitID, timeRange, page)
+	if err != nil {
+		return nil, nil, fmt.Errorf("failed to get logs: %w", err)
+	}
+
+	return logs, result, nil
 }
 
-// GetHabitLogs retrieves all logs for a habit
-func (s *logService) GetHabitLogs(habitID int64, userID int64) ([]*models.Log, error) {
+// StreamHabitLogs passes the cursors of one page of logs for a habit created within
+// timeRange to start, then the page's logs, with only the requested fields, to emit
+// as they are read
+func (s *logService) StreamHabitLogs(ctx context.Context, habitID int64, userID int64, timeRange *models.TimeRange, fields models.FieldSet, page *models.PageRequest, start func(*models.Page) error, emit func(*models.Log) error) error {
+	// Validate the time range and page request
+	if err := timeRange.Validate(); err != nil {
+		return fmt.Errorf("validation failed: %w", err)
+	}
+	if err := page.Validate(); err != nil {
+		return fmt.Errorf("validation failed: %w", err)
+	}
+
 	// Verify that the habit exists and belongs to the user
-	habit, err := s.habitRepo.GetByID(habitID)
-	if err != nil {
-		return nil, fmt.Errorf("habit not found")
+	if _, err := s.habitRepo.GetByIDForUser(habitID, userID); err != nil {
+		return fmt.Errorf("habit not found")
 	}
-	if habit.UserID != userID {
-		return nil, fmt.Errorf("unauthorized access to habit")
+
+	// Stream the page of logs for the habit
+	if err := s.logRepo.StreamByHabitID(ctx, habitID, timeRange, fields, page, start, emit); err != nil {
+		return fmt.Errorf("failed to get logs: %w", err)
 	}
 
-	// Get all logs for the habit
-	logs, err := s.logRepo.GetByHabitID(habitID)
+	return nil
+}
+
+// StreamUserLogFeed passes the user's logs created since since to emit, one habit at a
+// time. Ownership is part of the query, so the whole feed is a single query. Only the
+// current habit's logs are held in memory.
+func (s *logService) StreamUserLogFeed(ctx context.Context, userID int64, since time.Time, emit func(*models.HabitLogs) error) error {
+	var group *models.HabitLogs
+	err := s.logRepo.StreamByUserID(ctx, userID, since, func(log *models.Log) error {
+		if group != nil && group.HabitID != log.HabitID {
+			if err := emit(group); err != nil {
+				return err
+			}
+			group = nil
+		}
+		if group == nil {
+			group = &models.HabitLogs{HabitID: log.HabitID}
+		}
+		group.Logs = append(group.Logs, log)
+		return nil
+	})
 	if err != nil {
-		return nil, fmt.Errorf("failed to get logs: %w", err)
+		return fmt.Errorf("failed to get log feed: %w", err)
 	}
 
-	return logs, nil
+	// Emit the last habit's logs
+	if group != nil {
+		if err := emit(group); err != nil {
+			return fmt.Errorf("failed to get log feed: %w", err)
+		}
+	}
+
+	return nil
 }
 
 // UpdateLog updates a log
@@ -106,37 +165,12 @@ func (s *logService) UpdateLog(id int64, userID int64, req *models.UpdateLogRequ
 		return nil, fmt.Errorf("validation failed: %w", err)
 	}
 
-	// Get the log to check ownership
-	log, err := s.logRepo.GetByID(id)
-	if err != nil {
-		return nil, fmt.Errorf("failed to get log: %w", err)
-	}
-
-	// Verify that the log's habit belongs to the user
-	habit, err := s.habitRepo.GetByID(log.HabitID)
-	if err != nil {
-		return nil, fmt.Errorf("failed to get habit: %w", err)
-	}
-	if habit.UserID != userID {
-		return nil, fmt.Errorf("unauthorized access to log")
-	}
-
-	// Validate duration requirement: if habit has duration, log must maintain duration
-	// If updating duration_seconds to nil and habit requires it, reject
-	if habit.DurationSeconds != nil && req.DurationSeconds != nil && *req.DurationSeconds == 0 {
-		// Allow setting to 0 as that's different from nil
-	}
-	// Check the final state after update
-	finalDuration := log.DurationSeconds
-	if req.DurationSeconds != nil {
-		finalDuration = req.DurationSeconds
-	}
-	if habit.DurationSeconds != nil && finalDuration == nil {
-		return nil, fmt.Errorf("validation failed: duration_seconds is required for this habit")
+	// Update the log; the update checks that its habit belongs to the user and
+	// that a duration the habit requires is not left empty
+	updatedLog, err := s.logRepo.UpdateForUser(id, userID, req)
+	if errors.Is(err, repository.ErrDurationRequired) {
+		return nil, fmt.Errorf("validation failed: %w", err)
 	}
-
-	// Update the log
-	updatedLog, err := s.logRepo.Update(id, req)
 	if err != nil {
 		return nil, fmt.Errorf("failed to update log: %w", err)
 	}
@@ -146,23 +180,9 @@ func (s *logService) UpdateLog(id int64, userID int64, req *models.UpdateLogRequ
 
 // DeleteLog deletes a log
 func (s *logService) DeleteLog(id int64, userID int64) error {
-	// Get the log to check ownership
-	log, err := s.logRepo.GetByID(id)
-	if err != nil {
-		return fmt.Errorf("failed to get log: %w", err)
-	}
-
-	// Verify that the log's habit belongs to the user
-	habit, err := s.habitRepo.GetByID(log.HabitID)
-	if err != nil {
-		return fmt.Errorf("failed to get habit: %w", err)
-	}
-	if habit.UserID != userID {
-		return fmt.Errorf("unauthorized access to log")
-	}
-
-	// Delete the log
-	if err := s.logRepo.Delete(id); err != nil {
+	// Delete the log if its habit belongs to the user; its triggers take it out
+	// of the habit's rollups and activity bitmap
+	if _, err := s.logRepo.DeleteForUser(id, userID); err != nil {
 		return fmt.Errorf("failed to delete log: %w", err)
 	}
 
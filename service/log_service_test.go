@@ -0,0 +1,173 @@
+package service
+
+import (
+	"context"
+	"database/sql"
+	"path/filepath"
+	"strings"
+	"sync/atomic"
+	"testing"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+)
+
+// countingDB wraps a repository.DB and counts the statements sent through it
+type countingDB struct {
+	repository.DB
+	queries int64
+}
+
+// Exec counts and runs a write statement
+func (c *countingDB) Exec(query string, args ...interface{}) (sql.Result, error) {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.Exec(query, args...)
+}
+
+// ExecReturning counts and runs a write statement with a RETURNING clause
+func (c *countingDB) ExecReturning(query string, args ...interface{}) *sql.Row {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.ExecReturning(query, args...)
+}
+
+// ExecReturningRows counts and runs a write statement returning many rows
+func (c *countingDB) ExecReturningRows(query string, args ...interface{}) (*sql.Rows, error) {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.ExecReturningRows(query, args...)
+}
+
+// Query counts and runs a read statement
+func (c *countingDB) Query(query string, args ...interface{}) (*sql.Rows, error) {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.Query(query, args...)
+}
+
+// QueryContext counts and runs a cancellable read statement
+func (c *countingDB) QueryContext(ctx context.Context, query string, args ...interface{}) (*sql.Rows, error) {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.QueryContext(ctx, query, args...)
+}
+
+// QueryRow counts and runs a single-row read statement
+func (c *countingDB) QueryRow(query string, args ...interface{}) *sql.Row {
+	atomic.AddInt64(&c.queries, 1)
+	return c.DB.QueryRow(query, args...)
+}
+
+// reset returns the number of statements counted so far and zeroes the counter
+func (c *countingDB) reset() int64 {
+	return atomic.SwapInt64(&c.queries, 0)
+}
+
+// openTestDatabase creates a migrated WAL database in a temporary directory
+func openTestDatabase(t *testing.T) *config.Database {
+	t.Helper()
+
+	cfg := config.DefaultDatabaseConfig(filepath.Join(t.TempDir(), "test.db"))
+	cfg.Mode = config.ModeWAL
+	cfg.ReadStatements = repository.ReadStatements()
+	cfg.WriteStatements = repository.WriteStatements()
+
+	database, err := config.NewDatabaseWithConfig(cfg)
+	if err != nil {
+		t.Fatalf("failed to open database: %v", err)
+	}
+	t.Cleanup(func() { database.Close() })
+	return database
+}
+
+// TestOperationStatements checks how many statements each habit, log and streak
+// operation sends, ownership checks, time zone lookups, rollups and activity
+// bitmaps included, with every repository on the counted database
+func TestOperationStatements(t *testing.T) {
+	counter := &countingDB{DB: openTestDatabase(t)}
+	userRepo := repository.NewUserRepository(counter)
+	habitRepo := repository.NewHabitRepository(counter)
+	zones := repository.NewUserZoneCache(userRepo, 1000)
+	habitService := NewHabitService(habitRepo)
+	logService := NewLogService(repository.NewLogRepository(counter), habitRepo, zones)
+	streakService := NewStreakService(repository.NewActivityRepository(counter), habitRepo, zones)
+
+	owner, err := userRepo.Create(&models.CreateUserRequest{Name: "Owner", TimeZone: "America/New_York", PhoneNumber: "+15550000001"}, "not-a-real-hash")
+	if err != nil {
+		t.Fatalf("failed to create user: %v", err)
+	}
+	other, err := userRepo.Create(&models.CreateUserRequest{Name: "Other", TimeZone: "UTC", PhoneNumber: "+15550000002"}, "not-a-real-hash")
+	if err != nil {
+		t.Fatalf("failed to create user: %v", err)
+	}
+
+	duration := 60
+	notes := "updated notes"
+	var habitID, logID int64
+	createLog := func() error {
+		log, err := logService.CreateLog(habitID, owner.ID, &models.CreateLogRequest{Notes: "done", DurationSeconds: &duration})
+		if err == nil {
+			logID = log.ID
+		}
+		return err
+	}
+
+	tests := []struct {
+		name     string
+		run      func() error
+		queries  int64
+		notFound bool
+	}{
+		{"CreateHabit", func() error {
+			habit, err := habitService.CreateHabit(owner.ID, &models.CreateHabitRequest{Name: "Read", DurationSeconds: &duration})
+			if err == nil {
+				habitID = habit.ID
+			}
+			return err
+		}, 1, false},
+		{"GetHabit", func() error { _, err := habitService.GetHabit(habitID, owner.ID); return err }, 1, false},
+		{"GetHabit (other user)", func() error { _, err := habitService.GetHabit(habitID, other.ID); return err }, 1, true},
+		{"UpdateHabit", func() error {
+			_, err := habitService.UpdateHabit(habitID, owner.ID, &models.UpdateHabitRequest{Description: &notes})
+			return err
+		}, 1, false},
+		{"UpdateHabit (other user)", func() error {
+			_, err := habitService.UpdateHabit(habitID, other.ID, &models.UpdateHabitRequest{Description: &notes})
+			return err
+		}, 1, true},
+		// The first log of a user reads their time zone; later ones find it cached
+		{"CreateLog (zone not cached)", createLog, 2, false},
+		{"DeleteLog", func() error { return logService.DeleteLog(logID, owner.ID) }, 1, false},
+		{"CreateLog", createLog, 1, false},
+		{"GetLog", func() error { _, err := logService.GetLog(logID, owner.ID); return err }, 1, false},
+		{"GetLog (other user)", func() error { _, err := logService.GetLog(logID, other.ID); return err }, 1, true},
+		{"UpdateLog", func() error {
+			_, err := logService.UpdateLog(logID, owner.ID, &models.UpdateLogRequest{Notes: &notes})
+			return err
+		}, 1, false},
+		{"StreamUserLogFeed", func() error {
+			return logService.StreamUserLogFeed(context.Background(), owner.ID, time.Time{}, func(*models.HabitLogs) error { return nil })
+		}, 1, false},
+		// The ownership check and the bitmap read; the zone is cached
+		{"GetStreaks", func() error { _, err := streakService.GetStreaks(habitID, owner.ID); return err }, 2, false},
+		{"DeleteLog (other user)", func() error { return logService.DeleteLog(logID, other.ID) }, 1, true},
+		{"DeleteHabit (other user)", func() error { return habitService.DeleteHabit(habitID, other.ID) }, 1, true},
+		{"DeleteHabit", func() error { return habitService.DeleteHabit(habitID, owner.ID) }, 1, false},
+	}
+
+	for _, tt := range tests {
+		counter.reset()
+		err := tt.run()
+		queries := counter.reset()
+
+		if tt.notFound {
+			if err == nil || !strings.Contains(err.Error(), "not found") {
+				t.Fatalf("%s: expected not found, got %v", tt.name, err)
+			}
+		} else if err != nil {
+			t.Fatalf("%s: %v", tt.name, err)
+		}
+
+		if queries != tt.queries {
+			t.Errorf("%s sent %d statements, expected %d", tt.name, queries, tt.queries)
+		}
+	}
+}
@@ -0,0 +1,206 @@
+package service
+
+import (
+	"context"
+	"fmt"
+	"log"
+	"sort"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// Reminder scheduler settings
+const (
+	// reminderZoneRefresh is how often the scheduler re-reads the time zones users are in
+	reminderZoneRefresh = time.Hour
+	// reminderErrorDelay is how long the scheduler waits after a database error
+	reminderErrorDelay = time.Minute
+)
+
+// ReminderScheduler runs the reminder job in waves inside the server. Time zones
+// are grouped by the instant their local day starts, which is the same for every
+// zone at one UTC offset. Each group is evaluated once its day two has just
+// ended, waveDelay after local midnight. Sends are paced to sendsPerMinute, so one
+// daily spike becomes a smooth, bounded stream.
+type ReminderScheduler struct {
+	reminderRepo repository.ReminderRepository
+	reminders    ReminderService
+	clock        utils.Clock
+
+	waveDelay time.Duration
+	workers   int
+	// Sends are paced by a token bucket that holds one second's worth of sends
+	perSecond  float64
+	bucket     float64
+	tokens     float64
+	refilledAt time.Time
+
+	timeZones []string
+	listedAt  time.Time
+	// evaluated maps each time zone to the local day its last wave ran on
+	evaluated map[string]int64
+}
+
+// reminderWave is the time zones whose day starts at the same instant
+type reminderWave struct {
+	at        time.Time
+	offset    string
+	timeZones []string
+}
+
+// NewReminderScheduler creates a scheduler that sends at most sendsPerMinute
+// reminders a minute with workers concurrent sends
+func NewReminderScheduler(reminderRepo repository.ReminderRepository, reminders ReminderService, clock utils.Clock, sendsPerMinute int, waveDelay time.Duration, workers int) *ReminderScheduler {
+	perSecond := float64(sendsPerMinute) / 60
+	bucket := perSecond
+	if bucket < 1 {
+		bucket = 1
+	}
+	return &ReminderScheduler{
+		reminderRepo: reminderRepo,
+		reminders:    reminders,
+		clock:        clock,
+		waveDelay:    waveDelay,
+		workers:      workers,
+		perSecond:    perSecond,
+		bucket:       bucket,
+		tokens:       bucket,
+		refilledAt:   clock.Now(),
+		evaluated:    make(map[string]int64),
+	}
+}
+
+// Run evaluates waves and sends reminders until ctx is cancelled. Waves whose
+// time passed before the scheduler started are run at once; queueing is
+// idempotent, so a restart queues nothing twice.
+func (s *ReminderScheduler) Run(ctx context.Context) error {
+	for {
+		wait, err := s.step(ctx)
+		if err != nil {
+			if ctx.Err() != nil {
+				return ctx.Err()
+			}
+			log.Printf("Reminder scheduler: %v", err)
+			wait = reminderErrorDelay
+		}
+
+		select {
+		case <-s.clock.After(wait):
+		case <-ctx.Done():
+			return ctx.Err()
+		}
+	}
+}
+
+// step runs the waves that are due and one paced batch of sends, and returns how
+// long to wait before the next step
+func (s *ReminderScheduler) step(ctx context.Context) (time.Duration, error) {
+	now := s.clock.Now()
+	if s.listedAt.IsZero() || now.Sub(s.listedAt) >= reminderZoneRefresh {
+		timeZones, err := s.reminderRepo.ListTimeZones()
+		if err != nil {
+			return 0, err
+		}
+		s.timeZones, s.listedAt = timeZones, now
+	}
+
+	due, nextWave := s.waves(now)
+	for _, wave := range due {
+		enqueued, err := s.reminders.EnqueueReminders(ctx, wave.timeZones, now)
+		if err != nil {
+			return 0, err
+		}
+		for _, timeZone := range wave.timeZones {
+			s.evaluated[timeZone] = utils.TimeZones.LocalDay(now, timeZone)
+		}
+		log.Printf("Reminder wave for UTC%s (%d time zones): %d queued", wave.offset, len(wave.timeZones), enqueued)
+	}
+
+	// Send as many due reminders as the bucket allows
+	s.refill(now)
+	if budget := int(s.tokens); budget > 0 {
+		if budget > reminderQueueSize {
+			budget = reminderQueueSize
+		}
+		run, err := s.reminders.DeliverDue(ctx, now, s.workers, budget)
+		if err != nil {
+			return 0, err
+		}
+		s.tokens -= float64(run.Sent + run.Retried + run.Deferred + run.Failed + run.SentUnknown)
+	}
+
+	// Wake for the next wave, the zone refresh, or the next due reminder once
+	// there are tokens to send it
+	wake := s.listedAt.Add(reminderZoneRefresh)
+	if !nextWave.IsZero() && nextWave.Before(wake) {
+		wake = nextWave
+	}
+	nextDue, err := s.reminderRepo.NextDue()
+	if err != nil {
+		return 0, err
+	}
+	if nextDue != nil {
+		send := *nextDue
+		if s.tokens < 1 {
+			// Wait until the bucket is full, so sends go out in steady batches
+			if refilled := now.Add(time.Duration((s.bucket - s.tokens) / s.perSecond * float64(time.Second))); refilled.After(send) {
+				send = refilled
+			}
+		}
+		if send.Before(wake) {
+			wake = send
+		}
+	}
+	return wake.Sub(now), nil
+}
+
+// waves groups the time zones whose wave is due by the instant their day starts,
+// and returns them with the time of the next wave after now
+func (s *ReminderScheduler) waves(now time.Time) ([]*reminderWave, time.Time) {
+	byStart := make(map[time.Time]*reminderWave)
+	var next time.Time
+	for _, timeZone := range s.timeZones {
+		today := utils.TimeZones.LocalDay(now, timeZone)
+		start, _ := utils.TimeZones.DayBounds(today, timeZone)
+		at := start.Add(s.waveDelay)
+		if s.evaluated[timeZone] >= today {
+			// Today's wave has run; the next one is after tomorrow starts
+			tomorrow, _ := utils.TimeZones.DayBounds(today+1, timeZone)
+			at = tomorrow.Add(s.waveDelay)
+		} else if !at.After(now) {
+			wave, ok := byStart[start.UTC()]
+			if !ok {
+				wave = &reminderWave{at: at, offset: start.Format("-07:00")}
+				byStart[start.UTC()] = wave
+			}
+			wave.timeZones = append(wave.timeZones, timeZone)
+			continue
+		}
+		if next.IsZero() || at.Before(next) {
+			next = at
+		}
+	}
+
+	due := make([]*reminderWave, 0, len(byStart))
+	for _, wave := range byStart {
+		due = append(due, wave)
+	}
+	sort.Slice(due, func(i, j int) bool { return due[i].at.Before(due[j].at) })
+	return due, next
+}
+
+// refill adds the tokens earned since the last refill
+func (s *ReminderScheduler) refill(now time.Time) {
+	s.tokens += now.Sub(s.refilledAt).Seconds() * s.perSecond
+	if s.tokens > s.bucket {
+		s.tokens = s.bucket
+	}
+	s.refilledAt = now
+}
+
+// String describes the scheduler's settings
+func (s *ReminderScheduler) String() string {
+	return fmt.Sprintf("reminder waves %s after local midnight, at most %.0f sends a minute, %d workers", s.waveDelay, s.perSecond*60, s.workers)
+}
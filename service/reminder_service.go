@@ -0,0 +1,371 @@
+package service
+
+import (
+	"context"
+	"errors"
+	"fmt"
+	"io"
+	"log"
+	"math/rand"
+	"sync"
+	"sync/atomic"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// Reminder delivery settings
+const (
+	// reminderQueueSize bounds the reminders claimed but not yet sent, so a slow
+	// provider holds back claiming instead of filling memory
+	reminderQueueSize = 256
+	// reminderLease is how long a claimed reminder is left to its sender before it
+	// is claimed again; it covers a full queue at low provider rates
+	reminderLease = 10 * time.Minute
+	// reminderMaxAttempts is how many deliveries are started before a reminder fails
+	reminderMaxAttempts = 5
+	// Retries back off exponentially from reminderBaseBackoff up to reminderMaxBackoff
+	reminderBaseBackoff = time.Second
+	reminderMaxBackoff  = 5 * time.Minute
+	// reminderDeferral is how long a reminder waits while the provider's breaker is open
+	reminderDeferral = 5 * time.Second
+	// reminderExpiry is how long after being queued a reminder is still worth sending
+	reminderExpiry = 12 * time.Hour
+	// reminderPollInterval is how often a delivery run waiting on in-flight
+	// reminders checks for reminders to retry
+	reminderPollInterval = 100 * time.Millisecond
+)
+
+// ReminderSender delivers a reminder to a user and returns the provider's message ID
+type ReminderSender interface {
+	Send(ctx context.Context, reminder *models.Reminder) (string, error)
+}
+
+// ReminderService defines the interface for the missed-logs reminder job
+type ReminderService interface {
+	// EnqueueMissedLogReminders queues a reminder in the outbox for every user with
+	// a habit who did not log yesterday in their time zone, and returns the number queued
+	EnqueueMissedLogReminders(ctx context.Context) (int64, error)
+	// EnqueueReminders does the same for the users in the given time zones, with
+	// yesterday taken at now
+	EnqueueReminders(ctx context.Context, timeZones []string, now time.Time) (int64, error)
+	// DeliverReminders drains the outbox with workers concurrent sends, retrying
+	// failed sends, until no reminder is pending or ctx ends
+	DeliverReminders(ctx context.Context, workers int) (*models.ReminderRun, error)
+	// DeliverDue makes one attempt at up to limit reminders due at now, with
+	// workers concurrent sends, and returns once their outcomes are recorded
+	DeliverDue(ctx context.Context, now time.Time, workers int, limit int) (*models.ReminderRun, error)
+}
+
+// reminderService implements ReminderService
+type reminderService struct {
+	reminderRepo repository.ReminderRepository
+	sender       ReminderSender
+	now          func() time.Time
+}
+
+// NewReminderService creates a new reminder service
+func NewReminderService(reminderRepo repository.ReminderRepository, sender ReminderSender) ReminderService {
+	return &reminderService{
+		reminderRepo: reminderRepo,
+		sender:       sender,
+		now:          time.Now,
+	}
+}
+
+// EnqueueMissedLogReminders queues reminders for every time zone users are in.
+// Re-running it the same day queues nothing twice.
+func (s *reminderService) EnqueueMissedLogReminders(ctx context.Context) (int64, error) {
+	timeZones, err := s.reminderRepo.ListTimeZones()
+	if err != nil {
+		return 0, err
+	}
+	return s.EnqueueReminders(ctx, timeZones, s.now())
+}
+
+// EnqueueReminders selects and queues each time zone's candidates in one statement
+func (s *reminderService) EnqueueReminders(ctx context.Context, timeZones []string, now time.Time) (int64, error) {
+	var enqueued int64
+	for _, timeZone := range timeZones {
+		if err := ctx.Err(); err != nil {
+			return enqueued, err
+		}
+		n, err := s.reminderRepo.Enqueue(reminderWindow(timeZone, now), now)
+		if err != nil {
+			return enqueued, fmt.Errorf("failed to enqueue reminders for %s: %w", timeZone, err)
+		}
+		enqueued += n
+	}
+	return enqueued, nil
+}
+
+// reminderWindow returns the last two complete local days at now in a time zone:
+// day two is yesterday and day one the day before
+func reminderWindow(timeZone string, now time.Time) *models.ReminderWindow {
+	dayTwo := utils.TimeZones.LocalDay(now, timeZone) - 1
+	dayOneStart, _ := utils.TimeZones.DayBounds(dayTwo-1, timeZone)
+	dayTwoStart, dayTwoEnd := utils.TimeZones.DayBounds(dayTwo, timeZone)
+	return &models.ReminderWindow{
+		TimeZone:    timeZone,
+		Day:         dayTwoStart.Format("2006-01-02"),
+		DayOneStart: dayOneStart,
+		DayTwoStart: dayTwoStart,
+		DayTwoEnd:   dayTwoEnd,
+	}
+}
+
+// DeliverReminders claims due reminders into a bounded queue drained by the
+// workers. Outcomes are written back in batches by a single recorder. Failed sends
+// are retried with exponential backoff and jitter, and sends refused by an open
+// circuit breaker are deferred without using up an attempt.
+func (s *reminderService) DeliverReminders(ctx context.Context, workers int) (*models.ReminderRun, error) {
+	if workers < 1 {
+		workers = 1
+	}
+
+	run := &models.ReminderRun{}
+	queue := make(chan *models.Reminder, reminderQueueSize)
+	results := make(chan *models.ReminderDelivery, reminderQueueSize)
+	// inFlight counts the reminders claimed whose outcome is not recorded yet
+	var inFlight int64
+
+	var senders sync.WaitGroup
+	for i := 0; i < workers; i++ {
+		senders.Add(1)
+		go func() {
+			defer senders.Done()
+			for reminder := range queue {
+				results <- s.deliver(ctx, reminder, s.now)
+			}
+		}()
+	}
+	recorded := make(chan error, 1)
+	go func() {
+		recorded <- s.record(results, run, &inFlight)
+	}()
+
+	err := s.claim(ctx, queue, &inFlight)
+	close(queue)
+	senders.Wait()
+	close(results)
+	if recordErr := <-recorded; err == nil {
+		err = recordErr
+	}
+	return run, err
+}
+
+// claim feeds due reminders to the queue, claiming no more than it has room for,
+// until nothing is pending or in flight
+func (s *reminderService) claim(ctx context.Context, queue chan<- *models.Reminder, inFlight *int64) error {
+	for {
+		if err := ctx.Err(); err != nil {
+			return err
+		}
+
+		if room := cap(queue) - len(queue); room > 0 {
+			reminders, err := s.reminderRepo.Claim(s.now(), reminderLease, room)
+			if err != nil {
+				return err
+			}
+			if len(reminders) > 0 {
+				atomic.AddInt64(inFlight, int64(len(reminders)))
+				for _, reminder := range reminders {
+					queue <- reminder
+				}
+				continue
+			}
+		}
+
+		// Wait for in-flight reminders, which may be retried, or for the next retry
+		wait := reminderPollInterval
+		if atomic.LoadInt64(inFlight) == 0 {
+			next, err := s.reminderRepo.NextDue()
+			if err != nil {
+				return err
+			}
+			if next == nil {
+				return nil
+			}
+			wait = next.Sub(s.now())
+		}
+		if err := sleepContext(ctx, wait); err != nil {
+			return err
+		}
+	}
+}
+
+// DeliverDue claims one batch and sends it with a fixed number of workers. It
+// never waits on the clock, so a scheduler can pace it against simulated time.
+func (s *reminderService) DeliverDue(ctx context.Context, now time.Time, workers int, limit int) (*models.ReminderRun, error) {
+	run := &models.ReminderRun{}
+	reminders, err := s.reminderRepo.Claim(now, reminderLease, limit)
+	if err != nil || len(reminders) == 0 {
+		return run, err
+	}
+	if workers < 1 {
+		workers = 1
+	}
+
+	deliveries := make([]*models.ReminderDelivery, len(reminders))
+	at := func() time.Time { return now }
+	next := int64(-1)
+	var senders sync.WaitGroup
+	for i := 0; i < workers && i < len(reminders); i++ {
+		senders.Add(1)
+		go func() {
+			defer senders.Done()
+			for j := atomic.AddInt64(&next, 1); j < int64(len(reminders)); j = atomic.AddInt64(&next, 1) {
+				deliveries[j] = s.deliver(ctx, reminders[j], at)
+			}
+		}()
+	}
+	senders.Wait()
+
+	tally(run, deliveries)
+	if err := s.reminderRepo.Record(deliveries); err != nil {
+		return run, err
+	}
+	return run, nil
+}
+
+// deliver makes one attempt at a reminder and decides what happens next, with
+// now giving the time of the attempt and of its outcome
+func (s *reminderService) deliver(ctx context.Context, reminder *models.Reminder, now func() time.Time) *models.ReminderDelivery {
+	delivery := &models.ReminderDelivery{ReminderID: reminder.ID, At: now()}
+	if delivery.At.Sub(reminder.EnqueuedAt) > reminderExpiry {
+		delivery.Status = models.ReminderFailed
+		delivery.Error = "expired"
+		return delivery
+	}
+
+	messageID, err := s.sender.Send(ctx, reminder)
+	delivery.At = now()
+	switch {
+	case err == nil:
+		delivery.Status = models.ReminderSent
+		delivery.MessageID = messageID
+	case errors.Is(err, ErrReminderUnconfirmed):
+		// Retrying could send it twice, so the reminder is left for an operator
+		delivery.Status = models.ReminderSentUnknown
+		delivery.Error = err.Error()
+	case ctx.Err() != nil:
+		// The run is stopping; leave the reminder due for the next one
+		delivery.Status = models.ReminderPending
+		delivery.Deferred = true
+		delivery.NextAttemptAt = delivery.At
+		delivery.Error = err.Error()
+	case errors.Is(err, utils.ErrCircuitOpen):
+		delivery.Status = models.ReminderPending
+		delivery.Deferred = true
+		delivery.NextAttemptAt = delivery.At.Add(reminderDeferral)
+		delivery.Error = err.Error()
+	case errors.Is(err, ErrReminderRejected) || reminder.Attempts >= reminderMaxAttempts:
+		delivery.Status = models.ReminderFailed
+		delivery.Error = err.Error()
+	default:
+		delivery.Status = models.ReminderPending
+		delivery.NextAttemptAt = delivery.At.Add(reminderBackoff(reminder.Attempts))
+		delivery.Error = err.Error()
+	}
+	return delivery
+}
+
+// reminderBackoff returns the wait before the next attempt after attempts failed
+// ones: it doubles each time, and half of it is random so retries spread out
+func reminderBackoff(attempts int) time.Duration {
+	backoff := reminderMaxBackoff
+	if attempts < 20 {
+		if d := reminderBaseBackoff << (attempts - 1); d < backoff {
+			backoff = d
+		}
+	}
+	return backoff/2 + time.Duration(rand.Int63n(int64(backoff/2)+1))
+}
+
+// record writes outcomes back in batches of up to a queue's worth, flushing early
+// whenever no further outcome is waiting
+func (s *reminderService) record(results <-chan *models.ReminderDelivery, run *models.ReminderRun, inFlight *int64) error {
+	var recordErr error
+	batch := make([]*models.ReminderDelivery, 0, reminderQueueSize)
+	flush := func() {
+		if err := s.reminderRepo.Record(batch); err != nil {
+			// The reminders stay leased and are claimed again once the lease ends
+			log.Printf("Failed to record %d reminder deliveries: %v", len(batch), err)
+			if recordErr == nil {
+				recordErr = err
+			}
+		}
+		tally(run, batch)
+		atomic.AddInt64(inFlight, -int64(len(batch)))
+		batch = batch[:0]
+	}
+
+	for delivery := range results {
+		batch = append(batch, delivery)
+		if len(batch) == cap(batch) || len(results) == 0 {
+			flush()
+		}
+	}
+	if len(batch) > 0 {
+		flush()
+	}
+	return recordErr
+}
+
+// tally counts outcomes into a run, logging the reminders that failed for good
+func tally(run *models.ReminderRun, deliveries []*models.ReminderDelivery) {
+	for _, delivery := range deliveries {
+		switch {
+		case delivery.Status == models.ReminderSent:
+			run.Sent++
+		case delivery.Status == models.ReminderFailed:
+			log.Printf("Reminder %d failed: %s", delivery.ReminderID, delivery.Error)
+			run.Failed++
+		case delivery.Status == models.ReminderSentUnknown:
+			log.Printf("Reminder %d may not have been sent: %s", delivery.ReminderID, delivery.Error)
+			run.SentUnknown++
+		case delivery.Deferred:
+			run.Deferred++
+		default:
+			run.Retried++
+		}
+	}
+}
+
+// sleepContext waits for d or until ctx ends
+func sleepContext(ctx context.Context, d time.Duration) error {
+	if d <= 0 {
+		return nil
+	}
+	timer := time.NewTimer(d)
+	defer timer.Stop()
+	select {
+	case <-timer.C:
+		return nil
+	case <-ctx.Done():
+		return ctx.Err()
+	}
+}
+
+// logReminderSender writes reminders to a writer instead of delivering them
+type logReminderSender struct {
+	mu sync.Mutex
+	w  io.Writer
+}
+
+// NewLogReminderSender creates a sender that writes one line per reminder to w,
+// for running the job locally and in tests
+func NewLogReminderSender(w io.Writer) ReminderSender {
+	return &logReminderSender{w: w}
+}
+
+// Send writes the reminder
+func (s *logReminderSender) Send(ctx context.Context, reminder *models.Reminder) (string, error) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	_, err := fmt.Fprintf(s.w, "reminder user=%d phone=%s reason=%s message=%q\n",
+		reminder.UserID, reminder.PhoneNumber, reminder.Reason, reminder.Message())
+	return "", err
+}
@@ -0,0 +1,159 @@
+package service
+
+import (
+	"crypto/rand"
+	"crypto/sha256"
+	"encoding/base64"
+	"fmt"
+	"log"
+	"strings"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// refreshTokenBytes is the number of random bytes in a refresh token
+const refreshTokenBytes = 32
+
+// SessionService defines the interface for issuing and revoking tokens. A login
+// starts a session with a short-lived access token and an opaque refresh token;
+// each refresh token can be exchanged once for a new pair, without a password.
+type SessionService interface {
+	StartSession(userID int64) (*models.TokenResponse, error)
+	RefreshSession(req *models.RefreshTokenRequest) (*models.TokenResponse, error)
+	EndSession(claims *utils.JWTClaims, req *models.LogoutRequest) error
+	RevokeUserSessions(userID int64) error
+}
+
+// sessionService implements SessionService
+type sessionService struct {
+	repo        repository.RefreshTokenRepository
+	revocations *repository.TokenRevocations
+	jwtManager  *utils.JWTManager
+	accessTTL   time.Duration
+	refreshTTL  time.Duration
+	now         func() time.Time
+}
+
+// NewSessionService creates a new session service that issues access tokens
+// valid for accessTTL and refresh tokens valid for refreshTTL after their last
+// use. Access tokens carry the user's token epoch from revocations.
+func NewSessionService(repo repository.RefreshTokenRepository, revocations *repository.TokenRevocations, jwtManager *utils.JWTManager, accessTTL, refreshTTL time.Duration) SessionService {
+	return &sessionService{
+		repo:        repo,
+		revocations: revocations,
+		jwtManager:  jwtManager,
+		accessTTL:   accessTTL,
+		refreshTTL:  refreshTTL,
+		now:         time.Now,
+	}
+}
+
+// StartSession issues the first tokens of a new session for the user
+func (s *sessionService) StartSession(userID int64) (*models.TokenResponse, error) {
+	refreshToken, tokenHash, err := newRefreshToken()
+	if err != nil {
+		return nil, err
+	}
+
+	now := s.now()
+	if err := s.repo.Create(userID, tokenHash, now.Add(s.refreshTTL)); err != nil {
+		return nil, fmt.Errorf("failed to start session: %w", err)
+	}
+
+	// The user's expired sessions are pruned as new ones start; a failure only leaves them for next time
+	if err := s.repo.DeleteExpired(userID, now); err != nil {
+		log.Printf("Failed to prune sessions of user %d: %v", userID, err)
+	}
+
+	return s.tokens(userID, refreshToken)
+}
+
+// RefreshSession exchanges a refresh token for a new access token and the
+// session's next refresh token. The old refresh token stops working.
+func (s *sessionService) RefreshSession(req *models.RefreshTokenRequest) (*models.TokenResponse, error) {
+	// Validate the request
+	if err := req.Validate(); err != nil {
+		return nil, fmt.Errorf("validation failed: %w", err)
+	}
+
+	refreshToken, nextHash, err := newRefreshToken()
+	if err != nil {
+		return nil, err
+	}
+
+	// One indexed update finds the session and rotates its token
+	now := s.now()
+	tokenHash := sha256.Sum256([]byte(req.RefreshToken))
+	userID, err := s.repo.Rotate(tokenHash[:], nextHash, now, now.Add(s.refreshTTL))
+	if err != nil {
+		if strings.Contains(err.Error(), "not found") {
+			return nil, fmt.Errorf("invalid refresh token")
+		}
+		return nil, fmt.Errorf("failed to refresh session: %w", err)
+	}
+
+	return s.tokens(userID, refreshToken)
+}
+
+// EndSession logs out: it revokes the access token the request was made with
+// and ends the session of the refresh token
+func (s *sessionService) EndSession(claims *utils.JWTClaims, req *models.LogoutRequest) error {
+	// Validate the request
+	if err := req.Validate(); err != nil {
+		return fmt.Errorf("validation failed: %w", err)
+	}
+
+	tokenHash := sha256.Sum256([]byte(req.RefreshToken))
+	if err := s.repo.Delete(claims.UserID, tokenHash[:]); err != nil {
+		return fmt.Errorf("failed to end session: %w", err)
+	}
+
+	// Tokens issued before token IDs were added expire on their own
+	if claims.TokenID != 0 {
+		if err := s.revocations.RevokeToken(claims.TokenID, claims.ExpiresAt); err != nil {
+			return fmt.Errorf("failed to end session: %w", err)
+		}
+	}
+	return nil
+}
+
+// RevokeUserSessions revokes every access token issued to the user and ends
+// all of their sessions, so only a new login gets them tokens again
+func (s *sessionService) RevokeUserSessions(userID int64) error {
+	if err := s.revocations.RevokeUser(userID); err != nil {
+		return err
+	}
+	if err := s.repo.DeleteByUserID(userID); err != nil {
+		return fmt.Errorf("failed to end sessions: %w", err)
+	}
+	return nil
+}
+
+// tokens issues an access token for the user, in their current token epoch, alongside refreshToken
+func (s *sessionService) tokens(userID int64, refreshToken string) (*models.TokenResponse, error) {
+	token, err := s.jwtManager.GenerateToken(userID, s.revocations.Epoch(userID), s.accessTTL)
+	if err != nil {
+		return nil, fmt.Errorf("failed to generate token: %w", err)
+	}
+
+	return &models.TokenResponse{
+		Token:        token,
+		RefreshToken: refreshToken,
+		ExpiresIn:    int64(s.accessTTL / time.Second),
+	}, nil
+}
+
+// newRefreshToken returns a random refresh token and the SHA-256 hash it is stored under
+func newRefreshToken() (string, []byte, error) {
+	random := make([]byte, refreshTokenBytes)
+	if _, err := rand.Read(random); err != nil {
+		return "", nil, fmt.Errorf("failed to generate refresh token: %w", err)
+	}
+
+	token := base64.RawURLEncoding.EncodeToString(random)
+	hash := sha256.Sum256([]byte(token))
+	return token, hash[:], nil
+}
@@ -0,0 +1,79 @@
+package service
+
+import (
+	"fmt"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/repository"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// StreakService defines the interface for the streak subsystem. Every habit has
+// an activity bitmap of its logged local days, kept current by triggers on logs
+// inside each log write, and streaks are answered from it.
+type StreakService interface {
+	GetStreaks(habitID int64, userID int64) (*models.Streaks, error)
+	// Rebuild recomputes a habit's bitmap from its logs
+	Rebuild(habitID int64, userID int64) (*models.ActivityBitmap, error)
+}
+
+// streakService implements StreakService
+type streakService struct {
+	activityRepo repository.ActivityRepository
+	habitRepo    repository.HabitRepository
+	zones        *repository.UserZoneCache
+	now          func() time.Time
+}
+
+// NewStreakService creates a new streak service
+func NewStreakService(activityRepo repository.ActivityRepository, habitRepo repository.HabitRepository, zones *repository.UserZoneCache) StreakService {
+	return &streakService{
+		activityRepo: activityRepo,
+		habitRepo:    habitRepo,
+		zones:        zones,
+		now:          time.Now,
+	}
+}
+
+// GetStreaks returns a habit's current and longest streak from its bitmap
+func (s *streakService) GetStreaks(habitID int64, userID int64) (*models.Streaks, error) {
+	// Verify that the habit exists and belongs to the user
+	if _, err := s.habitRepo.GetByIDForUser(habitID, userID); err != nil {
+		return nil, fmt.Errorf("habit not found")
+	}
+
+	// Today is the user's local day
+	zone, err := s.zones.TimeZone(userID)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get user: %w", err)
+	}
+
+	activity, err := s.activityRepo.Get(habitID)
+	if err != nil {
+		return nil, fmt.Errorf("failed to get streaks: %w", err)
+	}
+
+	return &models.Streaks{
+		HabitID: habitID,
+		Current: activity.CurrentStreak(utils.TimeZones.LocalDay(s.now(), zone)),
+		Longest: activity.LongestStreak(),
+	}, nil
+}
+
+// Rebuild recomputes a habit's bitmap from its logs and returns it
+func (s *streakService) Rebuild(habitID int64, userID int64) (*models.ActivityBitmap, error) {
+	// Verify that the habit exists and belongs to the user
+	if _, err := s.habitRepo.GetByIDForUser(habitID, userID); err != nil {
+		return nil, fmt.Errorf("habit not found")
+	}
+
+	if err := s.activityRepo.Rebuild(habitID); err != nil {
+		return nil, fmt.Errorf("failed to rebuild activity: %w", err)
+	}
+	activity, err := s.activityRepo.Get(habitID)
+	if err != nil {
+		return nil, fmt.Errorf("failed to rebuild activity: %w", err)
+	}
+	return activity, nil
+}
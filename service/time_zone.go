@@ -0,0 +1,17 @@
+package service
+
+import (
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// loadLocation returns the named time zone from the process-wide cache, falling
+// back to UTC for names that were stored before time zones were validated
+func loadLocation(name string) *time.Location {
+	loc, err := utils.TimeZones.Location(name)
+	if err != nil {
+		return time.UTC
+	}
+	return loc
+}
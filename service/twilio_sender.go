@@ -0,0 +1,134 @@
+package service
+
+import (
+	"context"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"io"
+	"net/http"
+	"net/url"
+	"strings"
+	"time"
+
+	"github.com/hayden-erickson/ai-evaluation/config"
+	"github.com/hayden-erickson/ai-evaluation/models"
+	"github.com/hayden-erickson/ai-evaluation/utils"
+)
+
+// ErrReminderRejected is returned for a reminder the provider will never accept,
+// such as one to an invalid number; it is not retried
+var ErrReminderRejected = errors.New("reminder rejected")
+
+// ErrReminderUnconfirmed is returned when ctx ended after a reminder's request was
+// sent, so the provider may have accepted it; it is not retried
+var ErrReminderUnconfirmed = errors.New("reminder may have been sent")
+
+// twilioSender sends reminders as SMS through the Twilio Messages API
+type twilioSender struct {
+	cfg      config.TwilioConfig
+	endpoint string
+	client   *http.Client
+	limiter  *utils.RateLimiter
+	breaker  *utils.CircuitBreaker
+}
+
+// twilioMessage is the part of a Messages API response the sender reads
+type twilioMessage struct {
+	SID     string `json:"sid"`
+	Code    int    `json:"code"`
+	Message string `json:"message"`
+}
+
+// NewTwilioSender creates a sender with its own rate limit, circuit breaker and
+// pool of kept-alive connections
+func NewTwilioSender(cfg config.TwilioConfig) ReminderSender {
+	transport := http.DefaultTransport.(*http.Transport).Clone()
+	transport.MaxIdleConns = cfg.MaxConnections
+	transport.MaxIdleConnsPerHost = cfg.MaxConnections
+	transport.MaxConnsPerHost = cfg.MaxConnections
+	transport.IdleConnTimeout = 90 * time.Second
+
+	return &twilioSender{
+		cfg:      cfg,
+		endpoint: strings.TrimSuffix(cfg.BaseURL, "/") + "/2010-04-01/Accounts/" + url.PathEscape(cfg.AccountSID) + "/Messages.json",
+		client:   &http.Client{Transport: transport, Timeout: cfg.Timeout},
+		limiter:  utils.NewRateLimiter(cfg.RatePerSecond, cfg.Burst),
+		breaker:  utils.NewCircuitBreaker(cfg.BreakerThreshold, cfg.BreakerCooldown),
+	}
+}
+
+// Send posts the message and returns its Twilio SID. It fails fast with
+// utils.ErrCircuitOpen while the breaker is open, and otherwise waits for the rate
+// limit. Rejections (4xx other than 429) wrap ErrReminderRejected and count as a
+// success for the breaker; throttling, server errors and network errors count as failures.
+// A request cut off by ctx wraps ErrReminderUnconfirmed and records no outcome.
+func (s *twilioSender) Send(ctx context.Context, reminder *models.Reminder) (string, error) {
+	call, err := s.breaker.Allow()
+	if err != nil {
+		return "", err
+	}
+	if err := s.limiter.Wait(ctx); err != nil {
+		// No request was made, so there is no outcome to record
+		s.breaker.Release(call)
+		return "", err
+	}
+
+	sid, err := s.post(ctx, reminder)
+	if err != nil && ctx.Err() != nil && !errors.Is(err, ErrReminderRejected) {
+		// The request may have reached Twilio; the caller is stopping, not Twilio failing
+		s.breaker.Release(call)
+		return "", fmt.Errorf("%w: %v", ErrReminderUnconfirmed, err)
+	}
+	if errors.Is(err, ErrReminderRejected) {
+		// A rejection is a well-formed answer about one message, so it shows Twilio
+		// is up: it resets the failure count and closes a half-open breaker
+		s.breaker.Record(call, nil)
+	} else {
+		s.breaker.Record(call, err)
+	}
+	return sid, err
+}
+
+// post makes one Messages API call
+func (s *twilioSender) post(ctx context.Context, reminder *models.Reminder) (string, error) {
+	form := url.Values{
+		"To":   {reminder.PhoneNumber},
+		"From": {s.cfg.FromNumber},
+		"Body": {reminder.Message()},
+	}
+	req, err := http.NewRequestWithContext(ctx, http.MethodPost, s.endpoint, strings.NewReader(form.Encode()))
+	if err != nil {
+		return "", fmt.Errorf("failed to build request: %w", err)
+	}
+	req.SetBasicAuth(s.cfg.AccountSID, s.cfg.AuthToken)
+	req.Header.Set("Content-Type", "application/x-www-form-urlencoded")
+	req.Header.Set("Accept", "application/json")
+	// Every attempt at a reminder carries the same token, so Twilio accepts a
+	// reminder once even when an earlier attempt's outcome was never recorded
+	req.Header.Set("I-Twilio-Idempotency-Token", reminder.IdempotencyKey())
+
+	resp, err := s.client.Do(req)
+	if err != nil {
+		return "", fmt.Errorf("failed to send message: %w", err)
+	}
+	defer func() {
+		// Drain the body so the connection is reused
+		io.Copy(io.Discard, resp.Body)
+		resp.Body.Close()
+	}()
+
+	var message twilioMessage
+	if err := json.NewDecoder(io.LimitReader(resp.Body, 64<<10)).Decode(&message); err != nil && resp.StatusCode < 300 {
+		return "", fmt.Errorf("failed to decode response: %w", err)
+	}
+
+	switch {
+	case resp.StatusCode < 300:
+		return message.SID, nil
+	case resp.StatusCode == http.StatusTooManyRequests || resp.StatusCode >= 500:
+		return "", fmt.Errorf("twilio returned %d: %s", resp.StatusCode, message.Message)
+	default:
+		return "", fmt.Errorf("%w: twilio returned %d (code %d): %s", ErrReminderRejected, resp.StatusCode, message.Code, message.Message)
+	}
+}
@@ -1,8 +1,8 @@
 package service
 
 import (
+	"errors"
 	"fmt"
-	"time"
 
 	"github.com/hayden-erickson/ai-evaluation/models"
 	"github.com/hayden-erickson/ai-evaluation/repository"
@@ -21,16 +21,25 @@ type UserService interface {
 // userService implements UserService
 type userService struct {
 	repo       repository.UserRepository
+	habitCache *repository.HabitCache
+	zones      *repository.UserZoneCache
 	hasher     *utils.PasswordHasher
-	jwtManager *utils.JWTManager
+	sessions   SessionService
 }
 
-// NewUserService creates a new user service
-func NewUserService(repo repository.UserRepository, jwtManager *utils.JWTManager) UserService {
+// NewUserService creates a new user service. Deleting a user drops their habits
+// from habitCache, since the database deletes them by cascade, and updating or
+// deleting a user drops their time zone from zones. Password hashes
+// are run through hashAdmission, so a burst of logins cannot exhaust memory.
+// Logging in starts a session through sessions, and deleting a user or changing
+// their password revokes their tokens through it.
+func NewUserService(repo repository.UserRepository, habitCache *repository.HabitCache, zones *repository.UserZoneCache, hashAdmission *utils.HashAdmission, sessions SessionService) UserService {
 	return &userService{
 		repo:       repo,
-		hasher:     utils.NewPasswordHasher(),
-		jwtManager: jwtManager,
+		habitCache: habitCache,
+		zones:      zones,
+		hasher:     utils.NewPasswordHasher(hashAdmission),
+		sessions:   sessions,
 	}
 }
 
@@ -41,6 +50,11 @@ func (s *userService) Register(req *models.CreateUserRequest) (*models.User, err
 		return nil, fmt.Errorf("validation failed: %w", err)
 	}
 
+	// Only IANA time zones are stored, so day boundaries can always be resolved
+	if _, err := utils.TimeZones.Location(req.TimeZone); err != nil {
+		return nil, fmt.Errorf("validation failed: %w %q", err, req.TimeZone)
+	}
+
 	// Check if user already exists
 	existingUser, _ := s.repo.GetByPhoneNumber(req.PhoneNumber)
 	if existingUser != nil {
@@ -62,7 +76,7 @@ func (s *userService) Register(req *models.CreateUserRequest) (*models.User, err
 	return user, nil
 }
 
-// Login authenticates a user and returns a JWT token
+// Login authenticates a user and starts a session, returning an access token and a refresh token
 func (s *userService) Login(req *models.LoginRequest) (*models.LoginResponse, error) {
 	// Validate the request
 	if err := req.Validate(); err != nil {
@@ -75,21 +89,26 @@ func (s *userService) Login(req *models.LoginRequest) (*models.LoginResponse, er
 		return nil, fmt.Errorf("invalid credentials")
 	}
 
-	// Verify the password
+	// Verify the password; a verification that was not admitted is not a wrong password
 	valid, err := s.hasher.Verify(req.Password, user.PasswordHash)
+	if errors.Is(err, utils.ErrHashQueueFull) || errors.Is(err, utils.ErrHashWaitTimeout) {
+		return nil, fmt.Errorf("failed to verify password: %w", err)
+	}
 	if err != nil || !valid {
 		return nil, fmt.Errorf("invalid credentials")
 	}
 
-	// Generate a JWT token (24 hours expiration)
-	token, err := s.jwtManager.GenerateToken(user.ID, 24*time.Hour)
+	// Start a session; later tokens come from its refresh token without a password
+	tokens, err := s.sessions.StartSession(user.ID)
 	if err != nil {
-		return nil, fmt.Errorf("failed to generate token: %w", err)
+		return nil, err
 	}
 
 	return &models.LoginResponse{
-		Token: token,
-		User:  *user,
+		Token:        tokens.Token,
+		RefreshToken: tokens.RefreshToken,
+		ExpiresIn:    tokens.ExpiresIn,
+		User:         *user,
 	}, nil
 }
 
@@ -108,6 +127,11 @@ func (s *userService) UpdateUser(id int64, req *models.UpdateUserRequest) (*mode
 	if err := req.Validate(); err != nil {
 		return nil, fmt.Errorf("validation failed: %w", err)
 	}
+	if req.TimeZone != nil {
+		if _, err := utils.TimeZones.Location(*req.TimeZone); err != nil {
+			return nil, fmt.Errorf("validation failed: %w %q", err, *req.TimeZone)
+		}
+	}
 
 	// Hash the password if provided
 	var passwordHash *string
@@ -124,6 +148,14 @@ func (s *userService) UpdateUser(id int64, req *models.UpdateUserRequest) (*mode
 	if err != nil {
 		return nil, fmt.Errorf("failed to update user: %w", err)
 	}
+	s.zones.Invalidate(id)
+
+	// A new password revokes the tokens and sessions started with the old one
+	if passwordHash != nil {
+		if err := s.sessions.RevokeUserSessions(id); err != nil {
+			return nil, err
+		}
+	}
 
 	return user, nil
 }
@@ -133,5 +165,9 @@ func (s *userService) DeleteUser(id int64) error {
 	if err := s.repo.Delete(id); err != nil {
 		return fmt.Errorf("failed to delete user: %w", err)
 	}
-	return nil
+	s.habitCache.Invalidate(id)
+	s.zones.Invalidate(id)
+
+	// The user's tokens stop working at once instead of failing on each request until they expire
+	return s.sessions.RevokeUserSessions(id)
 }
@@ -0,0 +1,123 @@
+package utils
+
+import (
+	"errors"
+	"sync"
+	"time"
+)
+
+// ErrCircuitOpen is returned instead of calling a dependency the breaker has cut off
+var ErrCircuitOpen = errors.New("circuit open")
+
+// Circuit breaker states, as reported by State
+const (
+	CircuitClosed   = "closed"
+	CircuitOpen     = "open"
+	CircuitHalfOpen = "half-open"
+)
+
+// CircuitBreaker stops calls to a failing dependency. After threshold consecutive
+// failures it opens and rejects every call for the cooldown. Then it lets a single
+// call through, the probe: success closes it, failure opens it for another cooldown.
+// Calls still running from before it opened do not change it.
+type CircuitBreaker struct {
+	mu        sync.Mutex
+	threshold int
+	cooldown  time.Duration
+	failures  int
+	openUntil time.Time
+	probing   bool
+	now       func() time.Time
+}
+
+// NewCircuitBreaker creates a closed breaker
+func NewCircuitBreaker(threshold int, cooldown time.Duration) *CircuitBreaker {
+	if threshold < 1 {
+		threshold = 1
+	}
+	return &CircuitBreaker{
+		threshold: threshold,
+		cooldown:  cooldown,
+		now:       time.Now,
+	}
+}
+
+// CircuitCall is a call the breaker allowed, to be handed back to Record or Release
+type CircuitCall struct {
+	// probe marks the single call let through after the cooldown
+	probe bool
+}
+
+// Allow returns ErrCircuitOpen if a call must not be made now. Every call it
+// allows must be followed by Record, or by Release if it is not made after all.
+func (b *CircuitBreaker) Allow() (CircuitCall, error) {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+
+	if b.failures < b.threshold {
+		return CircuitCall{}, nil
+	}
+	if b.probing || b.now().Before(b.openUntil) {
+		return CircuitCall{}, ErrCircuitOpen
+	}
+	b.probing = true
+	return CircuitCall{probe: true}, nil
+}
+
+// Record reports the outcome of an allowed call. Once the breaker has opened,
+// only its probe's outcome closes or reopens it; calls allowed before it opened
+// are ignored.
+func (b *CircuitBreaker) Record(call CircuitCall, err error) {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+
+	if call.probe {
+		b.probing = false
+		if err == nil {
+			b.failures = 0
+		} else {
+			b.openUntil = b.now().Add(b.cooldown)
+		}
+		return
+	}
+
+	if b.failures >= b.threshold {
+		return
+	}
+	if err == nil {
+		b.failures = 0
+		return
+	}
+	b.failures++
+	if b.failures >= b.threshold {
+		b.openUntil = b.now().Add(b.cooldown)
+	}
+}
+
+// Release gives back an allowed call that was never made. It records no outcome,
+// so if it was the probe, the next call is let through in its place.
+func (b *CircuitBreaker) Release(call CircuitCall) {
+	if !call.probe {
+		return
+	}
+
+	b.mu.Lock()
+	defer b.mu.Unlock()
+
+	b.probing = false
+}
+
+// State returns whether the breaker is closed, open or letting a call through
+func (b *CircuitBreaker) State() string {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+
+	switch {
+	case b.failures < b.threshold:
+		return CircuitClosed
+	case !b.probing && b.now().Before(b.openUntil):
+		return CircuitOpen
+	default:
+		return CircuitHalfOpen
+	}
+}
@@ -0,0 +1,125 @@
+package utils
+
+import (
+	"sort"
+	"sync"
+	"time"
+)
+
+// Clock tells the time and waits, so long-running loops can run against simulated time
+type Clock interface {
+	Now() time.Time
+	// After delivers the time on the returned channel once d has passed
+	After(d time.Duration) <-chan time.Time
+}
+
+// SystemClock is the real clock
+var SystemClock Clock = systemClock{}
+
+// systemClock implements Clock with the time package
+type systemClock struct{}
+
+// Now returns the current time
+func (systemClock) Now() time.Time {
+	return time.Now()
+}
+
+// After waits for d in real time
+func (systemClock) After(d time.Duration) <-chan time.Time {
+	return time.After(d)
+}
+
+// SimulatedClock is a Clock whose time only moves when it is advanced. A driver
+// waits until the code under test is blocked on the clock, then jumps to its next
+// timer, so a day of scheduling runs in moments and the same way every time.
+type SimulatedClock struct {
+	mu     sync.Mutex
+	cond   *sync.Cond
+	now    time.Time
+	timers []*simulatedTimer
+}
+
+// simulatedTimer is a pending After call
+type simulatedTimer struct {
+	at time.Time
+	ch chan time.Time
+}
+
+// NewSimulatedClock creates a clock stopped at start
+func NewSimulatedClock(start time.Time) *SimulatedClock {
+	c := &SimulatedClock{now: start}
+	c.cond = sync.NewCond(&c.mu)
+	return c
+}
+
+// Now returns the simulated time
+func (c *SimulatedClock) Now() time.Time {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	return c.now
+}
+
+// After returns a channel that receives once the clock is advanced past d from now
+func (c *SimulatedClock) After(d time.Duration) <-chan time.Time {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	ch := make(chan time.Time, 1)
+	if d <= 0 {
+		ch <- c.now
+		return ch
+	}
+	c.timers = append(c.timers, &simulatedTimer{at: c.now.Add(d), ch: ch})
+	c.cond.Broadcast()
+	return ch
+}
+
+// BlockUntil waits until n timers are pending
+func (c *SimulatedClock) BlockUntil(n int) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	for len(c.timers) < n {
+		c.cond.Wait()
+	}
+}
+
+// Advance moves the clock forward by d and fires the timers that fall due
+func (c *SimulatedClock) Advance(d time.Duration) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	c.advanceTo(c.now.Add(d))
+}
+
+// AdvanceToNext moves the clock to the earliest pending timer and fires it,
+// returning the new time. Without pending timers the clock does not move.
+func (c *SimulatedClock) AdvanceToNext() time.Time {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if len(c.timers) > 0 {
+		next := c.timers[0].at
+		for _, timer := range c.timers[1:] {
+			if timer.at.Before(next) {
+				next = timer.at
+			}
+		}
+		c.advanceTo(next)
+	}
+	return c.now
+}
+
+// advanceTo sets the clock and fires due timers in order; the caller holds the lock
+func (c *SimulatedClock) advanceTo(t time.Time) {
+	if t.After(c.now) {
+		c.now = t
+	}
+	sort.Slice(c.timers, func(i, j int) bool { return c.timers[i].at.Before(c.timers[j].at) })
+	fired := 0
+	for _, timer := range c.timers {
+		if timer.at.After(c.now) {
+			break
+		}
+		timer.ch <- timer.at
+		fired++
+	}
+	c.timers = c.timers[fired:]
+}
@@ -0,0 +1,143 @@
+package utils
+
+import (
+	"errors"
+	"sync"
+	"time"
+)
+
+// Errors returned when a password hash is not admitted
+var (
+	// ErrHashQueueFull is returned at once when every hashing slot is busy and the wait queue is full
+	ErrHashQueueFull = errors.New("too many password hashes queued")
+	// ErrHashWaitTimeout is returned when a queued hash does not get a slot within the maximum wait
+	ErrHashWaitTimeout = errors.New("timed out waiting to hash password")
+)
+
+// HashAdmission bounds the memory used by concurrent password hashes. Each
+// Argon2 hash holds its full memory cost while it runs, so the number of hashes
+// run at once is the memory budget divided by that cost. Callers beyond that wait
+// in a bounded queue for at most a fixed time, and are turned away at once when
+// the queue is full.
+type HashAdmission struct {
+	slots    chan struct{}
+	maxQueue int
+	maxWait  time.Duration
+
+	mu       sync.Mutex
+	queued   int
+	stats    HashAdmissionStats
+	waitSum  time.Duration
+	waitPeak time.Duration
+}
+
+// HashAdmissionStats reports the admission counters
+type HashAdmissionStats struct {
+	Concurrency int     `json:"concurrency"`
+	MaxQueue    int     `json:"max_queue"`
+	Running     int     `json:"running"`
+	Queued      int     `json:"queued"`
+	PeakQueued  int     `json:"peak_queued"`
+	Admitted    int64   `json:"admitted"`
+	Waited      int64   `json:"waited"`
+	Rejected    int64   `json:"rejected"`
+	TimedOut    int64   `json:"timed_out"`
+	AvgWaitMs   float64 `json:"avg_wait_ms"`
+	MaxWaitMs   float64 `json:"max_wait_ms"`
+}
+
+// NewHashAdmission creates an admission limit that runs as many hashes of
+// hashMemory bytes at once as fit in memoryBudget bytes, at least one, with up to
+// maxQueue callers waiting up to maxWait each
+func NewHashAdmission(memoryBudget, hashMemory int64, maxQueue int, maxWait time.Duration) *HashAdmission {
+	concurrency := int(memoryBudget / hashMemory)
+	if concurrency < 1 {
+		concurrency = 1
+	}
+	return &HashAdmission{
+		slots:    make(chan struct{}, concurrency),
+		maxQueue: maxQueue,
+		maxWait:  maxWait,
+	}
+}
+
+// Do runs fn once a slot is free. It returns ErrHashQueueFull or
+// ErrHashWaitTimeout without running fn if the caller is not admitted.
+func (a *HashAdmission) Do(fn func()) error {
+	select {
+	case a.slots <- struct{}{}:
+		a.admit(0)
+	default:
+		if err := a.wait(); err != nil {
+			return err
+		}
+	}
+	defer func() { <-a.slots }()
+
+	fn()
+	return nil
+}
+
+// wait queues for a slot
+func (a *HashAdmission) wait() error {
+	a.mu.Lock()
+	if a.queued >= a.maxQueue {
+		a.stats.Rejected++
+		a.mu.Unlock()
+		return ErrHashQueueFull
+	}
+	a.queued++
+	if a.queued > a.stats.PeakQueued {
+		a.stats.PeakQueued = a.queued
+	}
+	a.mu.Unlock()
+
+	start := time.Now()
+	timer := time.NewTimer(a.maxWait)
+	defer timer.Stop()
+	select {
+	case a.slots <- struct{}{}:
+		a.mu.Lock()
+		a.queued--
+		a.mu.Unlock()
+		a.admit(time.Since(start))
+		return nil
+	case <-timer.C:
+		a.mu.Lock()
+		a.queued--
+		a.stats.TimedOut++
+		a.mu.Unlock()
+		return ErrHashWaitTimeout
+	}
+}
+
+// admit counts a caller that got a slot after waiting for waited
+func (a *HashAdmission) admit(waited time.Duration) {
+	a.mu.Lock()
+	defer a.mu.Unlock()
+	a.stats.Admitted++
+	if waited > 0 {
+		a.stats.Waited++
+		a.waitSum += waited
+		if waited > a.waitPeak {
+			a.waitPeak = waited
+		}
+	}
+}
+
+// Stats returns the admission counters and the current number of running and queued hashes
+func (a *HashAdmission) Stats() HashAdmissionStats {
+	a.mu.Lock()
+	defer a.mu.Unlock()
+
+	stats := a.stats
+	stats.Concurrency = cap(a.slots)
+	stats.MaxQueue = a.maxQueue
+	stats.Running = len(a.slots)
+	stats.Queued = a.queued
+	if stats.Waited > 0 {
+		stats.AvgWaitMs = float64(a.waitSum) / float64(stats.Waited) / float64(time.Millisecond)
+	}
+	stats.MaxWaitMs = float64(a.waitPeak) / float64(time.Millisecond)
+	return stats
+}
@@ -2,116 +2,260 @@ package utils
 
 import (
 	"crypto/hmac"
+	"crypto/rand"
 	"crypto/sha256"
 	"encoding/base64"
+	"encoding/binary"
 	"encoding/json"
 	"errors"
-	"fmt"
+	"hash"
+	"strconv"
 	"strings"
+	"sync"
 	"time"
+	"unsafe"
 )
 
-// JWTClaims represents the claims in a JWT token
+// Size limits of the token codec's scratch buffers. Tokens issued by this
+// package are far smaller; longer ones are rejected.
+const (
+	maxClaimsJSON = 192
+	maxTokenSize  = 512
+)
+
+// Errors returned for tokens that do not validate
+var (
+	errTokenFormat    = errors.New("invalid token format")
+	errTokenSignature = errors.New("invalid signature")
+	errTokenClaims    = errors.New("invalid claims")
+	errTokenExpired   = errors.New("token expired")
+)
+
+// JWTClaims represents the claims in a JWT token. TokenID identifies the token
+// for revoking it alone; Epoch is the user's token epoch when it was issued, for
+// revoking all of the user's tokens at once. Both are zero in tokens issued
+// before they were added.
 type JWTClaims struct {
-	UserID    int64  `json:"user_id"`
-	ExpiresAt int64  `json:"exp"`
-	IssuedAt  int64  `json:"iat"`
+	UserID    int64 `json:"user_id"`
+	ExpiresAt int64 `json:"exp"`
+	IssuedAt  int64 `json:"iat"`
+	TokenID   int64 `json:"jti"`
+	Epoch     int64 `json:"epoch"`
 }
 
-// JWTManager handles JWT token generation and validation
+// JWTManager handles JWT token generation and validation. The encoded header is
+// computed once, and HMAC state and scratch buffers are pooled, so generating a
+// token allocates only the returned string and validating one only the claims.
 type JWTManager struct {
 	secret []byte
+	// header is the base64url-encoded header followed by the dot before the claims
+	header string
+	codecs sync.Pool
+}
+
+// jwtCodec is the reusable state for encoding or checking one token
+type jwtCodec struct {
+	mac    hash.Hash
+	id     [8]byte
+	sum    [sha256.Size]byte
+	sig    [sha256.Size]byte
+	claims [maxClaimsJSON]byte
+	token  [maxTokenSize]byte
 }
 
 // NewJWTManager creates a new JWT manager
 func NewJWTManager(secret string) *JWTManager {
-	return &JWTManager{
-		secret: []byte(secret),
+	jm := &JWTManager{secret: []byte(secret)}
+
+	// Same bytes as marshalling {"alg": "HS256", "typ": "JWT"}, so tokens issued
+	// before the codec was rewritten still validate
+	headerJSON, _ := json.Marshal(map[string]string{"alg": "HS256", "typ": "JWT"})
+	jm.header = base64.RawURLEncoding.EncodeToString(headerJSON) + "."
+
+	jm.codecs.New = func() interface{} {
+		return &jwtCodec{mac: hmac.New(sha256.New, jm.secret)}
 	}
+	return jm
 }
 
-// GenerateToken generates a JWT token for a user
-func (jm *JWTManager) GenerateToken(userID int64, duration time.Duration) (string, error) {
+// GenerateToken generates a JWT token for a user in the given token epoch, with
+// a random token ID
+func (jm *JWTManager) GenerateToken(userID, epoch int64, duration time.Duration) (string, error) {
+	codec := jm.codecs.Get().(*jwtCodec)
+	defer jm.codecs.Put(codec)
+
+	// A positive 63-bit token ID; zero is left for tokens without one
+	if _, err := rand.Read(codec.id[:]); err != nil {
+		return "", err
+	}
+	tokenID := int64(binary.LittleEndian.Uint64(codec.id[:]) >> 1)
+	if tokenID == 0 {
+		tokenID = 1
+	}
+
 	now := time.Now()
 	claims := JWTClaims{
 		UserID:    userID,
 		ExpiresAt: now.Add(duration).Unix(),
 		IssuedAt:  now.Unix(),
+		TokenID:   tokenID,
+		Epoch:     epoch,
 	}
 
-	// Create header
-	header := map[string]string{
-		"alg": "HS256",
-		"typ": "JWT",
-	}
-
-	// Encode header
-	headerJSON, err := json.Marshal(header)
-	if err != nil {
-		return "", fmt.Errorf("failed to marshal header: %w", err)
-	}
-	headerEncoded := base64.RawURLEncoding.EncodeToString(headerJSON)
-
-	// Encode claims
-	claimsJSON, err := json.Marshal(claims)
-	if err != nil {
-		return "", fmt.Errorf("failed to marshal claims: %w", err)
-	}
-	claimsEncoded := base64.RawURLEncoding.EncodeToString(claimsJSON)
-
-	// Create signature
-	message := headerEncoded + "." + claimsEncoded
-	signature := jm.sign(message)
-	signatureEncoded := base64.RawURLEncoding.EncodeToString(signature)
-
-	// Combine all parts
-	token := message + "." + signatureEncoded
+	// header.claims, signed, then .signature
+	token := append(codec.token[:0], jm.header...)
+	token = appendBase64(token, appendClaims(codec.claims[:0], &claims))
+	signature := codec.sign(token)
+	token = append(token, '.')
+	token = appendBase64(token, signature)
 
-	return token, nil
+	return string(token), nil
 }
 
 // ValidateToken validates a JWT token and returns the claims
 func (jm *JWTManager) ValidateToken(token string) (*JWTClaims, error) {
-	// Split the token into parts
-	parts := strings.Split(token, ".")
-	if len(parts) != 3 {
-		return nil, errors.New("invalid token format")
+	// Find the two dots without splitting the token
+	if len(token) > maxTokenSize {
+		return nil, errTokenFormat
 	}
+	first := strings.IndexByte(token, '.')
+	last := strings.LastIndexByte(token, '.')
+	if first <= 0 || last == first || strings.IndexByte(token[first+1:last], '.') >= 0 {
+		return nil, errTokenFormat
+	}
+
+	codec := jm.codecs.Get().(*jwtCodec)
+	defer jm.codecs.Put(codec)
 
 	// Verify signature
-	message := parts[0] + "." + parts[1]
-	signature, err := base64.RawURLEncoding.DecodeString(parts[2])
-	if err != nil {
-		return nil, fmt.Errorf("failed to decode signature: %w", err)
+	if base64.RawURLEncoding.DecodedLen(len(token)-last-1) != sha256.Size {
+		return nil, errTokenSignature
 	}
-
-	expectedSignature := jm.sign(message)
-	if !hmac.Equal(signature, expectedSignature) {
-		return nil, errors.New("invalid signature")
+	if _, err := base64.RawURLEncoding.Decode(codec.sig[:], stringBytes(token[last+1:])); err != nil {
+		return nil, errTokenSignature
+	}
+	if !hmac.Equal(codec.sig[:], codec.sign(stringBytes(token[:last]))) {
+		return nil, errTokenSignature
 	}
 
 	// Decode claims
-	claimsJSON, err := base64.RawURLEncoding.DecodeString(parts[1])
+	encoded := token[first+1 : last]
+	if base64.RawURLEncoding.DecodedLen(len(encoded)) > maxClaimsJSON {
+		return nil, errTokenClaims
+	}
+	n, err := base64.RawURLEncoding.Decode(codec.claims[:], stringBytes(encoded))
 	if err != nil {
-		return nil, fmt.Errorf("failed to decode claims: %w", err)
+		return nil, errTokenClaims
 	}
-
-	var claims JWTClaims
-	if err := json.Unmarshal(claimsJSON, &claims); err != nil {
-		return nil, fmt.Errorf("failed to unmarshal claims: %w", err)
+	claims := &JWTClaims{}
+	if err := parseClaims(codec.claims[:n], claims); err != nil {
+		return nil, err
 	}
 
 	// Check expiration
 	if time.Now().Unix() > claims.ExpiresAt {
-		return nil, errors.New("token expired")
+		return nil, errTokenExpired
+	}
+
+	return claims, nil
+}
+
+// sign returns the HMAC of message, valid until the codec is next used
+func (c *jwtCodec) sign(message []byte) []byte {
+	c.mac.Reset()
+	c.mac.Write(message)
+	return c.mac.Sum(c.sum[:0])
+}
+
+// appendClaims appends the claims as JSON, in the field order encoding/json uses
+func appendClaims(dst []byte, claims *JWTClaims) []byte {
+	dst = append(dst, `{"user_id":`...)
+	dst = strconv.AppendInt(dst, claims.UserID, 10)
+	dst = append(dst, `,"exp":`...)
+	dst = strconv.AppendInt(dst, claims.ExpiresAt, 10)
+	dst = append(dst, `,"iat":`...)
+	dst = strconv.AppendInt(dst, claims.IssuedAt, 10)
+	dst = append(dst, `,"jti":`...)
+	dst = strconv.AppendInt(dst, claims.TokenID, 10)
+	dst = append(dst, `,"epoch":`...)
+	dst = strconv.AppendInt(dst, claims.Epoch, 10)
+	return append(dst, '}')
+}
+
+// parseClaims reads a flat JSON object of integer claims, as written by
+// appendClaims, in any order. Unknown claims, other value types and whitespace
+// are rejected.
+func parseClaims(data []byte, claims *JWTClaims) error {
+	if len(data) < 2 || data[0] != '{' || data[len(data)-1] != '}' {
+		return errTokenClaims
 	}
+	data = data[1 : len(data)-1]
+	for len(data) > 0 {
+		// "name":
+		if data[0] != '"' {
+			return errTokenClaims
+		}
+		end := 1
+		for end < len(data) && data[end] != '"' {
+			end++
+		}
+		if end+1 >= len(data) || data[end+1] != ':' {
+			return errTokenClaims
+		}
+		name := data[1:end]
+		data = data[end+2:]
 
-	return &claims, nil
+		// Integer value up to the next comma
+		end = 0
+		for end < len(data) && data[end] != ',' {
+			end++
+		}
+		value, err := strconv.ParseInt(unsafe.String(unsafe.SliceData(data), end), 10, 64)
+		if err != nil {
+			return errTokenClaims
+		}
+		switch string(name) {
+		case "user_id":
+			claims.UserID = value
+		case "exp":
+			claims.ExpiresAt = value
+		case "iat":
+			claims.IssuedAt = value
+		case "jti":
+			claims.TokenID = value
+		case "epoch":
+			claims.Epoch = value
+		default:
+			return errTokenClaims
+		}
+
+		data = data[end:]
+		if len(data) > 0 {
+			// Skip the comma; a trailing one leaves nothing to parse
+			data = data[1:]
+			if len(data) == 0 {
+				return errTokenClaims
+			}
+		}
+	}
+	return nil
+}
+
+// appendBase64 appends the unpadded base64url encoding of src to dst
+func appendBase64(dst, src []byte) []byte {
+	n := len(dst)
+	size := n + base64.RawURLEncoding.EncodedLen(len(src))
+	if size > cap(dst) {
+		grown := make([]byte, n, size)
+		copy(grown, dst)
+		dst = grown
+	}
+	dst = dst[:size]
+	base64.RawURLEncoding.Encode(dst[n:], src)
+	return dst
 }
 
-// sign creates an HMAC signature for a message
-func (jm *JWTManager) sign(message string) []byte {
-	h := hmac.New(sha256.New, jm.secret)
-	h.Write([]byte(message))
-	return h.Sum(nil)
+// stringBytes views s as a byte slice without copying. The slice must not be modified.
+func stringBytes(s string) []byte {
+	return unsafe.Slice(unsafe.StringData(s), len(s))
 }
@@ -11,6 +11,9 @@ import (
 	"golang.org/x/crypto/argon2"
 )
 
+// PasswordHashMemory is the memory, in bytes, one password hash holds while it runs
+const PasswordHashMemory = 64 << 20
+
 // PasswordHasher provides password hashing and verification functionality
 type PasswordHasher struct {
 	memory      uint32
@@ -18,16 +21,19 @@ type PasswordHasher struct {
 	parallelism uint8
 	saltLength  uint32
 	keyLength   uint32
+	admission   *HashAdmission
 }
 
-// NewPasswordHasher creates a new password hasher with default parameters
-func NewPasswordHasher() *PasswordHasher {
+// NewPasswordHasher creates a new password hasher with default parameters. Hashes
+// and verifications run through admission when it is not nil.
+func NewPasswordHasher(admission *HashAdmission) *PasswordHasher {
 	return &PasswordHasher{
-		memory:      64 * 1024, // 64 MB
+		memory:      PasswordHashMemory >> 10, // 64 MB, in KiB
 		iterations:  3,
 		parallelism: 2,
 		saltLength:  16,
 		keyLength:   32,
+		admission:   admission,
 	}
 }
 
@@ -40,7 +46,12 @@ func (ph *PasswordHasher) Hash(password string) (string, error) {
 	}
 
 	// Hash the password
-	hash := argon2.IDKey([]byte(password), salt, ph.iterations, ph.memory, ph.parallelism, ph.keyLength)
+	var hash []byte
+	if err := ph.run(func() {
+		hash = argon2.IDKey([]byte(password), salt, ph.iterations, ph.memory, ph.parallelism, ph.keyLength)
+	}); err != nil {
+		return "", err
+	}
 
 	// Encode the hash in the format: $argon2id$v=19$m=65536,t=3,p=2$salt$hash
 	b64Salt := base64.RawStdEncoding.EncodeToString(salt)
@@ -91,7 +102,12 @@ func (ph *PasswordHasher) Verify(password, encodedHash string) (bool, error) {
 
 	// Hash the password using the same parameters
 	keyLength := uint32(len(hash))
-	comparisonHash := argon2.IDKey([]byte(password), salt, iterations, memory, parallelism, keyLength)
+	var comparisonHash []byte
+	if err := ph.run(func() {
+		comparisonHash = argon2.IDKey([]byte(password), salt, iterations, memory, parallelism, keyLength)
+	}); err != nil {
+		return false, err
+	}
 
 	// Compare the hashes in constant time
 	if subtle.ConstantTimeCompare(hash, comparisonHash) == 1 {
@@ -100,3 +116,12 @@ func (ph *PasswordHasher) Verify(password, encodedHash string) (bool, error) {
 
 	return false, nil
 }
+
+// run runs an Argon2 computation, through the admission limit if there is one
+func (ph *PasswordHasher) run(fn func()) error {
+	if ph.admission == nil {
+		fn()
+		return nil
+	}
+	return ph.admission.Do(fn)
+}
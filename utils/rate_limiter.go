@@ -0,0 +1,67 @@
+package utils
+
+import (
+	"context"
+	"sync"
+	"time"
+)
+
+// RateLimiter is a token bucket shared by concurrent callers. Tokens refill at a
+// steady rate up to a burst; a caller that finds the bucket empty reserves the next
+// token and waits for it, so callers are served in order at the configured rate.
+type RateLimiter struct {
+	mu       sync.Mutex
+	interval time.Duration
+	burst    int
+	// next is when the bucket next has a token; the bucket is full once it is
+	// burst intervals in the past
+	next time.Time
+	now  func() time.Time
+}
+
+// NewRateLimiter creates a limiter that allows perSecond calls a second with bursts of up to burst
+func NewRateLimiter(perSecond float64, burst int) *RateLimiter {
+	if burst < 1 {
+		burst = 1
+	}
+	return &RateLimiter{
+		interval: time.Duration(float64(time.Second) / perSecond),
+		burst:    burst,
+		now:      time.Now,
+	}
+}
+
+// Wait takes a token, waiting for one if the bucket is empty. It returns the
+// context's error, and gives the token back, if ctx ends first.
+func (l *RateLimiter) Wait(ctx context.Context) error {
+	delay := l.reserve()
+	if delay <= 0 {
+		return nil
+	}
+
+	timer := time.NewTimer(delay)
+	defer timer.Stop()
+	select {
+	case <-timer.C:
+		return nil
+	case <-ctx.Done():
+		l.mu.Lock()
+		l.next = l.next.Add(-l.interval)
+		l.mu.Unlock()
+		return ctx.Err()
+	}
+}
+
+// reserve takes the next token and returns how long until it is available
+func (l *RateLimiter) reserve() time.Duration {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+
+	now := l.now()
+	if full := now.Add(-time.Duration(l.burst-1) * l.interval); l.next.Before(full) {
+		l.next = full
+	}
+	delay := l.next.Sub(now)
+	l.next = l.next.Add(l.interval)
+	return delay
+}
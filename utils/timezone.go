@@ -0,0 +1,179 @@
+package utils
+
+import (
+	"errors"
+	"sync"
+	"sync/atomic"
+	"time"
+)
+
+// timeZoneWindowDays is how many days before and after today each zone's table of
+// day boundaries covers
+const timeZoneWindowDays = 400
+
+// ErrUnknownTimeZone is returned for a name that is not in the IANA time zone database
+var ErrUnknownTimeZone = errors.New("unknown time zone")
+
+// TimeZones is the process-wide time zone cache. Every zone is read from the
+// zoneinfo database once per process.
+var TimeZones = NewTimeZoneCache(timeZoneWindowDays)
+
+// TimeZoneCache resolves time zone names to locations once and maps instants to
+// local days with a table lookup. For every zone it precomputes the UTC instant
+// each local day starts at, for a rolling window around today.
+type TimeZoneCache struct {
+	windowDays int64
+	now        func() time.Time
+
+	mu    sync.RWMutex
+	zones map[string]*zoneDays
+}
+
+// zoneDays is one cached zone and its table of day boundaries
+type zoneDays struct {
+	loc     *time.Location
+	table   atomic.Pointer[dayTable]
+	rebuild sync.Mutex
+}
+
+// dayTable holds the Unix time local day firstDay+i starts at in starts[i]. It has
+// one more entry than days, so starts[i+1] ends day firstDay+i.
+type dayTable struct {
+	firstDay int64
+	starts   []int64
+}
+
+// NewTimeZoneCache creates a cache whose day tables cover windowDays either side of today
+func NewTimeZoneCache(windowDays int) *TimeZoneCache {
+	return &TimeZoneCache{
+		windowDays: int64(windowDays),
+		now:        time.Now,
+		zones:      make(map[string]*zoneDays),
+	}
+}
+
+// Location returns the named zone. Names that are not IANA zones, including the
+// server-dependent "Local", return ErrUnknownTimeZone.
+func (c *TimeZoneCache) Location(name string) (*time.Location, error) {
+	z, err := c.zone(name)
+	if err != nil {
+		return nil, err
+	}
+	return z.loc, nil
+}
+
+// LocalDay returns the number of the local day t falls on in the named zone, counted
+// from 1970-01-01. Unknown zones count in UTC.
+func (c *TimeZoneCache) LocalDay(t time.Time, name string) int64 {
+	z, err := c.zone(name)
+	if err != nil {
+		return localDay(t, time.UTC)
+	}
+
+	u := t.Unix()
+	table := c.table(z, u)
+	if table == nil {
+		return localDay(t, z.loc)
+	}
+
+	// Days are 86400 seconds long except around offset changes, so the guess is at
+	// most one day off
+	last := int64(len(table.starts) - 2)
+	i := (u - table.starts[0]) / 86400
+	if i > last {
+		i = last
+	}
+	for table.starts[i] > u {
+		i--
+	}
+	for table.starts[i+1] <= u {
+		i++
+	}
+	return table.firstDay + i
+}
+
+// DayBounds returns the instants the local day starts and ends at in the named zone.
+// Unknown zones count in UTC.
+func (c *TimeZoneCache) DayBounds(day int64, name string) (time.Time, time.Time) {
+	z, err := c.zone(name)
+	if err != nil {
+		start := dayStart(day, time.UTC)
+		return start, start.AddDate(0, 0, 1)
+	}
+
+	if table := z.table.Load(); table != nil {
+		if i := day - table.firstDay; i >= 0 && i < int64(len(table.starts)-1) {
+			return time.Unix(table.starts[i], 0).In(z.loc), time.Unix(table.starts[i+1], 0).In(z.loc)
+		}
+	}
+	start := dayStart(day, z.loc)
+	return start, dayStart(day+1, z.loc)
+}
+
+// zone returns the cached zone, loading it on first use
+func (c *TimeZoneCache) zone(name string) (*zoneDays, error) {
+	c.mu.RLock()
+	z, ok := c.zones[name]
+	c.mu.RUnlock()
+	if ok {
+		return z, nil
+	}
+
+	if name == "" || name == "Local" {
+		return nil, ErrUnknownTimeZone
+	}
+	loc, err := time.LoadLocation(name)
+	if err != nil {
+		return nil, ErrUnknownTimeZone
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if z, ok := c.zones[name]; ok {
+		return z, nil
+	}
+	z = &zoneDays{loc: loc}
+	c.zones[name] = z
+	return z, nil
+}
+
+// table returns the zone's day table if it covers the Unix time u. A table is
+// built on first use and rebuilt around today once today nears its edge; instants
+// far from today are left to the caller to compute directly.
+func (c *TimeZoneCache) table(z *zoneDays, u int64) *dayTable {
+	table := z.table.Load()
+	if table != nil && u >= table.starts[0] && u < table.starts[len(table.starts)-1] {
+		return table
+	}
+
+	now := c.now()
+	if u < now.Unix()-c.windowDays/2*86400 || u > now.Unix()+c.windowDays/2*86400 {
+		return nil
+	}
+
+	z.rebuild.Lock()
+	defer z.rebuild.Unlock()
+	if table := z.table.Load(); table != nil && u >= table.starts[0] && u < table.starts[len(table.starts)-1] {
+		return table
+	}
+
+	today := localDay(now, z.loc)
+	table = &dayTable{firstDay: today - c.windowDays, starts: make([]int64, 2*c.windowDays+2)}
+	for i := range table.starts {
+		table.starts[i] = dayStart(table.firstDay+int64(i), z.loc).Unix()
+	}
+	z.table.Store(table)
+	return table
+}
+
+// localDay computes the local day of t in loc without a table
+func localDay(t time.Time, loc *time.Location) int64 {
+	year, month, day := t.In(loc).Date()
+	return time.Date(year, month, day, 0, 0, 0, 0, time.UTC).Unix() / 86400
+}
+
+// dayStart returns the instant local day day starts at in loc
+func dayStart(day int64, loc *time.Location) time.Time {
+	date := time.Unix(day*86400, 0).UTC()
+	return time.Date(date.Year(), date.Month(), date.Day(), 0, 0, 0, 0, loc)
+}